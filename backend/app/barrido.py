@@ -0,0 +1,331 @@
+"""
+Barridos de parámetros con caché de resultados en disco.
+Recorre una grilla o puntos aleatorios de ConfiguracionSimulacion en un pool de
+procesos y guarda cada corrida bajo un hash de configuración, semilla y código.
+
+Uso:
+    python -m backend.app.barrido discrete_event --param duracion_verde=3,5,7 --param capacidad_cruce_por_tick=1,2
+    python -m backend.app.barrido discrete_event --rango probabilidad_llegada=0.2:0.8 --puntos 20 --semillas 5
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+from concurrent.futures import Executor, as_completed
+from dataclasses import asdict, fields, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import ConfiguracionSimulacion
+from .sim import MODOS
+from .replicas import crear_pool, ejecutar_replica, resumir_replicas
+from ..core.common.semillas import FlujosAleatorios, derivar_semilla
+
+# Directorio del paquete backend, cuyo código define la versión de los resultados
+RAIZ_CODIGO = Path(__file__).resolve().parent.parent
+
+# Campos que no cambian el resultado de una corrida headless
+CAMPOS_SIN_EFECTO = frozenset({"semilla", "headless", "mostrar_gui", "ancho_ventana", "alto_ventana", "nodos", "hilos"})
+
+CACHE_DEFAULT = ".cache/barridos"
+
+
+@lru_cache(maxsize=1)
+def version_codigo() -> str:
+    """
+    Calcula un hash del código fuente del simulador.
+
+    Cualquier cambio en un módulo de backend (excepto los tests) produce
+    otra versión, así que no se reutilizan resultados de código anterior.
+
+    Returns:
+        Hash sha256 en hexadecimal
+    """
+    h = hashlib.sha256()
+    for ruta in sorted(RAIZ_CODIGO.rglob("*.py")):
+        relativa = ruta.relative_to(RAIZ_CODIGO)
+        if relativa.parts[0] == "tests":
+            continue
+        h.update(str(relativa).encode())
+        h.update(ruta.read_bytes())
+    return h.hexdigest()
+
+
+def clave_resultado(modo: str, config: ConfiguracionSimulacion, semilla: int) -> str:
+    """
+    Calcula la clave de caché de una corrida.
+
+    Args:
+        modo: Engine usado
+        config: Configuración de la corrida
+        semilla: Semilla de la corrida
+
+    Returns:
+        Hash sha256 estable de modo, configuración, semilla y versión del código
+    """
+    parametros = {k: v for k, v in asdict(config).items() if k not in CAMPOS_SIN_EFECTO}
+    contenido = json.dumps(
+        {"modo": modo, "config": parametros, "semilla": semilla, "codigo": version_codigo()},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(contenido.encode()).hexdigest()
+
+
+class CacheResultados:
+    """
+    Caché direccionada por contenido: un archivo JSON por clave.
+
+    Los archivos se reparten en subdirectorios por los dos primeros
+    caracteres de la clave y se escriben de forma atómica (archivo temporal
+    y rename), así que varios barridos pueden compartir el directorio.
+    """
+
+    def __init__(self, directorio: str = CACHE_DEFAULT):
+        """
+        Inicializa la caché.
+
+        Args:
+            directorio: Directorio raíz (se crea al guardar)
+        """
+        self.directorio = Path(directorio)
+
+    def _ruta(self, clave: str) -> Path:
+        return self.directorio / clave[:2] / f"{clave}.json"
+
+    def obtener(self, clave: str) -> Optional[dict]:
+        """
+        Busca un resultado.
+
+        Args:
+            clave: Clave de clave_resultado
+
+        Returns:
+            Resultado guardado, o None si no existe o está dañado
+        """
+        try:
+            with open(self._ruta(clave), encoding="utf-8") as archivo:
+                return json.load(archivo)
+        except (OSError, ValueError):
+            return None
+
+    def guardar(self, clave: str, resultado: dict) -> None:
+        """
+        Guarda un resultado.
+
+        Args:
+            clave: Clave de clave_resultado
+            resultado: Diccionario serializable en JSON
+        """
+        ruta = self._ruta(clave)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(dir=ruta.parent, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as archivo:
+                json.dump(resultado, archivo, ensure_ascii=False)
+            os.replace(temporal, ruta)
+        except BaseException:
+            os.unlink(temporal)
+            raise
+
+    def __repr__(self) -> str:
+        return f"CacheResultados({str(self.directorio)!r})"
+
+
+def _validar_campos(nombres) -> None:
+    """Verifica que los parámetros existan en ConfiguracionSimulacion."""
+    validos = {f.name for f in fields(ConfiguracionSimulacion)}
+    desconocidos = set(nombres) - validos
+    if desconocidos:
+        raise ValueError(f"Campos de configuración desconocidos: {sorted(desconocidos)}")
+
+
+def puntos_grilla(valores: Dict[str, Sequence]) -> List[dict]:
+    """
+    Genera el producto cartesiano de los valores de cada parámetro.
+
+    Args:
+        valores: Valores a probar por campo de la configuración
+
+    Returns:
+        Lista de puntos {campo: valor}
+    """
+    _validar_campos(valores)
+    nombres = list(valores)
+    return [dict(zip(nombres, combinacion)) for combinacion in itertools.product(*valores.values())]
+
+
+def puntos_aleatorios(rangos: Dict[str, Tuple[float, float]], cantidad: int, semilla: int = 0) -> List[dict]:
+    """
+    Muestrea puntos uniformes dentro de rangos.
+
+    Los campos enteros de la configuración se muestrean como enteros
+    (extremos incluidos); el resto, como reales.
+
+    Args:
+        rangos: (mínimo, máximo) por campo de la configuración
+        cantidad: Número de puntos
+        semilla: Semilla del muestreo, para repetir el mismo barrido
+
+    Returns:
+        Lista de puntos {campo: valor}
+    """
+    _validar_campos(rangos)
+    enteros = {f.name for f in fields(ConfiguracionSimulacion) if f.type in (int, "int")}
+    rng = FlujosAleatorios(semilla).flujo("barrido")
+    puntos = []
+    for _ in range(cantidad):
+        punto = {}
+        for nombre, (minimo, maximo) in rangos.items():
+            if nombre in enteros:
+                punto[nombre] = rng.randint(int(minimo), int(maximo))
+            else:
+                punto[nombre] = rng.uniform(minimo, maximo)
+        puntos.append(punto)
+    return puntos
+
+
+def ejecutar_barrido(
+    modo: str,
+    base: ConfiguracionSimulacion,
+    puntos: Sequence[dict],
+    semillas: Sequence[int],
+    cache: Optional[CacheResultados] = None,
+    procesos: Optional[int] = None,
+    pool: Optional[Executor] = None,
+    al_terminar: Optional[Callable[[dict, dict, bool], None]] = None,
+    confianza: float = 0.95,
+) -> List[dict]:
+    """
+    Ejecuta cada punto con cada semilla, calculando solo lo que no está en caché.
+
+    Args:
+        modo: Engine a usar
+        base: Configuración de partida; cada punto reemplaza algunos campos
+        puntos: Puntos del barrido ({campo: valor})
+        semillas: Semillas de las réplicas de cada punto (comunes a todos los puntos)
+        cache: Caché de resultados (None = sin caché)
+        procesos: Tamaño del pool si no se pasa uno
+        pool: Executor a reutilizar
+        al_terminar: Se llama con (punto, resumen de réplica, desde_cache)
+        confianza: Nivel de confianza de los intervalos
+
+    Returns:
+        Un elemento por punto, en el orden recibido, con "parametros",
+        "resumen" (ver resumir_replicas), "calculadas" y "en_cache"
+    """
+    configs = [replace(base, **punto) for punto in puntos]
+    resultados: List[Dict[int, dict]] = [{} for _ in puntos]
+    calculadas = [0] * len(puntos)
+    pendientes = []
+
+    for i, config in enumerate(configs):
+        for semilla in semillas:
+            clave = clave_resultado(modo, config, semilla)
+            guardado = cache.obtener(clave) if cache is not None else None
+            if guardado is not None:
+                resultados[i][semilla] = guardado
+                if al_terminar is not None:
+                    al_terminar(puntos[i], guardado, True)
+            else:
+                pendientes.append((i, semilla, clave))
+
+    if pendientes:
+        propio = pool is None
+        if propio:
+            pool = crear_pool(procesos)
+        try:
+            futuros = {
+                pool.submit(ejecutar_replica, modo, configs[i], semilla): (i, semilla, clave)
+                for i, semilla, clave in pendientes
+            }
+            for futuro in as_completed(futuros):
+                i, semilla, clave = futuros[futuro]
+                resumen = futuro.result()
+                if cache is not None:
+                    cache.guardar(clave, resumen)
+                resultados[i][semilla] = resumen
+                calculadas[i] += 1
+                if al_terminar is not None:
+                    al_terminar(puntos[i], resumen, False)
+        finally:
+            if propio:
+                pool.shutdown(cancel_futures=True)
+
+    return [
+        {
+            "parametros": dict(punto),
+            "resumen": resumir_replicas([resultados[i][s] for s in semillas], confianza),
+            "calculadas": calculadas[i],
+            "en_cache": len(semillas) - calculadas[i],
+        }
+        for i, punto in enumerate(puntos)
+    ]
+
+
+def _parsear_valor(texto: str):
+    """Interpreta un valor de la línea de comandos como int, float o texto."""
+    for tipo in (int, float):
+        try:
+            return tipo(texto)
+        except ValueError:
+            pass
+    return texto
+
+
+def main():
+    """Punto de entrada del barrido por línea de comandos."""
+    parser = argparse.ArgumentParser(description="Barrido de parámetros de la simulación de tráfico")
+    parser.add_argument(
+        "modo",
+        choices=MODOS,
+        help="Engine a usar en cada corrida"
+    )
+    parser.add_argument(
+        "--param", action="append", default=[], metavar="CAMPO=V1,V2,...",
+        help="Valores de grilla para un campo de la configuración (repetible)"
+    )
+    parser.add_argument(
+        "--rango", action="append", default=[], metavar="CAMPO=MIN:MAX",
+        help="Rango para muestreo aleatorio de un campo (repetible)"
+    )
+    parser.add_argument("--puntos", type=int, default=10, help="Puntos aleatorios con --rango (default: 10)")
+    parser.add_argument("--semillas", type=int, default=3, help="Réplicas por punto (default: 3)")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla maestra del barrido (default: 0)")
+    parser.add_argument("--ciclos", type=int, default=10, help="Ciclos por corrida (default: 10)")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos del pool (default: cpu_count)")
+    parser.add_argument("--cache", default=CACHE_DEFAULT, help=f"Directorio de la caché (default: {CACHE_DEFAULT})")
+    parser.add_argument("--sin-cache", action="store_true", help="No lee ni escribe la caché")
+    args = parser.parse_args()
+
+    if not args.param and not args.rango:
+        parser.error("Indique al menos un --param o un --rango")
+
+    puntos = [{}]
+    if args.param:
+        grilla = {}
+        for texto in args.param:
+            nombre, _, valores = texto.partition("=")
+            grilla[nombre] = [_parsear_valor(v) for v in valores.split(",")]
+        puntos = puntos_grilla(grilla)
+    if args.rango:
+        rangos = {}
+        for texto in args.rango:
+            nombre, _, limites = texto.partition("=")
+            minimo, _, maximo = limites.partition(":")
+            rangos[nombre] = (_parsear_valor(minimo), _parsear_valor(maximo))
+        aleatorios = puntos_aleatorios(rangos, args.puntos, args.semilla)
+        puntos = [{**p, **a} for p in puntos for a in aleatorios]
+
+    semillas = [derivar_semilla(args.semilla, "replica", str(r)) for r in range(args.semillas)]
+    base = ConfiguracionSimulacion(ciclos_minimos=args.ciclos, headless=True)
+    cache = None if args.sin_cache else CacheResultados(args.cache)
+
+    for resultado in ejecutar_barrido(args.modo, base, puntos, semillas, cache=cache, procesos=args.procesos):
+        print(json.dumps(resultado, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
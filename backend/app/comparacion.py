@@ -0,0 +1,143 @@
+"""
+Comparación pareada de configuraciones o engines.
+Corre las dos alternativas con las mismas semillas, de modo que ven exactamente la
+misma demanda, y estima la diferencia con un intervalo sobre las diferencias pareadas.
+
+Uso:
+    python -m backend.app.comparacion discrete_event --a duracion_verde=5 --b duracion_verde=7
+    python -m backend.app.comparacion threading --modo-b discrete_event --semillas 5
+"""
+import argparse
+import json
+import math
+from concurrent.futures import Executor
+from dataclasses import replace
+from typing import Dict, Optional, Sequence
+
+from .config import ConfiguracionSimulacion
+from .sim import MODOS
+from .replicas import crear_pool, ejecutar_replica
+from ..core.common.intervalos import cuantil_t, intervalo_confianza
+from ..core.common.semillas import derivar_semilla
+
+METRICAS_COMPARADAS = ("tiempo_espera_promedio", "espera_p95", "throughput")
+
+
+def comparar_pareado(
+    modo_a: str,
+    config_a: ConfiguracionSimulacion,
+    modo_b: str,
+    config_b: ConfiguracionSimulacion,
+    semillas: Sequence[int],
+    confianza: float = 0.95,
+    procesos: Optional[int] = None,
+    pool: Optional[Executor] = None,
+) -> Dict:
+    """
+    Compara B contra A con números aleatorios comunes.
+
+    Cada semilla se corre con A y con B. Como la demanda de cada vía sale de
+    un subflujo con nombre que solo depende de la semilla, la diferencia de
+    una semilla se debe únicamente a la configuración o al engine.
+
+    Args:
+        modo_a: Engine de la alternativa A
+        config_a: Configuración de A
+        modo_b: Engine de la alternativa B
+        config_b: Configuración de B
+        semillas: Semillas comunes
+        confianza: Nivel de confianza
+        procesos: Tamaño del pool si no se pasa uno
+        pool: Executor a reutilizar
+
+    Returns:
+        Por métrica: intervalos de A y de B, de la diferencia pareada (B - A),
+        el semiancho que tendría la comparación con réplicas independientes
+        y el factor de reducción de varianza del emparejamiento
+    """
+    propio = pool is None
+    if propio:
+        pool = crear_pool(procesos)
+    try:
+        futuros_a = [pool.submit(ejecutar_replica, modo_a, config_a, s) for s in semillas]
+        futuros_b = [pool.submit(ejecutar_replica, modo_b, config_b, s) for s in semillas]
+        resultados_a = [f.result() for f in futuros_a]
+        resultados_b = [f.result() for f in futuros_b]
+    finally:
+        if propio:
+            pool.shutdown(cancel_futures=True)
+
+    n = len(semillas)
+    comparacion = {"replicas": n, "confianza": confianza}
+    for metrica in METRICAS_COMPARADAS:
+        a = [r[metrica] for r in resultados_a]
+        b = [r[metrica] for r in resultados_b]
+        pareada = intervalo_confianza([y - x for x, y in zip(a, b)], confianza)
+        intervalo_a = intervalo_confianza(a, confianza)
+        intervalo_b = intervalo_confianza(b, confianza)
+
+        independiente = reduccion = None
+        if n >= 2:
+            varianza_independiente = intervalo_a["desviacion"] ** 2 + intervalo_b["desviacion"] ** 2
+            independiente = cuantil_t(0.5 + confianza / 2, 2 * n - 2) * math.sqrt(varianza_independiente / n)
+            varianza_pareada = pareada["desviacion"] ** 2
+            if varianza_pareada > 0:
+                reduccion = varianza_independiente / varianza_pareada
+            elif varianza_independiente > 0:
+                reduccion = math.inf
+
+        comparacion[metrica] = {
+            "a": intervalo_a,
+            "b": intervalo_b,
+            "diferencia": pareada,
+            "semiancho_independiente": independiente,
+            # Réplicas independientes necesarias por cada réplica pareada para igual precisión
+            "reduccion_varianza": reduccion,
+            "significativa": (
+                pareada["inferior"] is not None
+                and (pareada["inferior"] > 0 or pareada["superior"] < 0)
+            ),
+        }
+    return comparacion
+
+
+def _parsear_asignaciones(textos) -> dict:
+    """Convierte ["campo=valor", ...] en un diccionario con valores numéricos."""
+    cambios = {}
+    for texto in textos:
+        nombre, _, valor = texto.partition("=")
+        for tipo in (int, float):
+            try:
+                valor = tipo(valor)
+                break
+            except ValueError:
+                pass
+        cambios[nombre] = valor
+    return cambios
+
+
+def main():
+    """Punto de entrada de la comparación por línea de comandos."""
+    parser = argparse.ArgumentParser(description="Comparación pareada con números aleatorios comunes")
+    parser.add_argument("modo", choices=MODOS, help="Engine de la alternativa A (y de B si no se indica --modo-b)")
+    parser.add_argument("--modo-b", choices=MODOS, default=None, help="Engine de la alternativa B")
+    parser.add_argument("--a", action="append", default=[], metavar="CAMPO=VALOR", help="Cambio de configuración de A")
+    parser.add_argument("--b", action="append", default=[], metavar="CAMPO=VALOR", help="Cambio de configuración de B")
+    parser.add_argument("--ciclos", type=int, default=50, help="Ciclos por corrida (default: 50)")
+    parser.add_argument("--semillas", type=int, default=10, help="Semillas comunes (default: 10)")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla maestra (default: 0)")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos del pool (default: cpu_count)")
+    args = parser.parse_args()
+
+    base = ConfiguracionSimulacion(ciclos_minimos=args.ciclos, headless=True)
+    resultado = comparar_pareado(
+        args.modo, replace(base, **_parsear_asignaciones(args.a)),
+        args.modo_b or args.modo, replace(base, **_parsear_asignaciones(args.b)),
+        [derivar_semilla(args.semilla, "replica", str(r)) for r in range(args.semillas)],
+        procesos=args.procesos,
+    )
+    print(json.dumps(resultado, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ Configuración de la simulación de tráfico.
 Contiene todos los parámetros ajustables del sistema.
 """
 from dataclasses import dataclass
+from typing import List, Optional
 
 
 @dataclass
@@ -14,29 +15,89 @@ class ConfiguracionSimulacion:
         duracion_verde: Ticks que dura la luz verde
         duracion_amarillo: Ticks que dura la luz amarilla
         capacidad_cruce_por_tick: Vehículos máximos que cruzan por tick
+        programa_fases: Programa de fases propio, como lista de diccionarios
+            {"nombre", "duracion", "verde": [vías], "amarillo": [vías]}.
+            None = programa clásico NS/EW con duracion_verde y duracion_amarillo
     
     Atributos de simulación:
         ticks_totales: Número total de ticks a simular
         intervalo_tick: Tiempo real entre ticks (segundos)
         probabilidad_llegada: Probabilidad de que llegue un vehículo por vía por tick
+        distribucion_llegadas: 'bernoulli' (0 o 1 por tick), 'binomial' o 'poisson'
+        max_llegadas_por_tick: Ensayos por tick de la binomial; la poisson usa
+            la misma media (max_llegadas_por_tick * probabilidad_llegada)
+        semilla: Semilla maestra de las llegadas (None = una al azar por corrida)
+    
+    Atributos de red (engines vectorizado y de red):
+        num_intersecciones: Intersecciones simuladas en paralelo
+        interseccion_observada: Intersección que se reporta en TrafficState
+        desfase_intersecciones: Ticks de desfase de fase entre intersecciones
+            consecutivas (0 = todas sincronizadas)
+        red: Red vial del engine 'network' (ver RedVial.desde_config), por
+            ejemplo {"tipo": "corredor", "intersecciones": 10}. None =
+            intersecciones independientes
+        regiones: Procesos del engine 'network_multiprocessing'; la red se
+            reparte en ese número de regiones (None = cpu_count)
+        hilos: Hilos por proceso de los engines 'network' y
+            'network_multiprocessing'; cada uno avanza un tramo de enlaces e
+            intersecciones (None = 1). Se configura aparte de `regiones`
+        sincronizacion: 'conservadora' (ventanas comunes del tamaño del
+            lookahead) u 'optimista' (Time Warp, con retrocesos)
+        intervalo_checkpoint: Ticks entre capturas de estado de cada región
+            en la sincronización optimista
+        adelanto_maximo: Ticks que una región optimista puede ir por delante
+            del GVT (acota la memoria de capturas)
     
     Atributos de sistema:
-        modo: 'threading' o 'multiprocessing'
+        modo: 'threading', 'multiprocessing', 'vectorized', 'discrete_event', 'network'
+            o 'network_multiprocessing'
         ciclos_minimos: Ciclos mínimos para completar la simulación
+        tolerancia_relativa: Si se indica, la corrida termina antes de
+            ciclos_minimos cuando el semiancho relativo del intervalo de la
+            espera promedio y de la cola (tras el calentamiento) no supera
+            este valor. None = siempre se corren ciclos_minimos
+        confianza: Nivel de confianza de ese intervalo
+        headless: Ejecuta sin pausas ni salida por consola (modo batch)
+        lookahead: Ticks que los workers de multiprocessing pueden adelantarse
+            al proceso principal (1 = síncrono)
+        nodos: Direcciones "host:puerto" de nodos (python -m backend.app.nodo)
+            donde correr los workers de 'multiprocessing' y
+            'network_multiprocessing' por sockets (None = procesos locales).
+            La clave compartida con los nodos se lee de SIM_CLAVE_NODOS
     """
     # Semáforos
     duracion_verde: int = 5
     duracion_amarillo: int = 2
     capacidad_cruce_por_tick: int = 2
+    programa_fases: Optional[List[dict]] = None
     
     # Simulación
     ticks_totales: int = 100  # Suficiente para ~7 ciclos con config default
     intervalo_tick: float = 0.3  # 300ms entre ticks
     probabilidad_llegada: float = 0.6  # 60% de probabilidad
+    distribucion_llegadas: str = "bernoulli"
+    max_llegadas_por_tick: int = 1
+    semilla: Optional[int] = None  # Reproduce la corrida completa
+    
+    # Red (engines vectorizado y de red)
+    num_intersecciones: int = 1
+    interseccion_observada: int = 0
+    desfase_intersecciones: int = 0
+    red: Optional[dict] = None
+    regiones: Optional[int] = None
+    hilos: Optional[int] = None
+    sincronizacion: str = "conservadora"
+    intervalo_checkpoint: int = 8
+    adelanto_maximo: int = 256
     
     # Sistema
-    modo: str = "threading"  # 'threading' o 'multiprocessing'
+    modo: str = "threading"  # Ver MODOS en sim.py
     ciclos_minimos: int = 10
+    tolerancia_relativa: Optional[float] = None  # Terminación adaptativa (p. ej. 0.02)
+    confianza: float = 0.95
+    headless: bool = False  # Sin sleep ni consola, reporte final en JSON
+    lookahead: int = 1  # PASO en vuelo por worker en multiprocessing
+    nodos: Optional[List[str]] = None  # Workers en otros hosts, por sockets
     
     # GUI
     mostrar_gui: bool = True
@@ -46,6 +107,8 @@ class ConfiguracionSimulacion:
     @property
     def duracion_ciclo(self) -> int:
         """Calcula la duración de un ciclo completo en ticks."""
+        if self.programa_fases:
+            return sum(int(fase["duracion"]) for fase in self.programa_fases)
         return 2 * (self.duracion_verde + self.duracion_amarillo)
 
     def __repr__(self) -> str:
@@ -0,0 +1,37 @@
+"""
+Nodo de ejecución remota.
+Corre en cada host los workers que le asigna un engine multiprocessing con
+`--nodos`; todos los hosts deben tener la misma versión del código y la misma
+clave en SIM_CLAVE_NODOS.
+
+Uso:
+    export SIM_CLAVE_NODOS=$(python -c "import secrets; print(secrets.token_hex(32))")
+    python -m backend.app.nodo --host 0.0.0.0 --puerto 7001
+    python -m backend.app.sim multiprocessing --headless --nodos host1:7001,host2:7001
+"""
+import argparse
+
+from ..runtime.comms.nodos import VARIABLE_CLAVE, clave_nodos, servir_nodo
+
+
+def main():
+    """Punto de entrada del nodo por línea de comandos."""
+    parser = argparse.ArgumentParser(description="Nodo que corre workers de la simulación por sockets")
+    parser.add_argument(
+        "--host", default="127.0.0.1",
+        help="Interfaz en la que escuchar (default: 127.0.0.1; 0.0.0.0 acepta otros hosts)",
+    )
+    parser.add_argument("--puerto", type=int, default=7001, help="Puerto TCP (default: 7001)")
+    args = parser.parse_args()
+
+    try:
+        clave = clave_nodos()
+    except ValueError:
+        parser.error(f"defina {VARIABLE_CLAVE} con la clave compartida con el coordinador")
+
+    print(f"Nodo escuchando en {args.host}:{args.puerto}")
+    servir_nodo(args.host, args.puerto, clave=clave)
+
+
+if __name__ == "__main__":
+    main()
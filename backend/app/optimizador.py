@@ -0,0 +1,348 @@
+"""
+Optimización de tiempos semafóricos.
+Busca las duraciones de fase que minimizan la espera promedio o el p95 para una
+demanda dada, evaluando generaciones completas de candidatos en un pool de procesos.
+
+Uso:
+    python -m backend.app.optimizador discrete_event --fase NS_VERDE=3:30 --fase EW_VERDE=3:30
+    python -m backend.app.optimizador discrete_event --fase NS_VERDE=3:30 --objetivo p95 --probabilidad 0.3
+"""
+import argparse
+import json
+import math
+from concurrent.futures import Executor, as_completed
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import ConfiguracionSimulacion
+from .sim import MODOS
+from .replicas import crear_pool, ejecutar_replica
+from ..core.common.intervalos import intervalo_confianza
+from ..core.common.semillas import FlujosAleatorios, derivar_semilla
+from ..core.traffic.programa import ProgramaSemaforico
+
+# Métrica de resumir_reporte que minimiza cada objetivo
+OBJETIVOS = {
+    "promedio": "tiempo_espera_promedio",
+    "p95": "espera_p95",
+}
+
+
+class OptimizadorTiempos:
+    """
+    Optimizador de duraciones de fase por muestreo (estrategia evolutiva).
+
+    - Cada generación muestrea candidatos alrededor de una media con una
+      dispersión por fase, como un CMA-ES diagonal simplificado; la media y
+      la dispersión se actualizan con los mejores de la generación
+    - Todos los candidatos de una generación se evalúan con las mismas
+      semillas (números aleatorios comunes), así que las diferencias entre
+      candidatos no se deben a la demanda sorteada
+    - La evaluación avanza por etapas de semillas; tras cada etapa se
+      descartan los candidatos cuya diferencia pareada con el mejor tiene un
+      intervalo de confianza completamente positivo (claramente peores)
+    - Los resultados se memorizan por (candidato, semilla): un candidato que
+      reaparece no se vuelve a simular
+    """
+
+    def __init__(
+        self,
+        modo: str,
+        base: ConfiguracionSimulacion,
+        limites: Dict[str, Tuple[int, int]],
+        objetivo: str = "promedio",
+        semillas: Sequence[int] = (0, 1, 2, 3),
+        semillas_por_etapa: int = 2,
+        tamano_generacion: int = 8,
+        confianza: float = 0.95,
+        semilla_busqueda: int = 0,
+    ):
+        """
+        Inicializa el optimizador.
+
+        Args:
+            modo: Engine headless a usar
+            base: Configuración con la demanda; su programa de fases (o el
+                clásico) es el punto de partida
+            limites: (mínimo, máximo) de duración por nombre de fase a optimizar;
+                las fases no mencionadas conservan su duración
+            objetivo: 'promedio' o 'p95' del tiempo de espera
+            semillas: Semillas comunes con que se evalúa cada candidato
+            semillas_por_etapa: Semillas que se agregan entre descartes
+            tamano_generacion: Candidatos por generación
+            confianza: Nivel de confianza para descartar candidatos
+            semilla_busqueda: Semilla del muestreo de candidatos
+
+        Raises:
+            ValueError: Si el objetivo o alguna fase no existen
+        """
+        if objetivo not in OBJETIVOS:
+            raise ValueError(f"Objetivo inválido: {objetivo}. Use {', '.join(OBJETIVOS)}")
+        self.fases = ProgramaSemaforico.desde_config(base).a_lista()
+        nombres = [fase["nombre"] for fase in self.fases]
+        desconocidas = set(limites) - set(nombres)
+        if desconocidas:
+            raise ValueError(f"Fases desconocidas: {sorted(desconocidas)}")
+
+        self.modo = modo
+        self.base = base
+        self.variables = [nombre for nombre in nombres if nombre in limites]
+        self.limites = [limites[nombre] for nombre in self.variables]
+        self.metrica = OBJETIVOS[objetivo]
+        self._horizonte = base.ciclos_minimos * base.duracion_ciclo
+        self.semillas = list(semillas)
+        self.semillas_por_etapa = max(1, semillas_por_etapa)
+        self.tamano_generacion = max(2, tamano_generacion)
+        self.confianza = confianza
+        self._rng = FlujosAleatorios(semilla_busqueda).flujo("optimizador")
+
+        self._memoria: Dict[Tuple[Tuple[int, ...], int], float] = {}
+        self.evaluaciones = 0
+        self.evaluaciones_ahorradas = 0
+
+        inicial = {fase["nombre"]: fase["duracion"] for fase in self.fases}
+        self.media = [float(self._acotar(inicial[n], i)) for i, n in enumerate(self.variables)]
+        self.dispersion = [(maximo - minimo) / 4 for minimo, maximo in self.limites]
+
+    def _acotar(self, valor: float, indice: int) -> int:
+        """Redondea una duración y la lleva a su rango."""
+        minimo, maximo = self.limites[indice]
+        return min(maximo, max(minimo, int(round(valor))))
+
+    def configuracion(self, candidato: Sequence[int]) -> ConfiguracionSimulacion:
+        """
+        Construye la configuración de un candidato.
+
+        Args:
+            candidato: Duración de cada fase variable, en el orden de self.variables
+
+        Returns:
+            Configuración base con el programa de fases modificado. Los
+            ciclos se ajustan para que todos los candidatos simulen
+            aproximadamente los mismos ticks que la configuración base.
+        """
+        duraciones = dict(zip(self.variables, candidato))
+        fases = [{**fase, "duracion": duraciones.get(fase["nombre"], fase["duracion"])} for fase in self.fases]
+        ciclo = sum(fase["duracion"] for fase in fases)
+        ciclos = max(1, round(self._horizonte / ciclo))
+        return replace(self.base, programa_fases=fases, ciclos_minimos=ciclos)
+
+    def _muestrear(self, incumbente: Optional[Tuple[int, ...]]) -> List[Tuple[int, ...]]:
+        """Genera los candidatos distintos de una generación."""
+        candidatos = []
+        if incumbente is not None:
+            candidatos.append(incumbente)
+        centro = tuple(self._acotar(m, i) for i, m in enumerate(self.media))
+        if centro not in candidatos:
+            candidatos.append(centro)
+
+        intentos = 0
+        while len(candidatos) < self.tamano_generacion and intentos < 20 * self.tamano_generacion:
+            intentos += 1
+            candidato = tuple(
+                self._acotar(self._rng.gauss(m, s), i)
+                for i, (m, s) in enumerate(zip(self.media, self.dispersion))
+            )
+            if candidato not in candidatos:
+                candidatos.append(candidato)
+        return candidatos
+
+    def _evaluar(self, pool: Executor, trabajos: List[Tuple[Tuple[int, ...], int]]) -> None:
+        """Simula en paralelo los pares (candidato, semilla) que no están memorizados."""
+        pendientes = [t for t in trabajos if t not in self._memoria]
+        futuros = {
+            pool.submit(ejecutar_replica, self.modo, self.configuracion(candidato), semilla): (candidato, semilla)
+            for candidato, semilla in pendientes
+        }
+        for futuro in as_completed(futuros):
+            self._memoria[futuros[futuro]] = futuro.result()[self.metrica]
+        self.evaluaciones += len(pendientes)
+
+    def _valores(self, candidato: Tuple[int, ...], semillas: Sequence[int]) -> List[float]:
+        return [self._memoria[(candidato, s)] for s in semillas]
+
+    def evaluar_generacion(self, pool: Executor, candidatos: List[Tuple[int, ...]]) -> List[dict]:
+        """
+        Evalúa una generación por etapas de semillas, descartando a los claramente peores.
+
+        Args:
+            pool: Executor donde simular
+            candidatos: Candidatos de la generación
+
+        Returns:
+            Un diccionario por candidato con "candidato", "valor" (media sobre
+            las semillas evaluadas), "semillas" y "descartado"
+        """
+        vivos = list(candidatos)
+        descartados: Dict[Tuple[int, ...], int] = {}
+        evaluadas = 0
+
+        while evaluadas < len(self.semillas) and len(vivos) > 1:
+            evaluadas = min(len(self.semillas), evaluadas + self.semillas_por_etapa)
+            semillas = self.semillas[:evaluadas]
+            self._evaluar(pool, [(c, s) for c in vivos for s in semillas])
+
+            if evaluadas < 2 or evaluadas == len(self.semillas):
+                continue
+            mejor = min(vivos, key=lambda c: sum(self._valores(c, semillas)))
+            referencia = self._valores(mejor, semillas)
+            for candidato in list(vivos):
+                if candidato == mejor:
+                    continue
+                diferencias = [a - b for a, b in zip(self._valores(candidato, semillas), referencia)]
+                inferior = intervalo_confianza(diferencias, self.confianza)["inferior"]
+                if inferior is not None and inferior > 0:
+                    vivos.remove(candidato)
+                    descartados[candidato] = evaluadas
+                    self.evaluaciones_ahorradas += len(self.semillas) - evaluadas
+
+        if len(vivos) == 1 and evaluadas < len(self.semillas):
+            # Último sobreviviente: completa sus semillas para compararlo entre generaciones
+            self._evaluar(pool, [(vivos[0], s) for s in self.semillas])
+
+        resultados = []
+        for candidato in candidatos:
+            n = descartados.get(candidato, len(self.semillas))
+            valores = self._valores(candidato, self.semillas[:n])
+            resultados.append({
+                "candidato": candidato,
+                "valor": math.fsum(valores) / len(valores),
+                "semillas": n,
+                "descartado": candidato in descartados,
+            })
+        return resultados
+
+    def _actualizar(self, resultados: List[dict]) -> None:
+        """Mueve la media hacia los mejores candidatos y ajusta la dispersión."""
+        completos = sorted((r for r in resultados if not r["descartado"]), key=lambda r: r["valor"])
+        elite = completos[:max(1, len(resultados) // 2)]
+        pesos = [math.log(len(elite) + 0.5) - math.log(k + 1) for k in range(len(elite))]
+        total = sum(pesos)
+
+        for i in range(len(self.variables)):
+            valores = [r["candidato"][i] for r in elite]
+            nueva = sum(p * v for p, v in zip(pesos, valores)) / total
+            dispersion_elite = math.sqrt(sum(p * (v - nueva) ** 2 for p, v in zip(pesos, valores)) / total)
+            self.media[i] = nueva
+            # Mezcla con la dispersión anterior para no colapsar en una generación
+            self.dispersion[i] = max(0.3, 0.5 * self.dispersion[i] + 0.5 * dispersion_elite)
+
+    def optimizar(
+        self,
+        generaciones: int = 10,
+        procesos: Optional[int] = None,
+        pool: Optional[Executor] = None,
+        al_terminar_generacion: Optional[Callable[[dict], None]] = None,
+    ) -> dict:
+        """
+        Ejecuta la búsqueda.
+
+        Args:
+            generaciones: Número máximo de generaciones
+            procesos: Tamaño del pool si no se pasa uno
+            pool: Executor a reutilizar
+            al_terminar_generacion: Se llama con el resumen de cada generación
+
+        Returns:
+            Diccionario con el mejor programa, su valor, el historial y el
+            número de simulaciones hechas y evitadas
+        """
+        propio = pool is None
+        if propio:
+            pool = crear_pool(procesos)
+        mejor: Optional[dict] = None
+        historial = []
+        try:
+            for generacion in range(generaciones):
+                candidatos = self._muestrear(mejor["candidato"] if mejor else None)
+                resultados = self.evaluar_generacion(pool, candidatos)
+                completos = [r for r in resultados if not r["descartado"]]
+                lider = min(completos, key=lambda r: r["valor"])
+                if mejor is None or lider["valor"] < mejor["valor"]:
+                    mejor = lider
+                self._actualizar(resultados)
+
+                resumen = {
+                    "generacion": generacion,
+                    "candidatos": len(candidatos),
+                    "descartados": sum(r["descartado"] for r in resultados),
+                    "mejor": dict(zip(self.variables, mejor["candidato"])),
+                    "valor": mejor["valor"],
+                    "evaluaciones": self.evaluaciones,
+                }
+                historial.append(resumen)
+                if al_terminar_generacion is not None:
+                    al_terminar_generacion(resumen)
+                if all(s <= 0.5 for s in self.dispersion):
+                    break
+        finally:
+            if propio:
+                pool.shutdown(cancel_futures=True)
+
+        return {
+            "objetivo": self.metrica,
+            "mejor": dict(zip(self.variables, mejor["candidato"])),
+            "valor": mejor["valor"],
+            "programa_fases": self.configuracion(mejor["candidato"]).programa_fases,
+            "historial": historial,
+            "evaluaciones": self.evaluaciones,
+            "evaluaciones_ahorradas": self.evaluaciones_ahorradas,
+        }
+
+
+def main():
+    """Punto de entrada del optimizador por línea de comandos."""
+    parser = argparse.ArgumentParser(description="Optimización de tiempos semafóricos")
+    parser.add_argument(
+        "modo",
+        choices=MODOS,
+        help="Engine a usar en cada evaluación"
+    )
+    parser.add_argument(
+        "--fase", action="append", default=[], metavar="NOMBRE=MIN:MAX", required=True,
+        help="Rango de duración de una fase a optimizar (repetible)"
+    )
+    parser.add_argument("--objetivo", choices=list(OBJETIVOS), default="promedio", help="Métrica a minimizar")
+    parser.add_argument("--programa", default=None, help="Archivo JSON con el programa de partida")
+    parser.add_argument("--probabilidad", type=float, default=0.6, help="Probabilidad de llegada (default: 0.6)")
+    parser.add_argument("--ciclos", type=int, default=50, help="Ciclos por evaluación (default: 50)")
+    parser.add_argument("--generaciones", type=int, default=10, help="Generaciones máximas (default: 10)")
+    parser.add_argument("--poblacion", type=int, default=8, help="Candidatos por generación (default: 8)")
+    parser.add_argument("--semillas", type=int, default=6, help="Semillas comunes por candidato (default: 6)")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla maestra (default: 0)")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos del pool (default: cpu_count)")
+    args = parser.parse_args()
+
+    limites = {}
+    for texto in args.fase:
+        nombre, _, rango = texto.partition("=")
+        minimo, _, maximo = rango.partition(":")
+        limites[nombre] = (int(minimo), int(maximo))
+
+    programa_fases = None
+    if args.programa:
+        with open(args.programa, encoding="utf-8") as archivo:
+            programa_fases = json.load(archivo)
+
+    base = ConfiguracionSimulacion(
+        probabilidad_llegada=args.probabilidad,
+        ciclos_minimos=args.ciclos,
+        programa_fases=programa_fases,
+        headless=True,
+    )
+    optimizador = OptimizadorTiempos(
+        args.modo, base, limites,
+        objetivo=args.objetivo,
+        semillas=[derivar_semilla(args.semilla, "replica", str(r)) for r in range(args.semillas)],
+        tamano_generacion=args.poblacion,
+        semilla_busqueda=args.semilla,
+    )
+    resultado = optimizador.optimizar(
+        args.generaciones, procesos=args.procesos,
+        al_terminar_generacion=lambda g: print(json.dumps({"generacion": g}, ensure_ascii=False), flush=True),
+    )
+    print(json.dumps({"resultado": resultado}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
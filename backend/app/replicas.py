@@ -0,0 +1,185 @@
+"""
+Réplicas Monte Carlo de la simulación.
+Ejecuta la misma configuración con varias semillas en un pool de procesos y
+resume los resultados con intervalos de confianza.
+"""
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from .config import ConfiguracionSimulacion
+from .sim import ejecutar_headless
+from ..core.common.intervalos import intervalo_confianza
+
+
+def resumir_reporte(reporte: dict) -> dict:
+    """
+    Extrae de un reporte headless las métricas que se comparan entre réplicas.
+
+    En el engine vectorizado usa el agregado de la red, no solo la
+    intersección observada. En los engines de red un vehículo cruza varias
+    intersecciones: el throughput cuenta los vehículos que salen de la red,
+    mientras que las esperas y `cruces_por_tick` son por cruce.
+
+    Args:
+        reporte: Resultado de ejecutar_headless
+
+    Returns:
+        Diccionario con semilla, ticks, tiempo_espera_promedio, espera_p95,
+        throughput (vehículos por tick) y vehiculos_por_via; en los engines
+        de red, también cruces_por_tick
+    """
+    estadisticas = reporte["estadisticas"].get("red", reporte["estadisticas"])
+    ticks = reporte["ticks"]
+    p95 = estadisticas.get("espera", {}).get("percentiles", {}).get("p95")
+    completados = estadisticas.get("salidas_red", estadisticas["total_vehiculos"])
+    resumen = {
+        "semilla": reporte["semilla"],
+        "ticks": ticks,
+        "tiempo_espera_promedio": estadisticas["tiempo_espera_promedio"],
+        "espera_p95": p95 if p95 is not None else 0.0,
+        "throughput": completados / ticks if ticks else 0.0,
+        "vehiculos_por_via": dict(estadisticas["vehiculos_por_via"]),
+        "tiempo_total_s": reporte["tiempo_total_s"],
+    }
+    if "cruces" in estadisticas:
+        resumen["cruces_por_tick"] = estadisticas["cruces"] / ticks if ticks else 0.0
+    return resumen
+
+
+def ejecutar_replica(modo: str, config: ConfiguracionSimulacion, semilla: int) -> dict:
+    """
+    Ejecuta una réplica headless con una semilla.
+
+    Es una función de módulo para que el pool de procesos pueda enviarla a
+    sus workers.
+
+    Args:
+        modo: Engine a usar
+        config: Configuración base
+        semilla: Semilla de esta réplica
+
+    Returns:
+        Resumen de la réplica (ver resumir_reporte)
+    """
+    return resumir_reporte(ejecutar_headless(modo, replace(config, semilla=semilla, headless=True)))
+
+
+def crear_pool(procesos: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Crea un pool de procesos para réplicas.
+
+    El mismo pool puede pasarse a varias llamadas de ejecutar_replicas para
+    no pagar el arranque de los procesos en cada una.
+
+    Args:
+        procesos: Número de procesos (None = os.cpu_count())
+
+    Returns:
+        ProcessPoolExecutor sin tareas
+    """
+    return ProcessPoolExecutor(max_workers=procesos or os.cpu_count() or 1)
+
+
+def iterar_replicas(
+    modo: str,
+    config: ConfiguracionSimulacion,
+    semillas: Iterable[int],
+    pool: Executor,
+) -> Iterator[dict]:
+    """
+    Envía una réplica por semilla al pool y las entrega a medida que terminan.
+
+    Args:
+        modo: Engine a usar
+        config: Configuración base
+        semillas: Semillas de las réplicas
+        pool: Executor donde correrlas
+
+    Yields:
+        Resumen de cada réplica, en orden de finalización
+    """
+    futuros = [pool.submit(ejecutar_replica, modo, config, semilla) for semilla in semillas]
+    try:
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+    finally:
+        for futuro in futuros:
+            futuro.cancel()
+
+
+def resumir_replicas(resumenes: List[dict], confianza: float = 0.95) -> dict:
+    """
+    Combina los resúmenes de varias réplicas.
+
+    Cada réplica aporta una observación independiente, así que los
+    intervalos son intervalos t sobre las medias de cada corrida.
+
+    Args:
+        resumenes: Resúmenes de réplica (ver resumir_reporte)
+        confianza: Nivel de confianza de los intervalos
+
+    Returns:
+        Diccionario con el número de réplicas y un intervalo por métrica
+        (cruces_por_tick solo si todas las réplicas lo traen)
+    """
+    vias = sorted({via for r in resumenes for via in r["vehiculos_por_via"]})
+    resumen = {
+        "replicas": len(resumenes),
+        "confianza": confianza,
+        "semillas": sorted(r["semilla"] for r in resumenes),
+        "tiempo_espera_promedio": intervalo_confianza(
+            [r["tiempo_espera_promedio"] for r in resumenes], confianza
+        ),
+        "espera_p95": intervalo_confianza([r["espera_p95"] for r in resumenes], confianza),
+        "throughput": intervalo_confianza([r["throughput"] for r in resumenes], confianza),
+        "vehiculos_por_via": {
+            via: intervalo_confianza(
+                [r["vehiculos_por_via"].get(via, 0) for r in resumenes], confianza
+            )
+            for via in vias
+        },
+    }
+    if resumenes and all("cruces_por_tick" in r for r in resumenes):
+        resumen["cruces_por_tick"] = intervalo_confianza([r["cruces_por_tick"] for r in resumenes], confianza)
+    return resumen
+
+
+def ejecutar_replicas(
+    modo: str,
+    config: ConfiguracionSimulacion,
+    semillas: Iterable[int],
+    procesos: Optional[int] = None,
+    confianza: float = 0.95,
+    al_terminar: Optional[Callable[[dict], None]] = None,
+    pool: Optional[Executor] = None,
+) -> Dict:
+    """
+    Ejecuta réplicas en paralelo y calcula medias con intervalos de confianza.
+
+    Args:
+        modo: Engine a usar
+        config: Configuración base (se fuerza headless)
+        semillas: Una semilla por réplica
+        procesos: Tamaño del pool si no se pasa uno (None = os.cpu_count())
+        confianza: Nivel de confianza de los intervalos
+        al_terminar: Se llama con el resumen de cada réplica al terminar
+        pool: Executor a reutilizar. Si es None se crea uno y se cierra al final.
+
+    Returns:
+        Resumen de resumir_replicas
+    """
+    propio = pool is None
+    if propio:
+        pool = crear_pool(procesos)
+    try:
+        resumenes = []
+        for resumen in iterar_replicas(modo, config, semillas, pool):
+            resumenes.append(resumen)
+            if al_terminar is not None:
+                al_terminar(resumen)
+    finally:
+        if propio:
+            pool.shutdown(cancel_futures=True)
+    return resumir_replicas(resumenes, confianza)
@@ -6,14 +6,34 @@ Uso:
     python -m backend.app.sim threading
     python -m backend.app.sim multiprocessing
     py -3.13t -X gil=0 -m backend.app.sim threading
+    python -m backend.app.sim threading --headless --ciclos 5000
+    python -m backend.app.sim multiprocessing --headless --lookahead 8
+    python -m backend.app.sim vectorized --headless --intersecciones 1000
+    python -m backend.app.sim discrete_event --headless --ciclos 100000
+    python -m backend.app.sim vectorized --headless --programa fases.json
+    python -m backend.app.sim discrete_event --replicas 32 --semilla 1
+    python -m backend.app.sim discrete_event --headless --ciclos 100000 --tolerancia 0.01
+    python -m backend.app.sim network --headless --red grilla:10x10
+    python -m backend.app.sim network_multiprocessing --headless --red grilla:30x30 --regiones 4
+    python -m backend.app.sim network_multiprocessing --headless --red grilla:30x30 --sincronizacion optimista
+    py -3.13t -X gil=0 -m backend.app.sim network_multiprocessing --headless --red grilla:30x30 --regiones 2 --hilos 8
+    SIM_CLAVE_NODOS=... python -m backend.app.sim multiprocessing --headless --nodos 10.0.0.2:7001,10.0.0.3:7001
 """
 import sys
+import json
 import argparse
-from time import sleep, time
+from dataclasses import asdict
+from time import sleep, time, perf_counter
 
 from .config import ConfiguracionSimulacion
 from ..runtime.engines.threading_engine import ThreadingEngine
 from ..runtime.engines.multiprocessing_engine import MultiprocessingEngine
+from ..runtime.engines.vectorized_engine import VectorizedEngine
+from ..runtime.engines.discrete_event_engine import DiscreteEventEngine
+from ..runtime.engines.network_engine import NetworkEngine
+from ..runtime.engines.partitioned_engine import PartitionedNetworkEngine
+from ..core.common.semillas import derivar_semilla, nueva_semilla
+from ..core.common.convergencia import MonitorConvergencia
 
 
 def mostrar_estado(state, intervalo_tiempo: float = None):
@@ -31,7 +51,10 @@ def mostrar_estado(state, intervalo_tiempo: float = None):
     print(f"\n📊 Estadísticas:")
     stats = state.estadisticas
     print(f"  Total vehículos cruzados: {stats.get('total_vehiculos', 0)}")
-    print(f"  Tiempo espera promedio: {stats.get('tiempo_espera_promedio', 0):.3f}s")
+    print(f"  Tiempo espera promedio: {stats.get('tiempo_espera_promedio', 0):.3f} ticks")
+    percentiles = stats.get('espera', {}).get('percentiles', {})
+    if any(v is not None for v in percentiles.values()):
+        print(f"  Percentiles espera: " + ", ".join(f"{p}={v:.0f}" for p, v in percentiles.items()))
     
     vehiculos_via = stats.get('vehiculos_por_via', {})
     if vehiculos_via:
@@ -47,6 +70,110 @@ def mostrar_estado(state, intervalo_tiempo: float = None):
         print(f"\n⏱️ Tiempo de ejecución: {intervalo_tiempo:.3f}s")
 
 
+MODOS = (
+    "threading", "multiprocessing", "vectorized", "discrete_event", "network", "network_multiprocessing",
+)
+
+
+def crear_engine(modo: str, config: ConfiguracionSimulacion):
+    """
+    Crea el engine correspondiente al modo.
+    
+    Args:
+        modo: 'threading' o 'multiprocessing'
+        config: Configuración de la simulación
+        
+    Returns:
+        Engine sin iniciar
+    """
+    if modo == "threading":
+        return ThreadingEngine(config)
+    elif modo == "multiprocessing":
+        return MultiprocessingEngine(config)
+    elif modo == "vectorized":
+        return VectorizedEngine(config)
+    elif modo == "discrete_event":
+        return DiscreteEventEngine(config)
+    elif modo == "network":
+        return NetworkEngine(config)
+    elif modo == "network_multiprocessing":
+        return PartitionedNetworkEngine(config)
+    raise ValueError(f"Modo inválido: {modo}. Use {', '.join(MODOS)}")
+
+
+def ejecutar_headless(modo: str, config: ConfiguracionSimulacion) -> dict:
+    """
+    Ejecuta la simulación lo más rápido posible, sin pausas ni consola.
+    
+    El tiempo de la simulación es lógico (ticks del controlador), por lo que
+    el resultado no depende de `intervalo_tick` ni de la carga del equipo.
+    Con `tolerancia_relativa` la corrida se observa al cierre de cada ciclo
+    y termina en cuanto las métricas convergen.
+    
+    Args:
+        modo: 'threading' o 'multiprocessing'
+        config: Configuración de la simulación
+        
+    Returns:
+        Reporte serializable con rendimiento y estadísticas finales
+    """
+    engine = crear_engine(modo, config)
+    monitor = None
+    if config.tolerancia_relativa is not None:
+        monitor = MonitorConvergencia(config.tolerancia_relativa, config.confianza)
+    
+    engine.start()
+    try:
+        inicio = perf_counter()
+        tick_count = 0
+        ciclo = config.duracion_ciclo
+        if isinstance(engine, DiscreteEventEngine) and monitor is None:
+            # Salta directamente al fin de la corrida, procesando solo eventos
+            tick_count = config.ciclos_minimos * ciclo
+            engine.avanzar_hasta(tick_count)
+        while engine.controlador.ciclo_actual < config.ciclos_minimos:
+            if isinstance(engine, DiscreteEventEngine):
+                # Salta al cierre del ciclo siguiente
+                tick_count += ciclo
+                state = engine.avanzar_hasta(tick_count)
+            else:
+                state = engine.step()
+                tick_count += 1
+            if monitor is not None and tick_count % ciclo == 0:
+                _observar_ciclo(monitor, state)
+                if monitor.convergido():
+                    break
+        state_final = engine.get_state()
+        duracion = perf_counter() - inicio
+    finally:
+        engine.stop()
+    
+    reporte = {
+        "modo": modo,
+        "ticks": tick_count,
+        "ciclos": state_final.ciclo,
+        "tiempo_total_s": round(duracion, 6),
+        "ticks_por_segundo": round(tick_count / duracion, 2) if duracion > 0 else None,
+        "tiempo_simulado_s": round(tick_count * config.intervalo_tick, 3),
+        "semilla": engine.semilla,
+        "configuracion": asdict(config),
+        "estadisticas": state_final.estadisticas,
+    }
+    if monitor is not None:
+        reporte["convergencia"] = monitor.get_resumen(tick_count)
+    return reporte
+
+
+def _observar_ciclo(monitor: MonitorConvergencia, state) -> None:
+    """Pasa al monitor las métricas acumuladas al cierre de un ciclo."""
+    estadisticas = state.estadisticas.get("red", state.estadisticas)
+    monitor.observar(
+        estadisticas["tiempo_espera_total"],
+        estadisticas["total_vehiculos"],
+        sum(state.colas.values()),
+    )
+
+
 def ejecutar_simulacion(modo: str, config: ConfiguracionSimulacion):
     """
     Ejecuta la simulación con el modo especificado.
@@ -55,15 +182,15 @@ def ejecutar_simulacion(modo: str, config: ConfiguracionSimulacion):
         modo: 'threading' o 'multiprocessing'
         config: Configuración de la simulación
     """
+    if config.headless:
+        reporte = ejecutar_headless(modo, config)
+        print(json.dumps(reporte, ensure_ascii=False))
+        return reporte
+    
     # Crear engine según el modo
-    if modo == "threading":
-        print("\n🧵 Iniciando simulación con THREADING...")
-        engine = ThreadingEngine(config)
-    elif modo == "multiprocessing":
-        print("\n🔄 Iniciando simulación con MULTIPROCESSING...")
-        engine = MultiprocessingEngine(config)
-    else:
-        raise ValueError(f"Modo inválido: {modo}. Use 'threading' o 'multiprocessing'")
+    engine = crear_engine(modo, config)
+    icono = "🧵" if modo == "threading" else "🔄"
+    print(f"\n{icono} Iniciando simulación con {modo.upper()}...")
     
     # Iniciar engine
     engine.start()
@@ -84,6 +211,9 @@ def ejecutar_simulacion(modo: str, config: ConfiguracionSimulacion):
     # Ejecutar simulación
     inicio = time()
     tick_count = 0
+    monitor = None
+    if config.tolerancia_relativa is not None:
+        monitor = MonitorConvergencia(config.tolerancia_relativa, config.confianza)
     
     try:
         while engine.controlador.ciclo_actual < config.ciclos_minimos:
@@ -95,6 +225,13 @@ def ejecutar_simulacion(modo: str, config: ConfiguracionSimulacion):
             if tick_count % 5 == 0:
                 mostrar_estado(state)
             
+            # Terminar antes si las métricas ya convergieron
+            if monitor is not None and tick_count % ticks_por_ciclo == 0:
+                _observar_ciclo(monitor, state)
+                if monitor.convergido():
+                    print(f"\n📉 Métricas convergidas tras {tick_count} ticks")
+                    break
+            
             # Pausar entre ticks
             sleep(config.intervalo_tick)
         
@@ -121,6 +258,44 @@ def ejecutar_simulacion(modo: str, config: ConfiguracionSimulacion):
         print("\n✓ Engine detenido\n")
 
 
+def ejecutar_replicas_cli(modo: str, config: ConfiguracionSimulacion, replicas: int, procesos: int = None):
+    """
+    Ejecuta réplicas y emite una línea JSON por réplica y el resumen al final.
+    
+    Las semillas de las réplicas se derivan de la semilla maestra, así que
+    repetir el comando con la misma --semilla reproduce todas las réplicas.
+    
+    Args:
+        modo: Engine a usar
+        config: Configuración base
+        replicas: Número de réplicas
+        procesos: Tamaño del pool (None = cpu_count)
+    """
+    from .replicas import ejecutar_replicas
+    
+    base = config.semilla if config.semilla is not None else nueva_semilla()
+    semillas = [derivar_semilla(base, "replica", str(r)) for r in range(replicas)]
+    resumen = ejecutar_replicas(
+        modo, config, semillas, procesos=procesos,
+        al_terminar=lambda r: print(json.dumps({"replica": r}, ensure_ascii=False), flush=True),
+    )
+    resumen["semilla"] = base
+    print(json.dumps({"resumen": resumen}, ensure_ascii=False))
+    return resumen
+
+
+def _parsear_red(texto: str) -> dict:
+    """Interpreta --red: 'corredor:N', 'grilla:FxC' o la ruta de un JSON."""
+    tipo, _, tamano = texto.partition(":")
+    if tipo == "corredor":
+        return {"tipo": "corredor", "intersecciones": int(tamano)}
+    if tipo == "grilla":
+        filas, _, columnas = tamano.partition("x")
+        return {"tipo": "grilla", "filas": int(filas), "columnas": int(columnas)}
+    with open(texto, encoding="utf-8") as archivo:
+        return json.load(archivo)
+
+
 def main():
     """Función principal."""
     parser = argparse.ArgumentParser(
@@ -128,7 +303,7 @@ def main():
     )
     parser.add_argument(
         "modo",
-        choices=["threading", "multiprocessing"],
+        choices=MODOS,
         help="Modo de ejecución paralela"
     )
     parser.add_argument(
@@ -155,9 +330,109 @@ def main():
         default=0.3,
         help="Tiempo entre ticks en segundos (default: 0.3)"
     )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Ejecuta sin pausas ni consola y emite un reporte JSON al final"
+    )
+    parser.add_argument(
+        "--probabilidad",
+        type=float,
+        default=0.6,
+        help="Probabilidad de llegada por vía y ensayo (default: 0.6)"
+    )
+    parser.add_argument(
+        "--distribucion",
+        choices=["bernoulli", "binomial", "poisson"],
+        default="bernoulli",
+        help="Distribución de llegadas por vía y tick (default: bernoulli)"
+    )
+    parser.add_argument(
+        "--max-llegadas",
+        type=int,
+        default=1,
+        help="Ensayos por tick para binomial/poisson (default: 1)"
+    )
+    parser.add_argument(
+        "--intersecciones",
+        type=int,
+        default=1,
+        help="Intersecciones a simular en modo vectorized (default: 1)"
+    )
+    parser.add_argument(
+        "--semilla",
+        type=int,
+        default=None,
+        help="Semilla maestra de las llegadas, para reproducir una corrida"
+    )
+    parser.add_argument(
+        "--lookahead",
+        type=int,
+        default=1,
+        help="Ticks que los workers de multiprocessing pueden adelantarse (default: 1)"
+    )
+    parser.add_argument(
+        "--programa",
+        default=None,
+        help="Archivo JSON con la lista de fases (reemplaza --verde y --amarillo)"
+    )
+    parser.add_argument(
+        "--red",
+        default=None,
+        help="Red del modo network: corredor:N, grilla:FxC o un archivo JSON (ver RedVial)"
+    )
+    parser.add_argument(
+        "--regiones",
+        type=int,
+        default=None,
+        help="Procesos (regiones de la red) de network_multiprocessing (default: cpu_count)"
+    )
+    parser.add_argument(
+        "--hilos",
+        type=int,
+        default=None,
+        help="Hilos por proceso de network y network_multiprocessing (default: 1)"
+    )
+    parser.add_argument(
+        "--sincronizacion",
+        choices=["conservadora", "optimista"],
+        default="conservadora",
+        help="Sincronización entre regiones de network_multiprocessing (default: conservadora)"
+    )
+    parser.add_argument(
+        "--nodos",
+        default=None,
+        help="Nodos host:puerto,... (python -m backend.app.nodo) donde correr los workers de multiprocessing; "
+             "requiere la clave compartida en SIM_CLAVE_NODOS"
+    )
+    parser.add_argument(
+        "--tolerancia",
+        type=float,
+        default=None,
+        help="Termina antes de --ciclos cuando el semiancho relativo del IC baja de este valor (p. ej. 0.02)"
+    )
+    parser.add_argument(
+        "--replicas",
+        type=int,
+        default=None,
+        help="Réplicas headless en un pool de procesos; reporta medias e intervalos de confianza"
+    )
+    parser.add_argument(
+        "--procesos",
+        type=int,
+        default=None,
+        help="Procesos del pool de réplicas (default: cpu_count)"
+    )
     
     args = parser.parse_args()
     
+    programa_fases = None
+    if args.programa:
+        with open(args.programa, encoding="utf-8") as archivo:
+            programa_fases = json.load(archivo)
+    
+    red = _parsear_red(args.red) if args.red else None
+    
     # Crear configuración
     config = ConfiguracionSimulacion(
         modo=args.modo,
@@ -165,13 +440,32 @@ def main():
         duracion_amarillo=args.amarillo,
         ciclos_minimos=args.ciclos,
         intervalo_tick=args.intervalo,
+        headless=args.headless,
+        lookahead=args.lookahead,
+        semilla=args.semilla,
+        num_intersecciones=args.intersecciones,
+        probabilidad_llegada=args.probabilidad,
+        distribucion_llegadas=args.distribucion,
+        max_llegadas_por_tick=args.max_llegadas,
+        programa_fases=programa_fases,
+        tolerancia_relativa=args.tolerancia,
+        red=red,
+        regiones=args.regiones,
+        hilos=args.hilos,
+        sincronizacion=args.sincronizacion,
+        nodos=args.nodos.split(",") if args.nodos else None,
     )
     
+    if args.replicas:
+        ejecutar_replicas_cli(args.modo, config, args.replicas, args.procesos)
+        return
+    
     # Mostrar información del sistema
-    import sys
-    sys.path.insert(0, 'C:\\Users\\EleXc\\Music\\paralela-multi-hilos')
-    from system_info import mostrar_info_sistema
-    mostrar_info_sistema()
+    if not config.headless:
+        import sys
+        sys.path.insert(0, 'C:\\Users\\EleXc\\Music\\paralela-multi-hilos')
+        from system_info import mostrar_info_sistema
+        mostrar_info_sistema()
     
     # Ejecutar simulación
     ejecutar_simulacion(args.modo, config)
@@ -0,0 +1,226 @@
+"""
+Acumuladores de memoria constante para métricas de la simulación.
+Permiten calcular media, varianza y percentiles sin guardar cada muestra.
+"""
+import math
+from typing import Dict, Iterable, Optional
+
+# Percentiles reportados por defecto
+PERCENTILES = (50, 90, 95, 99)
+
+
+class HistogramaLog:
+    """
+    Histograma con cubetas logarítmicas para valores enteros no negativos.
+
+    Los valores menores que 2**bits_precision se guardan exactos. Por encima,
+    cada potencia de dos se divide en 2**(bits_precision - 1) cubetas, por lo
+    que el error relativo de un percentil queda acotado por
+    2**-(bits_precision - 1) (≈3% con el valor por defecto). El número de
+    cubetas está acotado por el rango de los valores, no por la cantidad de
+    muestras.
+    """
+
+    def __init__(self, bits_precision: int = 6):
+        """
+        Inicializa el histograma.
+
+        Args:
+            bits_precision: Bits de la mantisa que se conservan exactos
+        """
+        self.bits_precision = bits_precision
+        self._limite_exacto = 1 << bits_precision
+        self._mitad = 1 << (bits_precision - 1)
+        self._cubetas: Dict[int, int] = {}
+        self._cuenta = 0
+
+    def _indice(self, valor: int) -> int:
+        """Calcula la cubeta de un valor."""
+        if valor < self._limite_exacto:
+            return valor
+        desplazamiento = valor.bit_length() - self.bits_precision
+        mantisa = valor >> desplazamiento
+        return self._limite_exacto + (desplazamiento - 1) * self._mitad + (mantisa - self._mitad)
+
+    def _rango(self, indice: int):
+        """Retorna el rango [inferior, superior] de valores de una cubeta."""
+        if indice < self._limite_exacto:
+            return indice, indice
+        relativo = indice - self._limite_exacto
+        desplazamiento = relativo // self._mitad + 1
+        mantisa = relativo % self._mitad + self._mitad
+        inferior = mantisa << desplazamiento
+        return inferior, inferior + (1 << desplazamiento) - 1
+
+    def agregar(self, valor: int, veces: int = 1) -> None:
+        """
+        Registra un valor.
+
+        Args:
+            valor: Valor entero no negativo
+            veces: Número de repeticiones del valor
+        """
+        indice = self._indice(max(0, int(valor)))
+        self._cubetas[indice] = self._cubetas.get(indice, 0) + veces
+        self._cuenta += veces
+
+    def percentil(self, p: float) -> Optional[float]:
+        """
+        Estima un percentil por rango más cercano.
+
+        Args:
+            p: Percentil entre 0 y 100
+
+        Returns:
+            Valor estimado, o None si el histograma está vacío
+        """
+        if self._cuenta == 0:
+            return None
+        objetivo = max(1, math.ceil(p / 100 * self._cuenta))
+        acumulado = 0
+        for indice in sorted(self._cubetas):
+            acumulado += self._cubetas[indice]
+            if acumulado >= objetivo:
+                inferior, superior = self._rango(indice)
+                return (inferior + superior) / 2
+        inferior, superior = self._rango(max(self._cubetas))
+        return (inferior + superior) / 2
+
+    def combinar(self, otro: "HistogramaLog") -> None:
+        """
+        Suma a este histograma las cubetas de otro.
+
+        Args:
+            otro: Histograma con la misma precisión
+        """
+        if otro.bits_precision != self.bits_precision:
+            raise ValueError("No se pueden combinar histogramas con distinta precisión")
+        for indice, veces in otro._cubetas.items():
+            self._cubetas[indice] = self._cubetas.get(indice, 0) + veces
+        self._cuenta += otro._cuenta
+
+    @property
+    def cuenta(self) -> int:
+        """Retorna el número de valores registrados."""
+        return self._cuenta
+
+    @property
+    def num_cubetas(self) -> int:
+        """Retorna el número de cubetas ocupadas."""
+        return len(self._cubetas)
+
+    def __repr__(self) -> str:
+        return f"HistogramaLog(cuenta={self._cuenta}, cubetas={len(self._cubetas)})"
+
+
+class AcumuladorEspera:
+    """
+    Resumen en streaming de una serie de tiempos de espera.
+
+    Mantiene cuenta, suma, media y varianza (algoritmo de Welford), mínimo,
+    máximo y un HistogramaLog para percentiles. Usa memoria constante sin
+    importar cuántos vehículos se registren.
+    """
+
+    def __init__(self):
+        """Inicializa el acumulador vacío."""
+        self.cuenta = 0
+        self.suma = 0
+        self.media = 0.0
+        self._m2 = 0.0
+        self.minimo: Optional[int] = None
+        self.maximo: Optional[int] = None
+        self.histograma = HistogramaLog()
+
+    def agregar(self, valor: int, veces: int = 1) -> None:
+        """
+        Registra un tiempo de espera.
+
+        Args:
+            valor: Tiempo de espera en ticks
+            veces: Número de vehículos con esa misma espera
+        """
+        self.cuenta += veces
+        self.suma += valor * veces
+        delta = valor - self.media
+        self.media += delta * veces / self.cuenta
+        self._m2 += delta * (valor - self.media) * veces
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if self.maximo is None or valor > self.maximo:
+            self.maximo = valor
+        self.histograma.agregar(valor, veces)
+
+    def agregar_varios(self, valores: Iterable[int]) -> None:
+        """Registra varios tiempos de espera."""
+        for valor in valores:
+            self.agregar(valor)
+
+    def combinar(self, otro: "AcumuladorEspera") -> None:
+        """
+        Incorpora las muestras resumidas en otro acumulador.
+
+        Usa la fórmula de Chan para combinar medias y varianzas, por lo que el
+        resultado es el mismo que si todas las muestras se hubieran registrado
+        en este acumulador.
+
+        Args:
+            otro: Acumulador parcial (por ejemplo, de un proceso worker)
+        """
+        if otro.cuenta == 0:
+            return
+        if self.cuenta == 0:
+            self.media = otro.media
+            self._m2 = otro._m2
+        else:
+            total = self.cuenta + otro.cuenta
+            delta = otro.media - self.media
+            self.media += delta * otro.cuenta / total
+            self._m2 += otro._m2 + delta * delta * self.cuenta * otro.cuenta / total
+        self.cuenta += otro.cuenta
+        self.suma += otro.suma
+        if self.minimo is None or otro.minimo < self.minimo:
+            self.minimo = otro.minimo
+        if self.maximo is None or otro.maximo > self.maximo:
+            self.maximo = otro.maximo
+        self.histograma.combinar(otro.histograma)
+
+    @property
+    def varianza(self) -> float:
+        """Retorna la varianza muestral. 0 con menos de dos muestras."""
+        if self.cuenta < 2:
+            return 0.0
+        return self._m2 / (self.cuenta - 1)
+
+    @property
+    def desviacion(self) -> float:
+        """Retorna la desviación estándar muestral."""
+        return math.sqrt(self.varianza)
+
+    def percentil(self, p: float) -> Optional[float]:
+        """Estima un percentil, acotado al rango observado."""
+        valor = self.histograma.percentil(p)
+        if valor is None:
+            return None
+        return min(max(valor, self.minimo), self.maximo)
+
+    def get_resumen(self) -> dict:
+        """
+        Genera un resumen serializable.
+
+        Returns:
+            Diccionario con cuenta, media, desviación, extremos y percentiles
+        """
+        return {
+            "cuenta": self.cuenta,
+            "promedio": round(self.media, 3),
+            "desviacion": round(self.desviacion, 3),
+            "minimo": self.minimo,
+            "maximo": self.maximo,
+            "percentiles": {
+                f"p{p}": self.percentil(p) for p in PERCENTILES
+            },
+        }
+
+    def __repr__(self) -> str:
+        return f"AcumuladorEspera(cuenta={self.cuenta}, media={self.media:.2f})"
@@ -0,0 +1,198 @@
+"""
+Detección de convergencia de una corrida.
+Trunca el calentamiento con MSER y estima intervalos de confianza por medias de lotes.
+"""
+import math
+from typing import Dict, List, Sequence, Tuple
+
+from .intervalos import intervalo_confianza
+
+# Métricas que vigila el monitor
+METRICAS = ("tiempo_espera_promedio", "cola_total")
+
+
+def truncamiento_mser(valores: Sequence[float], tamano_lote: int = 5) -> int:
+    """
+    Estima cuántas observaciones iniciales descartar como calentamiento (MSER-m).
+
+    Agrupa la serie en lotes de `tamano_lote` y elige el punto de corte d
+    (como máximo la mitad de la serie) que minimiza el error estándar de la
+    media de lo que queda: sum((x_i - media_d)^2) / (n - d)^2.
+
+    Args:
+        valores: Serie de observaciones en orden temporal
+        tamano_lote: Observaciones por lote (5 = MSER-5)
+
+    Returns:
+        Número de observaciones a descartar (múltiplo de tamano_lote)
+    """
+    lotes = [
+        math.fsum(valores[i:i + tamano_lote]) / tamano_lote
+        for i in range(0, len(valores) - tamano_lote + 1, tamano_lote)
+    ]
+    n = len(lotes)
+    if n < 2:
+        return 0
+
+    # Sumas y sumas de cuadrados desde cada posición hasta el final
+    suma = cuadrados = 0.0
+    sufijo: List[Tuple[float, float]] = [(0.0, 0.0)] * n
+    for i in range(n - 1, -1, -1):
+        suma += lotes[i]
+        cuadrados += lotes[i] * lotes[i]
+        sufijo[i] = (suma, cuadrados)
+
+    mejor, corte = math.inf, 0
+    for d in range(n // 2 + 1):
+        restantes = n - d
+        s, s2 = sufijo[d]
+        estadistico = max(0.0, s2 - s * s / restantes) / (restantes * restantes)
+        if estadistico < mejor:
+            mejor, corte = estadistico, d
+    return corte * tamano_lote
+
+
+class MonitorConvergencia:
+    """
+    Vigila la convergencia de la espera promedio y de la cola total.
+
+    Recibe una observación por ciclo de semáforos (así cada observación
+    abarca todas las fases y la serie no tiene periodicidad):
+    - Espera: espera acumulada y vehículos despachados en el ciclo; la media
+      de un lote es el cociente de sus sumas
+    - Cola: suma de las colas al cerrar el ciclo
+
+    Tras descartar el calentamiento (MSER-5), divide lo que queda en un
+    número fijo de lotes y calcula un intervalo t sobre las medias de lote.
+    La corrida converge cuando el semiancho relativo de todas las métricas
+    es menor o igual a la tolerancia.
+    """
+
+    def __init__(self, tolerancia_relativa: float, confianza: float = 0.95, lotes: int = 20):
+        """
+        Inicializa el monitor.
+
+        Args:
+            tolerancia_relativa: Semiancho del intervalo dividido por la media
+                (por ejemplo 0.02 = ±2%)
+            confianza: Nivel de confianza de los intervalos
+            lotes: Número de lotes para las medias de lotes
+        """
+        self.tolerancia_relativa = tolerancia_relativa
+        self.confianza = confianza
+        self.lotes = lotes
+        self.observaciones_minimas = 2 * lotes
+
+        self._espera: List[Tuple[float, int]] = []  # (espera acumulada, vehículos) por ciclo
+        self._cola: List[float] = []
+        self._espera_anterior = 0.0
+        self._vehiculos_anterior = 0
+        self._proxima_revision = self.observaciones_minimas
+
+    @property
+    def observaciones(self) -> int:
+        """Retorna el número de ciclos observados."""
+        return len(self._cola)
+
+    def observar(self, espera_total: float, vehiculos: int, cola_total: int) -> None:
+        """
+        Registra el cierre de un ciclo.
+
+        Args:
+            espera_total: Espera acumulada de todos los vehículos despachados hasta ahora
+            vehiculos: Vehículos despachados hasta ahora
+            cola_total: Vehículos en cola en todas las vías al cerrar el ciclo
+        """
+        self._espera.append((espera_total - self._espera_anterior, vehiculos - self._vehiculos_anterior))
+        self._cola.append(float(cola_total))
+        self._espera_anterior = espera_total
+        self._vehiculos_anterior = vehiculos
+
+    def estimar(self) -> Dict:
+        """
+        Calcula calentamiento e intervalos con las observaciones actuales.
+
+        Returns:
+            Diccionario con "calentamiento_ciclos", "tamano_lote" y, por
+            métrica, media, semiancho y semiancho relativo (None si todavía
+            no hay observaciones suficientes)
+        """
+        n = self.observaciones
+        espera_ciclo = [s / v if v else 0.0 for s, v in self._espera]
+        calentamiento = max(truncamiento_mser(espera_ciclo), truncamiento_mser(self._cola))
+        tamano_lote = (n - calentamiento) // self.lotes
+
+        estimacion = {"ciclos": n, "calentamiento_ciclos": calentamiento, "tamano_lote": tamano_lote}
+        if n < self.observaciones_minimas or tamano_lote < 1:
+            estimacion.update({metrica: None for metrica in METRICAS})
+            return estimacion
+
+        # Lotes contiguos que terminan en la última observación
+        inicio = n - tamano_lote * self.lotes
+        medias_espera, medias_cola = [], []
+        for k in range(self.lotes):
+            desde, hasta = inicio + k * tamano_lote, inicio + (k + 1) * tamano_lote
+            suma = math.fsum(s for s, _ in self._espera[desde:hasta])
+            vehiculos = sum(v for _, v in self._espera[desde:hasta])
+            if vehiculos:
+                medias_espera.append(suma / vehiculos)
+            medias_cola.append(math.fsum(self._cola[desde:hasta]) / tamano_lote)
+
+        for metrica, medias in zip(METRICAS, (medias_espera, medias_cola)):
+            intervalo = intervalo_confianza(medias, self.confianza)
+            media, semiancho = intervalo["media"], intervalo["semiancho"]
+            if semiancho is None:
+                relativo = None
+            elif media:
+                relativo = semiancho / abs(media)
+            else:
+                relativo = 0.0 if semiancho == 0 else math.inf
+            estimacion[metrica] = {"media": media, "semiancho": semiancho, "relativo": relativo}
+        return estimacion
+
+    def convergido(self) -> bool:
+        """
+        Verifica si todas las métricas alcanzaron la tolerancia.
+
+        Recalcula la estimación solo cuando las observaciones crecieron un 5%
+        desde la última revisión, para que el costo total sea casi lineal.
+
+        Returns:
+            True si la corrida puede terminar
+        """
+        n = self.observaciones
+        if n < self._proxima_revision:
+            return False
+        self._proxima_revision = max(n + 1, math.ceil(n * 1.05))
+        return self._cumple(self.estimar())
+
+    def _cumple(self, estimacion: Dict) -> bool:
+        """Verifica la tolerancia en todas las métricas de una estimación."""
+        return all(
+            estimacion[m] is not None
+            and estimacion[m]["relativo"] is not None
+            and estimacion[m]["relativo"] <= self.tolerancia_relativa
+            for m in METRICAS
+        )
+
+    def get_resumen(self, ticks: int) -> dict:
+        """
+        Genera el reporte de convergencia.
+
+        Args:
+            ticks: Ticks simulados
+
+        Returns:
+            Diccionario serializable con la estimación final y los ticks usados
+        """
+        estimacion = self.estimar()
+        return {
+            "convergido": self._cumple(estimacion),
+            "ticks_necesarios": ticks,
+            "tolerancia_relativa": self.tolerancia_relativa,
+            "confianza": self.confianza,
+            **estimacion,
+        }
+
+    def __repr__(self) -> str:
+        return f"MonitorConvergencia(ciclos={self.observaciones}, tolerancia={self.tolerancia_relativa})"
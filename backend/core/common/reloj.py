@@ -0,0 +1,52 @@
+"""
+Reloj lógico de la simulación.
+Mide el tiempo en ticks enteros en lugar de tiempo real.
+"""
+
+
+class RelojSimulacion:
+    """
+    Reloj de la simulación basado en ticks.
+
+    Los engines lo avanzan una vez por tick. Al no depender del reloj del
+    sistema, los tiempos de espera son reproducibles aunque la simulación
+    se acelere, se pause o se reproduzca de nuevo.
+    """
+
+    def __init__(self, tick_inicial: int = 0):
+        """
+        Inicializa el reloj.
+
+        Args:
+            tick_inicial: Tick desde el que empieza a contar
+        """
+        self._tick = tick_inicial
+
+    @property
+    def ahora(self) -> int:
+        """Retorna el tick actual."""
+        return self._tick
+
+    def avanzar(self) -> int:
+        """
+        Avanza el reloj un tick.
+
+        Returns:
+            El nuevo tick actual
+        """
+        self._tick += 1
+        return self._tick
+
+    def sincronizar(self, tick: int) -> None:
+        """
+        Fija el reloj en un tick dado.
+
+        Usado por procesos worker que reciben el tick del proceso principal.
+
+        Args:
+            tick: Tick a fijar
+        """
+        self._tick = tick
+
+    def __repr__(self) -> str:
+        return f"RelojSimulacion(tick={self._tick})"
@@ -0,0 +1,114 @@
+"""
+Gestión de semillas y subflujos aleatorios.
+Cada componente estocástico obtiene su propio flujo, identificado por nombre y
+reproducible a partir de la semilla maestra de la corrida.
+"""
+import hashlib
+import random
+from typing import Optional
+
+# Componentes estocásticos con flujo propio
+COMPONENTE_LLEGADAS = "llegadas"
+COMPONENTE_SERVICIO = "servicio"
+
+
+def derivar_semilla(semilla: int, *nombres: str) -> int:
+    """
+    Deriva una semilla independiente a partir de la semilla maestra.
+
+    El resultado solo depende de los argumentos (no de PYTHONHASHSEED ni del
+    proceso), así que cualquier worker obtiene el mismo flujo.
+
+    Args:
+        semilla: Semilla maestra de la corrida
+        nombres: Componentes que identifican el flujo (p. ej. "llegadas", "NORTE")
+
+    Returns:
+        Semilla entera de 64 bits
+    """
+    clave = "/".join((str(semilla),) + nombres).encode()
+    return int.from_bytes(hashlib.sha256(clave).digest()[:8], "little")
+
+
+class FlujosAleatorios:
+    """
+    Fuente de subflujos aleatorios con nombre.
+
+    Un subflujo se identifica por una ruta de nombres, por ejemplo
+    ("llegadas", "NORTE") o ("servicio", "3", "ESTE"). Su semilla depende solo
+    de la semilla maestra y de la ruta, nunca del engine, de la configuración
+    ni del orden en que se pidan los flujos. Dos corridas con la misma semilla
+    maestra ven exactamente la misma demanda aunque cambien los tiempos de
+    los semáforos o el engine (números aleatorios comunes).
+
+    Ningún componente debe usar el RNG global del módulo `random`.
+    """
+
+    def __init__(self, semilla_maestra: Optional[int] = None, *prefijo: str):
+        """
+        Inicializa la fuente.
+
+        Args:
+            semilla_maestra: Semilla de la corrida (None = una nueva al azar)
+            prefijo: Ruta común a todos los flujos de esta fuente
+        """
+        self.semilla_maestra = semilla_maestra if semilla_maestra is not None else nueva_semilla()
+        self.prefijo = tuple(prefijo)
+
+    @classmethod
+    def desde_config(cls, config) -> "FlujosAleatorios":
+        """
+        Crea la fuente de una corrida.
+
+        Args:
+            config: ConfiguracionSimulacion (usa `semilla`)
+
+        Returns:
+            Fuente con la semilla de la configuración o una nueva
+        """
+        return cls(config.semilla)
+
+    def semilla(self, *nombres: str) -> int:
+        """
+        Retorna la semilla de un subflujo.
+
+        Args:
+            nombres: Ruta del subflujo dentro de esta fuente
+
+        Returns:
+            Semilla entera de 64 bits
+        """
+        return derivar_semilla(self.semilla_maestra, *self.prefijo, *nombres)
+
+    def flujo(self, *nombres: str) -> random.Random:
+        """
+        Crea el generador de un subflujo.
+
+        Args:
+            nombres: Ruta del subflujo dentro de esta fuente
+
+        Returns:
+            `random.Random` propio, independiente de los demás subflujos
+        """
+        return random.Random(self.semilla(*nombres))
+
+    def hijo(self, *nombres: str) -> "FlujosAleatorios":
+        """
+        Crea una fuente anidada (por ejemplo, una por intersección).
+
+        Args:
+            nombres: Ruta que se agrega al prefijo
+
+        Returns:
+            Fuente con la misma semilla maestra y el prefijo extendido
+        """
+        return FlujosAleatorios(self.semilla_maestra, *self.prefijo, *nombres)
+
+    def __repr__(self) -> str:
+        ruta = "/".join(self.prefijo) or "-"
+        return f"FlujosAleatorios(semilla={self.semilla_maestra}, prefijo={ruta})"
+
+
+def nueva_semilla() -> int:
+    """Sortea una semilla maestra de 32 bits con entropía del sistema."""
+    return random.SystemRandom().randrange(2**32)
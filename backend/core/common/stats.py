@@ -2,49 +2,109 @@
 Agregador de estadísticas del sistema de tráfico.
 Responsable de recopilar y calcular métricas de la simulación.
 """
-from typing import List, Dict
-from ..models.vehiculo import Vehiculo
+from typing import Dict, Iterable, Sequence
+from .acumulador import AcumuladorEspera
+from ..models.almacen import AlmacenVehiculos
+
+VIAS = ("NORTE", "SUR", "ESTE", "OESTE")
 
 
 class EstadisticasTrafico:
     """
     Recopila y agrega estadísticas de la simulación.
     
-    Rastrea:
+    Rastrea, con memoria constante:
     - Total de vehículos que cruzaron
     - Tiempos de espera acumulados
-    - Promedios
+    - Promedio, varianza, extremos y percentiles de espera (global y por vía)
     """
 
     def __init__(self):
         """Inicializa el agregador de estadísticas."""
-        self._vehiculos_cruzados: List[Vehiculo] = []
-        self._tiempo_espera_acumulado = 0.0
-        self._vehiculos_por_via: Dict[str, int] = {
-            "NORTE": 0,
-            "SUR": 0,
-            "ESTE": 0,
-            "OESTE": 0,
+        self._espera = AcumuladorEspera()
+        self._espera_por_via: Dict[str, AcumuladorEspera] = {
+            via: AcumuladorEspera() for via in VIAS
         }
 
-    def registrar_vehiculos(self, vehiculos: List[Vehiculo], via: str) -> None:
+    def registrar_vehiculos(self, almacen: AlmacenVehiculos, indices: Sequence[int], via: str) -> None:
         """
         Registra vehículos que cruzaron en un tick.
         
         Args:
-            vehiculos: Lista de vehículos que cruzaron
+            almacen: Almacén donde viven los vehículos
+            indices: Índices de los vehículos que cruzaron
             via: Nombre de la vía (NORTE, SUR, ESTE, OESTE)
         """
-        for vehiculo in vehiculos:
-            self._vehiculos_cruzados.append(vehiculo)
-            self._tiempo_espera_acumulado += vehiculo.tiempo_espera_total
-            if via in self._vehiculos_por_via:
-                self._vehiculos_por_via[via] += 1
+        self.registrar_tiempos((almacen.tiempo_espera(i) for i in indices), via)
+
+    def registrar_tiempos(self, tiempos_espera: Iterable[int], via: str) -> None:
+        """
+        Registra vehículos que cruzaron a partir de sus tiempos de espera.
+        
+        Usado cuando los vehículos viven en otro proceso.
+        
+        Args:
+            tiempos_espera: Tiempo de espera de cada vehículo, en ticks
+            via: Nombre de la vía (NORTE, SUR, ESTE, OESTE)
+        """
+        acumulador_via = self._espera_por_via.get(via)
+        if acumulador_via is None:
+            acumulador_via = self._espera_por_via[via] = AcumuladorEspera()
+        for espera in tiempos_espera:
+            self._espera.agregar(espera)
+            acumulador_via.agregar(espera)
+
+    def registrar_grupo(self, espera: int, cantidad: int, via: str) -> None:
+        """
+        Registra varios vehículos que cruzaron con la misma espera.
+        
+        Usado por engines que modelan las colas como conteos, sin un
+        registro por vehículo.
+        
+        Args:
+            espera: Tiempo de espera común, en ticks
+            cantidad: Número de vehículos
+            via: Nombre de la vía (NORTE, SUR, ESTE, OESTE)
+        """
+        acumulador_via = self._espera_por_via.get(via)
+        if acumulador_via is None:
+            acumulador_via = self._espera_por_via[via] = AcumuladorEspera()
+        self._espera.agregar(espera, cantidad)
+        acumulador_via.agregar(espera, cantidad)
+
+    def combinar(self, otro: "EstadisticasTrafico") -> None:
+        """
+        Incorpora las estadísticas parciales de otro agregador.
+        
+        Args:
+            otro: Estadísticas parciales (por ejemplo, de un proceso worker)
+        """
+        self._espera.combinar(otro._espera)
+        for via, acumulador in otro._espera_por_via.items():
+            if via not in self._espera_por_via:
+                self._espera_por_via[via] = AcumuladorEspera()
+            self._espera_por_via[via].combinar(acumulador)
+
+    @classmethod
+    def fusionar(cls, parciales: Iterable["EstadisticasTrafico"]) -> "EstadisticasTrafico":
+        """
+        Crea un agregador con la combinación de varios parciales.
+        
+        Args:
+            parciales: Estadísticas parciales a combinar
+            
+        Returns:
+            Nuevo EstadisticasTrafico con el total
+        """
+        total = cls()
+        for parcial in parciales:
+            total.combinar(parcial)
+        return total
 
     @property
     def total_vehiculos(self) -> int:
         """Retorna el total de vehículos que cruzaron."""
-        return len(self._vehiculos_cruzados)
+        return self._espera.cuenta
 
     @property
     def tiempo_espera_promedio(self) -> float:
@@ -52,16 +112,29 @@ class EstadisticasTrafico:
         Calcula el tiempo promedio de espera.
         
         Returns:
-            Tiempo promedio en segundos. 0 si no hay vehículos.
+            Tiempo promedio en ticks. 0 si no hay vehículos.
         """
-        if self.total_vehiculos == 0:
-            return 0.0
-        return self._tiempo_espera_acumulado / self.total_vehiculos
+        return self._espera.media
 
     @property
     def tiempo_espera_total(self) -> float:
-        """Retorna el tiempo total de espera acumulado."""
-        return self._tiempo_espera_acumulado
+        """Retorna el tiempo total de espera acumulado en ticks."""
+        return self._espera.suma
+
+    def percentil_espera(self, p: float, via: str = None) -> float:
+        """
+        Estima un percentil del tiempo de espera.
+        
+        Args:
+            p: Percentil entre 0 y 100
+            via: Vía a consultar. Si no se indica, se usa el total.
+            
+        Returns:
+            Tiempo en ticks. 0 si no hay vehículos.
+        """
+        acumulador = self._espera if via is None else self._espera_por_via[via]
+        valor = acumulador.percentil(p)
+        return 0.0 if valor is None else valor
 
     def get_vehiculos_por_via(self) -> Dict[str, int]:
         """
@@ -70,7 +143,7 @@ class EstadisticasTrafico:
         Returns:
             Diccionario con conteo por vía
         """
-        return self._vehiculos_por_via.copy()
+        return {via: acumulador.cuenta for via, acumulador in self._espera_por_via.items()}
 
     def get_resumen(self) -> dict:
         """
@@ -84,18 +157,16 @@ class EstadisticasTrafico:
             "tiempo_espera_promedio": round(self.tiempo_espera_promedio, 3),
             "tiempo_espera_total": round(self.tiempo_espera_total, 3),
             "vehiculos_por_via": self.get_vehiculos_por_via(),
+            "espera": self._espera.get_resumen(),
+            "espera_por_via": {
+                via: acumulador.get_resumen() for via, acumulador in self._espera_por_via.items()
+            },
         }
 
     def reset(self) -> None:
         """Reinicia todas las estadísticas."""
-        self._vehiculos_cruzados.clear()
-        self._tiempo_espera_acumulado = 0.0
-        self._vehiculos_por_via = {
-            "NORTE": 0,
-            "SUR": 0,
-            "ESTE": 0,
-            "OESTE": 0,
-        }
+        self._espera = AcumuladorEspera()
+        self._espera_por_via = {via: AcumuladorEspera() for via in VIAS}
 
     def __repr__(self) -> str:
-        return f"EstadisticasTrafico(vehiculos={self.total_vehiculos}, espera_prom={self.tiempo_espera_promedio:.2f}s)"
+        return f"EstadisticasTrafico(vehiculos={self.total_vehiculos}, espera_prom={self.tiempo_espera_promedio:.2f} ticks)"
@@ -0,0 +1,193 @@
+"""
+Almacén columnar de vehículos.
+Guarda los tiempos de todos los vehículos en arreglos compactos en lugar de
+un objeto por vehículo.
+"""
+import threading
+from array import array
+from typing import Iterable
+
+from .vehiculo import Vehiculo
+
+# Marca de tiempo no registrada (equivale a None en Vehiculo)
+SIN_TIEMPO = -1
+
+
+class AlmacenVehiculos:
+    """
+    Struct-of-arrays con los datos de los vehículos.
+
+    Cada vehículo ocupa una fila, identificada por un índice entero. Las
+    columnas son `array('q')` preasignados que crecen al doble cuando se
+    llenan, de modo que agregar un vehículo no crea objetos Python ni
+    entradas para el recolector de basura.
+
+    Cuando un vehículo ya cruzó y el engine registró su espera, `liberar`
+    devuelve su fila a una lista de libres que `agregar` reutiliza antes de
+    crecer. Así el almacén ocupa lo que los vehículos en cola, no lo que la
+    corrida completa.
+
+    Los semáforos del engine threading comparten un almacén, así que toda
+    lectura o escritura de filas toma el lock: `_crecer` reubica las
+    columnas y sin GIL otro hilo podría escribir en el arreglo anterior.
+
+    Columnas:
+        ids: Identificador global del vehículo
+        llegada: Tick de llegada a la cola
+        inicio_espera: Tick en que comenzó a esperar
+        salida: Tick en que cruzó la intersección (SIN_TIEMPO si no cruzó)
+    """
+
+    def __init__(self, capacidad_inicial: int = 1024):
+        """
+        Inicializa el almacén.
+
+        Args:
+            capacidad_inicial: Filas preasignadas
+        """
+        self._capacidad = max(1, capacidad_inicial)
+        self._tamano = 0  # Filas usadas alguna vez
+        self._libres = array("q")  # Filas liberadas, para reutilizar
+        self._lock = threading.Lock()  # Protege las filas y el crecimiento de las columnas
+        self.ids = array("q", [0]) * self._capacidad
+        self.llegada = array("q", [SIN_TIEMPO]) * self._capacidad
+        self.inicio_espera = array("q", [SIN_TIEMPO]) * self._capacidad
+        self.salida = array("q", [SIN_TIEMPO]) * self._capacidad
+
+    def _crecer(self) -> None:
+        """Duplica la capacidad de todas las columnas."""
+        extra = self._capacidad
+        self.ids.extend(array("q", [0]) * extra)
+        self.llegada.extend(array("q", [SIN_TIEMPO]) * extra)
+        self.inicio_espera.extend(array("q", [SIN_TIEMPO]) * extra)
+        self.salida.extend(array("q", [SIN_TIEMPO]) * extra)
+        self._capacidad += extra
+
+    def agregar(self, vehiculo_id: int, tick: int) -> int:
+        """
+        Registra la llegada de un vehículo.
+
+        Args:
+            vehiculo_id: Identificador global del vehículo
+            tick: Tick de llegada, que también inicia la espera
+
+        Returns:
+            Índice de la fila asignada (puede ser una fila liberada)
+        """
+        with self._lock:
+            if self._libres:
+                indice = self._libres.pop()
+            else:
+                if self._tamano == self._capacidad:
+                    self._crecer()
+                indice = self._tamano
+                self._tamano += 1
+            self.ids[indice] = vehiculo_id
+            self.llegada[indice] = tick
+            self.inicio_espera[indice] = tick
+            self.salida[indice] = SIN_TIEMPO
+        return indice
+
+    def liberar(self, indices: Iterable[int]) -> None:
+        """
+        Devuelve las filas de vehículos que ya cruzaron para reutilizarlas.
+
+        Debe llamarse después de registrar sus esperas y leer sus IDs: desde
+        aquí la fila puede pasar a otra llegada.
+
+        Args:
+            indices: Filas a liberar
+        """
+        with self._lock:
+            self._libres.extend(indices)
+
+    def marcar_salida(self, indice: int, tick: int) -> None:
+        """
+        Marca el tick en que el vehículo cruza la intersección.
+
+        Args:
+            indice: Fila del vehículo
+            tick: Tick actual del reloj de simulación
+        """
+        with self._lock:
+            if self.salida[indice] == SIN_TIEMPO:
+                self.salida[indice] = tick
+
+    def id_vehiculo(self, indice: int) -> int:
+        """
+        Retorna el identificador global del vehículo de una fila.
+
+        Args:
+            indice: Fila del vehículo
+        """
+        with self._lock:
+            return self.ids[indice]
+
+    def tiempo_espera(self, indice: int) -> int:
+        """
+        Calcula el tiempo total de espera de un vehículo que ya cruzó.
+
+        Args:
+            indice: Fila del vehículo
+
+        Returns:
+            Tiempo en ticks. 0 si aún no ha cruzado.
+        """
+        with self._lock:
+            salida = self.salida[indice]
+            if salida == SIN_TIEMPO:
+                return 0
+            return salida - self.inicio_espera[indice]
+
+    def tiempo_espera_hasta(self, indice: int, tick: int) -> int:
+        """
+        Calcula el tiempo de espera hasta un tick dado.
+
+        Args:
+            indice: Fila del vehículo
+            tick: Tick de referencia (normalmente el actual)
+
+        Returns:
+            Tiempo en ticks
+        """
+        with self._lock:
+            salida = self.salida[indice]
+            inicio = self.inicio_espera[indice]
+        fin = tick if salida == SIN_TIEMPO else salida
+        return fin - inicio
+
+    def vehiculo(self, indice: int) -> Vehiculo:
+        """
+        Materializa una fila como objeto Vehiculo.
+
+        Pensado para depuración y tests; la simulación trabaja con índices.
+
+        Args:
+            indice: Fila del vehículo
+
+        Returns:
+            Copia de los datos del vehículo
+        """
+        def _opcional(valor: int):
+            return None if valor == SIN_TIEMPO else valor
+
+        with self._lock:
+            return Vehiculo(
+                id=self.ids[indice],
+                tiempo_llegada=_opcional(self.llegada[indice]),
+                tiempo_inicio_espera=_opcional(self.inicio_espera[indice]),
+                tiempo_salida=_opcional(self.salida[indice]),
+            )
+
+    @property
+    def capacidad(self) -> int:
+        """Retorna el número de filas preasignadas."""
+        return self._capacidad
+
+    def __len__(self) -> int:
+        """Retorna el número de filas ocupadas (vehículos no liberados)."""
+        with self._lock:
+            return self._tamano - len(self._libres)
+
+    def __repr__(self) -> str:
+        return f"AlmacenVehiculos(vehiculos={len(self)}, capacidad={self._capacidad})"
@@ -0,0 +1,148 @@
+"""
+Cohortes de vehículos por carril en arreglos de NumPy.
+Reemplaza la deque de cohortes [tick de llegada, cantidad] de cada carril
+para que los engines vectorizados encolen y despachen todos los carriles a la vez.
+"""
+from typing import Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: los engines usan deques sin él
+    np = None
+
+
+class CohortesCarriles:
+    """
+    Colas FIFO de cohortes de todos los carriles, en dos matrices de NumPy.
+
+    La fila de cada carril es un búfer circular de `capacidad` cohortes
+    (tick de llegada y cantidad) con su propio inicio (`cabeza`) y largo.
+    `agregar` y `despachar` reciben arreglos de carriles distintos entre sí,
+    de modo que cada operación es una asignación por índices sobre todas
+    las filas. Los carriles que nunca comparten una llamada (por ejemplo,
+    tramos en hilos distintos) pueden operar a la vez, siempre que nadie
+    llame a `reservar` entretanto.
+    """
+
+    def __init__(self, carriles: int, capacidad: int = 8):
+        """
+        Inicializa las colas vacías.
+
+        Args:
+            carriles: Número de carriles
+            capacidad: Cohortes por carril antes de crecer
+        """
+        if np is None:
+            raise ImportError("CohortesCarriles requiere NumPy")
+        self.capacidad = max(1, capacidad)
+        self.ticks = np.zeros((carriles, self.capacidad), dtype=np.int64)
+        self.cantidades = np.zeros((carriles, self.capacidad), dtype=np.int64)
+        self.cabeza = np.zeros(carriles, dtype=np.int64)
+        self.largo = np.zeros(carriles, dtype=np.int64)
+
+    def reservar(self, nuevas: int = 1) -> None:
+        """
+        Asegura espacio para `nuevas` cohortes más en cada carril.
+
+        Al crecer, cada fila se reordena para que su cabeza quede en 0.
+
+        Args:
+            nuevas: Cohortes que cada carril puede recibir antes de la siguiente reserva
+        """
+        necesaria = int(self.largo.max(initial=0)) + nuevas
+        if necesaria <= self.capacidad:
+            return
+        capacidad = self.capacidad
+        while capacidad < necesaria:
+            capacidad *= 2
+        orden = (self.cabeza[:, None] + np.arange(self.capacidad)) % self.capacidad
+        for nombre in ("ticks", "cantidades"):
+            anterior = np.take_along_axis(getattr(self, nombre), orden, axis=1)
+            nueva = np.zeros((len(self.cabeza), capacidad), dtype=np.int64)
+            nueva[:, :self.capacidad] = anterior
+            setattr(self, nombre, nueva)
+        self.cabeza[:] = 0
+        self.capacidad = capacidad
+
+    def agregar(self, carriles, tick: int, cantidades) -> None:
+        """
+        Encola una cohorte al final de cada carril.
+
+        Args:
+            carriles: Carriles (sin repetir) que reciben vehículos
+            tick: Tick de llegada
+            cantidades: Vehículos de cada cohorte (mayores que cero)
+        """
+        posicion = (self.cabeza[carriles] + self.largo[carriles]) % self.capacidad
+        self.ticks[carriles, posicion] = tick
+        self.cantidades[carriles, posicion] = cantidades
+        self.largo[carriles] += 1
+
+    def despachar(self, carriles, cantidades, tick: int) -> Tuple["np.ndarray", ...]:
+        """
+        Retira vehículos del frente de cada carril, cohorte por cohorte.
+
+        Args:
+            carriles: Carriles (sin repetir) que despachan
+            cantidades: Vehículos a retirar de cada uno (no más de los que tiene)
+            tick: Tick actual, para calcular las esperas
+
+        Returns:
+            Grupos (carril, espera, cantidad), una entrada por cohorte tocada,
+            y la espera total (espera × cantidad) de cada carril de entrada
+        """
+        grupos_carril, grupos_espera, grupos_cantidad = [], [], []
+        carriles = np.asarray(carriles, dtype=np.int64)
+        restantes = np.asarray(cantidades, dtype=np.int64).copy()
+        espera_total = np.zeros(len(carriles), dtype=np.int64)
+        posiciones = np.arange(len(carriles))  # De cada carril pendiente en la entrada
+        while carriles.size:
+            cabeza = self.cabeza[carriles]
+            disponibles = self.cantidades[carriles, cabeza]
+            retirados = np.minimum(disponibles, restantes)
+            esperas = tick - self.ticks[carriles, cabeza]
+            grupos_carril.append(carriles)
+            grupos_espera.append(esperas)
+            grupos_cantidad.append(retirados)
+            espera_total[posiciones] += esperas * retirados
+
+            self.cantidades[carriles, cabeza] = disponibles - retirados
+            agotadas = retirados == disponibles
+            vacios = carriles[agotadas]
+            self.cabeza[vacios] = (cabeza[agotadas] + 1) % self.capacidad
+            self.largo[vacios] -= 1
+
+            restantes -= retirados
+            pendientes = restantes > 0
+            carriles, restantes, posiciones = carriles[pendientes], restantes[pendientes], posiciones[pendientes]
+
+        if not grupos_carril:
+            vacio = np.zeros(0, dtype=np.int64)
+            return vacio, vacio, vacio, espera_total
+        return (
+            np.concatenate(grupos_carril), np.concatenate(grupos_espera), np.concatenate(grupos_cantidad),
+            espera_total,
+        )
+
+    def capturar(self) -> tuple:
+        """Copia el estado de todas las colas."""
+        return self.ticks.copy(), self.cantidades.copy(), self.cabeza.copy(), self.largo.copy(), self.capacidad
+
+    def restaurar(self, estado: tuple) -> None:
+        """Vuelve a un estado de `capturar`, que no se modifica."""
+        ticks, cantidades, cabeza, largo, self.capacidad = estado
+        self.ticks, self.cantidades = ticks.copy(), cantidades.copy()
+        self.cabeza, self.largo = cabeza.copy(), largo.copy()
+
+    def cohortes(self, carril: int) -> list:
+        """
+        Retorna las cohortes de un carril, de la más antigua a la más nueva.
+
+        Returns:
+            Lista de [tick de llegada, cantidad], como la deque del engine sin NumPy
+        """
+        posiciones = (int(self.cabeza[carril]) + np.arange(int(self.largo[carril]))) % self.capacidad
+        return [[int(t), int(c)] for t, c in zip(self.ticks[carril, posiciones], self.cantidades[carril, posiciones])]
+
+    def __repr__(self) -> str:
+        return f"CohortesCarriles(carriles={len(self.cabeza)}, capacidad={self.capacidad})"
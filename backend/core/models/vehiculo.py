@@ -2,8 +2,7 @@
 Modelo de vehículo individual.
 Responsable de rastrear tiempos de llegada, espera y salida.
 """
-from dataclasses import dataclass, field
-from time import time
+from dataclasses import dataclass
 from typing import Optional
 
 
@@ -11,42 +10,70 @@ from typing import Optional
 class Vehiculo:
     """
     Representa un vehículo en el sistema de tráfico.
-    
+
+    Todos los tiempos son ticks del reloj lógico de la simulación.
+
     Atributos:
         id: Identificador único del vehículo
-        tiempo_llegada: Timestamp cuando el vehículo llegó a la cola
-        tiempo_inicio_espera: Timestamp cuando comenzó a esperar
-        tiempo_salida: Timestamp cuando el vehículo cruzó la intersección
+        tiempo_llegada: Tick en que el vehículo llegó a la cola
+        tiempo_inicio_espera: Tick en que comenzó a esperar
+        tiempo_salida: Tick en que el vehículo cruzó la intersección
     """
     id: int
-    tiempo_llegada: float = field(default_factory=time)
-    tiempo_inicio_espera: Optional[float] = None
-    tiempo_salida: Optional[float] = None
+    tiempo_llegada: Optional[int] = None
+    tiempo_inicio_espera: Optional[int] = None
+    tiempo_salida: Optional[int] = None
 
-    def marcar_inicio_espera(self) -> None:
-        """Marca el momento en que el vehículo comienza a esperar."""
+    def marcar_inicio_espera(self, tick: int) -> None:
+        """
+        Marca el momento en que el vehículo comienza a esperar.
+
+        Args:
+            tick: Tick actual del reloj de simulación
+        """
+        if self.tiempo_llegada is None:
+            self.tiempo_llegada = tick
         if self.tiempo_inicio_espera is None:
-            self.tiempo_inicio_espera = time()
+            self.tiempo_inicio_espera = tick
 
-    def marcar_salida(self) -> None:
-        """Marca el momento en que el vehículo cruza la intersección."""
+    def marcar_salida(self, tick: int) -> None:
+        """
+        Marca el momento en que el vehículo cruza la intersección.
+
+        Args:
+            tick: Tick actual del reloj de simulación
+        """
         if self.tiempo_salida is None:
-            self.tiempo_salida = time()
+            self.tiempo_salida = tick
 
-    @property
-    def tiempo_espera_total(self) -> float:
+    def tiempo_espera_hasta(self, tick: int) -> int:
         """
-        Calcula el tiempo total de espera del vehículo.
-        
+        Calcula el tiempo de espera hasta un tick dado.
+
+        Args:
+            tick: Tick de referencia (normalmente el actual)
+
         Returns:
-            Tiempo en segundos. 0 si no ha comenzado a esperar.
+            Tiempo en ticks. 0 si no ha comenzado a esperar.
         """
         if self.tiempo_inicio_espera is None:
-            return 0.0
-        
-        tiempo_fin = self.tiempo_salida if self.tiempo_salida else time()
+            return 0
+
+        tiempo_fin = self.tiempo_salida if self.tiempo_salida is not None else tick
         return tiempo_fin - self.tiempo_inicio_espera
 
+    @property
+    def tiempo_espera_total(self) -> int:
+        """
+        Calcula el tiempo total de espera del vehículo.
+
+        Returns:
+            Tiempo en ticks. 0 si no ha comenzado a esperar o no ha cruzado.
+        """
+        if self.tiempo_inicio_espera is None or self.tiempo_salida is None:
+            return 0
+        return self.tiempo_salida - self.tiempo_inicio_espera
+
     def __repr__(self) -> str:
         estado = "esperando" if self.tiempo_salida is None else "cruzó"
         return f"Vehiculo(id={self.id}, {estado})"
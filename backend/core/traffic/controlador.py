@@ -2,116 +2,144 @@
 Controlador central de tráfico.
 Responsable de coordinar las fases de los semáforos y evitar colisiones.
 """
-from typing import Dict
+from types import MappingProxyType
+from typing import Mapping, Optional
 
 from ..common.tipos import Color, Via
+from .programa import ProgramaSemaforico
 
 
 class ControladorTrafico:
     """
     Coordina los semáforos de la intersección.
     
-    Implementa un sistema de fases que alterna entre:
+    Por defecto implementa un sistema de fases que alterna entre:
     - Fase NS: Norte y Sur en VERDE
     - Transición: AMARILLO
     - Fase EW: Este y Oeste en VERDE
     - Transición: AMARILLO
     
-    Garantiza que no haya colisiones.
+    También acepta un ProgramaSemaforico con cualquier número de fases
+    (giros protegidos, despeje todo-rojo, duraciones por fase). El programa
+    valida que ninguna fase dé paso a ejes que se cruzan.
+    
+    El programa compilado se indexa por posición dentro del ciclo. Cada fase
+    tiene un único plan inmutable que se comparte entre ticks, y el estado
+    del controlador es solo el tick actual: fase, ciclo y ticks en fase se
+    obtienen por aritmética modular, así que avanzar o saltar a cualquier
+    tick cuesta lo mismo.
     """
 
     def __init__(
         self,
         duracion_verde: int = 5,
         duracion_amarillo: int = 2,
+        programa: Optional[ProgramaSemaforico] = None,
     ):
         """
         Inicializa el controlador.
         
         Args:
-            duracion_verde: Ticks que dura la luz verde
-            duracion_amarillo: Ticks que dura la luz amarilla
+            duracion_verde: Ticks que dura la luz verde (programa clásico)
+            duracion_amarillo: Ticks que dura la luz amarilla (programa clásico)
+            programa: Programa de fases compilado. Si se indica, las
+                duraciones anteriores no se usan.
         """
         self.duracion_verde = duracion_verde
         self.duracion_amarillo = duracion_amarillo
+        self.programa = programa or ProgramaSemaforico.clasico(duracion_verde, duracion_amarillo)
         
         # Estado interno
         self._tick_actual = 0
-        self._ciclo_actual = 0
-        self._fase_actual = "NS_VERDE"  # Fases: NS_VERDE, NS_AMARILLO, EW_VERDE, EW_AMARILLO
-        self._ticks_en_fase = 0
         
-        # Duración total de un ciclo completo
-        self._duracion_ciclo = 2 * (duracion_verde + duracion_amarillo)
+        # Tablas derivadas del programa: una entrada por fase, y el índice
+        # de fase de cada posición del ciclo
+        self._fase_por_posicion = self.programa.fase_por_posicion
+        self._duracion_ciclo = self.programa.duracion_ciclo
+        self._nombres = self.programa.nombres
+        self._planes = tuple(
+            MappingProxyType(self.programa.plan(fase)) for fase in range(self.programa.num_fases)
+        )
+        self._duraciones = self.programa.duraciones
+        self._inicios = self.programa.inicio_fase
 
-    def avanzar_tick(self) -> Dict[Via, Color]:
+    def avanzar_tick(self) -> Mapping[Via, Color]:
         """
         Avanza un tick en la simulación.
         
         Returns:
-            Diccionario con el plan de colores para cada vía
+            Plan de colores para cada vía (inmutable, compartido entre ticks)
         """
         self._tick_actual += 1
-        self._ticks_en_fase += 1
+        return self._planes[self._fase_por_posicion[self._tick_actual % self._duracion_ciclo]]
+
+    def fase_en_tick(self, tick: int) -> str:
+        """
+        Calcula la fase vigente en un tick sin modificar el estado.
+        
+        Equivale a la fase que tendría el controlador tras `tick` llamadas a
+        `avanzar_tick`, por lo que cualquier proceso con las mismas duraciones
+        puede derivar el plan por su cuenta.
         
-        # Determinar si hay que cambiar de fase
-        if self._fase_actual == "NS_VERDE" and self._ticks_en_fase >= self.duracion_verde:
-            self._fase_actual = "NS_AMARILLO"
-            self._ticks_en_fase = 0
-        elif self._fase_actual == "NS_AMARILLO" and self._ticks_en_fase >= self.duracion_amarillo:
-            self._fase_actual = "EW_VERDE"
-            self._ticks_en_fase = 0
-        elif self._fase_actual == "EW_VERDE" and self._ticks_en_fase >= self.duracion_verde:
-            self._fase_actual = "EW_AMARILLO"
-            self._ticks_en_fase = 0
-        elif self._fase_actual == "EW_AMARILLO" and self._ticks_en_fase >= self.duracion_amarillo:
-            self._fase_actual = "NS_VERDE"
-            self._ticks_en_fase = 0
-            self._ciclo_actual += 1  # Completamos un ciclo completo
+        Args:
+            tick: Tick absoluto (0 = estado inicial)
+            
+        Returns:
+            Nombre de la fase
+        """
+        return self._nombres[self._fase_por_posicion[tick % self._duracion_ciclo]]
+
+    def plan_en_tick(self, tick: int) -> Mapping[Via, Color]:
+        """
+        Calcula el plan de colores de un tick sin modificar el estado.
         
-        # Generar plan de colores según la fase
-        return self._generar_plan()
+        Args:
+            tick: Tick absoluto
+            
+        Returns:
+            Plan de colores para cada vía (inmutable, compartido entre ticks)
+        """
+        return self._planes[self._fase_por_posicion[tick % self._duracion_ciclo]]
 
-    def _generar_plan(self) -> Dict[Via, Color]:
+    def saltar_a(self, tick: int) -> Mapping[Via, Color]:
         """
-        Genera el plan de colores para la fase actual.
+        Lleva el controlador directamente a un tick, sin pasar por los intermedios.
         
+        Deja el mismo estado que `tick` llamadas a `avanzar_tick` desde el
+        inicio. Usado por engines que saltan ticks o reanudan una corrida.
+        
+        Args:
+            tick: Tick absoluto de destino
+            
         Returns:
-            Diccionario mapeando cada vía a su color
-        """
-        if self._fase_actual == "NS_VERDE":
-            return {
-                Via.NORTE: Color.VERDE,
-                Via.SUR: Color.VERDE,
-                Via.ESTE: Color.ROJO,
-                Via.OESTE: Color.ROJO,
-            }
-        elif self._fase_actual == "NS_AMARILLO":
-            return {
-                Via.NORTE: Color.AMARILLO,
-                Via.SUR: Color.AMARILLO,
-                Via.ESTE: Color.ROJO,
-                Via.OESTE: Color.ROJO,
-            }
-        elif self._fase_actual == "EW_VERDE":
-            return {
-                Via.NORTE: Color.ROJO,
-                Via.SUR: Color.ROJO,
-                Via.ESTE: Color.VERDE,
-                Via.OESTE: Color.VERDE,
-            }
-        else:  # EW_AMARILLO
-            return {
-                Via.NORTE: Color.ROJO,
-                Via.SUR: Color.ROJO,
-                Via.ESTE: Color.AMARILLO,
-                Via.OESTE: Color.AMARILLO,
-            }
+            Plan de colores en ese tick
+        """
+        self._tick_actual = tick
+        return self._planes[self._fase_por_posicion[tick % self._duracion_ciclo]]
+
+    def proximo_cambio(self, tick: int) -> int:
+        """
+        Calcula el primer tick posterior a `tick` en que cambia la fase.
+        
+        Args:
+            tick: Tick absoluto
+            
+        Returns:
+            Tick del próximo cambio de fase
+        """
+        posicion = tick % self._duracion_ciclo
+        fase = self._fase_por_posicion[posicion]
+        return tick - posicion + self._inicios[fase] + self._duraciones[fase]
+
+    @property
+    def duracion_ciclo(self) -> int:
+        """Retorna la duración de un ciclo completo en ticks."""
+        return self._duracion_ciclo
 
     @property
     def ciclo_actual(self) -> int:
         """Retorna el número de ciclos completos."""
-        return self._ciclo_actual
+        return self._tick_actual // self._duracion_ciclo
 
     @property
     def tick_actual(self) -> int:
@@ -121,7 +149,13 @@ class ControladorTrafico:
     @property
     def fase_actual(self) -> str:
         """Retorna la fase actual."""
-        return self._fase_actual
+        return self.fase_en_tick(self._tick_actual)
+
+    @property
+    def ticks_en_fase(self) -> int:
+        """Retorna los ticks transcurridos en la fase actual."""
+        posicion = self._tick_actual % self._duracion_ciclo
+        return posicion - self._inicios[self._fase_por_posicion[posicion]]
 
     def get_info(self) -> dict:
         """
@@ -132,9 +166,9 @@ class ControladorTrafico:
         """
         return {
             "tick": self._tick_actual,
-            "ciclo": self._ciclo_actual,
-            "fase": self._fase_actual,
-            "ticks_en_fase": self._ticks_en_fase,
+            "ciclo": self.ciclo_actual,
+            "fase": self.fase_actual,
+            "ticks_en_fase": self.ticks_en_fase,
         }
 
 
@@ -151,18 +185,29 @@ class ControladorTrafico:
             - ticks_restantes: Ticks que faltan para cambiar
             - duracion_total: Duración total de la fase
         """
-        # Determinar duración según la fase
-        if "VERDE" in self._fase_actual:
-            duracion = self.duracion_verde
-        else:  # AMARILLO
-            duracion = self.duracion_amarillo
+        return self.timing_en_tick(self._tick_actual)
+
+    def timing_en_tick(self, tick: int) -> dict:
+        """
+        Calcula el timing de fase de un tick sin modificar el estado.
+        
+        Args:
+            tick: Tick absoluto
+            
+        Returns:
+            Diccionario con el mismo formato que get_timing_fase
+        """
+        posicion = tick % self._duracion_ciclo
+        fase = self._fase_por_posicion[posicion]
+        duracion = self._duraciones[fase]
+        ticks_en_fase = posicion - self._inicios[fase]
         
         return {
-            "fase_actual": self._fase_actual,
-            "ticks_en_fase": self._ticks_en_fase,
-            "ticks_restantes": max(0, duracion - self._ticks_en_fase),
+            "fase_actual": self._nombres[fase],
+            "ticks_en_fase": ticks_en_fase,
+            "ticks_restantes": max(0, duracion - ticks_en_fase),
             "duracion_total": duracion,
         }
 
     def __repr__(self) -> str:
-        return f"ControladorTrafico(ciclo={self._ciclo_actual}, fase={self._fase_actual})"
+        return f"ControladorTrafico(ciclo={self.ciclo_actual}, fase={self.fase_actual})"
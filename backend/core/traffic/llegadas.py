@@ -0,0 +1,302 @@
+"""
+Generación de llegadas de vehículos.
+Cada vía tiene su propio generador con un flujo aleatorio independiente.
+"""
+import math
+import random
+from array import array
+from bisect import bisect_left
+from typing import List, Optional, Tuple
+
+from ..common.semillas import COMPONENTE_LLEGADAS, derivar_semilla
+
+# Tamaño de cada bloque de IDs reservado a una vía
+TAMANO_BLOQUE_IDS = 1024
+
+# Ticks cuyas llegadas se precalculan de una vez
+TICKS_POR_BLOQUE = 4096
+
+DISTRIBUCIONES = ("bernoulli", "binomial", "poisson")
+
+
+class BloquesIds:
+    """
+    Asigna IDs de vehículo de bloques disjuntos, sin contador central.
+
+    El bloque j de la vía en el slot i cubre
+    [(j * num_slots + i) * tamano_bloque, ... + tamano_bloque), de modo que
+    dos vías nunca producen el mismo ID.
+    """
+
+    def __init__(self, slot: int, num_slots: int, tamano_bloque: int = TAMANO_BLOQUE_IDS):
+        """
+        Inicializa el asignador.
+
+        Args:
+            slot: Posición de la vía (0..num_slots-1)
+            num_slots: Número total de vías que reparten IDs
+            tamano_bloque: IDs por bloque
+        """
+        self.slot = slot
+        self.num_slots = num_slots
+        self.tamano_bloque = tamano_bloque
+        self._bloque = 0
+        self._siguiente = slot * tamano_bloque
+        self._fin = self._siguiente + tamano_bloque
+
+    def siguiente(self) -> int:
+        """Retorna el próximo ID libre, reservando un bloque nuevo si hace falta."""
+        if self._siguiente == self._fin:
+            self._bloque += 1
+            self._siguiente = (self._bloque * self.num_slots + self.slot) * self.tamano_bloque
+            self._fin = self._siguiente + self.tamano_bloque
+        vehiculo_id = self._siguiente
+        self._siguiente += 1
+        return vehiculo_id
+
+
+class GeneradorLlegadas:
+    """
+    Llegadas de una vía, precalculadas por bloques de ticks.
+
+    Distribuciones del número de vehículos por tick:
+        bernoulli: 0 o 1 con probabilidad `probabilidad`
+        binomial: Binomial(max_por_tick, probabilidad)
+        poisson: Poisson de media max_por_tick * probabilidad
+
+    Los conteos de `ticks_por_bloque` ticks se generan juntos en un
+    `array('l')` y se consumen con un cursor. En lugar de una llamada al RNG
+    por tick, se sortea el salto hasta la siguiente llegada (geométrico para
+    los ensayos de Bernoulli, exponencial para Poisson), así que el costo es
+    proporcional a las llegadas y no a los ticks.
+
+    Usa su propio `random.Random`, por lo que el resultado no depende del
+    orden en que se ejecuten las vías ni del proceso que lo use. Es
+    serializable y puede enviarse a un worker al iniciarlo.
+    """
+
+    def __init__(
+        self,
+        probabilidad: float,
+        semilla: int,
+        ids: BloquesIds,
+        distribucion: str = "bernoulli",
+        max_por_tick: int = 1,
+        ticks_por_bloque: int = TICKS_POR_BLOQUE,
+    ):
+        """
+        Inicializa el generador.
+
+        Args:
+            probabilidad: Probabilidad de llegada de cada ensayo
+            semilla: Semilla del flujo aleatorio de esta vía
+            ids: Asignador de IDs de la vía
+            distribucion: 'bernoulli', 'binomial' o 'poisson'
+            max_por_tick: Ensayos por tick (binomial) o escala de la media (poisson)
+            ticks_por_bloque: Ticks precalculados en cada bloque
+        """
+        if distribucion not in DISTRIBUCIONES:
+            raise ValueError(f"Distribución inválida: {distribucion}. Use {', '.join(DISTRIBUCIONES)}")
+        self.probabilidad = probabilidad
+        self.ids = ids
+        self.distribucion = distribucion
+        self.ensayos_por_tick = 1 if distribucion == "bernoulli" else max(1, max_por_tick)
+        self.ticks_por_bloque = ticks_por_bloque
+        self._rng = random.Random(semilla)
+        self._conteos = array("l", [0]) * ticks_por_bloque
+        self._con_llegadas = array("l")  # Posiciones del bloque con al menos una llegada
+        self._cursor = ticks_por_bloque  # Fuerza el primer llenado
+        self._estado_rng = None  # Estado del RNG tras llenar el bloque actual (ver capturar)
+
+    @classmethod
+    def para_via(
+        cls,
+        via: str,
+        slot: int,
+        num_slots: int,
+        probabilidad: float,
+        semilla: int,
+        distribucion: str = "bernoulli",
+        max_por_tick: int = 1,
+    ) -> "GeneradorLlegadas":
+        """
+        Crea el generador de una vía a partir de la semilla maestra.
+
+        Args:
+            via: Nombre de la vía
+            slot: Posición de la vía, define sus bloques de IDs
+            num_slots: Número total de vías
+            probabilidad: Probabilidad de llegada de cada ensayo
+            semilla: Semilla maestra de la corrida
+            distribucion: 'bernoulli', 'binomial' o 'poisson'
+            max_por_tick: Ensayos por tick (binomial) o escala de la media (poisson)
+
+        Returns:
+            Generador con un flujo independiente para la vía
+        """
+        return cls(
+            probabilidad,
+            derivar_semilla(semilla, COMPONENTE_LLEGADAS, via),
+            BloquesIds(slot, num_slots),
+            distribucion=distribucion,
+            max_por_tick=max_por_tick,
+        )
+
+    @property
+    def media_por_tick(self) -> float:
+        """Retorna el número esperado de llegadas por tick."""
+        return self.ensayos_por_tick * self.probabilidad
+
+    def _llenar_bloque(self) -> None:
+        """Precalcula los conteos del siguiente bloque de ticks."""
+        conteos = self._conteos = array("l", [0]) * self.ticks_por_bloque
+        con_llegadas = self._con_llegadas = array("l")
+        self._cursor = 0
+        self._estado_rng = None
+        
+        p = self.probabilidad
+        if p <= 0:
+            return
+        rng = self._rng
+        
+        if self.distribucion == "poisson":
+            # Proceso de Poisson: saltos exponenciales entre llegadas
+            tasa = self.media_por_tick
+            t = rng.expovariate(tasa)
+            while t < self.ticks_por_bloque:
+                posicion = int(t)
+                if not conteos[posicion]:
+                    con_llegadas.append(posicion)
+                conteos[posicion] += 1
+                t += rng.expovariate(tasa)
+            return
+        
+        # Ensayos de Bernoulli: saltos geométricos entre éxitos
+        n = self.ensayos_por_tick
+        total = n * self.ticks_por_bloque
+        if p >= 1:
+            for i in range(self.ticks_por_bloque):
+                conteos[i] = n
+            con_llegadas.extend(range(self.ticks_por_bloque))
+            return
+        log_fallo = math.log1p(-p)
+        ensayo = int(math.log(1.0 - rng.random()) / log_fallo)
+        while ensayo < total:
+            posicion = ensayo // n
+            if not conteos[posicion]:
+                con_llegadas.append(posicion)
+            conteos[posicion] += 1
+            ensayo += 1 + int(math.log(1.0 - rng.random()) / log_fallo)
+
+    def contar(self) -> int:
+        """
+        Consume las llegadas del siguiente tick sin asignar IDs.
+
+        Returns:
+            Número de vehículos que llegan
+        """
+        if self._cursor == self.ticks_por_bloque:
+            self._llenar_bloque()
+        cantidad = self._conteos[self._cursor]
+        self._cursor += 1
+        return cantidad
+
+    def tomar_bloque(self) -> array:
+        """
+        Consume de una vez todos los ticks del siguiente bloque.
+
+        Pensado para engines que leen las llegadas de muchos carriles a la
+        vez: equivale a llamar `contar()` `ticks_por_bloque` veces desde el
+        inicio de un bloque. El generador suelta el bloque, así que las
+        capturas solo guardan la posición del RNG.
+
+        Returns:
+            Conteos por tick del bloque
+
+        Raises:
+            RuntimeError: Si el bloque actual no se consumió completo
+        """
+        if self._cursor != self.ticks_por_bloque:
+            raise RuntimeError("tomar_bloque debe llamarse al final de un bloque")
+        self._llenar_bloque()
+        conteos = self._conteos
+        self._conteos, self._con_llegadas = array("l"), array("l")
+        self._cursor = self.ticks_por_bloque
+        return conteos
+
+    def generar(self) -> List[int]:
+        """
+        Consume las llegadas del siguiente tick.
+
+        Returns:
+            IDs de los vehículos que llegan
+        """
+        cantidad = self.contar()
+        if not cantidad:
+            return []
+        return [self.ids.siguiente() for _ in range(cantidad)]
+
+    def saltar_hasta_llegada(self) -> Optional[Tuple[int, List[int]]]:
+        """
+        Consume de una vez los ticks sin llegadas y el siguiente con alguna.
+
+        Equivale a llamar `generar()` hasta obtener una lista no vacía, pero
+        sin recorrer los ticks vacíos uno por uno.
+
+        Returns:
+            Tupla (ticks vacíos saltados, IDs que llegan), o None si la
+            probabilidad es 0 y nunca llegará nadie
+        """
+        if self.probabilidad <= 0:
+            return None
+        saltados = 0
+        while True:
+            if self._cursor == self.ticks_por_bloque:
+                self._llenar_bloque()
+            j = bisect_left(self._con_llegadas, self._cursor)
+            if j < len(self._con_llegadas):
+                posicion = self._con_llegadas[j]
+                saltados += posicion - self._cursor
+                self._cursor = posicion + 1
+                cantidad = self._conteos[posicion]
+                return saltados, [self.ids.siguiente() for _ in range(cantidad)]
+            saltados += self.ticks_por_bloque - self._cursor
+            self._cursor = self.ticks_por_bloque
+
+    def capturar(self) -> tuple:
+        """
+        Captura la posición del generador para poder volver a ella.
+
+        Un bloque no se modifica después de llenarlo, así que la captura
+        comparte sus arreglos en lugar de copiarlos; el estado del RNG se
+        lee una sola vez por bloque.
+
+        Returns:
+            Estado opaco para restaurar
+        """
+        if self._estado_rng is None:
+            self._estado_rng = self._rng.getstate()
+        ids = self.ids
+        return (
+            self._cursor, self._conteos, self._con_llegadas, self._estado_rng,
+            (ids._bloque, ids._siguiente, ids._fin),
+        )
+
+    def restaurar(self, estado: tuple) -> None:
+        """
+        Vuelve a una posición capturada con `capturar`.
+
+        Args:
+            estado: Resultado de capturar
+        """
+        self._cursor, self._conteos, self._con_llegadas, estado_rng, ids = estado
+        if estado_rng is not self._estado_rng:
+            self._rng.setstate(estado_rng)
+            self._estado_rng = estado_rng
+        self.ids._bloque, self.ids._siguiente, self.ids._fin = ids
+
+    def __repr__(self) -> str:
+        return (
+            f"GeneradorLlegadas({self.distribucion}, media={self.media_por_tick:.2f}, "
+            f"slot={self.ids.slot})"
+        )
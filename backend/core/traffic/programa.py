@@ -0,0 +1,201 @@
+"""
+Programas de fases semafóricas.
+Describe secuencias arbitrarias de fases y las compila a una representación entera compacta.
+"""
+from array import array
+from typing import Iterable, Mapping, Sequence, Tuple
+
+from ..common.tipos import Color, Via
+
+VIAS = tuple(Via)
+EJE_NS = (Via.NORTE, Via.SUR)
+EJE_EW = (Via.ESTE, Via.OESTE)
+
+
+class ProgramaSemaforico:
+    """
+    Programa de fases compilado.
+
+    Cada fase tiene un nombre, una duración en ticks y un color por vía. Las
+    vías que una fase no menciona quedan en ROJO, lo que permite describir:
+    - Giros protegidos: una sola vía del eje en verde (p. ej. "N_PROTEGIDO")
+    - Despeje todo-rojo: una fase sin vías en verde ni amarillo
+    - Duraciones distintas por fase
+
+    Representación compilada (solo enteros, serializable y compartible con
+    procesos worker sin volver a interpretar la configuración):
+        colores: bytes de num_fases * 4, con Color.value por (fase, vía)
+        duraciones: array('l') con la duración de cada fase
+        fase_por_posicion: array('H') con el índice de fase de cada tick del ciclo
+        inicio_fase: array('l') con la posición del ciclo en que empieza cada fase
+    """
+
+    def __init__(self, fases: Sequence[Tuple[str, int, Mapping[Via, Color]]]):
+        """
+        Compila un programa.
+
+        Args:
+            fases: Secuencia de (nombre, duración, colores por vía)
+
+        Raises:
+            ValueError: Si el programa está vacío, tiene duraciones negativas o
+                fases que dan paso a la vez a vías que se cruzan
+        """
+        if not fases:
+            raise ValueError("El programa debe tener al menos una fase")
+
+        self.nombres: Tuple[str, ...] = tuple(nombre for nombre, _, _ in fases)
+        self.duraciones = array("l")
+        self.inicio_fase = array("l")
+        self.fase_por_posicion = array("H")
+        codigos = bytearray()
+
+        for indice, (nombre, duracion, colores) in enumerate(fases):
+            if duracion < 0:
+                raise ValueError(f"Duración negativa en la fase {nombre}")
+            plan = {via: colores.get(via, Color.ROJO) for via in VIAS}
+            _validar_sin_conflictos(nombre, plan)
+            codigos.extend(plan[via].value for via in VIAS)
+            self.duraciones.append(duracion)
+            self.inicio_fase.append(len(self.fase_por_posicion))
+            self.fase_por_posicion.extend([indice] * duracion)
+
+        if not self.fase_por_posicion:
+            raise ValueError("El ciclo del programa debe durar al menos un tick")
+        self.colores = bytes(codigos)
+
+    @classmethod
+    def clasico(cls, duracion_verde: int, duracion_amarillo: int) -> "ProgramaSemaforico":
+        """
+        Crea el programa de cuatro fases NS/EW con verde y amarillo.
+
+        Args:
+            duracion_verde: Ticks de verde de cada eje
+            duracion_amarillo: Ticks de amarillo de cada eje
+
+        Returns:
+            Programa compilado
+        """
+        return cls((
+            ("NS_VERDE", duracion_verde, dict.fromkeys(EJE_NS, Color.VERDE)),
+            ("NS_AMARILLO", duracion_amarillo, dict.fromkeys(EJE_NS, Color.AMARILLO)),
+            ("EW_VERDE", duracion_verde, dict.fromkeys(EJE_EW, Color.VERDE)),
+            ("EW_AMARILLO", duracion_amarillo, dict.fromkeys(EJE_EW, Color.AMARILLO)),
+        ))
+
+    @classmethod
+    def desde_lista(cls, fases: Iterable[dict]) -> "ProgramaSemaforico":
+        """
+        Compila un programa descrito como en la configuración.
+
+        Cada fase es un diccionario con "nombre", "duracion" y las listas
+        opcionales "verde" y "amarillo" con nombres de vía, por ejemplo:
+        {"nombre": "N_PROTEGIDO", "duracion": 3, "verde": ["NORTE"]}
+
+        Args:
+            fases: Descripción de las fases en orden
+
+        Returns:
+            Programa compilado
+
+        Raises:
+            ValueError: Si una fase no tiene nombre o duración, o menciona una vía desconocida
+        """
+        compiladas = []
+        for fase in fases:
+            try:
+                nombre, duracion = fase["nombre"], int(fase["duracion"])
+            except KeyError as e:
+                raise ValueError(f"Fase sin {e.args[0]}: {fase}") from None
+            colores = {}
+            for color, clave in ((Color.VERDE, "verde"), (Color.AMARILLO, "amarillo")):
+                for via in fase.get(clave, ()):
+                    if via not in Via.__members__:
+                        raise ValueError(f"Vía desconocida en la fase {nombre}: {via}")
+                    colores[Via[via]] = color
+            compiladas.append((nombre, duracion, colores))
+        return cls(compiladas)
+
+    @classmethod
+    def desde_config(cls, config) -> "ProgramaSemaforico":
+        """
+        Crea el programa de una configuración.
+
+        Args:
+            config: ConfiguracionSimulacion. Usa `programa_fases` si está
+                definido y, si no, el programa clásico con sus duraciones.
+
+        Returns:
+            Programa compilado
+        """
+        if config.programa_fases:
+            return cls.desde_lista(config.programa_fases)
+        return cls.clasico(config.duracion_verde, config.duracion_amarillo)
+
+    def a_lista(self) -> list:
+        """
+        Describe el programa en el formato de la configuración.
+
+        Es la inversa de desde_lista: permite partir de un programa compilado
+        (por ejemplo, el clásico) y modificar la duración de algunas fases.
+
+        Returns:
+            Lista de diccionarios con nombre, duración y vías en verde y amarillo
+        """
+        fases = []
+        for fase, nombre in enumerate(self.nombres):
+            plan = self.plan(fase)
+            descripcion = {"nombre": nombre, "duracion": self.duraciones[fase]}
+            for color, clave in ((Color.VERDE, "verde"), (Color.AMARILLO, "amarillo")):
+                vias = [via.name for via in VIAS if plan[via] == color]
+                if vias:
+                    descripcion[clave] = vias
+            fases.append(descripcion)
+        return fases
+
+    @property
+    def num_fases(self) -> int:
+        """Retorna el número de fases."""
+        return len(self.nombres)
+
+    @property
+    def duracion_ciclo(self) -> int:
+        """Retorna la duración de un ciclo completo en ticks."""
+        return len(self.fase_por_posicion)
+
+    def color(self, fase: int, via: Via) -> Color:
+        """
+        Decodifica el color de una vía en una fase.
+
+        Args:
+            fase: Índice de la fase
+            via: Vía a consultar
+
+        Returns:
+            Color de la vía
+        """
+        return Color(self.colores[fase * len(VIAS) + VIAS.index(via)])
+
+    def plan(self, fase: int) -> dict:
+        """Retorna el color de cada vía en una fase."""
+        return {via: self.color(fase, via) for via in VIAS}
+
+    def __eq__(self, otro) -> bool:
+        if not isinstance(otro, ProgramaSemaforico):
+            return NotImplemented
+        return (
+            self.nombres == otro.nombres
+            and self.duraciones == otro.duraciones
+            and self.colores == otro.colores
+        )
+
+    def __repr__(self) -> str:
+        return f"ProgramaSemaforico(fases={self.num_fases}, ciclo={self.duracion_ciclo})"
+
+
+def _validar_sin_conflictos(nombre: str, plan: Mapping[Via, Color]) -> None:
+    """Verifica que una fase no dé paso a la vez a los dos ejes."""
+    abierto_ns = any(plan[via] != Color.ROJO for via in EJE_NS)
+    abierto_ew = any(plan[via] != Color.ROJO for via in EJE_EW)
+    if abierto_ns and abierto_ew:
+        raise ValueError(f"La fase {nombre} da paso a vías que se cruzan (NS y EW)")
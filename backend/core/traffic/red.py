@@ -0,0 +1,278 @@
+"""
+Red vial de varias intersecciones.
+Describe intersecciones unidas por enlaces dirigidos y la guarda en arreglos CSR.
+"""
+import heapq
+from array import array
+from typing import Iterable, List, Optional, Sequence
+
+from ..common.tipos import Via
+
+VIAS = tuple(Via)
+VIAS_POR_INTERSECCION = len(VIAS)
+SLOT_VIA = {via: slot for slot, via in enumerate(VIAS)}
+
+# Desplazamiento (fila, columna) hacia la intersección a la que sigue un
+# vehículo que llega por cada vía y cruza en línea recta. Llega por la vía
+# NORTE quien viene del norte y sigue hacia el sur, y así para las demás.
+DESPLAZAMIENTO_SALIDA = {
+    Via.NORTE: (1, 0),
+    Via.SUR: (-1, 0),
+    Via.ESTE: (0, -1),
+    Via.OESTE: (0, 1),
+}
+
+
+class RedVial:
+    """
+    Intersecciones conectadas por enlaces dirigidos.
+
+    Cada intersección tiene un carril por vía (carril = intersección * 4 +
+    slot de la vía). Un enlace lleva los vehículos que cruzan por la vía `via`
+    de la intersección `origen` hasta la cola de la misma vía en `destino`,
+    tras `tiempo_viaje` ticks. `capacidad` limita los vehículos que el enlace
+    puede almacenar (en tránsito más la cola de destino); si está lleno, el
+    carril de origen no despacha (bloqueo por cola).
+
+    Representación compacta (todo en `array`, sin objetos por enlace):
+        indptr: CSR por intersección de origen; los enlaces que salen de i
+            son indptr[i]..indptr[i + 1]
+        destino, carril_origen, carril_destino, capacidad, tiempo_viaje:
+            un valor por enlace, en orden CSR
+        enlace_de_carril: enlace de salida de cada carril (-1 = sale de la red)
+        entrada_de_carril: enlace que alimenta cada carril (-1 = borde de la
+            red, recibe demanda externa)
+    """
+
+    def __init__(self, num_intersecciones: int, enlaces: Iterable[dict]):
+        """
+        Construye la red.
+
+        Args:
+            num_intersecciones: Número de intersecciones
+            enlaces: Diccionarios con "origen", "destino", "via" (nombre),
+                "capacidad" y "tiempo_viaje"
+
+        Raises:
+            ValueError: Si un enlace es inválido o un carril tiene dos enlaces
+                de salida o de entrada
+        """
+        if num_intersecciones < 1:
+            raise ValueError("La red necesita al menos una intersección")
+        self.num_intersecciones = num_intersecciones
+        num_carriles = num_intersecciones * VIAS_POR_INTERSECCION
+
+        normalizados = sorted(
+            (self._validar(enlace, num_intersecciones) for enlace in enlaces),
+            key=lambda e: (e[0], e[2]),
+        )
+
+        self.indptr = array("l", [0]) * (num_intersecciones + 1)
+        self.destino = array("l")
+        self.carril_origen = array("l")
+        self.carril_destino = array("l")
+        self.capacidad = array("l")
+        self.tiempo_viaje = array("l")
+        self.enlace_de_carril = array("l", [-1]) * num_carriles
+        self.entrada_de_carril = array("l", [-1]) * num_carriles
+
+        for indice, (origen, destino, slot, capacidad, tiempo_viaje) in enumerate(normalizados):
+            salida = origen * VIAS_POR_INTERSECCION + slot
+            entrada = destino * VIAS_POR_INTERSECCION + slot
+            if self.enlace_de_carril[salida] != -1:
+                raise ValueError(f"El carril {VIAS[slot].name} de {origen} ya tiene enlace de salida")
+            if self.entrada_de_carril[entrada] != -1:
+                raise ValueError(f"El carril {VIAS[slot].name} de {destino} ya tiene enlace de entrada")
+            self.indptr[origen + 1] += 1
+            self.destino.append(destino)
+            self.carril_origen.append(salida)
+            self.carril_destino.append(entrada)
+            self.capacidad.append(capacidad)
+            self.tiempo_viaje.append(tiempo_viaje)
+            self.enlace_de_carril[salida] = indice
+            self.entrada_de_carril[entrada] = indice
+
+        for i in range(num_intersecciones):
+            self.indptr[i + 1] += self.indptr[i]
+
+    @staticmethod
+    def _validar(enlace: dict, num_intersecciones: int) -> tuple:
+        """Normaliza un enlace a (origen, destino, slot, capacidad, tiempo_viaje)."""
+        try:
+            origen, destino = int(enlace["origen"]), int(enlace["destino"])
+            via = enlace["via"]
+            capacidad, tiempo_viaje = int(enlace["capacidad"]), int(enlace["tiempo_viaje"])
+        except KeyError as e:
+            raise ValueError(f"Enlace sin {e.args[0]}: {enlace}") from None
+        if via not in Via.__members__:
+            raise ValueError(f"Vía desconocida en el enlace {enlace}")
+        if not (0 <= origen < num_intersecciones and 0 <= destino < num_intersecciones):
+            raise ValueError(f"Intersección fuera de rango en el enlace {enlace}")
+        if origen == destino:
+            raise ValueError(f"El enlace {enlace} no puede volver a su origen")
+        if capacidad < 1 or tiempo_viaje < 1:
+            raise ValueError(f"Capacidad y tiempo de viaje deben ser positivos: {enlace}")
+        return origen, destino, SLOT_VIA[Via[via]], capacidad, tiempo_viaje
+
+    @classmethod
+    def grilla(cls, filas: int, columnas: int, capacidad: int = 30, tiempo_viaje: int = 5) -> "RedVial":
+        """
+        Crea una grilla de calles rectas en ambos sentidos.
+
+        La intersección de la fila f y columna c es f * columnas + c. Los
+        vehículos cruzan en línea recta hasta salir por el borde.
+
+        Args:
+            filas: Filas de la grilla
+            columnas: Columnas de la grilla
+            capacidad: Capacidad de cada enlace
+            tiempo_viaje: Ticks de viaje entre intersecciones vecinas
+
+        Returns:
+            Red con un enlace por par de vecinas y sentido
+        """
+        enlaces = []
+        for f in range(filas):
+            for c in range(columnas):
+                for via, (df, dc) in DESPLAZAMIENTO_SALIDA.items():
+                    fd, cd = f + df, c + dc
+                    if 0 <= fd < filas and 0 <= cd < columnas:
+                        enlaces.append({
+                            "origen": f * columnas + c, "destino": fd * columnas + cd,
+                            "via": via.name, "capacidad": capacidad, "tiempo_viaje": tiempo_viaje,
+                        })
+        return cls(filas * columnas, enlaces)
+
+    @classmethod
+    def corredor(cls, intersecciones: int, capacidad: int = 30, tiempo_viaje: int = 5) -> "RedVial":
+        """
+        Crea un corredor este-oeste de intersecciones consecutivas.
+
+        Args:
+            intersecciones: Intersecciones del corredor
+            capacidad: Capacidad de cada enlace
+            tiempo_viaje: Ticks de viaje entre intersecciones vecinas
+
+        Returns:
+            Red de una fila
+        """
+        return cls.grilla(1, intersecciones, capacidad, tiempo_viaje)
+
+    @classmethod
+    def desde_config(cls, config) -> Optional["RedVial"]:
+        """
+        Crea la red descrita en la configuración.
+
+        Args:
+            config: ConfiguracionSimulacion. `red` puede ser None,
+                {"tipo": "corredor", "intersecciones": n, ...},
+                {"tipo": "grilla", "filas": f, "columnas": c, ...} o
+                {"intersecciones": n, "enlaces": [...]}; "capacidad" y
+                "tiempo_viaje" son opcionales en los dos primeros
+
+        Returns:
+            Red, o None si la configuración no define una
+        """
+        descripcion = config.red
+        if not descripcion:
+            return None
+        opciones = {k: descripcion[k] for k in ("capacidad", "tiempo_viaje") if k in descripcion}
+        tipo = descripcion.get("tipo", "enlaces")
+        if tipo == "corredor":
+            return cls.corredor(descripcion["intersecciones"], **opciones)
+        if tipo == "grilla":
+            return cls.grilla(descripcion["filas"], descripcion["columnas"], **opciones)
+        if tipo == "enlaces":
+            return cls(descripcion["intersecciones"], descripcion["enlaces"])
+        raise ValueError(f"Tipo de red inválido: {tipo}. Use 'corredor', 'grilla' o 'enlaces'")
+
+    @property
+    def num_enlaces(self) -> int:
+        """Retorna el número de enlaces."""
+        return len(self.destino)
+
+    def enlaces_de(self, interseccion: int) -> range:
+        """Retorna los índices de los enlaces que salen de una intersección."""
+        return range(self.indptr[interseccion], self.indptr[interseccion + 1])
+
+    def vecinos(self, interseccion: int) -> List[int]:
+        """Retorna las intersecciones a las que llegan sus enlaces de salida."""
+        return [self.destino[e] for e in self.enlaces_de(interseccion)]
+
+    def carriles_de_borde(self) -> List[int]:
+        """Retorna los carriles sin enlace de entrada (reciben demanda externa)."""
+        return [carril for carril, enlace in enumerate(self.entrada_de_carril) if enlace == -1]
+
+    def particionar(self, partes: int) -> array:
+        """
+        Reparte las intersecciones en regiones conexas de tamaño parejo.
+
+        Crecimiento voraz por BFS: cada región parte de la intersección libre
+        con menos vecinas libres (una esquina de lo que queda) y se le suma,
+        una a una, la intersección de su frontera con más enlaces hacia la
+        región (y, a igualdad, la más cercana a la semilla), hasta llegar a
+        su tamaño objetivo. Así cada región queda
+        compacta y se cortan pocos enlaces.
+
+        Args:
+            partes: Número de regiones (se limita al de intersecciones)
+
+        Returns:
+            Región de cada intersección
+        """
+        n = self.num_intersecciones
+        partes = max(1, min(partes, n))
+        adyacentes: List[List[int]] = [[] for _ in range(n)]
+        for origen in range(n):
+            for destino in self.vecinos(origen):
+                adyacentes[origen].append(destino)
+                adyacentes[destino].append(origen)
+
+        asignacion = array("l", [-1]) * n
+        libres_vecinas = [len(a) for a in adyacentes]
+        restantes = n
+        for parte in range(partes):
+            objetivo = restantes // (partes - parte)
+            ganancia, distancia = {}, {}
+            frontera = []
+            tamano = 0
+            while tamano < objetivo:
+                while frontera and asignacion[frontera[0][2]] != -1:
+                    heapq.heappop(frontera)
+                if frontera:
+                    actual = heapq.heappop(frontera)[2]
+                else:
+                    # Región vacía o componente agotada: nueva semilla
+                    actual = min(
+                        (i for i in range(n) if asignacion[i] == -1),
+                        key=lambda i: (libres_vecinas[i], i),
+                    )
+                    distancia[actual] = 0
+                asignacion[actual] = parte
+                tamano += 1
+                for vecina in adyacentes[actual]:
+                    libres_vecinas[vecina] -= 1
+                    if asignacion[vecina] == -1:
+                        ganancia[vecina] = ganancia.get(vecina, 0) + 1
+                        distancia.setdefault(vecina, distancia[actual] + 1)
+                        heapq.heappush(frontera, (-ganancia[vecina], distancia[vecina], vecina))
+            restantes -= tamano
+        return asignacion
+
+    def enlaces_de_corte(self, asignacion: Sequence[int]) -> List[int]:
+        """
+        Retorna los enlaces que unen intersecciones de regiones distintas.
+
+        Args:
+            asignacion: Región de cada intersección (ver particionar)
+
+        Returns:
+            Índices de los enlaces cortados
+        """
+        return [
+            e for e in range(self.num_enlaces)
+            if asignacion[self.carril_origen[e] // VIAS_POR_INTERSECCION] != asignacion[self.destino[e]]
+        ]
+
+    def __repr__(self) -> str:
+        return f"RedVial(intersecciones={self.num_intersecciones}, enlaces={self.num_enlaces})"
@@ -4,10 +4,11 @@ Responsable de mantener cola de vehículos y despachar según el color.
 """
 import threading
 from collections import deque
-from typing import List
+from typing import List, Optional
 
 from ..common.tipos import Color, Via
-from ..models.vehiculo import Vehiculo
+from ..common.reloj import RelojSimulacion
+from ..models.almacen import AlmacenVehiculos
 
 
 class Semaforo:
@@ -15,20 +16,31 @@ class Semaforo:
     Representa un semáforo en una intersección.
     
     Gestiona la cola de vehículos y el despacho según el estado del semáforo.
+    La cola guarda índices enteros al AlmacenVehiculos, no objetos.
     No contiene lógica de concurrencia - solo lógica de dominio.
     """
 
-    def __init__(self, via: Via, capacidad_por_tick: int = 2):
+    def __init__(
+        self,
+        via: Via,
+        capacidad_por_tick: int = 2,
+        reloj: Optional[RelojSimulacion] = None,
+        almacen: Optional[AlmacenVehiculos] = None,
+    ):
         """
         Inicializa el semáforo.
         
         Args:
             via: Dirección de la vía (Norte, Sur, Este, Oeste)
             capacidad_por_tick: Número máximo de vehículos que pueden cruzar por tick
+            reloj: Reloj lógico compartido con el engine. Si no se indica, se crea uno propio.
+            almacen: Almacén de vehículos compartido. Si no se indica, se crea uno propio.
         """
         self.via = via
+        self.reloj = reloj if reloj is not None else RelojSimulacion()
+        self.almacen = almacen if almacen is not None else AlmacenVehiculos()
         self.color = Color.ROJO
-        self.cola: deque[Vehiculo] = deque()
+        self.cola: deque[int] = deque()
         self.capacidad_por_tick = capacidad_por_tick
         self._vehiculos_cruzados_total = 0
         self._lock = threading.Lock() # Lock interno para proteger la cola
@@ -37,18 +49,22 @@ class Semaforo:
         """Cambia el color del semáforo."""
         self.color = color
 
-    def agregar_vehiculo(self, vehiculo: Vehiculo) -> None:
+    def agregar_vehiculo(self, vehiculo_id: int) -> int:
         """
         Agrega un vehículo a la cola.
         
         Args:
-            vehiculo: Vehículo a agregar
+            vehiculo_id: Identificador del vehículo que llega
+            
+        Returns:
+            Índice del vehículo en el almacén
         """
-        vehiculo.marcar_inicio_espera()
+        indice = self.almacen.agregar(vehiculo_id, self.reloj.ahora)
         with self._lock:
-            self.cola.append(vehiculo)
+            self.cola.append(indice)
+        return indice
 
-    def tick(self) -> List[Vehiculo]:
+    def tick(self) -> List[int]:
         """
         Ejecuta un tick de simulación.
         
@@ -56,17 +72,18 @@ class Semaforo:
         - Si está en ROJO o AMARILLO: no despacha ninguno
         
         Returns:
-            Lista de vehículos que cruzaron en este tick
+            Índices (en el almacén) de los vehículos que cruzaron en este tick
         """
         vehiculos_despachados = []
+        ahora = self.reloj.ahora
 
         with self._lock:
             if self.color == Color.VERDE:
                 # Despachar hasta la capacidad permitida
                 for _ in range(min(self.capacidad_por_tick, len(self.cola))):
-                    vehiculo = self.cola.popleft()
-                    vehiculo.marcar_salida()
-                    vehiculos_despachados.append(vehiculo)
+                    indice = self.cola.popleft()
+                    self.almacen.marcar_salida(indice, ahora)
+                    vehiculos_despachados.append(indice)
                     self._vehiculos_cruzados_total += 1
 
         return vehiculos_despachados
@@ -104,7 +121,7 @@ class Semaforo:
         Para cada vehículo incluye:
         - id: Identificador único
         - posicion: Posición en la cola (0 = primero)
-        - esperando_desde: Tiempo de espera actual
+        - esperando_desde: Tiempo de espera actual en ticks
         
         Returns:
             Lista de diccionarios con detalles de cada vehículo
@@ -114,13 +131,15 @@ class Semaforo:
             # y para asegurar que la lista de vehículos es consistente con el momento del lock.
             cola_snapshot = list(self.cola) 
         
+        ahora = self.reloj.ahora
+        almacen = self.almacen
         return [
             {
-                "id": vehiculo.id,
+                "id": almacen.id_vehiculo(indice),
                 "posicion": idx,
-                "esperando_desde": vehiculo.tiempo_espera_total,
+                "esperando_desde": almacen.tiempo_espera_hasta(indice, ahora),
             }
-            for idx, vehiculo in enumerate(cola_snapshot)
+            for idx, indice in enumerate(cola_snapshot)
         ]
 
     def __repr__(self) -> str:
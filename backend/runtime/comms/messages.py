@@ -1,11 +1,15 @@
 """
 Estructuras de mensajes para comunicación entre procesos.
-Usado por el multiprocessing engine.
+Usado por los engines multiprocessing y de red particionada.
 """
+from array import array
 from dataclasses import dataclass, field
 from typing import Optional, List, Dict
 from enum import Enum, auto
 
+from ...core.common.stats import EstadisticasTrafico
+from ...core.common.tipos import Color
+
 
 class TipoComando(Enum):
     """Tipos de comandos que se pueden enviar a procesos."""
@@ -14,6 +18,9 @@ class TipoComando(Enum):
     TICK = auto()
     DETENER = auto()
     OBTENER_ESTADO = auto()
+    PASO = auto()  # Tick completo en un solo mensaje (color + llegadas + estado)
+    VENTANA = auto()  # Avanzar una región de la red varios ticks
+    INICIAR = auto()  # Crear los workers de un nodo (transporte por sockets)
 
 
 class TipoRespuesta(Enum):
@@ -22,6 +29,10 @@ class TipoRespuesta(Enum):
     ESTADO_SEMAFORO = auto()
     ACK = auto()
     ERROR = auto()
+    RESULTADO_PASO = auto()
+    RESULTADO_VENTANA = auto()
+    ESTADO_REGION = auto()
+    LISTO = auto()
 
 
 @dataclass
@@ -33,13 +44,17 @@ class Comando:
         tipo: Tipo de comando
         via: Vía del semáforo destino
         payload: Datos adicionales (color, vehículo, etc.)
+        tick: Tick lógico del proceso principal al emitir el comando
+        secuencia: Número de petición, único por worker, para correlacionar la respuesta
     """
     tipo: TipoComando
     via: str
     payload: Optional[any] = None
+    tick: Optional[int] = None
+    secuencia: Optional[int] = None
 
     def __repr__(self) -> str:
-        return f"Comando({self.tipo.name}, via={self.via})"
+        return f"Comando({self.tipo.name}, via={self.via}, tick={self.tick}, seq={self.secuencia})"
 
 
 @dataclass
@@ -52,14 +67,40 @@ class Respuesta:
         via: Vía que responde
         payload: Datos de respuesta
         exito: Si la operación fue exitosa
+        tick: Tick del comando que originó la respuesta
+        secuencia: Secuencia del comando que originó la respuesta
     """
     tipo: TipoRespuesta
     via: str
     payload: Optional[any] = None
     exito: bool = True
+    tick: Optional[int] = None
+    secuencia: Optional[int] = None
 
     def __repr__(self) -> str:
-        return f"Respuesta({self.tipo.name}, via={self.via}, exito={self.exito})"
+        return f"Respuesta({self.tipo.name}, via={self.via}, seq={self.secuencia}, exito={self.exito})"
+
+
+def validar_respuesta(resp: Respuesta, nombre: str, secuencia: int, tipo_esperado: TipoRespuesta) -> None:
+    """
+    Verifica que una respuesta sea la que se esperaba de un worker.
+
+    Args:
+        resp: Respuesta recibida
+        nombre: Nombre del worker, para el mensaje de error
+        secuencia: Secuencia de la petición pendiente
+        tipo_esperado: Tipo de respuesta esperado
+
+    Raises:
+        RuntimeError: Si es un error o no corresponde a la petición pendiente
+    """
+    if not resp.exito or resp.tipo == TipoRespuesta.ERROR:
+        raise RuntimeError(f"Error en worker {nombre}: {resp.payload}")
+    if resp.secuencia != secuencia or resp.tipo != tipo_esperado:
+        raise RuntimeError(
+            f"Respuesta inesperada de {nombre}: {resp!r} "
+            f"(se esperaba {tipo_esperado.name} seq={secuencia})"
+        )
 
 
 @dataclass
@@ -73,6 +114,7 @@ class EstadoSemaforoMsg:
     tamano_cola: int
     vehiculos_cruzados: int
     vehiculos_cola: List[dict] = field(default_factory=list) # Lista de diccionarios con info de autos
+    estadisticas: Optional[EstadisticasTrafico] = None # Agregado parcial del worker, solo si se pidió
 
     def to_dict(self) -> dict:
         """Convierte a diccionario."""
@@ -89,10 +131,12 @@ class EstadoSemaforoMsg:
 class VehiculosDespachadosMsg:
     """
     Mensaje con vehículos despachados en un tick.
+    
+    Los tiempos de espera no viajan por vehículo: el worker los agrega en
+    sus estadísticas parciales.
     """
     via: str
     cantidad: int
-    tiempos_espera: List[float]
     vehiculos_detalle: List[dict] = field(default_factory=list) # Detalle para animación
 
     def to_dict(self) -> dict:
@@ -100,6 +144,61 @@ class VehiculosDespachadosMsg:
         return {
             "via": self.via,
             "cantidad": self.cantidad,
-            "tiempos_espera": self.tiempos_espera,
             "vehiculos_detalle": self.vehiculos_detalle,
         }
+
+
+@dataclass
+class PasoMsg:
+    """
+    Payload del comando PASO: todo lo que un worker necesita para un tick.
+    
+    Sustituye la secuencia CAMBIAR_COLOR + AGREGAR_VEHICULO* + TICK +
+    OBTENER_ESTADO por un único ida y vuelta. Si no se indica color, el
+    worker lo deriva del tick con su propio programa de fases.
+    """
+    color: Optional[Color] = None # Fuerza un color; None = según el programa de fases
+    llegadas: List[int] = field(default_factory=list) # Llegadas inyectadas, además de las del generador del worker
+    incluir_detalle: bool = True # Detalle de la cola para la GUI
+    incluir_estadisticas: bool = False # Adjuntar estadísticas parciales
+
+
+@dataclass
+class ResultadoPasoMsg:
+    """
+    Respuesta a un comando PASO: despacho del tick y estado resultante.
+    """
+    despachados: VehiculosDespachadosMsg
+    estado: Optional[EstadoSemaforoMsg] = None # Solo si se pidió detalle o estadísticas
+    tamano_cola: int = 0 # Cola al terminar el tick, siempre presente
+    llegadas: List[int] = field(default_factory=list) # IDs de los vehículos que llegaron en el tick
+    vehiculos_cruzados: int = 0 # Acumulado de cruces del worker hasta el tick
+    espera_total: int = 0 # Acumulado de espera de esos cruces, en ticks
+
+
+@dataclass
+class VentanaMsg:
+    """
+    Payload del comando VENTANA: avanzar una región de la red hasta un tick.
+    
+    Los vehículos y créditos que entran por el borde viajan como triples
+    (enlace, tick, cantidad) aplanados en un `array('q')`.
+    """
+    hasta: int # Último tick de la ventana
+    llegadas: array = field(default_factory=lambda: array("q")) # Vehículos despachados hacia la región
+    creditos: array = field(default_factory=lambda: array("q")) # Espacio liberado en enlaces que salen de la región
+    gvt: int = 0 # Tiempo virtual global: ningún tick hasta aquí se volverá a simular (modo optimista)
+
+
+@dataclass
+class ResultadoVentanaMsg:
+    """
+    Respuesta a un comando VENTANA: lo que salió de la región y sus contadores.
+    """
+    llegadas: array # Triples de vehículos que salieron por enlaces del borde
+    creditos: array # Triples de créditos para regiones aguas arriba
+    contadores: array # CONTADORES_POR_TICK valores acumulados por cada tick simulado
+    observada: Optional[array] = None # Colas, cruzados y espera de la intersección observada por tick, si es de la región
+    desde: int = 0 # Primer tick de contadores (en modo optimista, puede repetir ticks deshechos)
+    ahora: int = 0 # Tick de la región al responder
+    retrocesos: int = 0 # Retrocesos acumulados por la región (modo optimista)
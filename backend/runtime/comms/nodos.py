@@ -0,0 +1,494 @@
+"""
+Ejecución repartida en nodos: agente de nodo y coordinador.
+Un nodo escucha en un puerto TCP y corre como procesos locales los workers que le
+asigna el coordinador (el proceso principal de un engine), que le reenvía los
+comandos agrupados en un lote por nodo y por tick.
+
+Nodo y coordinador se autentican con la clave compartida de SIM_CLAVE_NODOS, y
+un nodo solo crea los workers de WORKERS_REMOTOS, que se piden por nombre.
+"""
+import importlib
+import multiprocessing as mp
+import os
+import secrets
+import socket
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from time import monotonic
+from typing import Callable, Deque, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from .messages import Comando, Respuesta, TipoComando, TipoRespuesta, validar_respuesta
+from .sockets import AuthenticationError, CanalSocket, parsear_direccion
+
+# Tiempo máximo que se espera a un nodo antes de declarar la respuesta perdida
+TIMEOUT_RESPUESTA = 5.0
+
+# Tiempo para crear los workers de un nodo
+TIMEOUT_INICIO = 30.0
+
+# Variable de entorno con la clave compartida por los nodos y el coordinador
+VARIABLE_CLAVE = "SIM_CLAVE_NODOS"
+
+# Workers que un nodo acepta crear: nombre -> módulo (relativo a este paquete)
+WORKERS_REMOTOS = {
+    "worker_semaforo": "..engines.multiprocessing_engine",
+    "worker_region": "..engines.partitioned_engine",
+}
+
+# Worker a crear: nombre en WORKERS_REMOTOS y sus argumentos sin la conexión,
+# que va como segundo argumento (como en worker_semaforo y worker_region)
+EspecWorker = Tuple[str, tuple]
+
+
+def clave_nodos() -> bytes:
+    """
+    Lee la clave compartida de la variable de entorno SIM_CLAVE_NODOS.
+
+    Va en el entorno y no en la configuración ni en la línea de comandos
+    para que no aparezca en los reportes ni en la lista de procesos.
+
+    Raises:
+        ValueError: Si la variable no está definida o está vacía
+    """
+    clave = os.environ.get(VARIABLE_CLAVE, "")
+    if not clave:
+        raise ValueError(f"Defina {VARIABLE_CLAVE} con la clave compartida por los nodos")
+    return clave.encode()
+
+
+def funcion_worker(nombre: str) -> Callable:
+    """
+    Resuelve el nombre de un worker de WORKERS_REMOTOS.
+
+    El import es diferido porque los engines importan este módulo.
+
+    Raises:
+        ValueError: Si el worker no está permitido
+    """
+    modulo = WORKERS_REMOTOS.get(nombre)
+    if modulo is None:
+        raise ValueError(f"Worker no permitido en un nodo: {nombre!r}")
+    return getattr(importlib.import_module(modulo, __package__), nombre)
+
+
+def lanzar_worker(funcion: Callable, args: tuple) -> Tuple[Connection, mp.Process]:
+    """
+    Crea un worker en un proceso local con su propio Pipe.
+
+    Args:
+        funcion: Función worker; recibe la conexión como segundo argumento
+        args: Argumentos del worker, sin la conexión
+
+    Returns:
+        Tupla (extremo del Pipe del lado padre, proceso)
+    """
+    conexion_padre, conexion_hijo = mp.Pipe(duplex=True)
+    proceso = mp.Process(target=funcion, args=(args[0], conexion_hijo, *args[1:]), daemon=True)
+    proceso.start()
+    conexion_hijo.close()  # El extremo del hijo solo vive en el worker
+    return conexion_padre, proceso
+
+
+class _Lote:
+    """Comandos de una trama del coordinador cuyas respuestas se devuelven juntas."""
+
+    def __init__(self):
+        self.faltan = 0
+        self.respuestas: List[Respuesta] = []
+
+
+def _atender(canal: CanalSocket) -> None:
+    """
+    Atiende a un coordinador hasta que cierra la conexión.
+
+    Las respuestas de los workers a una misma trama se juntan y vuelven en
+    una sola trama, en el orden en que llegaron las tramas.
+    """
+    conexiones: Dict[str, Connection] = {}
+    procesos: Dict[str, mp.Process] = {}
+    # Por worker, las peticiones aún sin respuesta: (lote, comando)
+    pendientes: Dict[str, Deque[Tuple[_Lote, Comando]]] = {}
+    lotes: Deque[_Lote] = deque()
+
+    def responder_error(via: str, comando: Comando, lote: _Lote, mensaje: str) -> None:
+        lote.respuestas.append(Respuesta(
+            tipo=TipoRespuesta.ERROR, via=via, payload=mensaje, exito=False,
+            tick=comando.tick, secuencia=comando.secuencia,
+        ))
+        lote.faltan -= 1
+
+    try:
+        while True:
+            activos = [via for via, cola in pendientes.items() if cola and via in conexiones]
+            listos = wait(
+                [canal]
+                + list(conexiones.values())
+                + [procesos[via].sentinel for via in activos]
+            )
+
+            if canal in listos:
+                try:
+                    comandos = canal.recibir()
+                except (EOFError, OSError):
+                    break
+                lote = _Lote()
+                lotes.append(lote)
+                for comando in comandos:
+                    if comando.tipo == TipoComando.INICIAR:
+                        try:
+                            especs = [
+                                (via, funcion_worker(nombre), args) for via, (nombre, args) in comando.payload.items()
+                            ]
+                        except ValueError as e:
+                            lote.respuestas.append(Respuesta(
+                                tipo=TipoRespuesta.ERROR, via=comando.via, payload=str(e), exito=False,
+                                tick=comando.tick, secuencia=comando.secuencia,
+                            ))
+                            continue
+                        for via, funcion, args in especs:
+                            conexiones[via], procesos[via] = lanzar_worker(funcion, args)
+                            pendientes[via] = deque()
+                        lote.respuestas.append(Respuesta(
+                            tipo=TipoRespuesta.LISTO, via=comando.via,
+                            tick=comando.tick, secuencia=comando.secuencia,
+                        ))
+                        continue
+                    lote.faltan += 1
+                    conexion = conexiones.get(comando.via)
+                    if conexion is None:
+                        responder_error(comando.via, comando, lote, "Worker desconocido en el nodo")
+                        continue
+                    try:
+                        conexion.send(comando)
+                    except (BrokenPipeError, OSError):
+                        responder_error(comando.via, comando, lote, "El worker no está disponible")
+                        continue
+                    if comando.tipo == TipoComando.DETENER:
+                        lote.faltan -= 1  # DETENER no tiene respuesta
+                    else:
+                        pendientes[comando.via].append((lote, comando))
+
+            for via in list(conexiones):
+                conexion, cola = conexiones[via], pendientes[via]
+                if conexion in listos:
+                    try:
+                        while conexion.poll():
+                            respuesta = conexion.recv()
+                            if cola:
+                                lote, _ = cola.popleft()
+                                lote.respuestas.append(respuesta)
+                                lote.faltan -= 1
+                    except (EOFError, OSError):
+                        # El worker cerró su extremo (DETENER o fin del proceso)
+                        del conexiones[via]
+                        conexion.close()
+                if cola and (via not in conexiones or not procesos[via].is_alive()):
+                    while cola:
+                        lote, comando = cola.popleft()
+                        responder_error(via, comando, lote, "El worker terminó sin responder")
+
+            while lotes and lotes[0].faltan == 0:
+                canal.enviar(lotes.popleft().respuestas)
+    finally:
+        for proceso in procesos.values():
+            proceso.join(timeout=2)
+            if proceso.is_alive():
+                proceso.terminate()
+        for conexion in conexiones.values():
+            conexion.close()
+        canal.close()
+
+
+def servir_nodo(
+    host: str = "127.0.0.1",
+    puerto: int = 7001,
+    escucha: Optional[socket.socket] = None,
+    clave: Optional[bytes] = None,
+) -> None:
+    """
+    Corre un nodo: atiende a los coordinadores que se conecten, uno tras otro.
+
+    Las conexiones que no se autentican con la clave se cierran sin leer
+    ninguna trama.
+
+    Args:
+        host: Interfaz en la que escuchar (0.0.0.0 para aceptar otros hosts)
+        puerto: Puerto TCP
+        escucha: Socket ya en escucha (ignora host y puerto)
+        clave: Clave compartida (None = la de SIM_CLAVE_NODOS)
+    """
+    if clave is None:
+        clave = clave_nodos()
+    if escucha is None:
+        escucha = socket.create_server((host, puerto))
+    with escucha:
+        while True:
+            conexion, _ = escucha.accept()
+            canal = CanalSocket(conexion)
+            try:
+                canal.autenticar(clave, servidor=True)
+            except (AuthenticationError, OSError):
+                canal.close()
+                continue
+            _atender(canal)
+
+
+class ExtremoRemoto:
+    """
+    Sustituto de la conexión Pipe de un worker que corre en un nodo.
+
+    `send` no escribe en el socket: deja el comando en el lote del nodo,
+    que el coordinador envía al esperar respuestas.
+    """
+
+    def __init__(self, coordinador: "CoordinadorNodos", nodo: int):
+        self._coordinador = coordinador
+        self._nodo = nodo
+
+    def send(self, comando: Comando) -> None:
+        """Encola un comando para el nodo del worker."""
+        self._coordinador.encolar(self._nodo, comando)
+
+    def close(self) -> None:
+        """Los sockets los cierra el coordinador."""
+
+
+class CoordinadorNodos:
+    """
+    Reparte workers entre nodos y les hace llegar los comandos por sockets.
+
+    - Los workers se asignan a los nodos por turno, en el orden recibido
+    - Los comandos se acumulan por nodo y viajan en una trama por nodo cada
+      vez que el engine espera respuestas (una barrera de tick), así que un
+      tick cuesta un ida y vuelta por nodo y no uno por worker
+    - Las respuestas se validan igual que las de los Pipes (tipo, secuencia
+      y errores de worker)
+    """
+
+    def __init__(
+        self,
+        direcciones: Sequence[str],
+        timeout: float = TIMEOUT_RESPUESTA,
+        clave: Optional[bytes] = None,
+    ):
+        """
+        Inicializa el coordinador.
+
+        Args:
+            direcciones: "host:puerto" de cada nodo (ver servir_nodo)
+            timeout: Segundos de espera por respuesta antes de fallar
+            clave: Clave compartida con los nodos (None = la de SIM_CLAVE_NODOS)
+        """
+        if not direcciones:
+            raise ValueError("Se necesita al menos un nodo")
+        for direccion in direcciones:
+            parsear_direccion(direccion)
+        self.direcciones = list(direcciones)
+        self.timeout = timeout
+        self._clave = clave_nodos() if clave is None else clave
+        self._canales: List[CanalSocket] = []
+        self._salidas: List[List[Comando]] = []
+        self._nodo_de: Dict[str, int] = {}
+        self._recibidas: Dict[str, Deque[Respuesta]] = {}
+        self.tramas_enviadas = 0
+
+    @property
+    def workers(self) -> int:
+        """Retorna el número de workers repartidos."""
+        return len(self._nodo_de)
+
+    def iniciar(self, workers: Dict[Hashable, EspecWorker]) -> Dict[Hashable, ExtremoRemoto]:
+        """
+        Se conecta a los nodos y crea en ellos los workers.
+
+        Args:
+            workers: Nombre (en WORKERS_REMOTOS) y argumentos (sin la conexión)
+                de cada worker, por clave (vía o índice de región)
+
+        Returns:
+            Extremo por clave, para usar en lugar de la conexión Pipe
+
+        Raises:
+            ValueError: Si un worker no está en WORKERS_REMOTOS
+            AuthenticationError: Si un nodo no comparte la clave
+        """
+        for nombre, _ in workers.values():
+            if nombre not in WORKERS_REMOTOS:
+                raise ValueError(f"Worker no permitido en un nodo: {nombre!r}")
+        for direccion in self.direcciones:
+            canal = CanalSocket.conectar(direccion, self.timeout)
+            self._canales.append(canal)
+            try:
+                canal.autenticar(self._clave, servidor=False)
+            except AuthenticationError as e:
+                raise AuthenticationError(f"El nodo {direccion} no aceptó la autenticación: {e}") from e
+        self._salidas = [[] for _ in self._canales]
+        asignados: List[Dict[str, EspecWorker]] = [{} for _ in self._canales]
+        extremos = {}
+        for i, (clave, espec) in enumerate(workers.items()):
+            nodo = i % len(self._canales)
+            nombre = _nombre(clave)
+            asignados[nodo][nombre] = espec
+            self._nodo_de[nombre] = nodo
+            self._recibidas[nombre] = deque()
+            extremos[clave] = ExtremoRemoto(self, nodo)
+
+        for nodo, especs in enumerate(asignados):
+            self.encolar(nodo, Comando(tipo=TipoComando.INICIAR, via="", payload=especs, secuencia=0))
+        self.vaciar()
+        for nodo, canal in enumerate(self._canales):
+            if not wait([canal], timeout=TIMEOUT_INICIO):
+                raise TimeoutError(f"El nodo {self.direcciones[nodo]} no creó sus workers")
+            respuesta = self._recibir(nodo)[0]
+            validar_respuesta(respuesta, self.direcciones[nodo], 0, TipoRespuesta.LISTO)
+        return extremos
+
+    def encolar(self, nodo: int, comando: Comando) -> None:
+        """Agrega un comando al próximo lote de un nodo."""
+        self._salidas[nodo].append(comando)
+
+    def vaciar(self) -> None:
+        """Envía a cada nodo, en una trama, los comandos acumulados."""
+        for nodo, salida in enumerate(self._salidas):
+            if salida:
+                try:
+                    self._canales[nodo].enviar(salida)
+                except OSError as e:
+                    raise RuntimeError(f"El nodo {self.direcciones[nodo]} no está disponible") from e
+                self.tramas_enviadas += 1
+                self._salidas[nodo] = []
+
+    def esperar_respuestas(
+        self,
+        pendientes: Dict[Hashable, int],
+        tipo_esperado: TipoRespuesta,
+        minimo: Optional[int] = None,
+    ) -> List[Respuesta]:
+        """
+        Envía los lotes pendientes y espera una respuesta por petición (ver esperar_respuestas).
+
+        Args:
+            pendientes: Secuencia esperada para cada worker
+            tipo_esperado: Tipo de respuesta esperado
+            minimo: Retorna en cuanto haya al menos este número de respuestas
+                (None = esperar todas)
+
+        Returns:
+            Respuestas recibidas, una por worker que respondió
+        """
+        self.vaciar()
+        faltan = {_nombre(clave): clave for clave in pendientes}
+        respuestas = []
+        limite = monotonic() + self.timeout
+
+        while faltan:
+            for nombre in [n for n in faltan if self._recibidas[n]]:
+                clave = faltan.pop(nombre)
+                resp = self._recibidas[nombre].popleft()
+                validar_respuesta(resp, nombre, pendientes[clave], tipo_esperado)
+                respuestas.append(resp)
+            if not faltan or (minimo is not None and len(respuestas) >= minimo):
+                break
+
+            nodos = sorted({self._nodo_de[nombre] for nombre in faltan})
+            listos = wait([self._canales[nodo] for nodo in nodos], timeout=max(0.0, limite - monotonic()))
+            if not listos:
+                raise TimeoutError(f"Sin respuesta de los workers: {', '.join(faltan)}")
+            for nodo in nodos:
+                if self._canales[nodo] in listos:
+                    self._recibir(nodo)
+
+        return respuestas
+
+    def _recibir(self, nodo: int) -> List[Respuesta]:
+        """Recibe una trama de un nodo y reparte sus respuestas por worker."""
+        try:
+            respuestas = self._canales[nodo].recibir()
+        except (EOFError, OSError) as e:
+            raise RuntimeError(f"Se perdió la conexión con el nodo {self.direcciones[nodo]}") from e
+        for resp in respuestas:
+            if resp.via in self._recibidas:
+                self._recibidas[resp.via].append(resp)
+        return respuestas
+
+    def cerrar(self) -> None:
+        """
+        Envía los comandos pendientes (normalmente los DETENER) y cierra las conexiones.
+
+        Como el join de los procesos locales, espera a que cada nodo cierre su
+        extremo, lo que hace cuando terminaron sus workers; así el nodo queda
+        libre para otro coordinador.
+        """
+        try:
+            self.vaciar()
+        except RuntimeError:
+            pass  # El nodo ya no está
+        limite = monotonic() + self.timeout
+        for canal in self._canales:
+            try:
+                canal.cerrar_escritura()
+                # Las respuestas que aún estaban en camino se descartan
+                while wait([canal], timeout=max(0.0, limite - monotonic())):
+                    canal.recibir()
+            except (EOFError, OSError):
+                pass
+            canal.close()
+        self._canales = []
+
+    def __repr__(self) -> str:
+        return f"CoordinadorNodos(nodos={len(self.direcciones)}, workers={self.workers})"
+
+
+def _nombre(clave) -> str:
+    """Nombre con el que viaja un worker: la vía o el índice de región."""
+    return getattr(clave, "name", str(clave))
+
+
+class NodosLocales:
+    """
+    Nodos en procesos locales que escuchan en puertos libres de 127.0.0.1.
+
+    Sustituyen a los hosts remotos para probar el transporte por sockets en
+    una sola máquina. Usan una clave aleatoria que, dentro del bloque with,
+    queda en SIM_CLAVE_NODOS para los coordinadores de este proceso:
+
+        with NodosLocales(2) as direcciones:
+            engine = MultiprocessingEngine(replace(config, nodos=direcciones))
+    """
+
+    def __init__(self, cantidad: int = 2):
+        """
+        Inicializa los nodos (se lanzan al entrar en el bloque with).
+
+        Args:
+            cantidad: Número de nodos
+        """
+        self.cantidad = cantidad
+        self.clave = secrets.token_hex(32)
+        self.procesos: List[mp.Process] = []
+        self.direcciones: List[str] = []
+        self._clave_anterior: Optional[str] = None
+
+    def __enter__(self) -> List[str]:
+        self._clave_anterior = os.environ.get(VARIABLE_CLAVE)
+        os.environ[VARIABLE_CLAVE] = self.clave
+        for _ in range(self.cantidad):
+            escucha = socket.create_server(("127.0.0.1", 0))
+            # No daemon: un nodo crea procesos (sus workers terminan al cerrarse sus Pipes)
+            proceso = mp.Process(target=servir_nodo, kwargs={"escucha": escucha, "clave": self.clave.encode()})
+            proceso.start()
+            self.direcciones.append(f"127.0.0.1:{escucha.getsockname()[1]}")
+            escucha.close()  # El socket en escucha queda en el nodo
+            self.procesos.append(proceso)
+        return self.direcciones
+
+    def __exit__(self, *exc) -> None:
+        for proceso in self.procesos:
+            proceso.terminate()
+            proceso.join(timeout=2)
+        self.procesos = []
+        self.direcciones = []
+        if self._clave_anterior is None:
+            os.environ.pop(VARIABLE_CLAVE, None)
+        else:
+            os.environ[VARIABLE_CLAVE] = self._clave_anterior
@@ -0,0 +1,413 @@
+"""
+Transporte por sockets TCP con un formato binario compacto.
+Usado para correr los workers de los engines multiprocessing en otros hosts.
+
+Una trama es el largo del cuerpo (4 bytes) seguido de un lote de mensajes
+(Comando o Respuesta). Cada mensaje lleva una cabecera de tamaño fijo y su
+payload: los de cada tick (PASO, VENTANA y sus resultados) se empaquetan con
+struct y arreglos int64 en orden de red; los demás, con pickle.
+
+Antes de la primera trama, ambos extremos se autentican con una clave
+compartida (ver CanalSocket.autenticar), así que solo se decodifican tramas
+de quien conoce la clave.
+"""
+import hmac
+import os
+import pickle
+import select
+import socket
+import struct
+import sys
+from array import array
+from multiprocessing import AuthenticationError
+from time import monotonic, sleep
+from typing import Iterable, List, Optional, Tuple, Union
+
+from .messages import (
+    Comando, PasoMsg, Respuesta, ResultadoPasoMsg, ResultadoVentanaMsg,
+    TipoComando, TipoRespuesta, VehiculosDespachadosMsg, VentanaMsg,
+)
+from ...core.common.tipos import Color
+
+Mensaje = Union[Comando, Respuesta]
+
+# Largo del cuerpo de una trama
+_TRAMA = struct.Struct("!I")
+# Cantidad de mensajes del lote
+_LOTE = struct.Struct("!H")
+# Clase, tipo, éxito, codec del payload, tick, secuencia, largo de la vía y del payload
+_MENSAJE = struct.Struct("!BBBBqqBI")
+
+_PASO = struct.Struct("!B??I")  # Color (0 = según el programa), detalle, estadísticas, llegadas
+_RESULTADO_PASO = struct.Struct("!qqqqII")  # Cantidad, cola, cruces, espera, ids despachados, ids llegados
+_VENTANA = struct.Struct("!qqII")  # Hasta, GVT, llegadas, créditos
+_RESULTADO_VENTANA = struct.Struct("!qqqIIIi")  # Desde, ahora, retrocesos y largos (-1 = sin observada)
+_ENTERO = struct.Struct("!q")
+
+# Tick o secuencia ausentes
+_SIN_VALOR = -(2 ** 63)
+
+# Clases de mensaje
+_COMANDO = 0
+_RESPUESTA = 1
+
+# Codecs de payload
+NINGUNO = 0
+ENTERO = 1
+BOOLEANO = 2
+TEXTO = 3
+PASO = 4
+RESULTADO_PASO = 5
+VENTANA = 6
+RESULTADO_VENTANA = 7
+PICKLE = 255
+
+# Cota de una trama recibida, para no reservar memoria por un largo corrupto
+TRAMA_MAXIMA = 1 << 30
+
+# Autenticación: desafío aleatorio firmado con HMAC-SHA256 de la clave compartida
+_LARGO_DESAFIO = 32
+_LARGO_FIRMA = 32
+_ACEPTADO = b"\x01"
+_RECHAZADO = b"\x00"
+
+# Tiempo máximo del intercambio de autenticación
+TIMEOUT_AUTENTICACION = 10.0
+
+_INVERTIR_BYTES = sys.byteorder == "little"
+
+
+def _empacar_enteros(valores) -> bytes:
+    """Serializa enteros como int64 en orden de red."""
+    arreglo = array("q", valores)
+    if _INVERTIR_BYTES:
+        arreglo.byteswap()
+    return arreglo.tobytes()
+
+
+def _leer_enteros(datos: memoryview, posicion: int, cantidad: int) -> Tuple[array, int]:
+    """Lee `cantidad` int64 en orden de red; retorna el arreglo y la posición siguiente."""
+    fin = posicion + 8 * cantidad
+    arreglo = array("q")
+    arreglo.frombytes(datos[posicion:fin])
+    if _INVERTIR_BYTES:
+        arreglo.byteswap()
+    return arreglo, fin
+
+
+def _codificar_payload(payload) -> Tuple[int, bytes]:
+    """Elige el codec de un payload y lo serializa."""
+    if payload is None:
+        return NINGUNO, b""
+    if isinstance(payload, bool):
+        return BOOLEANO, b"\x01" if payload else b"\x00"
+    if isinstance(payload, int):
+        return ENTERO, _ENTERO.pack(payload)
+    if isinstance(payload, str):
+        return TEXTO, payload.encode()
+    if isinstance(payload, PasoMsg):
+        return PASO, _PASO.pack(
+            0 if payload.color is None else payload.color.value,
+            payload.incluir_detalle, payload.incluir_estadisticas, len(payload.llegadas),
+        ) + _empacar_enteros(payload.llegadas)
+    if isinstance(payload, VentanaMsg):
+        return VENTANA, b"".join((
+            _VENTANA.pack(payload.hasta, payload.gvt, len(payload.llegadas), len(payload.creditos)),
+            _empacar_enteros(payload.llegadas), _empacar_enteros(payload.creditos),
+        ))
+    if isinstance(payload, ResultadoVentanaMsg):
+        observada = payload.observada
+        return RESULTADO_VENTANA, b"".join((
+            _RESULTADO_VENTANA.pack(
+                payload.desde, payload.ahora, payload.retrocesos, len(payload.llegadas),
+                len(payload.creditos), len(payload.contadores), -1 if observada is None else len(observada),
+            ),
+            _empacar_enteros(payload.llegadas), _empacar_enteros(payload.creditos),
+            _empacar_enteros(payload.contadores), _empacar_enteros(observada or ()),
+        ))
+    if isinstance(payload, ResultadoPasoMsg) and payload.estado is None:
+        despachados = payload.despachados
+        ids = [detalle["id"] for detalle in despachados.vehiculos_detalle if detalle.keys() == {"id"}]
+        if len(ids) == len(despachados.vehiculos_detalle):
+            return RESULTADO_PASO, b"".join((
+                _RESULTADO_PASO.pack(
+                    despachados.cantidad, payload.tamano_cola, payload.vehiculos_cruzados, payload.espera_total,
+                    len(ids), len(payload.llegadas),
+                ),
+                _empacar_enteros(ids), _empacar_enteros(payload.llegadas),
+            ))
+    return PICKLE, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decodificar_payload(codec: int, datos: memoryview, via: str):
+    """Reconstruye un payload a partir de su codec."""
+    if codec == NINGUNO:
+        return None
+    if codec == BOOLEANO:
+        return datos[0] != 0
+    if codec == ENTERO:
+        return _ENTERO.unpack(datos)[0]
+    if codec == TEXTO:
+        return bytes(datos).decode()
+    if codec == PASO:
+        color, detalle, estadisticas, cantidad = _PASO.unpack_from(datos)
+        llegadas, _ = _leer_enteros(datos, _PASO.size, cantidad)
+        return PasoMsg(
+            color=Color(color) if color else None, llegadas=llegadas.tolist(),
+            incluir_detalle=detalle, incluir_estadisticas=estadisticas,
+        )
+    if codec == VENTANA:
+        hasta, gvt, num_llegadas, num_creditos = _VENTANA.unpack_from(datos)
+        llegadas, posicion = _leer_enteros(datos, _VENTANA.size, num_llegadas)
+        creditos, _ = _leer_enteros(datos, posicion, num_creditos)
+        return VentanaMsg(hasta=hasta, llegadas=llegadas, creditos=creditos, gvt=gvt)
+    if codec == RESULTADO_VENTANA:
+        desde, ahora, retrocesos, *largos = _RESULTADO_VENTANA.unpack_from(datos)
+        posicion = _RESULTADO_VENTANA.size
+        arreglos = []
+        for largo in largos:
+            arreglo, posicion = _leer_enteros(datos, posicion, max(largo, 0))
+            arreglos.append(arreglo if largo >= 0 else None)
+        llegadas, creditos, contadores, observada = arreglos
+        return ResultadoVentanaMsg(
+            llegadas=llegadas, creditos=creditos, contadores=contadores, observada=observada,
+            desde=desde, ahora=ahora, retrocesos=retrocesos,
+        )
+    if codec == RESULTADO_PASO:
+        cantidad, tamano_cola, cruzados, espera, num_ids, num_llegadas = _RESULTADO_PASO.unpack_from(datos)
+        ids, posicion = _leer_enteros(datos, _RESULTADO_PASO.size, num_ids)
+        llegadas, _ = _leer_enteros(datos, posicion, num_llegadas)
+        return ResultadoPasoMsg(
+            despachados=VehiculosDespachadosMsg(
+                via=via, cantidad=cantidad, vehiculos_detalle=[{"id": i} for i in ids],
+            ),
+            tamano_cola=tamano_cola, llegadas=llegadas.tolist(),
+            vehiculos_cruzados=cruzados, espera_total=espera,
+        )
+    if codec == PICKLE:
+        return pickle.loads(datos)
+    raise ValueError(f"Codec de payload desconocido: {codec}")
+
+
+def _opcional(valor: Optional[int]) -> int:
+    return _SIN_VALOR if valor is None else valor
+
+
+def _desde_opcional(valor: int) -> Optional[int]:
+    return None if valor == _SIN_VALOR else valor
+
+
+def codificar_lote(mensajes: Iterable[Mensaje]) -> bytes:
+    """
+    Serializa un lote de mensajes como una trama completa.
+
+    Args:
+        mensajes: Comandos o respuestas, en el orden en que se entregarán
+
+    Returns:
+        Bytes de la trama, con su largo al principio
+    """
+    partes = [b""]
+    cantidad = 0
+    for mensaje in mensajes:
+        codec, payload = _codificar_payload(mensaje.payload)
+        via = mensaje.via.encode()
+        if isinstance(mensaje, Comando):
+            clase, exito = _COMANDO, True
+        else:
+            clase, exito = _RESPUESTA, mensaje.exito
+        partes.append(_MENSAJE.pack(
+            clase, mensaje.tipo.value, exito, codec,
+            _opcional(mensaje.tick), _opcional(mensaje.secuencia), len(via), len(payload),
+        ))
+        partes.append(via)
+        partes.append(payload)
+        cantidad += 1
+    partes[0] = _LOTE.pack(cantidad)
+    cuerpo = b"".join(partes)
+    return _TRAMA.pack(len(cuerpo)) + cuerpo
+
+
+def decodificar_lote(cuerpo) -> List[Mensaje]:
+    """
+    Reconstruye los mensajes del cuerpo de una trama (sin el largo).
+
+    Args:
+        cuerpo: Bytes del cuerpo
+
+    Returns:
+        Comandos o respuestas, en el orden en que se codificaron
+    """
+    datos = memoryview(cuerpo)
+    (cantidad,) = _LOTE.unpack_from(datos)
+    posicion = _LOTE.size
+    mensajes: List[Mensaje] = []
+    for _ in range(cantidad):
+        clase, tipo, exito, codec, tick, secuencia, largo_via, largo_payload = _MENSAJE.unpack_from(datos, posicion)
+        posicion += _MENSAJE.size
+        via = bytes(datos[posicion:posicion + largo_via]).decode()
+        posicion += largo_via
+        payload = _decodificar_payload(codec, datos[posicion:posicion + largo_payload], via)
+        posicion += largo_payload
+        if clase == _COMANDO:
+            mensajes.append(Comando(
+                tipo=TipoComando(tipo), via=via, payload=payload,
+                tick=_desde_opcional(tick), secuencia=_desde_opcional(secuencia),
+            ))
+        else:
+            mensajes.append(Respuesta(
+                tipo=TipoRespuesta(tipo), via=via, payload=payload, exito=bool(exito),
+                tick=_desde_opcional(tick), secuencia=_desde_opcional(secuencia),
+            ))
+    return mensajes
+
+
+def parsear_direccion(texto: str) -> Tuple[str, int]:
+    """
+    Convierte "host:puerto" en una dirección de socket.
+
+    Raises:
+        ValueError: Si falta el puerto o no es un número
+    """
+    host, separador, puerto = texto.rpartition(":")
+    if not separador or not puerto.isdigit():
+        raise ValueError(f"Dirección inválida: {texto!r}. Use host:puerto")
+    return host or "127.0.0.1", int(puerto)
+
+
+class CanalSocket:
+    """
+    Extremo de una conexión TCP que intercambia lotes de mensajes.
+
+    `enviar` escribe una trama con todo el lote en una sola llamada;
+    `recibir` lee exactamente una trama, sin leer de más, así que `fileno`
+    sirve con multiprocessing.connection.wait para saber si hay otra.
+    """
+
+    def __init__(self, conexion: socket.socket):
+        """
+        Inicializa el canal.
+
+        Args:
+            conexion: Socket TCP ya conectado
+        """
+        conexion.settimeout(None)  # Bloqueante; las esperas con límite usan wait/poll
+        conexion.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.socket = conexion
+
+    @classmethod
+    def conectar(cls, direccion: str, timeout: float = 5.0) -> "CanalSocket":
+        """
+        Se conecta a un nodo, reintentando mientras el nodo termina de arrancar.
+
+        Args:
+            direccion: "host:puerto"
+            timeout: Segundos antes de desistir
+
+        Raises:
+            ConnectionError: Si el nodo no acepta la conexión a tiempo
+        """
+        destino = parsear_direccion(direccion)
+        limite = monotonic() + timeout
+        while True:
+            try:
+                return cls(socket.create_connection(destino, timeout=timeout))
+            except OSError as e:
+                if monotonic() >= limite:
+                    raise ConnectionError(f"No se pudo conectar con el nodo {direccion}: {e}") from e
+                sleep(0.05)
+
+    def autenticar(self, clave: bytes, servidor: bool) -> None:
+        """
+        Autentica a ambos extremos con la clave compartida antes de cualquier trama.
+
+        Como deliver_challenge/answer_challenge de multiprocessing.connection:
+        cada extremo envía un desafío aleatorio y verifica el HMAC-SHA256 con
+        que el otro lo firma; la clave no viaja. El servidor (el nodo) desafía
+        primero, así que no firma nada para quien aún no se autenticó.
+
+        Args:
+            clave: Clave compartida
+            servidor: True en el nodo, False en el coordinador
+
+        Raises:
+            AuthenticationError: Si el otro extremo no conoce la clave, la
+                rechaza o no completa el intercambio a tiempo
+        """
+        self.socket.settimeout(TIMEOUT_AUTENTICACION)
+        try:
+            if servidor:
+                self._desafiar(clave)
+                self._responder_desafio(clave)
+            else:
+                self._responder_desafio(clave)
+                self._desafiar(clave)
+        except (EOFError, socket.timeout) as e:
+            raise AuthenticationError(f"Autenticación incompleta: {e}") from e
+        finally:
+            self.socket.settimeout(None)
+
+    def _desafiar(self, clave: bytes) -> None:
+        """Envía un desafío y verifica la firma del otro extremo."""
+        desafio = os.urandom(_LARGO_DESAFIO)
+        self.socket.sendall(desafio)
+        firma = self._leer(_LARGO_FIRMA)
+        if not hmac.compare_digest(firma, hmac.digest(clave, desafio, "sha256")):
+            self.socket.sendall(_RECHAZADO)
+            raise AuthenticationError("El otro extremo no conoce la clave")
+        self.socket.sendall(_ACEPTADO)
+
+    def _responder_desafio(self, clave: bytes) -> None:
+        """Firma el desafío del otro extremo y lee si la aceptó."""
+        desafio = self._leer(_LARGO_DESAFIO)
+        self.socket.sendall(hmac.digest(clave, desafio, "sha256"))
+        if self._leer(1) != _ACEPTADO:
+            raise AuthenticationError("El otro extremo rechazó la clave")
+
+    def fileno(self) -> int:
+        """Descriptor del socket, para wait/select."""
+        return self.socket.fileno()
+
+    def enviar(self, mensajes: Iterable[Mensaje]) -> None:
+        """Envía un lote de mensajes en una trama."""
+        self.socket.sendall(codificar_lote(mensajes))
+
+    def recibir(self) -> List[Mensaje]:
+        """
+        Recibe una trama completa.
+
+        Returns:
+            Mensajes del lote
+
+        Raises:
+            EOFError: Si el otro extremo cerró la conexión
+        """
+        (largo,) = _TRAMA.unpack(self._leer(_TRAMA.size))
+        if largo > TRAMA_MAXIMA:
+            raise ValueError(f"Trama demasiado grande: {largo} bytes")
+        return decodificar_lote(self._leer(largo))
+
+    def poll(self, timeout: float = 0.0) -> bool:
+        """Retorna True si hay datos por leer antes de `timeout` segundos."""
+        listos, _, _ = select.select([self.socket], [], [], timeout)
+        return bool(listos)
+
+    def cerrar_escritura(self) -> None:
+        """Avisa al otro extremo que no se enviará nada más (recibirá EOF), sin dejar de leer."""
+        self.socket.shutdown(socket.SHUT_WR)
+
+    def close(self) -> None:
+        """Cierra la conexión."""
+        self.socket.close()
+
+    def _leer(self, cantidad: int) -> bytearray:
+        """Lee exactamente `cantidad` bytes."""
+        buffer = bytearray(cantidad)
+        vista = memoryview(buffer)
+        leidos = 0
+        while leidos < cantidad:
+            n = self.socket.recv_into(vista[leidos:])
+            if n == 0:
+                raise EOFError("Conexión cerrada por el otro extremo")
+            leidos += n
+        return buffer
@@ -0,0 +1,210 @@
+"""
+Tablero de estado en memoria compartida.
+Usado por el multiprocessing engine para publicar contadores sin mensajes.
+"""
+import os
+import sys
+from multiprocessing import shared_memory
+from time import monotonic, sleep
+from typing import List, NamedTuple, Optional
+
+from ...core.common.tipos import Color
+
+# Campos de cada slot (un slot por vía), todos int64
+SECUENCIA = 0        # Seqlock: impar mientras el worker escribe
+TICK = 1             # Tick al que corresponden los valores
+COLOR = 2            # Color.value
+TAMANO_COLA = 3
+VEHICULOS_CRUZADOS = 4
+ESPERA_TOTAL = 5     # Suma de esperas de los vehículos que cruzaron, en ticks
+CAMPOS_POR_SLOT = 6
+
+BYTES_POR_CAMPO = 8
+
+# Lecturas seguidas de un slot a medio escribir antes de ceder el procesador
+REINTENTOS_ACTIVOS = 100
+
+# Tiempo máximo que se espera a un slot a medio escribir: su worker pudo
+# morir entre los dos incrementos de la secuencia
+TIMEOUT_LECTURA = 0.1
+
+
+class LecturaTablero(NamedTuple):
+    """Valores publicados por un worker en su slot."""
+    tick: int
+    color: Color
+    tamano_cola: int
+    vehiculos_cruzados: int
+    espera_total: int
+
+
+def tracker_heredado() -> bool:
+    """
+    Indica si este proceso ya tiene un resource tracker en marcha.
+
+    Los procesos lanzados con multiprocessing (fork, spawn o forkserver)
+    heredan el descriptor del tracker de su creador; un programa aparte no
+    tiene ninguno hasta que registra su primer recurso. Hasta Python 3.12 no
+    hay una forma pública de saberlo, así que se lee el atributo privado
+    `_fd` del tracker del módulo, presente sin cambios de 3.8 a 3.12
+    (test_tablero fija este comportamiento). Desde 3.13 no se usa.
+    """
+    from multiprocessing import resource_tracker
+    return resource_tracker._resource_tracker._fd is not None
+
+
+def _conectar_sin_seguimiento(nombre: str) -> shared_memory.SharedMemory:
+    """
+    Se conecta a un bloque existente sin que el resource tracker lo libere.
+
+    Solo el proceso que crea el bloque debe liberarlo. Los procesos lanzados
+    por él comparten su resource tracker, que guarda un conjunto de nombres,
+    así que registrarlo de nuevo no tiene efecto (y quitarlo borraría el
+    registro del creador). Un proceso con su propio tracker, en cambio, lo
+    borraría al terminar: ahí se quita el registro de este único bloque.
+    Desde Python 3.13 basta con `track=False`.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=nombre, track=False)
+    from multiprocessing import resource_tracker
+    compartido = tracker_heredado()
+    bloque = shared_memory.SharedMemory(name=nombre)
+    if os.name == "posix" and not compartido:
+        resource_tracker.unregister(bloque._name, "shared_memory")
+    return bloque
+
+
+class TableroEstado:
+    """
+    Bloque de `multiprocessing.shared_memory` con un slot de tamaño fijo por vía.
+
+    Cada worker escribe solo en su slot; el proceso principal lee todos los
+    slots directamente a través de un memoryview, sin copiar ni deserializar.
+    Las escrituras usan un seqlock: el worker incrementa la secuencia antes y
+    después de escribir, y el lector reintenta si la secuencia es impar o
+    cambió durante la lectura. Si el slot sigue a medio escribir después de
+    un tiempo límite, el lector desiste (el worker murió escribiendo) y deja
+    que el engine lo detecte por su Pipe.
+    """
+
+    def __init__(self, bloque: shared_memory.SharedMemory, num_slots: int, propietario: bool):
+        self._bloque = bloque
+        self.num_slots = num_slots
+        self._propietario = propietario
+        self._valores = bloque.buf.cast("q")
+
+    @classmethod
+    def crear(cls, num_slots: int) -> "TableroEstado":
+        """
+        Crea un tablero nuevo con todos los valores en cero.
+
+        Args:
+            num_slots: Número de slots (uno por vía)
+
+        Returns:
+            Tablero propietario del bloque de memoria
+        """
+        tamano = num_slots * CAMPOS_POR_SLOT * BYTES_POR_CAMPO
+        bloque = shared_memory.SharedMemory(create=True, size=tamano)
+        bloque.buf[:tamano] = bytes(tamano)
+        return cls(bloque, num_slots, propietario=True)
+
+    @classmethod
+    def conectar(cls, nombre: str, num_slots: int) -> "TableroEstado":
+        """
+        Se conecta a un tablero creado por otro proceso.
+
+        Args:
+            nombre: Nombre del bloque de memoria compartida
+            num_slots: Número de slots del tablero
+
+        Returns:
+            Tablero sin propiedad sobre el bloque
+        """
+        return cls(_conectar_sin_seguimiento(nombre), num_slots, propietario=False)
+
+    @property
+    def nombre(self) -> str:
+        """Retorna el nombre del bloque, para pasarlo a otros procesos."""
+        return self._bloque.name
+
+    def escribir(
+        self,
+        slot: int,
+        tick: int,
+        color: Color,
+        tamano_cola: int,
+        vehiculos_cruzados: int,
+        espera_total: int,
+    ) -> None:
+        """
+        Publica los valores de un slot.
+
+        Args:
+            slot: Índice del slot (vía) a escribir
+            tick: Tick al que corresponden los valores
+            color: Color actual del semáforo
+            tamano_cola: Vehículos en cola
+            vehiculos_cruzados: Total de vehículos que han cruzado
+            espera_total: Suma de esperas de los vehículos que cruzaron
+        """
+        base = slot * CAMPOS_POR_SLOT
+        valores = self._valores
+        valores[base + SECUENCIA] += 1
+        valores[base + TICK] = tick
+        valores[base + COLOR] = color.value
+        valores[base + TAMANO_COLA] = tamano_cola
+        valores[base + VEHICULOS_CRUZADOS] = vehiculos_cruzados
+        valores[base + ESPERA_TOTAL] = espera_total
+        valores[base + SECUENCIA] += 1
+
+    def leer(self, slot: int, timeout: float = TIMEOUT_LECTURA) -> Optional[LecturaTablero]:
+        """
+        Lee un slot de forma consistente.
+
+        Reintenta de inmediato unas pocas veces y luego cede el procesador
+        entre intentos, hasta `timeout` segundos.
+
+        Args:
+            slot: Índice del slot a leer
+            timeout: Segundos de espera a un slot a medio escribir
+
+        Returns:
+            Valores publicados, o None si el worker aún no ha escrito o si el
+            slot no quedó consistente a tiempo
+        """
+        base = slot * CAMPOS_POR_SLOT
+        valores = self._valores
+        intentos = 0
+        limite = None
+        while True:
+            secuencia = valores[base + SECUENCIA]
+            if not secuencia % 2:
+                lectura = tuple(valores[base + TICK:base + CAMPOS_POR_SLOT])
+                if valores[base + SECUENCIA] == secuencia:
+                    break
+            intentos += 1
+            if intentos >= REINTENTOS_ACTIVOS:
+                if limite is None:
+                    limite = monotonic() + timeout
+                elif monotonic() >= limite:
+                    return None
+                sleep(0.0001)  # Cede el procesador al worker que escribe
+        if secuencia == 0:
+            return None
+        tick, color, tamano_cola, vehiculos_cruzados, espera_total = lectura
+        return LecturaTablero(tick, Color(color), tamano_cola, vehiculos_cruzados, espera_total)
+
+    def leer_todos(self) -> List[Optional[LecturaTablero]]:
+        """Lee todos los slots."""
+        return [self.leer(slot) for slot in range(self.num_slots)]
+
+    def cerrar(self) -> None:
+        """Libera la vista local; el propietario además elimina el bloque."""
+        self._valores.release()
+        self._bloque.close()
+        if self._propietario:
+            self._bloque.unlink()
+
+    def __repr__(self) -> str:
+        return f"TableroEstado(nombre={self.nombre}, slots={self.num_slots})"
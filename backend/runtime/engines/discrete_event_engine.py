@@ -0,0 +1,262 @@
+"""
+Engine de eventos discretos.
+Avanza de evento en evento con un calendario `heapq`, sin visitar los ticks vacíos.
+"""
+import heapq
+import sys
+from enum import IntEnum
+from typing import Dict, List, Tuple
+
+from .base import BaseEngine
+from ...core.common.tipos import Via, Color
+from ...core.common.state import TrafficState
+from ...core.common.stats import EstadisticasTrafico
+from ...core.common.semillas import FlujosAleatorios
+from ...core.common.reloj import RelojSimulacion
+from ...core.traffic.semaforo import Semaforo
+from ...core.traffic.controlador import ControladorTrafico
+from ...core.traffic.programa import ProgramaSemaforico
+from ...core.traffic.llegadas import GeneradorLlegadas
+from ...core.models.almacen import AlmacenVehiculos
+
+
+class TipoEvento(IntEnum):
+    """
+    Tipos de evento del calendario.
+
+    El valor fija el orden dentro de un mismo tick, igual que en los engines
+    por tick: primero el color, luego las llegadas y al final el despacho.
+    """
+    CAMBIO_FASE = 0
+    LLEGADA = 1
+    SALIDA = 2
+
+
+class DiscreteEventEngine(BaseEngine):
+    """
+    Engine basado en un calendario de eventos.
+
+    - Eventos: cambio de fase, llegada a una vía y salida (despacho de un
+      tick en una vía en verde con cola)
+    - Entre dos eventos no se ejecuta nada: el reloj salta al siguiente
+    - Las llegadas saltan los ticks vacíos del generador de cada vía, y el
+      controlador salta directamente a cada cambio de fase
+    - `step()` cumple el contrato de BaseEngine avanzando un tick;
+      `avanzar_hasta(tick)` observa el estado en un tick arbitrario
+
+    Con la misma semilla produce los mismos resultados que los engines por tick.
+    """
+
+    def __init__(self, config):
+        """
+        Inicializa el engine.
+
+        Args:
+            config: ConfiguracionSimulacion
+        """
+        self.config = config
+        self._running = False
+
+        self.controlador: ControladorTrafico = None
+        self.reloj = RelojSimulacion()
+        self.almacen = AlmacenVehiculos()
+        self.stats = EstadisticasTrafico()
+        self.semaforos: Dict[Via, Semaforo] = {}
+        self.generadores: Dict[Via, GeneradorLlegadas] = {}
+        self.flujos = FlujosAleatorios.desde_config(config)  # Subflujos con nombre, comunes entre engines
+        self.semilla = self.flujos.semilla_maestra
+
+        # Calendario: (tick, tipo, secuencia, vía)
+        self._calendario: List[Tuple[int, int, int, Via]] = []
+        self._secuencia = 0
+        self._salida_pendiente: Dict[Via, bool] = {}
+        self._tick_generador: Dict[Via, int] = {}  # Último tick consumido de cada generador
+        self._llegadas_agendadas: Dict[Via, List[int]] = {}  # IDs de la próxima llegada de cada vía
+        self.eventos_procesados = 0
+
+        self._eventos_tick: List[Dict] = []
+        self._vehiculos_en_transito: Dict[str, List[Dict]] = {}
+
+    def start(self) -> None:
+        """Crea semáforos y generadores y agenda los primeros eventos."""
+        if self._running:
+            return
+
+        self.controlador = ControladorTrafico(
+            programa=ProgramaSemaforico.desde_config(self.config),
+        )
+        for slot, via in enumerate(Via):
+            self.semaforos[via] = Semaforo(
+                via=via, capacidad_por_tick=self.config.capacidad_cruce_por_tick,
+                reloj=self.reloj, almacen=self.almacen,
+            )
+            self.semaforos[via].set_color(self.controlador.plan_en_tick(0)[via])
+            self.generadores[via] = GeneradorLlegadas.para_via(
+                via.name, slot, len(Via), self.config.probabilidad_llegada, self.semilla,
+                distribucion=self.config.distribucion_llegadas,
+                max_por_tick=self.config.max_llegadas_por_tick,
+            )
+            self._salida_pendiente[via] = False
+            self._tick_generador[via] = 0
+            self._agendar_llegada(via)
+
+        self._agendar(self.controlador.proximo_cambio(0), TipoEvento.CAMBIO_FASE, None)
+        self._running = True
+
+    def _agendar(self, tick: int, tipo: TipoEvento, via: Via) -> None:
+        """Agrega un evento al calendario."""
+        self._secuencia += 1
+        heapq.heappush(self._calendario, (tick, tipo, self._secuencia, via))
+
+    def _agendar_llegada(self, via: Via) -> None:
+        """Agenda la próxima llegada de una vía saltando los ticks vacíos."""
+        siguiente = self.generadores[via].saltar_hasta_llegada()
+        if siguiente is None:
+            return
+        saltados, ids = siguiente
+        tick = self._tick_generador[via] + saltados + 1
+        self._tick_generador[via] = tick
+        self._llegadas_agendadas[via] = ids
+        self._agendar(tick, TipoEvento.LLEGADA, via)
+
+    def _agendar_salida(self, via: Via, tick: int) -> None:
+        """Agenda un despacho si la vía está en verde, tiene cola y no hay otro pendiente."""
+        if self._salida_pendiente[via]:
+            return
+        semaforo = self.semaforos[via]
+        if semaforo.color == Color.VERDE and semaforo.tamano_cola:
+            self._salida_pendiente[via] = True
+            self._agendar(tick, TipoEvento.SALIDA, via)
+
+    def avanzar_hasta(self, tick: int) -> TrafficState:
+        """
+        Procesa todos los eventos hasta `tick` inclusive y observa el estado.
+
+        Args:
+            tick: Tick de observación (no anterior al actual)
+
+        Returns:
+            TrafficState en ese tick
+        """
+        if not self._running:
+            raise RuntimeError("Engine no está corriendo.")
+        if tick < self.reloj.ahora:
+            raise ValueError(f"No se puede retroceder del tick {self.reloj.ahora} al {tick}")
+
+        self._eventos_tick = []
+        self._vehiculos_en_transito = {}
+        registrar = not self.config.headless
+
+        calendario = self._calendario
+        while calendario and calendario[0][0] <= tick:
+            tick_evento, tipo, _, via = heapq.heappop(calendario)
+            self.reloj.sincronizar(tick_evento)
+            self.eventos_procesados += 1
+
+            if tipo == TipoEvento.CAMBIO_FASE:
+                plan = self.controlador.saltar_a(tick_evento)
+                for via_plan, color in plan.items():
+                    semaforo = self.semaforos[via_plan]
+                    if registrar and semaforo.color != color:
+                        self._eventos_tick.append({
+                            "tipo": "cambio_semaforo", "via": via_plan.name,
+                            "color_anterior": semaforo.color.name, "color_nuevo": color.name,
+                        })
+                    semaforo.set_color(color)
+                    self._agendar_salida(via_plan, tick_evento)
+                self._agendar(self.controlador.proximo_cambio(tick_evento), TipoEvento.CAMBIO_FASE, None)
+
+            elif tipo == TipoEvento.LLEGADA:
+                semaforo = self.semaforos[via]
+                for vehiculo_id in self._llegadas_agendadas.pop(via):
+                    semaforo.agregar_vehiculo(vehiculo_id)
+                    if registrar:
+                        self._eventos_tick.append({
+                            "tipo": "vehiculo_llego", "via": via.name,
+                            "vehiculo_id": vehiculo_id, "icono": "🚗→"
+                        })
+                self._agendar_salida(via, tick_evento)
+                self._agendar_llegada(via)
+
+            else:  # SALIDA
+                self._salida_pendiente[via] = False
+                cruzados = self.semaforos[via].tick()
+                self.stats.registrar_vehiculos(self.almacen, cruzados, via.name)
+                if registrar:
+                    self._registrar_transito(via, cruzados)
+                self.almacen.liberar(cruzados)
+                # Sigue despachando el próximo tick mientras quede cola y verde
+                if self.controlador.plan_en_tick(tick_evento + 1)[via] == Color.VERDE:
+                    self._agendar_salida(via, tick_evento + 1)
+
+        self.reloj.sincronizar(tick)
+        self.controlador.saltar_a(tick)
+        return self._construir_estado()
+
+    def _registrar_transito(self, via: Via, cruzados: List[int]) -> None:
+        """Registra los vehículos despachados para la animación."""
+        for idx, indice in enumerate(cruzados):
+            vehiculo_id = self.almacen.ids[indice]
+            self._vehiculos_en_transito.setdefault(via.name, []).append({
+                "id": vehiculo_id, "progreso": (idx + 1) / len(cruzados)
+            })
+            self._eventos_tick.append({
+                "tipo": "vehiculo_despachado", "via": via.name,
+                "vehiculo_id": vehiculo_id, "icono": "🚗✓"
+            })
+
+    def step(self) -> TrafficState:
+        """
+        Avanza un tick.
+
+        Returns:
+            TrafficState en el nuevo tick
+        """
+        return self.avanzar_hasta(self.reloj.ahora + 1)
+
+    def _construir_estado(self) -> TrafficState:
+        """Construye el estado actual del sistema."""
+        return TrafficState(
+            tick=self.controlador.tick_actual,
+            ciclo=self.controlador.ciclo_actual,
+            fase=self.controlador.fase_actual,
+            luces={v.name: s.color.name for v, s in self.semaforos.items()},
+            colas={v.name: s.tamano_cola for v, s in self.semaforos.items()},
+            estadisticas=self.stats.get_resumen(),
+            info_sistema={
+                "motor": "Eventos discretos (heapq)",
+                "python_version": f"{sys.version_info.major}.{sys.version_info.minor}",
+                "eventos_procesados": self.eventos_procesados,
+                "eventos_agendados": len(self._calendario),
+            },
+            vehiculos_detalle={
+                v.name: [] if self.config.headless else s.get_vehiculos_detalle()
+                for v, s in self.semaforos.items()
+            },
+            vehiculos_en_transito=self._vehiculos_en_transito,
+            eventos_tick={"eventos": self._eventos_tick},
+            timing_fase=self.controlador.get_timing_fase(),
+            configuracion={
+                "duracion_verde": self.config.duracion_verde,
+                "duracion_amarillo": self.config.duracion_amarillo,
+                "capacidad_cruce": self.config.capacidad_cruce_por_tick,
+                "probabilidad_llegada": self.config.probabilidad_llegada,
+                "intervalo_tick": self.config.intervalo_tick,
+            },
+        )
+
+    def get_state(self) -> TrafficState:
+        """Obtiene el estado actual sin avanzar."""
+        return self._construir_estado()
+
+    def stop(self) -> None:
+        """Detiene el engine y descarta los eventos pendientes."""
+        self._calendario.clear()
+        self._running = False
+
+    def is_running(self) -> bool:
+        """Verifica si está corriendo."""
+        return self._running
+
+    def __repr__(self) -> str:
+        return f"DiscreteEventEngine(running={self._running}, agendados={len(self._calendario)})"
@@ -2,37 +2,189 @@
 Engine basado en procesos (multiprocessing).
 Ejecuta semáforos como procesos separados con comunicación explícita.
 """
+import copy
 import multiprocessing as mp
-import random
-from typing import Dict, List
-from queue import Empty
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from time import monotonic
+from typing import Callable, Deque, Dict, Hashable, List, Optional, Tuple
 
 from .base import BaseEngine
 from ..comms.messages import *
+from ..comms.nodos import CoordinadorNodos, lanzar_worker
+from ..comms.tablero import TableroEstado
 from ...core.common.tipos import Via, Color
 from ...core.common.state import TrafficState
 from ...core.common.stats import EstadisticasTrafico
+from ...core.common.semillas import FlujosAleatorios
+from ...core.common.reloj import RelojSimulacion
 from ...core.traffic.semaforo import Semaforo
 from ...core.traffic.controlador import ControladorTrafico
-from ...core.models.vehiculo import Vehiculo
+from ...core.traffic.programa import ProgramaSemaforico
+from ...core.traffic.llegadas import GeneradorLlegadas
 
 
-def worker_semaforo(via: Via, queue_comandos: mp.Queue, queue_respuestas: mp.Queue, capacidad: int):
+# Tiempo máximo que se espera a un worker vivo antes de declarar la respuesta perdida
+TIMEOUT_RESPUESTA = 5.0
+
+
+class _CrucesDiferidos:
+    """
+    Esperas de los vehículos despachados por un worker, agrupadas por tick.
+
+    Con pipeline el worker simula ticks que el proceso principal aún no
+    consumió. Sus cruces esperan aquí y pasan a las estadísticas parciales
+    cuando el principal alcanza ese tick, de modo que las estadísticas que
+    se envían nunca incluyen ticks posteriores al que se pidió.
+    """
+
+    def __init__(self, stats: EstadisticasTrafico, via: str):
+        self.stats = stats
+        self.via = via
+        self._pendientes: Deque[Tuple[int, List[int]]] = deque()
+        self.espera_total = 0  # Incluye los cruces pendientes, para el tablero
+
+    def agregar(self, tick: int, esperas: List[int]) -> None:
+        """Guarda las esperas de los vehículos que cruzaron en un tick."""
+        if esperas:
+            self._pendientes.append((tick, esperas))
+            self.espera_total += sum(esperas)
+
+    def consolidar(self, hasta: int) -> None:
+        """Pasa a las estadísticas los cruces de los ticks hasta `hasta`."""
+        pendientes = self._pendientes
+        while pendientes and pendientes[0][0] <= hasta:
+            self.stats.registrar_tiempos(pendientes.popleft()[1], self.via)
+
+    def hasta(self, tick: int) -> EstadisticasTrafico:
+        """Retorna las estadísticas hasta un tick, sin consolidar los cruces que quedan pendientes."""
+        pendientes = self._pendientes
+        if not pendientes or pendientes[0][0] > tick:
+            return self.stats
+        copia = copy.deepcopy(self.stats)
+        for tick_cruce, esperas in pendientes:
+            if tick_cruce > tick:
+                break
+            copia.registrar_tiempos(esperas, self.via)
+        return copia
+
+
+def _despachar(semaforo: Semaforo, cruces: _CrucesDiferidos) -> VehiculosDespachadosMsg:
+    """Ejecuta el tick del semáforo y guarda las esperas de los que cruzaron."""
+    vehiculos_cruzados = semaforo.tick()
+    almacen = semaforo.almacen
+    cruces.agregar(semaforo.reloj.ahora, [almacen.tiempo_espera(i) for i in vehiculos_cruzados])
+    
+    # NUEVO: Serializar detalle para animación
+    detalle = [{"id": almacen.ids[i]} for i in vehiculos_cruzados]
+    almacen.liberar(vehiculos_cruzados)
+    
+    return VehiculosDespachadosMsg(
+        via=semaforo.via.name,
+        cantidad=len(vehiculos_cruzados),
+        vehiculos_detalle=detalle
+    )
+
+
+def _estado(
+    semaforo: Semaforo,
+    stats: EstadisticasTrafico,
+    incluir_detalle: bool = True,
+    incluir_estadisticas: bool = False,
+) -> EstadoSemaforoMsg:
+    """Construye el mensaje de estado del semáforo con las estadísticas dadas (si se piden)."""
+    return EstadoSemaforoMsg(
+        via=semaforo.via.name,
+        color=semaforo.color.name,
+        tamano_cola=semaforo.tamano_cola,
+        vehiculos_cruzados=semaforo.vehiculos_cruzados_total,
+        # Usar el método oficial del dominio para el detalle de cola
+        vehiculos_cola=semaforo.get_vehiculos_detalle() if incluir_detalle else [],
+        # Las estadísticas parciales solo viajan cuando se piden
+        estadisticas=stats if incluir_estadisticas else None,
+    )
+
+
+def _publicar(
+    tablero: TableroEstado,
+    slot: int,
+    reloj: RelojSimulacion,
+    semaforo: Semaforo,
+    cruces: _CrucesDiferidos,
+) -> None:
+    """Escribe los contadores del semáforo en su slot del tablero."""
+    tablero.escribir(
+        slot,
+        tick=reloj.ahora,
+        color=semaforo.color,
+        tamano_cola=semaforo.tamano_cola,
+        vehiculos_cruzados=semaforo.vehiculos_cruzados_total,
+        espera_total=cruces.espera_total,
+    )
+
+
+def worker_semaforo(
+    via: Via,
+    conexion: Connection,
+    capacidad: int,
+    nombre_tablero: str = None,
+    slot: int = 0,
+    programa: ProgramaSemaforico = None,
+    generador: GeneradorLlegadas = None,
+    lookahead: int = 1,
+):
     """
     Función worker que ejecuta en un proceso separado.
     
     Args:
         via: Vía del semáforo
-        queue_comandos: Cola de entrada de comandos
-        queue_respuestas: Cola de salida de respuestas
+        conexion: Extremo del Pipe dúplex exclusivo de este worker
         capacidad: Capacidad de cruce por tick
+        nombre_tablero: Bloque de memoria compartida donde publicar contadores
+        slot: Slot del tablero que corresponde a esta vía
+        programa: Programa de fases compilado, para derivar el color de cada
+            tick (None = programa clásico por defecto)
+        generador: Generador de llegadas propio de la vía (None = sin llegadas)
+        lookahead: PASO que el proceso principal envía por delante del tick
+            que consume; acota qué ticks ya consumió
     """
-    semaforo = Semaforo(via=via, capacidad_por_tick=capacidad)
+    reloj = RelojSimulacion()
+    semaforo = Semaforo(via=via, capacidad_por_tick=capacidad, reloj=reloj)
+    # Agregado parcial, se combina en el proceso principal
+    cruces = _CrucesDiferidos(EstadisticasTrafico(), via.name)
+    tablero = TableroEstado.conectar(nombre_tablero, len(Via)) if nombre_tablero else None
+    controlador = ControladorTrafico(programa=programa)
     
+    try:
+        _bucle_worker(via, conexion, reloj, semaforo, cruces, tablero, slot, controlador, generador, lookahead)
+    finally:
+        if tablero is not None:
+            tablero.cerrar()
+        conexion.close()
+
+
+def _bucle_worker(via, conexion, reloj, semaforo, cruces, tablero, slot, controlador, generador, lookahead):
+    """Atiende comandos hasta recibir DETENER o hasta que se cierre el Pipe."""
     while True:
         try:
             # Esperar comando
-            comando: Comando = queue_comandos.get(timeout=1)
+            comando: Comando = conexion.recv()
+        except (EOFError, OSError):
+            # El proceso principal cerró su extremo
+            break
+        
+        def responder(tipo: TipoRespuesta, payload=None, exito: bool = True) -> None:
+            # Cada respuesta devuelve el tick y la secuencia del comando que la originó
+            conexion.send(Respuesta(
+                tipo=tipo, via=via.name, payload=payload, exito=exito,
+                tick=comando.tick, secuencia=comando.secuencia,
+            ))
+        
+        try:
+            # El reloj del worker sigue al del proceso principal; con pipeline
+            # puede ir adelantado, y nunca retrocede
+            if comando.tick is not None and comando.tick > reloj.ahora:
+                reloj.sincronizar(comando.tick)
             
             if comando.tipo == TipoComando.DETENER:
                 # Finalizar proceso
@@ -40,73 +192,159 @@ def worker_semaforo(via: Via, queue_comandos: mp.Queue, queue_respuestas: mp.Que
             
             elif comando.tipo == TipoComando.CAMBIAR_COLOR:
                 # Cambiar color del semáforo
-                color = comando.payload
-                semaforo.set_color(color)
-                queue_respuestas.put(Respuesta(
-                    tipo=TipoRespuesta.ACK,
-                    via=via.name,
-                ))
+                semaforo.set_color(comando.payload)
+                responder(TipoRespuesta.ACK)
             
             elif comando.tipo == TipoComando.AGREGAR_VEHICULO:
                 # Agregar vehículo
-                vehiculo_id = comando.payload
-                vehiculo = Vehiculo(id=vehiculo_id)
-                semaforo.agregar_vehiculo(vehiculo)
-                queue_respuestas.put(Respuesta(
-                    tipo=TipoRespuesta.ACK,
-                    via=via.name,
-                ))
+                semaforo.agregar_vehiculo(comando.payload)
+                responder(TipoRespuesta.ACK)
             
             elif comando.tipo == TipoComando.TICK:
-                # Ejecutar tick
-                vehiculos_cruzados = semaforo.tick()
-                tiempos = [v.tiempo_espera_total for v in vehiculos_cruzados]
-                
-                # NUEVO: Serializar detalle para animación
-                detalle = [
-                    {"id": v.id, "tiempo_espera": v.tiempo_espera_total}
-                    for v in vehiculos_cruzados
-                ]
-                
-                msg = VehiculosDespachadosMsg(
-                    via=via.name,
-                    cantidad=len(vehiculos_cruzados),
-                    tiempos_espera=tiempos,
-                    vehiculos_detalle=detalle
-                )
-                queue_respuestas.put(Respuesta(
-                    tipo=TipoRespuesta.VEHICULOS_DESPACHADOS,
-                    via=via.name,
-                    payload=msg,
-                ))
+                # Ejecutar tick (sin pipeline: el principal ya está en este tick)
+                despachados = _despachar(semaforo, cruces)
+                cruces.consolidar(reloj.ahora)
+                responder(TipoRespuesta.VEHICULOS_DESPACHADOS, despachados)
             
             elif comando.tipo == TipoComando.OBTENER_ESTADO:
-                # Usar el método oficial del dominio para el detalle de cola
-                vehiculos_cola = semaforo.get_vehiculos_detalle()
+                # Enviar estado; las estadísticas llegan hasta el tick del principal
+                if comando.tick is not None:
+                    cruces.consolidar(comando.tick)
+                responder(
+                    TipoRespuesta.ESTADO_SEMAFORO,
+                    _estado(semaforo, cruces.stats, incluir_estadisticas=bool(comando.payload)),
+                )
+            
+            elif comando.tipo == TipoComando.PASO:
+                # Tick completo: color, llegadas, despacho y estado en un solo ida y vuelta
+                paso: PasoMsg = comando.payload
+                # El principal envía este PASO al consumir el tick `tick - lookahead + 1`
+                cruces.consolidar(reloj.ahora - lookahead + 1)
+                if paso.color is not None:
+                    semaforo.set_color(paso.color)
+                else:
+                    semaforo.set_color(controlador.plan_en_tick(reloj.ahora)[via])
+                llegadas = list(paso.llegadas)
+                if generador is not None:
+                    llegadas.extend(generador.generar())
+                for vehiculo_id in llegadas:
+                    semaforo.agregar_vehiculo(vehiculo_id)
+                despachados = _despachar(semaforo, cruces)
+                if not paso.incluir_detalle:
+                    despachados.vehiculos_detalle = []
                 
-                # Enviar estado
-                estado = EstadoSemaforoMsg(
-                    via=via.name,
-                    color=semaforo.color.name,
-                    tamano_cola=semaforo.tamano_cola,
-                    vehiculos_cruzados=semaforo.vehiculos_cruzados_total,
-                    vehiculos_cola=vehiculos_cola
+                # Color, cola y contadores ya van en el tablero; el estado
+                # completo solo viaja si se pidió detalle o estadísticas
+                estado = None
+                if paso.incluir_detalle or paso.incluir_estadisticas:
+                    estado = _estado(
+                        semaforo, cruces.hasta(reloj.ahora),
+                        incluir_detalle=paso.incluir_detalle,
+                        incluir_estadisticas=paso.incluir_estadisticas,
+                    )
+                if tablero is not None:
+                    _publicar(tablero, slot, reloj, semaforo, cruces)
+                responder(
+                    TipoRespuesta.RESULTADO_PASO,
+                    ResultadoPasoMsg(
+                        despachados=despachados, estado=estado,
+                        tamano_cola=semaforo.tamano_cola, llegadas=llegadas,
+                        vehiculos_cruzados=semaforo.vehiculos_cruzados_total,
+                        espera_total=cruces.espera_total,
+                    ),
                 )
-                queue_respuestas.put(Respuesta(
-                    tipo=TipoRespuesta.ESTADO_SEMAFORO,
-                    via=via.name,
-                    payload=estado,
-                ))
-        
-        except Empty:
-            continue
+                continue
+            
+            if tablero is not None:
+                _publicar(tablero, slot, reloj, semaforo, cruces)
+        
         except Exception as e:
-            queue_respuestas.put(Respuesta(
-                tipo=TipoRespuesta.ERROR,
-                via=via.name,
-                payload=str(e),
-                exito=False,
-            ))
+            responder(TipoRespuesta.ERROR, str(e), exito=False)
+
+
+def esperar_respuestas(
+    pendientes: Dict[Hashable, int],
+    conexiones: Dict[Hashable, Connection],
+    procesos: Dict[Hashable, mp.Process],
+    tipo_esperado: TipoRespuesta,
+    minimo: Optional[int] = None,
+) -> List[Respuesta]:
+    """
+    Espera una respuesta por cada petición pendiente.
+    
+    Las respuestas se recogen en el orden en que llegan. Un worker que
+    termina sin responder, una respuesta de error o fuera de secuencia se
+    reportan de inmediato con una excepción en lugar de descartarse.
+    
+    Args:
+        pendientes: Secuencia esperada para cada worker (vía, región, ...)
+        conexiones: Pipe de cada worker
+        procesos: Proceso de cada worker, para detectar si terminó
+        tipo_esperado: Tipo de respuesta esperado
+        minimo: Retorna en cuanto haya al menos este número de respuestas
+            (None = esperar todas)
+        
+    Returns:
+        Respuestas recibidas, una por worker que respondió
+    """
+    por_conexion = {conexiones[clave]: clave for clave in pendientes}
+    por_centinela = {procesos[clave].sentinel: clave for clave in pendientes}
+    respuestas = []
+    limite = monotonic() + TIMEOUT_RESPUESTA
+    
+    while por_conexion and (minimo is None or len(respuestas) < minimo):
+        listos = wait(
+            list(por_conexion) + [c for c, k in por_centinela.items() if k in por_conexion.values()],
+            timeout=max(0.0, limite - monotonic()),
+        )
+        if not listos:
+            faltan = ", ".join(_nombre(clave) for clave in por_conexion.values())
+            raise TimeoutError(f"Sin respuesta de los workers: {faltan}")
+        
+        for listo in listos:
+            if listo in por_conexion:
+                clave = por_conexion.pop(listo)
+                resp: Respuesta = listo.recv()
+                validar_respuesta(resp, _nombre(clave), pendientes[clave], tipo_esperado)
+                respuestas.append(resp)
+        
+        for listo in listos:
+            clave = por_centinela.get(listo)
+            if clave in por_conexion.values() and not conexiones[clave].poll():
+                raise RuntimeError(f"El worker {_nombre(clave)} terminó sin responder")
+    
+    return respuestas
+
+
+def iniciar_workers(
+    funcion: Callable,
+    workers: Dict[Hashable, tuple],
+    coordinador: Optional[CoordinadorNodos] = None,
+) -> Tuple[Dict[Hashable, Connection], Dict[Hashable, mp.Process]]:
+    """
+    Crea un worker por clave, en un proceso local o en los nodos del coordinador.
+    
+    Args:
+        funcion: Función worker; recibe la conexión como segundo argumento
+        workers: Argumentos de cada worker, sin la conexión
+        coordinador: Coordinador de nodos remotos (None = procesos locales con Pipes)
+        
+    Returns:
+        Tupla (conexiones, procesos). Con coordinador las conexiones son
+        ExtremoRemoto y no hay procesos locales
+    """
+    if coordinador is not None:
+        # Los nodos solo crean workers conocidos, que se piden por nombre
+        return coordinador.iniciar({clave: (funcion.__name__, args) for clave, args in workers.items()}), {}
+    conexiones, procesos = {}, {}
+    for clave, args in workers.items():
+        conexiones[clave], procesos[clave] = lanzar_worker(funcion, args)
+    return conexiones, procesos
+
+
+def _nombre(clave) -> str:
+    """Nombre legible de un worker: la vía o el índice de región."""
+    return getattr(clave, "name", str(clave))
 
 
 class MultiprocessingEngine(BaseEngine):
@@ -114,8 +352,20 @@ class MultiprocessingEngine(BaseEngine):
     Engine basado en multiprocessing.
     
     - Cada semáforo se ejecuta en un proceso separado
-    - Usa Queue para comunicación
-    - No hay memoria compartida directa
+    - Cada worker tiene su propio Pipe dúplex; las peticiones llevan tick y
+      secuencia y se multiplexan con multiprocessing.connection.wait
+    - Color, cola y contadores se publican en un TableroEstado en memoria
+      compartida, que el proceso principal lee sin mensajes
+    - Cada worker agrega sus propias estadísticas; el proceso principal
+      combina los parciales bajo demanda
+    - Cada worker genera sus llegadas con su propio flujo aleatorio (derivado
+      de la semilla maestra) e IDs de bloques disjuntos
+    - Cada worker deriva su color del tick con su propio programa de fases,
+      y con `config.lookahead` > 1 recibe los PASO de hasta K ticks antes de
+      que el proceso principal los consuma (pipeline)
+    - Con `config.nodos`, los workers corren en otros hosts y los comandos
+      viajan por sockets, en un lote por nodo y por tick (CoordinadorNodos);
+      sin memoria compartida, luces y colas salen de las respuestas
     """
 
     def __init__(self, config):
@@ -130,18 +380,37 @@ class MultiprocessingEngine(BaseEngine):
         
         # Componentes del dominio (proceso principal)
         self.controlador: ControladorTrafico = None
+        self.reloj = RelojSimulacion()
         self.stats = EstadisticasTrafico()
         
         # Comunicación multiproceso
-        self.queues_comandos: Dict[Via, mp.Queue] = {}
-        self.queue_respuestas: mp.Queue = None
+        self.conexiones: Dict[Via, Connection] = {}
         self.procesos: Dict[Via, mp.Process] = {}
+        self.coordinador: Optional[CoordinadorNodos] = None
+        self._secuencia = 0
+        
+        # Pipeline: PASO enviados y aún no consumidos, en orden de tick
+        self.lookahead = max(1, config.lookahead)
+        self._en_vuelo: Deque[Tuple[int, Dict[Via, int]]] = deque()
+        self._recibidos: Dict[int, List[Respuesta]] = {}
+        self._ultimo_tick_enviado = 0
+        # En headless el fin de la corrida se conoce de antemano: no se
+        # adelantan ticks que nunca se consumirían
+        self._horizonte: Optional[int] = (
+            config.ciclos_minimos * config.duracion_ciclo if config.headless else None
+        )
         
         # Estado de semáforos (cache en proceso principal)
         self.estados_semaforos: Dict[Via, EstadoSemaforoMsg] = {}
+        self.tablero: TableroEstado = None
+        self._slots: Dict[Via, int] = {via: slot for slot, via in enumerate(Via)}
+        self._tick_estadisticas = -1  # Tick de la última combinación de estadísticas
+        # Cruces y espera acumulados por vía al tick actual, de los ResultadoPasoMsg
+        self._contadores: Dict[Via, Tuple[int, int]] = {}
         
-        # Contador de vehículos
-        self._next_vehicle_id = 0
+        # Semilla maestra: de ella salen los flujos de llegadas de cada worker
+        self.flujos = FlujosAleatorios.desde_config(config)
+        self.semilla = self.flujos.semilla_maestra
         
         # Sistema de eventos y tránsito
         self._eventos_tick: List[Dict] = []
@@ -154,27 +423,38 @@ class MultiprocessingEngine(BaseEngine):
         
         # Crear controlador (en proceso principal)
         self.controlador = ControladorTrafico(
-            duracion_verde=self.config.duracion_verde,
-            duracion_amarillo=self.config.duracion_amarillo,
+            programa=ProgramaSemaforico.desde_config(self.config),
         )
         
-        # Crear colas
-        self.queue_respuestas = mp.Queue()
+        # Tablero compartido, salvo con nodos remotos (no ven la memoria compartida)
+        if self.config.nodos:
+            self.coordinador = CoordinadorNodos(self.config.nodos)
+        else:
+            self.tablero = TableroEstado.crear(len(Via))
         
-        # Crear proceso para cada semáforo
+        # Crear proceso (y Pipe) para cada semáforo
+        self.conexiones, self.procesos = iniciar_workers(
+            worker_semaforo,
+            {
+                via: (
+                    via, self.config.capacidad_cruce_por_tick,
+                    self.tablero.nombre if self.tablero is not None else None, self._slots[via],
+                    self.controlador.programa,
+                    GeneradorLlegadas.para_via(
+                        via.name, self._slots[via], len(Via),
+                        self.config.probabilidad_llegada, self.semilla,
+                        distribucion=self.config.distribucion_llegadas,
+                        max_por_tick=self.config.max_llegadas_por_tick,
+                    ),
+                    self.lookahead,
+                )
+                for via in Via
+            },
+            self.coordinador,
+        )
+        
+        # Inicializar estado en cache
         for via in Via:
-            queue_cmd = mp.Queue()
-            self.queues_comandos[via] = queue_cmd
-            
-            proceso = mp.Process(
-                target=worker_semaforo,
-                args=(via, queue_cmd, self.queue_respuestas, self.config.capacidad_cruce_por_tick),
-                daemon=True,
-            )
-            proceso.start()
-            self.procesos[via] = proceso
-            
-            # Inicializar estado en cache
             self.estados_semaforos[via] = EstadoSemaforoMsg(
                 via=via.name,
                 color="ROJO",
@@ -185,7 +465,14 @@ class MultiprocessingEngine(BaseEngine):
         self._running = True
 
     def step(self) -> TrafficState:
-        """Tick de simulación con captura de eventos y tránsito."""
+        """
+        Tick de simulación con captura de eventos y tránsito.
+        
+        Cada worker recibe un único comando PASO y devuelve un único
+        ResultadoPasoMsg (llegadas + despacho + estado). Con lookahead K, los PASO
+        de los próximos K - 1 ticks ya están en el Pipe del worker, que los
+        procesa mientras el proceso principal consume los resultados.
+        """
         if not self._running:
             raise RuntimeError("Engine no está corriendo.")
         
@@ -193,19 +480,17 @@ class MultiprocessingEngine(BaseEngine):
         self._eventos_tick = []
         self._vehiculos_en_transito = {}
         
-        # Guardar colores anteriores
-        colores_anteriores = {via: self.estados_semaforos[via].color for via in Via}
+        # Guardar colores anteriores (del cache: el tablero puede ir adelantado)
+        colores_anteriores = {via.name: estado.color for via, estado in self.estados_semaforos.items()}
         
-        # 1. Controlador decide el plan de luces
+        # 1. Controlador decide el plan de luces (los workers lo derivan por su cuenta)
         plan = self.controlador.avanzar_tick()
+        tick = self.reloj.avanzar()
         
-        # 2. Enviar comandos de cambio de color y detectar eventos
+        # 2. Detectar cambios de color
         for via, color in plan.items():
-            color_anterior = colores_anteriores[via]
-            self.queues_comandos[via].put(Comando(
-                tipo=TipoComando.CAMBIAR_COLOR, via=via.name, payload=color
-            ))
-            
+            self.estados_semaforos[via].color = color.name
+            color_anterior = colores_anteriores[via.name]
             if color_anterior != color.name:
                 self._eventos_tick.append({
                     "tipo": "cambio_semaforo", "via": via.name,
@@ -213,23 +498,29 @@ class MultiprocessingEngine(BaseEngine):
                     "icono": self._get_icono_color(color.name)
                 })
         
-        self._esperar_respuestas(len(Via), TipoRespuesta.ACK)
-        
-        # 3. Simular llegada de vehículos
-        self._simular_llegada_vehiculos()
-        
-        # 4. Enviar comando TICK
-        for via in Via:
-            self.queues_comandos[via].put(Comando(tipo=TipoComando.TICK, via=via.name))
+        # 3. Enviar los PASO hasta K - 1 ticks por delante
+        limite = self._fin_pipeline(tick)
+        while self._ultimo_tick_enviado < limite:
+            self._enviar_paso(self._ultimo_tick_enviado + 1)
         
-        # 5. Recopilar respuestas y generar tránsito
-        respuestas = self._esperar_respuestas(len(Via), TipoRespuesta.VEHICULOS_DESPACHADOS)
-        for resp in respuestas:
+        # 4. Recopilar resultados de este tick y generar tránsito
+        interactivo = not self.config.headless
+        for resp in self._recoger_paso(tick):
             if resp.payload:
-                msg: VehiculosDespachadosMsg = resp.payload
-                # Registrar en stats
-                vehiculos_sim = [Vehiculo(id=v['id']) for v in msg.vehiculos_detalle]
-                self.stats.registrar_vehiculos(vehiculos_sim, msg.via)
+                resultado: ResultadoPasoMsg = resp.payload
+                msg = resultado.despachados
+                via = Via[resp.via]
+                if resultado.estado is not None:
+                    self.estados_semaforos[via] = resultado.estado
+                self.estados_semaforos[via].tamano_cola = resultado.tamano_cola
+                self._contadores[via] = (resultado.vehiculos_cruzados, resultado.espera_total)
+                
+                # Llegadas generadas por el worker
+                for v_id in resultado.llegadas:
+                    self._eventos_tick.append({
+                        "tipo": "vehiculo_llego", "via": resp.via,
+                        "vehiculo_id": v_id, "icono": "🚗→"
+                    })
                 
                 # Tránsito para animación
                 if msg.vehiculos_detalle:
@@ -244,67 +535,193 @@ class MultiprocessingEngine(BaseEngine):
                             "vehiculo_id": v_info['id'], "icono": "🚗✓"
                         })
         
-        # 6. Obtener estado de semáforos
-        self._actualizar_estados_semaforos()
+        if self._pide_estadisticas(tick):
+            self._fusionar_estadisticas()
         
         return self._construir_estado()
 
     def _get_icono_color(self, color: str) -> str:
         return {"VERDE": "🟢", "AMARILLO": "🟡", "ROJO": "🔴"}.get(color, "⚪")
 
-    def _simular_llegada_vehiculos(self) -> None:
-        """Simula llegada aleatoria de vehículos."""
-        for via in Via:
-            if random.random() < self.config.probabilidad_llegada:
-                v_id = self._next_vehicle_id
-                self.queues_comandos[via].put(Comando(
-                    tipo=TipoComando.AGREGAR_VEHICULO,
-                    via=via.name,
-                    payload=v_id,
-                ))
-                self._next_vehicle_id += 1
-                self._eventos_tick.append({
-                    "tipo": "vehiculo_llego", "via": via.name,
-                    "vehiculo_id": v_id, "icono": "🚗→"
-                })
+    def _fin_pipeline(self, tick: int) -> int:
+        """
+        Calcula el último tick cuyo PASO puede estar en vuelo al consumir `tick`.
+        
+        Son K - 1 ticks por delante, sin pasar del horizonte de una corrida
+        headless y, si la corrida puede terminar por convergencia, sin cruzar
+        el cierre de un ciclo (como las ventanas del engine particionado).
+        """
+        limite = tick + self.lookahead - 1
+        if self.config.tolerancia_relativa is not None:
+            ciclo = self.controlador.duracion_ciclo
+            limite = min(limite, ((tick - 1) // ciclo + 1) * ciclo)
+        if self._horizonte is not None:
+            limite = max(tick, min(limite, self._horizonte))
+        return limite
 
-    def _esperar_respuestas(self, cantidad: int, tipo_esperado: TipoRespuesta) -> List[Respuesta]:
-        """Espera N respuestas de un tipo específico."""
-        respuestas = []
-        while len(respuestas) < cantidad:
-            try:
-                resp: Respuesta = self.queue_respuestas.get(timeout=2)
-                if resp.tipo == tipo_esperado:
-                    respuestas.append(resp)
-            except:
-                break
-        return respuestas
+    def _pide_estadisticas(self, tick: int) -> bool:
+        """
+        Indica si el PASO de un tick trae las estadísticas parciales de los workers.
+        
+        Se piden solo al cierre de cada ciclo, en modo interactivo o si la
+        corrida headless vigila la convergencia (el monitor observa ahí); si
+        no, se piden al final con get_state. Entre cierres, los totales salen
+        de los contadores que trae cada ResultadoPasoMsg.
+        """
+        if self.config.headless and self.config.tolerancia_relativa is None:
+            return False
+        return tick % self.controlador.duracion_ciclo == 0
 
-    def _actualizar_estados_semaforos(self) -> None:
-        """Solicita y actualiza el estado de todos los semáforos."""
-        for via in Via:
-            self.queues_comandos[via].put(Comando(
-                tipo=TipoComando.OBTENER_ESTADO,
-                via=via.name,
+    def _enviar_paso(self, tick: int) -> None:
+        """
+        Envía a cada worker el comando PASO de un tick sin esperar respuesta.
+        
+        Args:
+            tick: Tick a simular; debe ser el siguiente al último enviado
+        """
+        # En headless no se pide el detalle de colas
+        interactivo = not self.config.headless
+        pendientes = {
+            via: self._enviar(
+                via,
+                TipoComando.PASO,
+                PasoMsg(
+                    incluir_detalle=interactivo,
+                    incluir_estadisticas=self._pide_estadisticas(tick),
+                ),
+                tick=tick,
+            )
+            for via in Via
+        }
+        self._en_vuelo.append((tick, pendientes))
+        self._ultimo_tick_enviado = tick
+
+    def _recoger_paso(self, tick: int) -> List[Respuesta]:
+        """
+        Obtiene los resultados PASO de un tick.
+        
+        Cada Pipe entrega las respuestas en orden, así que basta con esperar
+        el PASO más antiguo en vuelo.
+        
+        Args:
+            tick: Tick cuyos resultados se necesitan
+            
+        Returns:
+            Una respuesta RESULTADO_PASO por vía
+        """
+        if tick in self._recibidos:
+            return self._recibidos.pop(tick)
+        while self._en_vuelo:
+            tick_enviado, pendientes = self._en_vuelo.popleft()
+            respuestas = self._esperar_respuestas(pendientes, TipoRespuesta.RESULTADO_PASO)
+            if tick_enviado == tick:
+                return respuestas
+            self._recibidos[tick_enviado] = respuestas
+        raise RuntimeError(f"No hay un PASO en vuelo para el tick {tick}")
+
+    def _drenar_pipeline(self) -> None:
+        """Recibe todos los PASO en vuelo, para poder enviar otros comandos."""
+        while self._en_vuelo:
+            tick_enviado, pendientes = self._en_vuelo.popleft()
+            self._recibidos[tick_enviado] = self._esperar_respuestas(
+                pendientes, TipoRespuesta.RESULTADO_PASO
+            )
+
+    def _enviar(self, via: Via, tipo: TipoComando, payload=None, tick: int = None) -> int:
+        """
+        Envía un comando al worker de una vía.
+        
+        Returns:
+            Secuencia asignada, que la respuesta debe devolver
+        """
+        self._secuencia += 1
+        try:
+            self.conexiones[via].send(Comando(
+                tipo=tipo, via=via.name, payload=payload, tick=tick, secuencia=self._secuencia,
             ))
+        except (BrokenPipeError, OSError) as e:
+            raise RuntimeError(f"El worker {via.name} no está disponible") from e
+        return self._secuencia
+
+    def _esperar_respuestas(self, pendientes: Dict[Via, int], tipo_esperado: TipoRespuesta) -> List[Respuesta]:
+        """
+        Espera una respuesta por cada petición pendiente (ver esperar_respuestas).
+        
+        Args:
+            pendientes: Secuencia esperada para cada vía
+            tipo_esperado: Tipo de respuesta esperado
+            
+        Returns:
+            Respuestas recibidas, una por vía
+        """
+        if self.coordinador is not None:
+            return self.coordinador.esperar_respuestas(pendientes, tipo_esperado)
+        return esperar_respuestas(pendientes, self.conexiones, self.procesos, tipo_esperado)
+
+    def _actualizar_estados_semaforos(self, incluir_estadisticas: bool = True) -> None:
+        """
+        Solicita y actualiza el estado de todos los semáforos.
         
-        respuestas = self._esperar_respuestas(len(Via), TipoRespuesta.ESTADO_SEMAFORO)
+        Args:
+            incluir_estadisticas: Si True, los workers envían sus estadísticas
+                parciales y se recalcula el total combinado
+        """
+        # Las respuestas de un Pipe llegan en orden: primero los PASO pendientes
+        self._drenar_pipeline()
+        # Si los workers van adelantados, sus luces y colas son de ticks que el
+        # proceso principal aún no consumió; sus estadísticas no: con el tick
+        # del comando cada worker solo consolida los cruces hasta ese tick
+        adelantado = bool(self._recibidos)
+        
+        pendientes = {
+            via: self._enviar(via, TipoComando.OBTENER_ESTADO, incluir_estadisticas, tick=self.reloj.ahora)
+            for via in Via
+        }
+        
+        respuestas = self._esperar_respuestas(pendientes, TipoRespuesta.ESTADO_SEMAFORO)
         for resp in respuestas:
             if resp.payload:
                 via_enum = Via[resp.via]
+                if adelantado:
+                    # Luces y colas del tick actual ya están en el cache
+                    resp.payload.color = self.estados_semaforos[via_enum].color
+                    resp.payload.tamano_cola = self.estados_semaforos[via_enum].tamano_cola
                 self.estados_semaforos[via_enum] = resp.payload
+        
+        if incluir_estadisticas:
+            self._fusionar_estadisticas()
+
+    def _fusionar_estadisticas(self) -> None:
+        """Recalcula las estadísticas totales combinando los parciales de los workers."""
+        self.stats = EstadisticasTrafico.fusionar(
+            estado.estadisticas for estado in self.estados_semaforos.values()
+            if estado.estadisticas is not None
+        )
+        self._tick_estadisticas = self.reloj.ahora
+
+    def _leer_tablero(self):
+        """
+        Lee luces y colas del tablero compartido, sin mensajes.
+        
+        Returns:
+            Tupla (luces, colas) indexadas por nombre de vía. Las vías cuyo
+            worker aún no publicó usan el último estado recibido.
+        """
+        luces, colas = {}, {}
+        for via in Via:
+            lectura = self.tablero.leer(self._slots[via]) if self.tablero else None
+            # Con pipeline el worker puede haber publicado un tick posterior
+            if lectura is None or lectura.tick != self.reloj.ahora:
+                luces[via.name] = self.estados_semaforos[via].color
+                colas[via.name] = self.estados_semaforos[via].tamano_cola
+            else:
+                luces[via.name] = lectura.color.name
+                colas[via.name] = lectura.tamano_cola
+        return luces, colas
 
     def _construir_estado(self) -> TrafficState:
         """Construye el estado actual del sistema."""
-        luces = {
-            via.name: self.estados_semaforos[via].color
-            for via in Via
-        }
-        
-        colas = {
-            via.name: self.estados_semaforos[via].tamano_cola
-            for via in Via
-        }
+        luces, colas = self._leer_tablero()
         
         # NUEVO: Timing de fase
         timing_fase = self.controlador.get_timing_fase()
@@ -322,8 +739,13 @@ class MultiprocessingEngine(BaseEngine):
         info_sistema = {
             "motor": "Multiprocessing",
             "python_version": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
-            "procesos_activos": sum(1 for p in self.procesos.values() if p.is_alive()),
+            "procesos_activos": (
+                sum(1 for p in self.procesos.values() if p.is_alive())
+                if self.coordinador is None else self.coordinador.workers
+            ),
         }
+        if self.coordinador is not None:
+            info_sistema["nodos"] = len(self.coordinador.direcciones)
         
         return TrafficState(
             tick=self.controlador.tick_actual,
@@ -331,7 +753,7 @@ class MultiprocessingEngine(BaseEngine):
             fase=self.controlador.fase_actual,
             luces=luces,
             colas=colas,
-            estadisticas=self.stats.get_resumen(),
+            estadisticas=self._resumen_estadisticas(),
             info_sistema=info_sistema,
             # Detalles recuperados del cache de estados
             vehiculos_detalle={
@@ -344,9 +766,31 @@ class MultiprocessingEngine(BaseEngine):
             configuracion=configuracion,
         )
 
+    def _resumen_estadisticas(self) -> dict:
+        """Resumen de las estadísticas combinadas, con los totales al tick actual."""
+        resumen = self.stats.get_resumen()
+        if len(self._contadores) < len(Via):
+            return resumen
+        # Contadores exactos del tick; la distribución, de la última combinación
+        cruzados = sum(cuenta for cuenta, _ in self._contadores.values())
+        espera = sum(suma for _, suma in self._contadores.values())
+        resumen.update({
+            "total_vehiculos": cruzados,
+            "tiempo_espera_total": espera,
+            "tiempo_espera_promedio": round(espera / cruzados, 3) if cruzados else 0.0,
+            "vehiculos_por_via": {via.name: self._contadores[via][0] for via in Via},
+        })
+        return resumen
+
     def get_state(self) -> TrafficState:
-        """Obtiene el estado actual sin avanzar."""
-        self._actualizar_estados_semaforos()
+        """
+        Obtiene el estado actual sin avanzar.
+        
+        Luces y colas se leen del tablero compartido; solo se consulta a los
+        workers si las estadísticas combinadas no corresponden al tick actual.
+        """
+        if self._tick_estadisticas != self.reloj.ahora:
+            self._actualizar_estados_semaforos()
         return self._construir_estado()
 
     def stop(self) -> None:
@@ -356,10 +800,10 @@ class MultiprocessingEngine(BaseEngine):
         
         # Enviar comando de detener a todos
         for via in Via:
-            self.queues_comandos[via].put(Comando(
-                tipo=TipoComando.DETENER,
-                via=via.name,
-            ))
+            try:
+                self._enviar(via, TipoComando.DETENER)
+            except RuntimeError:
+                pass  # El worker ya terminó
         
         # Esperar a que terminen
         for proceso in self.procesos.values():
@@ -367,6 +811,17 @@ class MultiprocessingEngine(BaseEngine):
             if proceso.is_alive():
                 proceso.terminate()
         
+        for conexion in self.conexiones.values():
+            conexion.close()
+        
+        if self.coordinador is not None:
+            self.coordinador.cerrar()
+            self.coordinador = None
+        
+        if self.tablero is not None:
+            self.tablero.cerrar()
+            self.tablero = None
+        
         self._running = False
 
     def is_running(self) -> bool:
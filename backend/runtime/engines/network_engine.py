@@ -0,0 +1,702 @@
+"""
+Engine de red vial.
+Extiende el engine vectorizado con enlaces entre intersecciones: lo que cruza una
+intersección viaja por un enlace y se suma a la cola de la siguiente.
+"""
+import copy
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .vectorized_engine import VectorizedEngine, VIAS_POR_INTERSECCION, np, _vista
+from ...core.common.tipos import Via
+from ...core.common.state import TrafficState
+from ...core.common.stats import EstadisticasTrafico
+from ...core.traffic.llegadas import GeneradorLlegadas
+from ...core.traffic.red import RedVial
+
+# Contadores que una región publica por tick (ver contadores())
+CONTADORES_POR_TICK = 5
+
+
+class NetworkEngine(VectorizedEngine):
+    """
+    Engine vectorizado sobre una RedVial.
+
+    - Solo los carriles de borde (sin enlace de entrada) reciben demanda
+      externa; el resto se alimenta de lo que despacha la intersección
+      aguas arriba
+    - Cada enlace guarda los vehículos en tránsito en un búfer circular de
+      `tiempo_viaje` posiciones dentro de un único `array('q')`: lo que se
+      despacha en el tick t llega a la cola de destino en t + tiempo_viaje
+    - Un carril no despacha más de lo que cabe en su enlace de salida. La
+      ocupación del enlace (en tránsito más cola de destino) la lleva el
+      origen; el espacio que libera la cola de destino vuelve al origen
+      como crédito, también tras `tiempo_viaje` ticks, de modo que las colas
+      se propagan hacia atrás
+    - Lo que cruza un carril sin enlace de salida abandona la red
+
+    Como ninguna intersección depende del estado de otra en el mismo tick
+    (vehículos y créditos tardan al menos `tiempo_viaje`), el engine puede
+    simular solo una región de la red: los enlaces que cruzan el borde de la
+    región dejan sus vehículos y créditos en `llegadas_salientes` y
+    `creditos_salientes`, y los que entran se reciben con `recibir`. El
+    origen cuenta los vehículos en tránsito hasta el tick de llegada, así que
+    los contadores de las regiones siempre suman los de la red completa.
+    `capturar` y `restaurar` guardan y recuperan el estado de la región
+    (para la simulación optimista).
+
+    Con NumPy, las dos fases del tick (enlaces e intersecciones) son
+    operaciones sobre arreglos completos, como en el engine vectorizado.
+
+    Con `config.hilos` mayor que 1, cada tick avanza en un pool de hilos:
+    los enlaces y las intersecciones se reparten en tramos contiguos, que
+    solo comparten los arreglos de la región y escriben en posiciones
+    distintas. Dentro de `network_multiprocessing` da el esquema híbrido de
+    procesos (regiones, con mensajes) por hilos (tramos, con memoria
+    compartida). Los hilos solo avanzan a la vez en un intérprete sin GIL
+    (free-threaded, 3.13t); los resultados no dependen del número de hilos.
+
+    Sin `config.red` se comporta como el engine vectorizado con
+    intersecciones independientes.
+    """
+
+    def __init__(
+        self,
+        config,
+        red: RedVial = None,
+        region: Optional[Iterable[int]] = None,
+        usar_numpy: Optional[bool] = None,
+    ):
+        """
+        Inicializa el engine.
+
+        Args:
+            config: ConfiguracionSimulacion (usa `red` si no se pasa una)
+            red: Red a simular. Por defecto, la de la configuración o
+                num_intersecciones intersecciones sin enlaces.
+            region: Intersecciones que simula este engine (None = todas)
+            usar_numpy: Avanzar con operaciones de NumPy. None = si está instalado.
+        """
+        super().__init__(config, usar_numpy)
+        self.red = red or RedVial.desde_config(config) or RedVial(self.num_intersecciones, [])
+        self.num_intersecciones = self.red.num_intersecciones
+        self.region = array("l", sorted(set(region)) if region is not None else range(self.num_intersecciones))
+        if self.region and not 0 <= self.region[0] <= self.region[-1] < self.num_intersecciones:
+            raise ValueError(f"Región fuera de la red: {list(self.region)}")
+
+        # Columnas por enlace
+        self.ocupacion = array("q")      # En tránsito + cola de destino + créditos por volver (vista del origen)
+        self.en_transito = array("q")    # Vehículos en el enlace, hasta su tick de llegada
+        self._inicio_bufer = array("l")  # Posición del búfer circular de cada enlace
+        self._bufer = array("q")         # Vehículos por tick de despacho
+        self._creditos = array("q")      # Créditos por tick de liberación
+
+        # Enlaces con origen en la región
+        self._locales = bytearray()
+        self._salientes = array("l")
+        self._destino_local = bytearray()
+        self._origen_local = bytearray()
+        self._carriles_region = array("l")
+
+        # Lo recibido de otras regiones: tick de llegada -> {enlace: cantidad}
+        self._llegadas_remotas: Dict[int, Dict[int, int]] = {}
+        self._creditos_remotos: Dict[int, Dict[int, int]] = {}
+
+        # Triples (enlace, tick, cantidad) que cruzan el borde de la región
+        self.llegadas_salientes = array("q")
+        self.creditos_salientes = array("q")
+
+        self.salidas_red = 0
+        self.vehiculos_en_cola = 0
+        self.vehiculos_en_transito = 0
+
+        # Tramos que avanzan en paralelo (ver avanzar)
+        self.hilos = max(1, config.hilos or 1)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._tramos_enlaces: List[array] = []
+        self._tramos_intersecciones: List[array] = []
+
+    def start(self) -> None:
+        """Crea las columnas de carriles y enlaces; quita la demanda de los carriles internos."""
+        if self._running:
+            return
+        locales = self._locales = bytearray(self.num_intersecciones)
+        for i in self.region:
+            locales[i] = 1
+        super().start()
+        red = self.red
+
+        self._destino_local = bytearray(locales[d] for d in red.destino)
+        self._origen_local = bytearray(
+            locales[carril // VIAS_POR_INTERSECCION] for carril in red.carril_origen
+        )
+        self._salientes = array("l", (e for e in range(red.num_enlaces) if self._origen_local[e]))
+        self._carriles_region = array("l", (
+            i * VIAS_POR_INTERSECCION + slot for i in self.region for slot in range(VIAS_POR_INTERSECCION)
+        ))
+        self._llegadas_remotas = {}
+        self._creditos_remotos = {}
+
+        self.ocupacion = array("q", [0]) * red.num_enlaces
+        self.en_transito = array("q", [0]) * red.num_enlaces
+        self._inicio_bufer = array("l", [0]) * (red.num_enlaces + 1)
+        for e, tiempo in enumerate(red.tiempo_viaje):
+            self._inicio_bufer[e + 1] = self._inicio_bufer[e] + tiempo
+        self._bufer = array("q", [0]) * self._inicio_bufer[-1]
+        self._creditos = array("q", [0]) * self._inicio_bufer[-1]
+        self.llegadas_salientes = array("q")
+        self.creditos_salientes = array("q")
+        self.salidas_red = 0
+        self.vehiculos_en_cola = 0
+        self.vehiculos_en_transito = 0
+
+        self._tramos_enlaces = _repartir(self._salientes, self.hilos)
+        self._tramos_intersecciones = _repartir(self.region, self.hilos)
+        if self.usar_numpy:
+            self._iniciar_red_np()
+        if self.hilos > 1:
+            self._pool = ThreadPoolExecutor(self.hilos - 1, thread_name_prefix="tramo")
+
+    def _crear_generador(self, interseccion: int, slot: int, via: Via) -> Optional[GeneradorLlegadas]:
+        """Crea el generador de un carril de borde de la región; el resto no recibe demanda externa."""
+        carril = interseccion * VIAS_POR_INTERSECCION + slot
+        if self.red.entrada_de_carril[carril] != -1 or not self._locales[interseccion]:
+            return None
+        return super()._crear_generador(interseccion, slot, via)
+
+    def _iniciar_red_np(self) -> None:
+        """Prepara las tablas de la red y los tramos como arreglos de NumPy."""
+        red = self.red
+        self._tiempos_np = np.array(red.tiempo_viaje, dtype=np.int64)
+        self._inicio_np = np.array(self._inicio_bufer, dtype=np.int64)
+        self._capacidad_np = np.array(red.capacidad, dtype=np.int64)
+        self._carril_destino_np = np.array(red.carril_destino, dtype=np.int64)
+        self._enlace_de_carril_np = np.array(red.enlace_de_carril, dtype=np.int64)
+        self._entrada_de_carril_np = np.array(red.entrada_de_carril, dtype=np.int64)
+        self._destino_local_np = np.frombuffer(self._destino_local, dtype=np.uint8).astype(bool)
+        self._origen_local_np = np.frombuffer(self._origen_local, dtype=np.uint8).astype(bool)
+        self._vincular_columnas()
+
+        # Columna del bloque de llegadas de cada carril con demanda externa
+        columna = np.full(len(self.cola), -1, dtype=np.int64)
+        columna[self._carriles_llegadas] = np.arange(len(self._carriles_llegadas))
+        self._tramos_enlaces = [np.array(tramo, dtype=np.int64) for tramo in self._tramos_enlaces]
+        tramos = []
+        for tramo in self._tramos_intersecciones:
+            intersecciones = np.array(tramo, dtype=np.int64)
+            carriles = (intersecciones[:, None] * VIAS_POR_INTERSECCION + np.arange(VIAS_POR_INTERSECCION)).ravel()
+            con_llegadas = carriles[columna[carriles] != -1]
+            tramos.append((intersecciones, carriles, columna[con_llegadas], con_llegadas))
+        self._tramos_intersecciones = tramos
+        self._fila_llegadas = None
+
+    def _vincular_columnas(self) -> None:
+        """Agrega las vistas de las columnas por enlace."""
+        super()._vincular_columnas()
+        self._ocupacion_np = _vista(self.ocupacion)
+        self._en_transito_np = _vista(self.en_transito)
+        self._bufer_np = _vista(self._bufer)
+        self._creditos_np = _vista(self._creditos)
+
+    def stop(self) -> None:
+        """Detiene el engine y su pool de hilos."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        super().stop()
+
+    def step(self) -> TrafficState:
+        """
+        Avanza un tick en todas las intersecciones y enlaces.
+
+        Returns:
+            TrafficState de la intersección observada
+        """
+        self.avanzar()
+        self._registrar_cambios_observada()
+        return self._construir_estado(self.interseccion_observada)
+
+    def avanzar(self) -> int:
+        """
+        Avanza un tick en las intersecciones y enlaces de la región.
+
+        Con varios hilos, primero los enlaces y después las intersecciones se
+        reparten en tramos que avanzan en paralelo; los acumulados de cada
+        tramo se suman en orden al terminar.
+
+        Returns:
+            Tick simulado
+        """
+        if not self._running:
+            raise RuntimeError("Engine no está corriendo.")
+
+        self.controlador.avanzar_tick()
+        tick = self.reloj.avanzar()
+        if self.usar_numpy:
+            # Fuera de los tramos: pueden reubicar las cohortes o llenar un bloque de llegadas
+            self._cohortes_np.reservar()
+            self._fila_llegadas = self._llegadas_del_tick()
+            avanzar_enlaces, avanzar_intersecciones = self._avanzar_enlaces_np, self._avanzar_intersecciones_np
+        else:
+            avanzar_enlaces, avanzar_intersecciones = self._avanzar_enlaces, self._avanzar_intersecciones
+
+        # 1. Llegadas y créditos de los enlaces: lo despachado o liberado hace tiempo_viaje ticks
+        if self._pool is None:
+            en_cola, transito = avanzar_enlaces(tick, self._tramos_enlaces[0])
+        else:
+            en_cola = transito = 0
+            for cola_tramo, transito_tramo in self._en_paralelo(
+                avanzar_enlaces, [(tick, tramo) for tramo in self._tramos_enlaces]
+            ):
+                en_cola += cola_tramo
+                transito += transito_tramo
+        en_cola += self._aplicar_remotos(tick)
+
+        # 2. Fase, demanda externa y despacho por intersección
+        if self._pool is None:
+            cola_tramo, transito_tramo, salidas = avanzar_intersecciones(
+                tick, self._tramos_intersecciones[0], self.stats, self.llegadas_salientes, self.creditos_salientes,
+            )
+            en_cola += cola_tramo
+            transito += transito_tramo
+            self.salidas_red += salidas
+        else:
+            tareas = [
+                (tick, tramo, EstadisticasTrafico(), array("q"), array("q"))
+                for tramo in self._tramos_intersecciones
+            ]
+            resultados = self._en_paralelo(avanzar_intersecciones, tareas)
+            for (_, _, stats, llegadas, creditos), (cola_tramo, transito_tramo, salidas) in zip(tareas, resultados):
+                en_cola += cola_tramo
+                transito += transito_tramo
+                self.salidas_red += salidas
+                self.stats.combinar(stats)
+                self.llegadas_salientes.extend(llegadas)
+                self.creditos_salientes.extend(creditos)
+
+        self.vehiculos_en_cola += en_cola
+        self.vehiculos_en_transito += transito
+        return tick
+
+    def _avanzar_enlaces(self, tick: int, enlaces: Iterable[int]) -> Tuple[int, int]:
+        """
+        Entrega lo que llega en este tick por enlaces con origen en la región.
+
+        Cada enlace solo toca su búfer y el carril de destino, así que tramos
+        distintos pueden avanzar a la vez.
+
+        Args:
+            tick: Tick actual
+            enlaces: Enlaces a avanzar
+
+        Returns:
+            Variación de (vehículos en cola, vehículos en tránsito)
+        """
+        bufer, creditos, inicio_bufer = self._bufer, self._creditos, self._inicio_bufer
+        ocupacion, en_transito = self.ocupacion, self.en_transito
+        cola = self.cola
+        cohortes = self._cohortes
+        tiempos = self.red.tiempo_viaje
+        carril_destino = self.red.carril_destino
+        destino_local = self._destino_local
+        en_cola = transito = 0
+
+        for e in enlaces:
+            ranura = inicio_bufer[e] + tick % tiempos[e]
+            llegan = bufer[ranura]
+            if llegan:
+                bufer[ranura] = 0
+                en_transito[e] -= llegan
+                transito -= llegan
+                if destino_local[e]:
+                    destino = carril_destino[e]
+                    cola[destino] += llegan
+                    en_cola += llegan
+                    cohortes[destino].append([tick, llegan])
+            if creditos[ranura]:
+                ocupacion[e] -= creditos[ranura]
+                creditos[ranura] = 0
+        return en_cola, transito
+
+    def _aplicar_remotos(self, tick: int) -> int:
+        """
+        Entrega los vehículos y créditos de otras regiones que llegan en este tick.
+
+        Returns:
+            Vehículos agregados a las colas
+        """
+        cola = self.cola
+        cohortes = self._cohortes
+        carril_destino = self.red.carril_destino
+        en_cola = 0
+
+        remotas = self._llegadas_remotas.get(tick)
+        if remotas and self.usar_numpy:
+            enlaces = np.fromiter(remotas.keys(), dtype=np.int64, count=len(remotas))
+            llegan = np.fromiter(remotas.values(), dtype=np.int64, count=len(remotas))
+            en_cola += self._encolar_np(tick, self._carril_destino_np[enlaces], llegan)
+        elif remotas:
+            for e, llegan in remotas.items():
+                if llegan:
+                    destino = carril_destino[e]
+                    cola[destino] += llegan
+                    en_cola += llegan
+                    cohortes[destino].append([tick, llegan])
+        remotos = self._creditos_remotos.get(tick)
+        if remotos:
+            ocupacion = self.ocupacion
+            for e, liberados in remotos.items():
+                ocupacion[e] -= liberados
+        return en_cola
+
+    def _avanzar_intersecciones(
+        self,
+        tick: int,
+        intersecciones: Iterable[int],
+        stats: EstadisticasTrafico,
+        llegadas_salientes: array,
+        creditos_salientes: array,
+    ) -> Tuple[int, int, int]:
+        """
+        Avanza la fase, la demanda externa y el despacho de un tramo de intersecciones.
+
+        Cada carril escribe solo en sus columnas, en su enlace de salida y en
+        el crédito de su enlace de entrada (del que es el único destino), así
+        que tramos distintos pueden avanzar a la vez si no comparten `stats`
+        ni los arreglos de salientes.
+
+        Args:
+            tick: Tick actual
+            intersecciones: Intersecciones a avanzar
+            stats: Estadísticas donde registrar las esperas
+            llegadas_salientes: Destino de los triples de vehículos que salen de la región
+            creditos_salientes: Destino de los triples de créditos que salen de la región
+
+        Returns:
+            Variación de (vehículos en cola, vehículos en tránsito, salidas de la red)
+        """
+        red = self.red
+        bufer, creditos, inicio_bufer = self._bufer, self._creditos, self._inicio_bufer
+        ocupacion, en_transito = self.ocupacion, self.en_transito
+        cola = self.cola
+        cohortes = self._cohortes
+        tiempos = red.tiempo_viaje
+        ciclo = self.controlador.duracion_ciclo
+        posicion = self.posicion
+        generadores = self._generadores
+        verdes_por_posicion = self._verdes_por_posicion
+        enlace_de_carril = red.enlace_de_carril
+        entrada_de_carril = red.entrada_de_carril
+        capacidad = red.capacidad
+        destino_local = self._destino_local
+        origen_local = self._origen_local
+        en_cola = transito = salidas = 0
+
+        for i in intersecciones:
+            pos = posicion[i] + 1
+            if pos == ciclo:
+                pos = 0
+            posicion[i] = pos
+
+            base = i * VIAS_POR_INTERSECCION
+            for carril in range(base, base + VIAS_POR_INTERSECCION):
+                generador = generadores[carril]
+                if generador is not None:
+                    llegadas = generador.contar()
+                    if llegadas:
+                        cola[carril] += llegadas
+                        en_cola += llegadas
+                        cohortes[carril].append([tick, llegadas])
+
+            for slot in verdes_por_posicion[pos]:
+                carril = base + slot
+                if not cola[carril]:
+                    continue
+                e = enlace_de_carril[carril]
+                if e == -1:
+                    despachados = self._despachar(carril, tick, stats=stats)
+                    salidas += despachados
+                else:
+                    libre = capacidad[e] - ocupacion[e]
+                    if libre <= 0:
+                        continue
+                    despachados = self._despachar(carril, tick, libre, stats)
+                    ocupacion[e] += despachados
+                    transito += despachados
+                    en_transito[e] += despachados
+                    bufer[inicio_bufer[e] + tick % tiempos[e]] += despachados
+                    if not destino_local[e]:
+                        llegadas_salientes.extend((e, tick, despachados))
+                en_cola -= despachados
+
+                # El espacio liberado vuelve como crédito al enlace de entrada
+                entrada = entrada_de_carril[carril]
+                if entrada != -1:
+                    if origen_local[entrada]:
+                        creditos[inicio_bufer[entrada] + tick % tiempos[entrada]] += despachados
+                    else:
+                        creditos_salientes.extend((entrada, tick, despachados))
+        return en_cola, transito, salidas
+
+    def _avanzar_enlaces_np(self, tick: int, enlaces) -> Tuple[int, int]:
+        """Versión con NumPy de `_avanzar_enlaces`, para un arreglo de enlaces."""
+        ranuras = self._inicio_np[enlaces] + tick % self._tiempos_np[enlaces]
+        bufer, creditos = self._bufer_np, self._creditos_np
+        en_cola = transito = 0
+
+        llegan = bufer[ranuras]
+        hay = llegan != 0
+        if hay.any():
+            con_llegadas, llegan = enlaces[hay], llegan[hay]
+            bufer[ranuras[hay]] = 0
+            self._en_transito_np[con_llegadas] -= llegan
+            transito -= int(llegan.sum())
+            locales = self._destino_local_np[con_llegadas]
+            en_cola += self._encolar_np(tick, self._carril_destino_np[con_llegadas[locales]], llegan[locales])
+
+        liberados = creditos[ranuras]
+        hay = liberados != 0
+        if hay.any():
+            self._ocupacion_np[enlaces[hay]] -= liberados[hay]
+            creditos[ranuras[hay]] = 0
+        return en_cola, transito
+
+    def _avanzar_intersecciones_np(
+        self,
+        tick: int,
+        tramo: tuple,
+        stats: EstadisticasTrafico,
+        llegadas_salientes: array,
+        creditos_salientes: array,
+    ) -> Tuple[int, int, int]:
+        """
+        Versión con NumPy de `_avanzar_intersecciones`.
+
+        Args:
+            tick: Tick actual
+            tramo: (intersecciones, sus carriles, columnas del bloque de
+                llegadas y carriles con demanda externa), de `_iniciar_red_np`
+            stats: Estadísticas donde registrar las esperas
+            llegadas_salientes: Destino de los triples de vehículos que salen de la región
+            creditos_salientes: Destino de los triples de créditos que salen de la región
+
+        Returns:
+            Variación de (vehículos en cola, vehículos en tránsito, salidas de la red)
+        """
+        intersecciones, carriles, columnas, con_llegadas = tramo
+        self._avanzar_fases_np(intersecciones)
+        en_cola = self._encolar_np(tick, con_llegadas, self._fila_llegadas[columnas])
+
+        carriles = self._en_verde_con_cola_np(carriles)
+        if not carriles.size:
+            return en_cola, 0, 0
+        cantidades = np.minimum(self._cola_np[carriles], self.config.capacidad_cruce_por_tick)
+
+        # Un carril no despacha más de lo que cabe en su enlace de salida
+        enlaces = self._enlace_de_carril_np[carriles]
+        con_enlace = enlaces != -1
+        if con_enlace.any():
+            salida = enlaces[con_enlace]
+            libre = self._capacidad_np[salida] - self._ocupacion_np[salida]
+            cantidades[con_enlace] = np.minimum(cantidades[con_enlace], libre)
+            despachan = cantidades > 0
+            carriles, cantidades = carriles[despachan], cantidades[despachan]
+            enlaces, con_enlace = enlaces[despachan], con_enlace[despachan]
+
+        self._despachar_np(carriles, cantidades, tick, stats)
+        en_cola -= int(cantidades.sum())
+        salidas = int(cantidades[~con_enlace].sum())
+
+        salida, despachados = enlaces[con_enlace], cantidades[con_enlace]
+        transito = int(despachados.sum())
+        if salida.size:
+            self._ocupacion_np[salida] += despachados
+            self._en_transito_np[salida] += despachados
+            self._bufer_np[self._inicio_np[salida] + tick % self._tiempos_np[salida]] += despachados
+            remotos = ~self._destino_local_np[salida]
+            if remotos.any():
+                _extender_triples(llegadas_salientes, salida[remotos], tick, despachados[remotos])
+
+        # El espacio liberado vuelve como crédito al enlace de entrada
+        entradas = self._entrada_de_carril_np[carriles]
+        con_entrada = entradas != -1
+        entradas, liberados = entradas[con_entrada], cantidades[con_entrada]
+        locales = self._origen_local_np[entradas]
+        propias = entradas[locales]
+        self._creditos_np[self._inicio_np[propias] + tick % self._tiempos_np[propias]] += liberados[locales]
+        if not locales.all():
+            _extender_triples(creditos_salientes, entradas[~locales], tick, liberados[~locales])
+        return en_cola, transito, salidas
+
+    def _en_paralelo(self, funcion: Callable, tareas: List[tuple]) -> list:
+        """
+        Ejecuta una función por tramo en el pool de hilos y espera a todas.
+
+        El hilo que llama corre el primer tramo en lugar de quedarse esperando.
+
+        Returns:
+            Resultados en el orden de las tareas
+        """
+        futuros = [self._pool.submit(funcion, *argumentos) for argumentos in tareas[1:]]
+        return [funcion(*tareas[0])] + [futuro.result() for futuro in futuros]
+
+    def recibir(self, llegadas: Iterable[int], creditos: Iterable[int]) -> None:
+        """
+        Incorpora vehículos y créditos que otra región envió por enlaces del borde.
+
+        Se aplican en su tick de llegada (tick + tiempo_viaje del enlace).
+        Las cantidades pueden ser negativas para corregir un envío anterior.
+
+        Args:
+            llegadas: Triples (enlace, tick de despacho, cantidad) de enlaces
+                con destino en la región
+            creditos: Triples (enlace, tick de liberación, cantidad) de enlaces
+                con origen en la región
+        """
+        tiempos = self.red.tiempo_viaje
+        for triples, pendientes in ((llegadas, self._llegadas_remotas), (creditos, self._creditos_remotos)):
+            triples = iter(triples)
+            for e, tick, cantidad in zip(triples, triples, triples):
+                por_enlace = pendientes.setdefault(tick + tiempos[e], {})
+                por_enlace[e] = por_enlace.get(e, 0) + cantidad
+
+    def descartar_entradas(self, hasta: int) -> None:
+        """
+        Olvida lo recibido de otras regiones con llegada hasta un tick.
+
+        Args:
+            hasta: Último tick a descartar (ya no se volverá a simular)
+        """
+        for pendientes in (self._llegadas_remotas, self._creditos_remotos):
+            for tick in [t for t in pendientes if t <= hasta]:
+                del pendientes[tick]
+
+    def tomar_salientes(self):
+        """
+        Retira los vehículos y créditos que salieron de la región desde la última llamada.
+
+        Returns:
+            Tupla (llegadas, creditos) de triples (enlace, tick, cantidad)
+        """
+        llegadas, creditos = self.llegadas_salientes, self.creditos_salientes
+        self.llegadas_salientes, self.creditos_salientes = array("q"), array("q")
+        return llegadas, creditos
+
+    def capturar(self) -> tuple:
+        """
+        Captura el estado de la región para poder volver a él.
+
+        Lo recibido de otras regiones no forma parte del estado: se conserva
+        aparte hasta descartar_entradas. Con NumPy, el bloque de llegadas en
+        curso se comparte con la captura (no se modifica después de llenarlo).
+
+        Returns:
+            Estado opaco para restaurar
+        """
+        generadores = self._generadores
+        if self.usar_numpy:
+            cohortes = (self._cohortes_np.capturar(), self._bloque_llegadas, self._cursor_llegadas)
+        else:
+            cohortes = {
+                c: [cohorte[:] for cohorte in self._cohortes[c]] for c in self._carriles_region if self._cohortes[c]
+            }
+        return (
+            self.reloj.ahora,
+            self.posicion[:], self.cola[:], self.cruzados[:], self.espera_total[:],
+            cohortes,
+            [generadores[c].capturar() if generadores[c] is not None else None for c in self._carriles_region],
+            copy.deepcopy(self.stats),
+            self.ocupacion[:], self.en_transito[:], self._bufer[:], self._creditos[:],
+            self.salidas_red, self.vehiculos_en_cola, self.vehiculos_en_transito,
+        )
+
+    def restaurar(self, estado: tuple) -> None:
+        """
+        Vuelve a un estado capturado con `capturar`.
+
+        El estado capturado no se modifica, así que puede restaurarse varias veces.
+
+        Args:
+            estado: Resultado de capturar
+        """
+        (
+            tick, posicion, cola, cruzados, espera_total, cohortes, generadores, stats,
+            ocupacion, en_transito, bufer, creditos,
+            self.salidas_red, self.vehiculos_en_cola, self.vehiculos_en_transito,
+        ) = estado
+        self.reloj.sincronizar(tick)
+        self.controlador.saltar_a(tick)
+        self.posicion, self.cola, self.cruzados, self.espera_total = posicion[:], cola[:], cruzados[:], espera_total[:]
+        self.ocupacion, self.en_transito = ocupacion[:], en_transito[:]
+        self._bufer, self._creditos = bufer[:], creditos[:]
+        self.stats = copy.deepcopy(stats)
+        if self.usar_numpy:
+            cohortes, self._bloque_llegadas, self._cursor_llegadas = cohortes
+            self._cohortes_np.restaurar(cohortes)
+            self._vincular_columnas()
+        for c, generador in zip(self._carriles_region, generadores):
+            if not self.usar_numpy:
+                self._cohortes[c] = deque(cohorte[:] for cohorte in cohortes.get(c, ()))
+            if generador is not None:
+                self._generadores[c].restaurar(generador)
+        self.llegadas_salientes, self.creditos_salientes = array("q"), array("q")
+
+    def contadores(self) -> tuple:
+        """
+        Retorna los contadores acumulados de la región, sumables entre regiones.
+
+        Returns:
+            (vehículos cruzados, espera total, salidas de la red, en cola, en tránsito)
+        """
+        return (
+            self.stats.total_vehiculos, self.stats.tiempo_espera_total,
+            self.salidas_red, self.vehiculos_en_cola, self.vehiculos_en_transito,
+        )
+
+    def _construir_estado(self, interseccion: int) -> TrafficState:
+        """Construye el TrafficState de una intersección con el resumen de la red."""
+        estado = super()._construir_estado(interseccion)
+        # En la red un vehículo cruza varias intersecciones: total_vehiculos y
+        # las esperas del resumen son por cruce; los viajes terminados son salidas_red
+        estado.estadisticas["red"].update({
+            "cruces": self.stats.total_vehiculos,
+            "salidas_red": self.salidas_red,
+            "en_transito": self.vehiculos_en_transito,
+            "en_cola": self.vehiculos_en_cola,
+        })
+        estado.info_sistema.update({
+            "motor": "Red vial (struct-of-arrays)",
+            "enlaces": self.red.num_enlaces,
+            "hilos": self.hilos,
+        })
+        return estado
+
+    def __repr__(self) -> str:
+        return f"NetworkEngine(running={self._running}, red={self.red}, region={len(self.region)}, hilos={self.hilos})"
+
+
+def _repartir(valores: array, partes: int) -> List[array]:
+    """
+    Reparte un arreglo en tramos contiguos de tamaño parejo, conservando el orden.
+
+    Args:
+        valores: Arreglo a repartir
+        partes: Número máximo de tramos
+
+    Returns:
+        Entre 1 y `partes` tramos (uno vacío si no hay valores)
+    """
+    partes = max(1, min(partes, len(valores)))
+    cortes = [len(valores) * k // partes for k in range(partes + 1)]
+    return [valores[inicio:fin] for inicio, fin in zip(cortes, cortes[1:])]
+
+
+def _extender_triples(destino: array, enlaces, tick: int, cantidades) -> None:
+    """Agrega a un arreglo de triples (enlace, tick, cantidad) los de varios enlaces, en orden."""
+    triples = np.empty((len(enlaces), 3), dtype=np.int64)
+    triples[:, 0] = enlaces
+    triples[:, 1] = tick
+    triples[:, 2] = cantidades
+    destino.frombytes(triples.astype(destino.typecode).tobytes())
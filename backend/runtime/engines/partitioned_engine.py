@@ -0,0 +1,832 @@
+"""
+Engine de red particionada (multiprocessing).
+Reparte las intersecciones de una RedVial en regiones, una por proceso, que solo
+intercambian los vehículos y créditos de los enlaces que cruzan entre regiones.
+"""
+import multiprocessing as mp
+import os
+import sys
+from array import array
+from collections import deque
+from dataclasses import replace
+from multiprocessing.connection import Connection
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .base import BaseEngine
+from .multiprocessing_engine import esperar_respuestas, iniciar_workers
+from .network_engine import CONTADORES_POR_TICK, NetworkEngine
+from .vectorized_engine import VIAS_POR_INTERSECCION
+from ..comms.messages import (
+    Comando, Respuesta, ResultadoVentanaMsg, TipoComando, TipoRespuesta, VentanaMsg,
+)
+from ..comms.nodos import CoordinadorNodos
+from ...core.common.tipos import Via
+from ...core.common.state import TrafficState
+from ...core.common.stats import EstadisticasTrafico
+from ...core.common.semillas import FlujosAleatorios
+from ...core.common.reloj import RelojSimulacion
+from ...core.traffic.controlador import ControladorTrafico
+from ...core.traffic.programa import ProgramaSemaforico
+from ...core.traffic.red import RedVial
+
+SINCRONIZACIONES = ("conservadora", "optimista")
+
+# Ticks por ventana cuando ningún enlace cruza entre regiones
+VENTANA_MAXIMA = 1024
+
+# Valores por tick de la intersección observada: cola y cruzados por vía, y espera total
+CAMPOS_OBSERVADA = 2 * VIAS_POR_INTERSECCION + 1
+
+
+def _valores_observada(engine: NetworkEngine, interseccion: int) -> tuple:
+    """Cola y cruzados por vía y espera total de una intersección."""
+    base = interseccion * VIAS_POR_INTERSECCION
+    fin = base + VIAS_POR_INTERSECCION
+    return (*engine.cola[base:fin], *engine.cruzados[base:fin], sum(engine.espera_total[base:fin]))
+
+
+def _diferencia(nuevos: array, anteriores: array) -> array:
+    """
+    Corrige un envío: triples (enlace, tick, cantidad) que llevan de `anteriores` a `nuevos`.
+
+    Ambos son los triples de un mismo tick; solo se incluyen los enlaces
+    cuya cantidad cambió (con la diferencia, que puede ser negativa).
+    """
+    cambios: Dict[int, int] = {}
+    for triples, signo in ((nuevos, 1), (anteriores, -1)):
+        for k in range(0, len(triples), 3):
+            cambios[triples[k]] = cambios.get(triples[k], 0) + signo * triples[k + 2]
+    diferencia = array("q")
+    for e, cantidad in cambios.items():
+        if cantidad:
+            diferencia.extend((e, (nuevos or anteriores)[1], cantidad))
+    return diferencia
+
+
+class RegionConservadora:
+    """
+    Región que solo simula ticks que ya no pueden recibir nada nuevo.
+
+    El proceso principal fija cada ventana dentro del lookahead, así que lo
+    que llega por el borde nunca es anterior al tick actual de la región.
+    """
+
+    def __init__(self, engine: NetworkEngine, observada: Optional[int] = None):
+        """
+        Inicializa la región.
+
+        Args:
+            engine: NetworkEngine iniciado sobre las intersecciones de la región
+            observada: Intersección observada, si pertenece a la región
+        """
+        self.engine = engine
+        self.observada = observada
+
+    def procesar(self, ventana: VentanaMsg) -> ResultadoVentanaMsg:
+        """
+        Incorpora lo recibido y avanza hasta el final de la ventana.
+
+        Args:
+            ventana: Entradas del borde y último tick a simular
+
+        Returns:
+            Salidas del borde y contadores por tick
+        """
+        engine = self.engine
+        desde = engine.reloj.ahora + 1
+        engine.recibir(ventana.llegadas, ventana.creditos)
+        contadores = array("q")
+        detalle = array("q") if self.observada is not None else None
+        while engine.reloj.ahora < ventana.hasta:
+            engine.avanzar()
+            contadores.extend(engine.contadores())
+            if detalle is not None:
+                detalle.extend(_valores_observada(engine, self.observada))
+        engine.descartar_entradas(engine.reloj.ahora)
+        llegadas, creditos = engine.tomar_salientes()
+        return ResultadoVentanaMsg(
+            llegadas=llegadas, creditos=creditos, contadores=contadores, observada=detalle,
+            desde=desde, ahora=engine.reloj.ahora,
+        )
+
+
+class RegionOptimista:
+    """
+    Región con sincronización optimista (Time Warp).
+
+    - Avanza sin esperar a las demás regiones y captura su estado cada
+      `intervalo_checkpoint` ticks (NetworkEngine.capturar)
+    - Si recibe algo que llega en un tick ya simulado (un rezagado), vuelve
+      a la última captura anterior a ese tick y re-simula desde allí
+    - Cancelación perezosa: lo que envió en los ticks deshechos no se anula
+      de inmediato; al re-simular cada tick se envía solo la diferencia con
+      lo enviado antes (cantidades negativas incluidas), que en general es
+      nada, así que un retroceso no provoca retrocesos en cadena
+    - Con el GVT que le pasa el proceso principal descarta las capturas,
+      envíos y entradas que ya no puede necesitar (recolección de fósiles)
+
+    Como la simulación es determinista, el resultado es el mismo que con la
+    sincronización conservadora.
+    """
+
+    def __init__(self, engine: NetworkEngine, observada: Optional[int] = None, intervalo_checkpoint: int = 8):
+        """
+        Inicializa la región.
+
+        Args:
+            engine: NetworkEngine iniciado sobre las intersecciones de la región
+            observada: Intersección observada, si pertenece a la región
+            intervalo_checkpoint: Ticks entre capturas de estado
+        """
+        self.engine = engine
+        self.observada = observada
+        self.intervalo_checkpoint = max(1, intervalo_checkpoint)
+        self._capturas: Deque[Tuple[int, tuple]] = deque([(engine.reloj.ahora, engine.capturar())])
+        self._enviados: Dict[int, Tuple[array, array]] = {}  # Tick -> (llegadas, créditos) enviados
+        self._por_confirmar: Dict[int, Tuple[array, array]] = {}  # Enviados en ticks deshechos
+        self.retrocesos = 0
+        self.ticks_deshechos = 0
+
+    @property
+    def ahora(self) -> int:
+        """Retorna el último tick simulado."""
+        return self.engine.reloj.ahora
+
+    @property
+    def capturas(self) -> int:
+        """Retorna el número de capturas de estado retenidas."""
+        return len(self._capturas)
+
+    def recibir(self, llegadas: array, creditos: array) -> None:
+        """
+        Incorpora lo recibido por el borde; si algo llega a un tick ya simulado, retrocede.
+
+        Args:
+            llegadas: Triples (enlace, tick de despacho, cantidad)
+            creditos: Triples (enlace, tick de liberación, cantidad)
+        """
+        tiempos = self.engine.red.tiempo_viaje
+        primera = min(
+            (triples[k + 1] + tiempos[triples[k]] for triples in (llegadas, creditos) for k in range(0, len(triples), 3)),
+            default=None,
+        )
+        self.engine.recibir(llegadas, creditos)
+        if primera is not None and primera <= self.ahora:
+            self.retroceder(primera - 1)
+
+    def retroceder(self, tick: int) -> None:
+        """
+        Restaura la última captura no posterior a `tick`.
+
+        Los ticks entre la captura y `tick` se re-simulan en el siguiente
+        `avanzar_hasta`, con los mismos resultados.
+
+        Args:
+            tick: Último tick que sigue siendo válido
+        """
+        while len(self._capturas) > 1 and self._capturas[-1][0] > tick:
+            self._capturas.pop()
+        base, estado = self._capturas[-1]
+        if base > tick:
+            raise RuntimeError(f"No hay captura anterior al tick {tick} (la más antigua es {base})")
+        for t in [t for t in self._enviados if t > base]:
+            self._por_confirmar.setdefault(t, self._enviados.pop(t))
+        self.retrocesos += 1
+        self.ticks_deshechos += self.ahora - base
+        self.engine.restaurar(estado)
+
+    def avanzar_hasta(self, hasta: int):
+        """
+        Simula hasta un tick (retrocediendo si la región ya lo pasó).
+
+        Args:
+            hasta: Tick en el que debe quedar la región
+
+        Returns:
+            Tupla (llegadas, créditos, primer tick, contadores, observada)
+            con lo que hay que enviar y los contadores de los ticks simulados
+        """
+        if hasta < self.ahora:
+            self.retroceder(hasta)
+        engine = self.engine
+        desde = self.ahora + 1
+        salida_llegadas, salida_creditos = array("q"), array("q")
+        contadores = array("q")
+        detalle = array("q") if self.observada is not None else None
+        while self.ahora < hasta:
+            tick = engine.avanzar()
+            llegadas, creditos = engine.tomar_salientes()
+            anterior = self._por_confirmar.pop(tick, None)
+            if anterior is None:
+                salida_llegadas.extend(llegadas)
+                salida_creditos.extend(creditos)
+            else:
+                salida_llegadas.extend(_diferencia(llegadas, anterior[0]))
+                salida_creditos.extend(_diferencia(creditos, anterior[1]))
+            self._enviados[tick] = (llegadas, creditos)
+            contadores.extend(engine.contadores())
+            if detalle is not None:
+                detalle.extend(_valores_observada(engine, self.observada))
+            if tick % self.intervalo_checkpoint == 0:
+                self._capturas.append((tick, engine.capturar()))
+        return salida_llegadas, salida_creditos, desde, contadores, detalle
+
+    def recolectar(self, gvt: int) -> None:
+        """
+        Descarta lo que ya no puede necesitar un retroceso (recolección de fósiles).
+
+        Args:
+            gvt: Tiempo virtual global; ningún tick hasta aquí se volverá a simular
+        """
+        while len(self._capturas) > 1 and self._capturas[1][0] <= gvt:
+            self._capturas.popleft()
+        # Un retroceso puede volver a la captura más antigua y re-simular desde
+        # allí: lo enviado después sigue haciendo falta para las diferencias
+        base = self._capturas[0][0]
+        for enviados in (self._enviados, self._por_confirmar):
+            for t in [t for t in enviados if t <= base]:
+                del enviados[t]
+        self.engine.descartar_entradas(base)
+
+    def procesar(self, ventana: VentanaMsg) -> ResultadoVentanaMsg:
+        """
+        Incorpora lo recibido, avanza hasta `ventana.hasta` y recolecta fósiles.
+
+        Args:
+            ventana: Entradas del borde, tick objetivo y GVT
+
+        Returns:
+            Envíos (o correcciones) del borde y contadores por tick
+        """
+        self.recibir(ventana.llegadas, ventana.creditos)
+        llegadas, creditos, desde, contadores, detalle = self.avanzar_hasta(ventana.hasta)
+        self.recolectar(ventana.gvt)
+        return ResultadoVentanaMsg(
+            llegadas=llegadas, creditos=creditos, contadores=contadores, observada=detalle,
+            desde=desde, ahora=self.ahora, retrocesos=self.retrocesos,
+        )
+
+
+def worker_region(
+    indice: int,
+    conexion: Connection,
+    config,
+    red: RedVial,
+    region: List[int],
+    observada: Optional[int] = None,
+):
+    """
+    Función worker que simula una región de la red en un proceso separado.
+
+    Args:
+        indice: Índice de la región
+        conexion: Extremo del Pipe dúplex exclusivo de este worker
+        config: ConfiguracionSimulacion (usa `sincronizacion` e `intervalo_checkpoint`)
+        red: Red completa (la región solo simula sus intersecciones)
+        region: Intersecciones de la región
+        observada: Intersección observada, si pertenece a la región
+    """
+    engine = NetworkEngine(config, red, region)
+    engine.start()
+    if config.sincronizacion == "optimista":
+        simulador = RegionOptimista(engine, observada, config.intervalo_checkpoint)
+    else:
+        simulador = RegionConservadora(engine, observada)
+    try:
+        _bucle_region(indice, conexion, simulador)
+    finally:
+        engine.stop()
+        conexion.close()
+
+
+def _bucle_region(indice, conexion, simulador):
+    """Atiende comandos hasta recibir DETENER o hasta que se cierre el Pipe."""
+    while True:
+        try:
+            comando: Comando = conexion.recv()
+        except (EOFError, OSError):
+            break
+
+        def responder(tipo: TipoRespuesta, payload=None, exito: bool = True) -> None:
+            conexion.send(Respuesta(
+                tipo=tipo, via=str(indice), payload=payload, exito=exito,
+                tick=comando.tick, secuencia=comando.secuencia,
+            ))
+
+        try:
+            if comando.tipo == TipoComando.DETENER:
+                break
+
+            elif comando.tipo == TipoComando.VENTANA:
+                responder(TipoRespuesta.RESULTADO_VENTANA, simulador.procesar(comando.payload))
+
+            elif comando.tipo == TipoComando.OBTENER_ESTADO:
+                # Estadísticas parciales de la región, para combinarlas
+                responder(TipoRespuesta.ESTADO_REGION, simulador.engine.stats)
+
+            else:
+                responder(TipoRespuesta.ERROR, f"Comando no soportado: {comando.tipo.name}", exito=False)
+
+        except Exception as e:
+            responder(TipoRespuesta.ERROR, str(e), exito=False)
+
+
+class PartitionedNetworkEngine(BaseEngine):
+    """
+    Engine de red con una región por proceso.
+
+    - RedVial.particionar reparte las intersecciones en regiones conexas de
+      tamaño parejo cortando pocos enlaces; cada worker simula su región con
+      un NetworkEngine
+    - Vehículos y créditos tardan al menos el menor `tiempo_viaje` de los
+      enlaces cortados (lookahead) en afectar a otra región, así que cada
+      worker avanza ese número de ticks (una ventana) sin esperar a nadie
+    - Al cierre de cada ventana cada worker devuelve un único mensaje con los
+      triples (enlace, tick, cantidad) que salieron por el borde; el proceso
+      principal los agrupa por región de destino y los entrega con la
+      ventana siguiente
+    - Por cada tick de la ventana los workers devuelven sus contadores
+      acumulados (y el dueño de la intersección observada, sus colas), de
+      modo que `step` sigue entregando un TrafficState por tick
+    - Las estadísticas completas se combinan bajo demanda, como en el engine
+      multiprocessing
+    - Con `config.nodos`, las regiones corren en otros hosts (CoordinadorNodos)
+    - Con `config.hilos`, cada región reparte su tick en un pool de hilos
+      (ver NetworkEngine): procesos y hilos se configuran por separado
+
+    Con `config.sincronizacion = "optimista"` no hay ventanas comunes: cada
+    región (RegionOptimista) avanza hasta `adelanto_maximo` ticks por delante
+    del GVT y retrocede si recibe un rezagado. El proceso principal atiende a
+    cada worker en cuanto responde, le reenvía lo que le corresponde y
+    recalcula el GVT (mínimo entre el tick de cada región y la llegada de lo
+    que aún no entregó); `step` solo consume ticks ya confirmados por el GVT.
+
+    Con la misma semilla los resultados coinciden con los de NetworkEngine.
+    """
+
+    def __init__(self, config, red: RedVial = None):
+        """
+        Inicializa el engine.
+
+        Args:
+            config: ConfiguracionSimulacion (usa `red` y `regiones`)
+            red: Red a simular. Por defecto, la de la configuración o
+                num_intersecciones intersecciones sin enlaces.
+        """
+        self.config = config
+        self._running = False
+        self.red = red or RedVial.desde_config(config) or RedVial(max(1, config.num_intersecciones), [])
+        self.num_intersecciones = self.red.num_intersecciones
+        self.interseccion_observada = config.interseccion_observada
+        if not 0 <= self.interseccion_observada < self.num_intersecciones:
+            raise IndexError(
+                f"Intersección {self.interseccion_observada} fuera de rango (0..{self.num_intersecciones - 1})"
+            )
+
+        if config.sincronizacion not in SINCRONIZACIONES:
+            raise ValueError(
+                f"Sincronización inválida: {config.sincronizacion}. Use {', '.join(SINCRONIZACIONES)}"
+            )
+        self.optimista = config.sincronizacion == "optimista"
+
+        # Partición y lookahead
+        self.asignacion = self.red.particionar(config.regiones or os.cpu_count() or 1)
+        self.num_regiones = max(self.asignacion) + 1
+        self.enlaces_cortados = self.red.enlaces_de_corte(self.asignacion)
+        self.ventana = min((self.red.tiempo_viaje[e] for e in self.enlaces_cortados), default=VENTANA_MAXIMA)
+        self._region_destino = array("l", (self.asignacion[d] for d in self.red.destino))
+        self._region_origen = array("l", (
+            self.asignacion[carril // VIAS_POR_INTERSECCION] for carril in self.red.carril_origen
+        ))
+
+        # Componentes del dominio (proceso principal)
+        self.controlador: ControladorTrafico = None
+        self.reloj = RelojSimulacion()
+        self.stats = EstadisticasTrafico()
+        self.flujos = FlujosAleatorios.desde_config(config)
+        self.semilla = self.flujos.semilla_maestra
+
+        # Comunicación multiproceso
+        self.conexiones: Dict[int, Connection] = {}
+        self.procesos: Dict[int, mp.Process] = {}
+        self.coordinador: Optional[CoordinadorNodos] = None
+        self._secuencia = 0
+        self._horizonte: Optional[int] = (
+            config.ciclos_minimos * config.duracion_ciclo if config.headless else None
+        )
+
+        # Ticks simulados por las regiones y aún no consumidos por step
+        self._por_tick: Deque[Tuple[tuple, tuple]] = deque()
+        self._entrantes: Dict[int, VentanaMsg] = {}
+        self._contadores = (0,) * CONTADORES_POR_TICK
+        self._observada = (0,) * CAMPOS_OBSERVADA
+        self._tick_estadisticas = -1
+
+        # Sincronización optimista: cada región vista desde el proceso principal
+        self._gvt = 0
+        self._confirmado = 0  # Último tick pasado a _por_tick
+        self._ahora_region: Dict[int, int] = {}
+        self._cota_region: Dict[int, int] = {}  # Tick por debajo del cual la región ya no retrocede
+        self._en_curso: Dict[int, int] = {}  # Secuencia del VENTANA sin responder de cada región
+        self._contadores_region: Dict[int, Dict[int, tuple]] = {}
+        self._observada_por_tick: Dict[int, tuple] = {}
+        self._retrocesos: Dict[int, int] = {}
+
+        self._eventos_tick: List[Dict] = []
+        self._luces_observadas: Dict[str, str] = {}
+
+    def start(self) -> None:
+        """Crea un proceso (y un Pipe) por región, localmente o en los nodos de `config.nodos`."""
+        if self._running:
+            return
+
+        self.controlador = ControladorTrafico(
+            programa=ProgramaSemaforico.desde_config(self.config),
+        )
+        ciclo = self.controlador.duracion_ciclo
+        self._desfase_observada = self.interseccion_observada * self.config.desfase_intersecciones % ciclo
+
+        # Todas las regiones usan la misma semilla maestra, aunque la configuración no fije una
+        config = replace(self.config, semilla=self.semilla)
+        regiones: List[List[int]] = [[] for _ in range(self.num_regiones)]
+        for interseccion, region in enumerate(self.asignacion):
+            regiones[region].append(interseccion)
+
+        workers = {}
+        for indice, region in enumerate(regiones):
+            observada = self.interseccion_observada if self.asignacion[self.interseccion_observada] == indice else None
+            workers[indice] = (indice, config, self.red, region, observada)
+            self._entrantes[indice] = VentanaMsg(hasta=0)
+            self._ahora_region[indice] = self._cota_region[indice] = 0
+            self._contadores_region[indice] = {}
+            self._retrocesos[indice] = 0
+        if self.config.nodos:
+            self.coordinador = CoordinadorNodos(self.config.nodos)
+        self.conexiones, self.procesos = iniciar_workers(worker_region, workers, self.coordinador)
+
+        self._luces_observadas = self._luces(0)
+        self._running = True
+
+    def step(self) -> TrafficState:
+        """
+        Avanza un tick; si las regiones no lo simularon todavía, corre una ventana.
+
+        Returns:
+            TrafficState de la intersección observada
+        """
+        if not self._running:
+            raise RuntimeError("Engine no está corriendo.")
+
+        self.controlador.avanzar_tick()
+        tick = self.reloj.avanzar()
+        if not self._por_tick:
+            if self.optimista:
+                self._avanzar_optimista(tick)
+            else:
+                self._correr_ventana(tick)
+        self._contadores, self._observada = self._por_tick.popleft()
+
+        self._eventos_tick = []
+        luces = self._luces(tick)
+        for via, color in luces.items():
+            if self._luces_observadas.get(via) != color:
+                self._eventos_tick.append({
+                    "tipo": "cambio_semaforo", "via": via,
+                    "color_anterior": self._luces_observadas.get(via), "color_nuevo": color,
+                })
+        self._luces_observadas = luces
+
+        return self._construir_estado()
+
+    def _fin_ventana(self, desde: int) -> int:
+        """
+        Calcula el último tick de la ventana que empieza en `desde`.
+
+        La ventana dura el lookahead, no pasa del horizonte de una corrida
+        headless y, si la corrida puede terminar por convergencia, tampoco
+        cruza el cierre de un ciclo (para no simular ticks de más).
+        """
+        hasta = desde + self.ventana - 1
+        if self.config.tolerancia_relativa is not None:
+            ciclo = self.controlador.duracion_ciclo
+            hasta = min(hasta, ((desde - 1) // ciclo + 1) * ciclo)
+        if self._horizonte is not None:
+            hasta = max(desde, min(hasta, self._horizonte))
+        return hasta
+
+    def _correr_ventana(self, desde: int) -> None:
+        """
+        Avanza todas las regiones una ventana e intercambia lo que cruzó el borde.
+
+        Args:
+            desde: Primer tick de la ventana
+        """
+        hasta = self._fin_ventana(desde)
+        pendientes = {}
+        for indice, ventana in self._entrantes.items():
+            ventana.hasta = hasta
+            pendientes[indice] = self._enviar(indice, TipoComando.VENTANA, ventana, tick=desde)
+        self._entrantes = {indice: VentanaMsg(hasta=hasta) for indice in self.conexiones}
+
+        ticks = hasta - desde + 1
+        contadores = [[0] * CONTADORES_POR_TICK for _ in range(ticks)]
+        observada = None
+        for resp in self._esperar_respuestas(pendientes, TipoRespuesta.RESULTADO_VENTANA):
+            resultado: ResultadoVentanaMsg = resp.payload
+            self._enrutar(resultado)
+            valores = resultado.contadores
+            for t in range(ticks):
+                fila = contadores[t]
+                for c in range(CONTADORES_POR_TICK):
+                    fila[c] += valores[t * CONTADORES_POR_TICK + c]
+            if resultado.observada is not None:
+                observada = resultado.observada
+
+        for t in range(ticks):
+            self._por_tick.append((
+                tuple(contadores[t]),
+                tuple(observada[t * CAMPOS_OBSERVADA:(t + 1) * CAMPOS_OBSERVADA]),
+            ))
+
+    def _enrutar(self, resultado: ResultadoVentanaMsg) -> None:
+        """Agrupa los vehículos y créditos que salieron de una región por región de destino."""
+        llegadas = resultado.llegadas
+        for k in range(0, len(llegadas), 3):
+            self._entrantes[self._region_destino[llegadas[k]]].llegadas.extend(llegadas[k:k + 3])
+        creditos = resultado.creditos
+        for k in range(0, len(creditos), 3):
+            self._entrantes[self._region_origen[creditos[k]]].creditos.extend(creditos[k:k + 3])
+
+    def _primera_llegada(self, ventana: VentanaMsg) -> Optional[int]:
+        """Retorna el primer tick de llegada de lo que lleva una ventana (None si está vacía)."""
+        tiempos = self.red.tiempo_viaje
+        return min(
+            (
+                triples[k + 1] + tiempos[triples[k]]
+                for triples in (ventana.llegadas, ventana.creditos)
+                for k in range(0, len(triples), 3)
+            ),
+            default=None,
+        )
+
+    def _lanzar_optimista(self, indice: int, hasta: int) -> None:
+        """Envía a una región lo que tiene pendiente y el tick hasta el que puede avanzar."""
+        ventana = self._entrantes[indice]
+        self._entrantes[indice] = VentanaMsg(hasta=0)
+        ventana.hasta = hasta
+        # get_state puede hacer volver a las regiones al tick de step, que queda detrás del GVT
+        ventana.gvt = min(self._gvt, self.reloj.ahora)
+        primera = self._primera_llegada(ventana)
+        cota = min(self._ahora_region[indice], hasta)
+        if primera is not None:
+            cota = min(cota, primera - 1)
+        self._cota_region[indice] = cota
+        self._en_curso[indice] = self._enviar(indice, TipoComando.VENTANA, ventana, tick=hasta)
+
+    def _registrar_optimista(self, respuestas: List[Respuesta]) -> None:
+        """Enruta lo que enviaron las regiones y guarda sus contadores por tick."""
+        for resp in respuestas:
+            indice = int(resp.via)
+            resultado: ResultadoVentanaMsg = resp.payload
+            del self._en_curso[indice]
+            self._enrutar(resultado)
+            self._ahora_region[indice] = self._cota_region[indice] = resultado.ahora
+            self._retrocesos[indice] = resultado.retrocesos
+
+            # Los ticks re-simulados reemplazan a los anteriores
+            por_tick = self._contadores_region[indice]
+            valores, observada = resultado.contadores, resultado.observada
+            for k, t in enumerate(range(resultado.desde, resultado.ahora + 1)):
+                if t <= self._confirmado:
+                    continue
+                por_tick[t] = tuple(valores[k * CONTADORES_POR_TICK:(k + 1) * CONTADORES_POR_TICK])
+                if observada is not None:
+                    self._observada_por_tick[t] = tuple(observada[k * CAMPOS_OBSERVADA:(k + 1) * CAMPOS_OBSERVADA])
+
+    def _calcular_gvt(self) -> int:
+        """
+        Calcula el tiempo virtual global.
+
+        Es el menor entre la cota de cada región (su tick, o la llegada de lo
+        que se le acaba de enviar menos uno) y la llegada menos uno de lo
+        que el proceso principal aún no entregó. Nada puede hacer retroceder
+        a una región hasta ese tick.
+        """
+        gvt = min(self._cota_region.values())
+        for ventana in self._entrantes.values():
+            primera = self._primera_llegada(ventana)
+            if primera is not None:
+                gvt = min(gvt, primera - 1)
+        return gvt
+
+    def _avanzar_optimista(self, tick: int) -> None:
+        """
+        Deja correr las regiones hasta que el GVT alcance `tick` y confirma los ticks alcanzados.
+
+        Cada región que responde recibe de inmediato su siguiente trabajo: no
+        espera a las demás.
+
+        Args:
+            tick: Tick que step necesita confirmado
+        """
+        while self._gvt < tick:
+            limite = self._gvt + max(1, self.config.adelanto_maximo)
+            if self._horizonte is not None:
+                limite = max(tick, min(limite, self._horizonte))
+            for indice in self.conexiones:
+                if indice in self._en_curso:
+                    continue
+                ahora = self._ahora_region[indice]
+                hasta = max(ahora, min(ahora + self.ventana, limite))
+                ventana = self._entrantes[indice]
+                if hasta > ahora or ventana.llegadas or ventana.creditos:
+                    self._lanzar_optimista(indice, hasta)
+
+            if not self._en_curso:
+                raise RuntimeError(f"La simulación optimista no avanza (GVT={self._gvt}, tick {tick})")
+            self._registrar_optimista(self._esperar_respuestas(
+                dict(self._en_curso), TipoRespuesta.RESULTADO_VENTANA, minimo=1,
+            ))
+            self._gvt = self._calcular_gvt()
+
+        for t in range(self._confirmado + 1, self._gvt + 1):
+            contadores = [0] * CONTADORES_POR_TICK
+            for por_tick in self._contadores_region.values():
+                for c, valor in enumerate(por_tick.pop(t)):
+                    contadores[c] += valor
+            self._por_tick.append((tuple(contadores), self._observada_por_tick.pop(t)))
+        self._confirmado = self._gvt
+
+    def _sincronizar_optimista(self) -> None:
+        """Lleva todas las regiones exactamente al tick actual (retrocediendo las adelantadas)."""
+        if self._en_curso:
+            self._registrar_optimista(self._esperar_respuestas(
+                dict(self._en_curso), TipoRespuesta.RESULTADO_VENTANA,
+            ))
+        for indice in self.conexiones:
+            self._lanzar_optimista(indice, self.reloj.ahora)
+        self._registrar_optimista(self._esperar_respuestas(
+            dict(self._en_curso), TipoRespuesta.RESULTADO_VENTANA,
+        ))
+
+    def _enviar(self, indice: int, tipo: TipoComando, payload=None, tick: int = None) -> int:
+        """
+        Envía un comando al worker de una región.
+
+        Returns:
+            Secuencia asignada, que la respuesta debe devolver
+        """
+        self._secuencia += 1
+        try:
+            self.conexiones[indice].send(Comando(
+                tipo=tipo, via=str(indice), payload=payload, tick=tick, secuencia=self._secuencia,
+            ))
+        except (BrokenPipeError, OSError) as e:
+            raise RuntimeError(f"El worker de la región {indice} no está disponible") from e
+        return self._secuencia
+
+    def _esperar_respuestas(
+        self, pendientes: Dict[int, int], tipo_esperado: TipoRespuesta, minimo: Optional[int] = None
+    ) -> List[Respuesta]:
+        """Espera las respuestas de las regiones (ver esperar_respuestas)."""
+        if self.coordinador is not None:
+            return self.coordinador.esperar_respuestas(pendientes, tipo_esperado, minimo)
+        return esperar_respuestas(pendientes, self.conexiones, self.procesos, tipo_esperado, minimo)
+
+    def _fusionar_estadisticas(self) -> None:
+        """
+        Combina las estadísticas parciales de las regiones.
+
+        Con sincronización conservadora, si las regiones van adelantadas
+        (step en medio de una ventana), el resultado incluye los ticks ya
+        simulados de esa ventana. Con la optimista, las regiones vuelven
+        antes al tick actual.
+        """
+        if self.optimista:
+            self._sincronizar_optimista()
+        pendientes = {
+            indice: self._enviar(indice, TipoComando.OBTENER_ESTADO, True, tick=self.reloj.ahora)
+            for indice in self.conexiones
+        }
+        respuestas = self._esperar_respuestas(pendientes, TipoRespuesta.ESTADO_REGION)
+        self.stats = EstadisticasTrafico.fusionar(resp.payload for resp in respuestas)
+        self._tick_estadisticas = self.reloj.ahora
+
+    def _luces(self, tick: int) -> Dict[str, str]:
+        """Retorna el color de cada vía de la intersección observada en un tick."""
+        plan = self.controlador.plan_en_tick((self._desfase_observada + tick) % self.controlador.duracion_ciclo)
+        return {via.name: color.name for via, color in plan.items()}
+
+    def _construir_estado(self) -> TrafficState:
+        """Construye el TrafficState de la intersección observada."""
+        tick = self.reloj.ahora
+        ciclo = self.controlador.duracion_ciclo
+        cruzados_red, espera_red, salidas, en_cola, en_transito = self._contadores
+
+        observada = self._observada
+        vias = VIAS_POR_INTERSECCION
+        cruzados = {via.name: observada[vias + slot] for slot, via in enumerate(Via)}
+        total = sum(cruzados.values())
+        espera = observada[2 * vias]
+
+        red = self.stats.get_resumen()
+        red.update({
+            # Contadores exactos del tick; la distribución, de la última combinación
+            "total_vehiculos": cruzados_red,
+            "tiempo_espera_total": espera_red,
+            "tiempo_espera_promedio": round(espera_red / cruzados_red, 3) if cruzados_red else 0.0,
+            "cruces": cruzados_red,
+            "salidas_red": salidas,
+            "en_transito": en_transito,
+            "en_cola": en_cola,
+        })
+
+        return TrafficState(
+            tick=tick,
+            ciclo=(tick + self._desfase_observada) // ciclo,
+            fase=self.controlador.timing_en_tick((self._desfase_observada + tick) % ciclo)["fase_actual"],
+            luces=self._luces(tick),
+            colas={via.name: observada[slot] for slot, via in enumerate(Via)},
+            estadisticas={
+                "interseccion": self.interseccion_observada,
+                "total_vehiculos": total,
+                "tiempo_espera_promedio": round(espera / total, 3) if total else 0.0,
+                "tiempo_espera_total": espera,
+                "vehiculos_por_via": cruzados,
+                "red": red,
+            },
+            info_sistema={
+                "motor": "Red particionada (multiprocessing)",
+                "python_version": f"{sys.version_info.major}.{sys.version_info.minor}",
+                "intersecciones": self.num_intersecciones,
+                "enlaces": self.red.num_enlaces,
+                "regiones": self.num_regiones,
+                "hilos_por_region": max(1, self.config.hilos or 1),
+                "enlaces_cortados": len(self.enlaces_cortados),
+                "ventana": self.ventana,
+                "sincronizacion": self.config.sincronizacion,
+                "retrocesos": sum(self._retrocesos.values()),
+                "procesos_activos": (
+                    sum(1 for p in self.procesos.values() if p.is_alive())
+                    if self.coordinador is None else self.coordinador.workers
+                ),
+                "nodos": len(self.config.nodos) if self.config.nodos else 0,
+            },
+            vehiculos_detalle={via.name: [] for via in Via},
+            vehiculos_en_transito={},
+            eventos_tick={"eventos": self._eventos_tick},
+            timing_fase=self.controlador.timing_en_tick((self._desfase_observada + tick) % ciclo),
+            configuracion={
+                "duracion_verde": self.config.duracion_verde,
+                "duracion_amarillo": self.config.duracion_amarillo,
+                "capacidad_cruce": self.config.capacidad_cruce_por_tick,
+                "probabilidad_llegada": self.config.probabilidad_llegada,
+                "intervalo_tick": self.config.intervalo_tick,
+            },
+        )
+
+    def get_state(self) -> TrafficState:
+        """
+        Obtiene el estado actual sin avanzar.
+
+        Solo se consulta a los workers si las estadísticas combinadas no
+        corresponden al tick actual.
+        """
+        if self._running and self._tick_estadisticas != self.reloj.ahora:
+            self._fusionar_estadisticas()
+        return self._construir_estado()
+
+    def stop(self) -> None:
+        """Detiene el engine y todos los procesos."""
+        if not self._running:
+            return
+
+        for indice in self.conexiones:
+            try:
+                self._enviar(indice, TipoComando.DETENER)
+            except RuntimeError:
+                pass  # El worker ya terminó
+
+        for proceso in self.procesos.values():
+            proceso.join(timeout=2)
+            if proceso.is_alive():
+                proceso.terminate()
+
+        for conexion in self.conexiones.values():
+            conexion.close()
+
+        if self.coordinador is not None:
+            self.coordinador.cerrar()
+            self.coordinador = None
+
+        self._running = False
+
+    def is_running(self) -> bool:
+        """Verifica si está corriendo."""
+        return self._running
+
+    def __repr__(self) -> str:
+        return (
+            f"PartitionedNetworkEngine(running={self._running}, regiones={self.num_regiones}, "
+            f"ventana={self.ventana})"
+        )
@@ -3,7 +3,6 @@ Engine basado en hilos (threading).
 Ejecuta semáforos como hilos compartiendo memoria.
 """
 import threading
-import random
 from typing import Dict, List
 from time import sleep
 
@@ -12,9 +11,13 @@ from ..comms.messages import *
 from ...core.common.tipos import Via, Color
 from ...core.common.state import TrafficState
 from ...core.common.stats import EstadisticasTrafico
+from ...core.common.semillas import FlujosAleatorios
+from ...core.common.reloj import RelojSimulacion
 from ...core.traffic.semaforo import Semaforo
 from ...core.traffic.controlador import ControladorTrafico
-from ...core.models.vehiculo import Vehiculo
+from ...core.traffic.programa import ProgramaSemaforico
+from ...core.traffic.llegadas import GeneradorLlegadas
+from ...core.models.almacen import AlmacenVehiculos
 
 
 class ThreadingEngine(BaseEngine):
@@ -24,6 +27,8 @@ class ThreadingEngine(BaseEngine):
     - Cada semáforo ejecuta en su su propio hilo (threading.Thread)
     - Usa Barrier para sincronización estricta de ticks
     - Memoria compartida protegida por RLock
+    - Cada hilo genera las llegadas de su vía con un flujo aleatorio propio,
+      derivado de la semilla maestra
     """
 
     def __init__(self, config):
@@ -38,37 +43,53 @@ class ThreadingEngine(BaseEngine):
         
         self.controlador: ControladorTrafico = None
         self.semaforos: Dict[Via, Semaforo] = {}
+        self.generadores: Dict[Via, GeneradorLlegadas] = {}
+        self.reloj = RelojSimulacion()
+        self.almacen = AlmacenVehiculos()  # Compartido por todos los semáforos
         self.stats = EstadisticasTrafico()
-        self._next_vehicle_id = 0
+        self.flujos = FlujosAleatorios.desde_config(config)  # Subflujos con nombre, comunes entre engines
+        self.semilla = self.flujos.semilla_maestra
         self._eventos_tick: List[Dict] = []
         self._vehiculos_en_transito: Dict[Via, List[Dict]] = {}
 
     def _worker_semaforo(self, via: Via):
         semaforo = self.semaforos[via]
-        print(f"[THREAD] Iniciado hilo para {via.name}")
+        generador = self.generadores[via]
+        if not self.config.headless:
+            print(f"[THREAD] Iniciado hilo para {via.name}")
         
         while self._running:
             try:
                 # 1. Esperar a que el hilo principal inicie el tick
                 self._barrier.wait(timeout=5)
                 
-                # 2. Realizar el trabajo del semáforo
+                # 2. Realizar el trabajo del semáforo: llegadas y despacho
+                llegadas = generador.generar()
+                for vehiculo_id in llegadas:
+                    semaforo.agregar_vehiculo(vehiculo_id)
                 vehiculos_cruzados = semaforo.tick()
                 
-                if vehiculos_cruzados:
+                if llegadas or vehiculos_cruzados:
                     with self._lock:
-                        self.stats.registrar_vehiculos(vehiculos_cruzados, via.name)
-                        for idx, vehiculo in enumerate(vehiculos_cruzados):
+                        for vehiculo_id in llegadas:
+                            self._eventos_tick.append({
+                                "tipo": "vehiculo_llego", "via": via.name,
+                                "vehiculo_id": vehiculo_id, "icono": "🚗→"
+                            })
+                        self.stats.registrar_vehiculos(self.almacen, vehiculos_cruzados, via.name)
+                        for idx, indice in enumerate(vehiculos_cruzados):
+                            vehiculo_id = self.almacen.id_vehiculo(indice)
                             progreso = (idx + 1) / len(vehiculos_cruzados)
                             if via not in self._vehiculos_en_transito:
                                 self._vehiculos_en_transito[via] = []
                             self._vehiculos_en_transito[via].append({
-                                "id": vehiculo.id, "progreso": progreso
+                                "id": vehiculo_id, "progreso": progreso
                             })
                             self._eventos_tick.append({
                                 "tipo": "vehiculo_despachado", "via": via.name,
-                                "vehiculo_id": vehiculo.id, "icono": "🚗✓"
+                                "vehiculo_id": vehiculo_id, "icono": "🚗✓"
                             })
+                        self.almacen.liberar(vehiculos_cruzados)
 
                 # 3. Esperar a que todos terminen para cerrar el tick
                 self._barrier.wait(timeout=5)
@@ -84,11 +105,18 @@ class ThreadingEngine(BaseEngine):
             if self._running: return
             self._running = True
             self.controlador = ControladorTrafico(
-                duracion_verde=self.config.duracion_verde,
-                duracion_amarillo=self.config.duracion_amarillo,
+                programa=ProgramaSemaforico.desde_config(self.config),
             )
-            for via in Via:
-                self.semaforos[via] = Semaforo(via=via, capacidad_por_tick=self.config.capacidad_cruce_por_tick)
+            for slot, via in enumerate(Via):
+                self.semaforos[via] = Semaforo(
+                    via=via, capacidad_por_tick=self.config.capacidad_cruce_por_tick,
+                    reloj=self.reloj, almacen=self.almacen,
+                )
+                self.generadores[via] = GeneradorLlegadas.para_via(
+                    via.name, slot, len(Via), self.config.probabilidad_llegada, self.semilla,
+                    distribucion=self.config.distribucion_llegadas,
+                    max_por_tick=self.config.max_llegadas_por_tick,
+                )
                 thread = threading.Thread(target=self._worker_semaforo, args=(via,), daemon=True)
                 self._threads[via] = thread
                 thread.start()
@@ -102,11 +130,10 @@ class ThreadingEngine(BaseEngine):
             self._vehiculos_en_transito = {}
             
             plan = self.controlador.avanzar_tick()
+            self.reloj.avanzar()
             for via, color in plan.items():
                 self.semaforos[via].set_color(color)
             
-            self._simular_llegada_vehiculos()
-            
         # Sincronización fuera del bloqueo para EVITAR DEADLOCK
         # Los hilos worker necesitan el lock para registrar vehículos antes de llegar a la barrera
         try:
@@ -121,17 +148,6 @@ class ThreadingEngine(BaseEngine):
         with self._lock:
             return self._construir_estado()
 
-    def _simular_llegada_vehiculos(self) -> None:
-        for via, semaforo in self.semaforos.items():
-            if random.random() < self.config.probabilidad_llegada:
-                vehiculo = Vehiculo(id=self._next_vehicle_id)
-                self._next_vehicle_id += 1
-                semaforo.agregar_vehiculo(vehiculo)
-                self._eventos_tick.append({
-                    "tipo": "vehiculo_llego", "via": via.name,
-                    "vehiculo_id": vehiculo.id, "icono": "🚗→"
-                })
-
     def _construir_estado(self) -> TrafficState:
         import sys
         info_sistema = {
@@ -148,7 +164,11 @@ class ThreadingEngine(BaseEngine):
             colas={v.name: s.tamano_cola for v, s in self.semaforos.items()},
             estadisticas=self.stats.get_resumen(),
             info_sistema=info_sistema,
-            vehiculos_detalle={v.name: s.get_vehiculos_detalle() for v, s in self.semaforos.items()},
+            # En headless no se arma el detalle de colas (como en multiprocessing)
+            vehiculos_detalle={
+                v.name: [] if self.config.headless else s.get_vehiculos_detalle()
+                for v, s in self.semaforos.items()
+            },
             vehiculos_en_transito={v.name: t for v, t in self._vehiculos_en_transito.items()},
             eventos_tick={"eventos": self._eventos_tick},
             timing_fase=self.controlador.get_timing_fase(),
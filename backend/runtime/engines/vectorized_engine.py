@@ -0,0 +1,468 @@
+"""
+Engine vectorizado (struct-of-arrays).
+Simula N intersecciones a la vez guardando su estado en arreglos por columna;
+con NumPy instalado, cada tick es un conjunto de operaciones sobre arreglos completos.
+"""
+import sys
+from array import array
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él, el tick recorre las intersecciones en Python
+    np = None
+
+from .base import BaseEngine
+from ...core.common.tipos import Via
+from ...core.common.state import TrafficState
+from ...core.common.stats import EstadisticasTrafico
+from ...core.common.semillas import COMPONENTE_LLEGADAS, FlujosAleatorios
+from ...core.common.reloj import RelojSimulacion
+from ...core.traffic.controlador import ControladorTrafico
+from ...core.traffic.programa import ProgramaSemaforico
+from ...core.traffic.llegadas import BloquesIds, GeneradorLlegadas, TICKS_POR_BLOQUE
+from ...core.models.cohortes import CohortesCarriles
+
+VIAS_POR_INTERSECCION = len(Via)
+NOMBRES_VIA = tuple(via.name for via in Via)
+
+
+class VectorizedEngine(BaseEngine):
+    """
+    Engine que avanza N intersecciones por tick sin objetos por vehículo.
+
+    - Fase y temporizador de cada intersección: su posición dentro del ciclo,
+      en un `array('l')`; el plan de colores sale de una tabla precalculada
+      por posición
+    - Colas, vehículos cruzados y espera acumulada por carril
+      (intersección × vía) en `array('q')`
+    - Cada carril guarda cohortes [tick de llegada, cantidad] en lugar de
+      vehículos, de modo que las esperas se registran por grupo
+    - Estadísticas globales en un único EstadisticasTrafico; TrafficState se
+      construye bajo demanda para una intersección
+
+    Con NumPy (opcional), `step` avanza todas las intersecciones con
+    operaciones sobre arreglos: las columnas se leen a través de vistas de
+    NumPy sobre los mismos `array('q')`, las cohortes viven en un
+    CohortesCarriles y las llegadas de cada bloque de ticks se apilan en una
+    matriz ticks × carriles (cada carril conserva su flujo aleatorio, así que
+    el resultado es el mismo que sin NumPy). Sin NumPy, el tick recorre las
+    intersecciones en Python.
+
+    La intersección 0 usa los mismos flujos de llegadas que los engines de
+    una sola intersección, así que con N = 1 y la misma semilla los
+    resultados coinciden.
+    """
+
+    def __init__(self, config, usar_numpy: Optional[bool] = None):
+        """
+        Inicializa el engine.
+
+        Args:
+            config: ConfiguracionSimulacion (usa num_intersecciones,
+                interseccion_observada y desfase_intersecciones)
+            usar_numpy: Avanzar con operaciones de NumPy. None = si está instalado.
+        """
+        if usar_numpy and np is None:
+            raise ImportError("usar_numpy requiere NumPy")
+        self.usar_numpy = np is not None if usar_numpy is None else usar_numpy
+        self.config = config
+        self._running = False
+        self.num_intersecciones = max(1, config.num_intersecciones)
+        self.interseccion_observada = config.interseccion_observada
+
+        self.controlador: ControladorTrafico = None  # Reloj de fases de referencia (desfase 0)
+        self.reloj = RelojSimulacion()
+        self.stats = EstadisticasTrafico()
+        self.flujos = FlujosAleatorios.desde_config(config)  # Subflujos con nombre, comunes entre engines
+        self.semilla = self.flujos.semilla_maestra
+
+        # Columnas por intersección
+        self.posicion = array("l")   # Posición en el ciclo de fases
+        self.desfases = array("l")   # Desfase de cada intersección, en ticks
+
+        # Columnas por carril (intersección * 4 + vía)
+        self.cola = array("q")
+        self.cruzados = array("q")
+        self.espera_total = array("q")
+        self._cohortes: List[Deque[list]] = []
+        self._generadores: List[GeneradorLlegadas] = []
+
+        # Con NumPy: cohortes en matrices y llegadas del bloque de ticks actual
+        self._cohortes_np: Optional[CohortesCarriles] = None
+        self._carriles_llegadas = None   # Carriles con demanda externa (columnas del bloque)
+        self._bloque_llegadas = None     # Matriz ticks × carriles_llegadas
+        self._cursor_llegadas = TICKS_POR_BLOQUE
+
+        # Tablas por posición en el ciclo
+        self._plan_por_posicion: List[Dict[Via, str]] = []
+        self._verdes_por_posicion: List[tuple] = []
+        self._timing_por_posicion: List[dict] = []
+
+        self._eventos_tick: List[Dict] = []
+        self._luces_observadas: Dict[str, str] = {}
+
+    def start(self) -> None:
+        """Crea las columnas, las tablas de fases y los generadores de llegadas."""
+        if self._running:
+            return
+
+        self.controlador = ControladorTrafico(
+            programa=ProgramaSemaforico.desde_config(self.config),
+        )
+        self._construir_tablas()
+
+        n = self.num_intersecciones
+        ciclo = self.controlador.duracion_ciclo
+        self.desfases = array("l", (i * self.config.desfase_intersecciones % ciclo for i in range(n)))
+        self.posicion = array("l", self.desfases)
+
+        carriles = n * VIAS_POR_INTERSECCION
+        self.cola = array("q", [0]) * carriles
+        self.cruzados = array("q", [0]) * carriles
+        self.espera_total = array("q", [0]) * carriles
+        self._cohortes = [] if self.usar_numpy else [deque() for _ in range(carriles)]
+        self._generadores = [
+            self._crear_generador(i, slot, via)
+            for i in range(n)
+            for slot, via in enumerate(Via)
+        ]
+        if self.usar_numpy:
+            self._iniciar_numpy()
+
+        self._luces_observadas = self._luces(self.interseccion_observada)
+        self._running = True
+
+    def _construir_tablas(self) -> None:
+        """Precalcula plan, vías en verde y timing de fase para cada posición del ciclo."""
+        self._plan_por_posicion = []
+        self._verdes_por_posicion = []
+        self._timing_por_posicion = []
+
+        for posicion in range(self.controlador.duracion_ciclo):
+            plan = self.controlador.plan_en_tick(posicion)
+            self._plan_por_posicion.append({via: color.name for via, color in plan.items()})
+            self._verdes_por_posicion.append(tuple(
+                slot for slot, via in enumerate(Via) if plan[via].name == "VERDE"
+            ))
+            self._timing_por_posicion.append(self.controlador.timing_en_tick(posicion))
+
+    def _iniciar_numpy(self) -> None:
+        """Crea las tablas, las cohortes y las vistas que usa el tick con NumPy."""
+        carriles = len(self.cola)
+        self._verdes_np = np.array(
+            [[slot in verdes for slot in range(VIAS_POR_INTERSECCION)] for verdes in self._verdes_por_posicion],
+            dtype=bool,
+        )
+        self._todos_carriles = np.arange(carriles, dtype=np.int64)
+        self._carriles_llegadas = np.array(
+            [c for c, generador in enumerate(self._generadores) if generador is not None], dtype=np.int64,
+        )
+        self._bloque_llegadas = None
+        self._cursor_llegadas = TICKS_POR_BLOQUE
+        self._cohortes_np = CohortesCarriles(carriles)
+        self._vincular_columnas()
+
+    def _vincular_columnas(self) -> None:
+        """Crea vistas de NumPy sobre las columnas; hay que repetirlo si se reemplazan los arreglos."""
+        self._posicion_np = _vista(self.posicion)
+        self._cola_np = _vista(self.cola)
+        self._cruzados_np = _vista(self.cruzados)
+        self._espera_np = _vista(self.espera_total)
+
+    def _llegadas_del_tick(self):
+        """
+        Consume las llegadas del tick en todos los carriles con demanda externa.
+
+        Returns:
+            Fila del bloque: llegadas de cada carril de `_carriles_llegadas`
+        """
+        if self._cursor_llegadas == TICKS_POR_BLOQUE:
+            bloques = [
+                np.frombuffer(conteos, dtype=conteos.typecode)
+                for conteos in (self._generadores[c].tomar_bloque() for c in self._carriles_llegadas.tolist())
+            ]
+            if bloques:
+                matriz = np.stack(bloques, axis=1)
+                # Los conteos por tick son chicos: un tipo angosto reduce la matriz
+                self._bloque_llegadas = matriz.astype(np.min_scalar_type(int(matriz.max())))
+            else:
+                self._bloque_llegadas = np.zeros((TICKS_POR_BLOQUE, 0), dtype=np.uint8)
+            self._cursor_llegadas = 0
+        fila = self._bloque_llegadas[self._cursor_llegadas]
+        self._cursor_llegadas += 1
+        return fila
+
+    def _avanzar_fases_np(self, intersecciones=None) -> None:
+        """Avanza una posición en el ciclo de fases de las intersecciones (todas por defecto)."""
+        ciclo = self.controlador.duracion_ciclo
+        if intersecciones is None:
+            posicion = self._posicion_np
+            posicion += 1
+            posicion[posicion == ciclo] = 0
+        else:
+            posicion = self._posicion_np[intersecciones] + 1
+            posicion[posicion == ciclo] = 0
+            self._posicion_np[intersecciones] = posicion
+
+    def _encolar_np(self, tick: int, carriles, cantidades) -> int:
+        """
+        Suma llegadas a las colas y les abre una cohorte.
+
+        Args:
+            tick: Tick de llegada
+            carriles: Carriles sin repetir
+            cantidades: Llegadas de cada carril (pueden ser cero)
+
+        Returns:
+            Vehículos encolados
+        """
+        hay = cantidades > 0
+        if not hay.any():
+            return 0
+        carriles, cantidades = carriles[hay], cantidades[hay].astype(np.int64)
+        self._cola_np[carriles] += cantidades
+        self._cohortes_np.agregar(carriles, tick, cantidades)
+        return int(cantidades.sum())
+
+    def _en_verde_con_cola_np(self, carriles):
+        """Filtra los carriles que están en verde y tienen vehículos."""
+        posicion = self._posicion_np[carriles // VIAS_POR_INTERSECCION]
+        verdes = self._verdes_np[posicion, carriles % VIAS_POR_INTERSECCION]
+        return carriles[verdes & (self._cola_np[carriles] > 0)]
+
+    def _despachar_np(self, carriles, cantidades, tick: int, stats: EstadisticasTrafico) -> None:
+        """
+        Despacha vehículos de varios carriles a la vez y registra sus esperas.
+
+        Equivale a `_despachar` en cada carril, con las cantidades ya limitadas.
+
+        Args:
+            carriles: Carriles sin repetir
+            cantidades: Vehículos a despachar de cada uno
+            tick: Tick actual
+            stats: Estadísticas donde registrar las esperas
+        """
+        self._cola_np[carriles] -= cantidades
+        self._cruzados_np[carriles] += cantidades
+        grupos, esperas, vehiculos, espera_total = self._cohortes_np.despachar(carriles, cantidades, tick)
+        self._espera_np[carriles] += espera_total
+
+        # Un registro por combinación de vía y espera
+        claves, inverso = np.unique(esperas * VIAS_POR_INTERSECCION + grupos % VIAS_POR_INTERSECCION, return_inverse=True)
+        totales = np.bincount(inverso, weights=vehiculos).astype(np.int64)
+        for clave, total in zip(claves.tolist(), totales.tolist()):
+            espera, slot = divmod(clave, VIAS_POR_INTERSECCION)
+            stats.registrar_grupo(espera, total, NOMBRES_VIA[slot])
+
+    def _crear_generador(self, interseccion: int, slot: int, via: Via) -> GeneradorLlegadas:
+        """Crea el generador de un carril con su propio flujo aleatorio."""
+        if interseccion == 0:
+            semilla = self.flujos.semilla(COMPONENTE_LLEGADAS, via.name)
+        else:
+            semilla = self.flujos.semilla(COMPONENTE_LLEGADAS, str(interseccion), via.name)
+        return GeneradorLlegadas(
+            self.config.probabilidad_llegada,
+            semilla,
+            BloquesIds(slot, VIAS_POR_INTERSECCION),
+            distribucion=self.config.distribucion_llegadas,
+            max_por_tick=self.config.max_llegadas_por_tick,
+        )
+
+    def step(self) -> TrafficState:
+        """
+        Avanza un tick en todas las intersecciones.
+
+        Returns:
+            TrafficState de la intersección observada
+        """
+        if not self._running:
+            raise RuntimeError("Engine no está corriendo.")
+
+        self.controlador.avanzar_tick()
+        tick = self.reloj.avanzar()
+
+        if self.usar_numpy:
+            self._avanzar_np(tick)
+            self._registrar_cambios_observada()
+            return self._construir_estado(self.interseccion_observada)
+
+        ciclo = self.controlador.duracion_ciclo
+        posicion = self.posicion
+        cola = self.cola
+        cohortes = self._cohortes
+        generadores = self._generadores
+        verdes_por_posicion = self._verdes_por_posicion
+
+        for i in range(self.num_intersecciones):
+            # 1. Avanzar la fase
+            pos = posicion[i] + 1
+            if pos == ciclo:
+                pos = 0
+            posicion[i] = pos
+
+            # 2. Llegadas en los cuatro carriles
+            base = i * VIAS_POR_INTERSECCION
+            for carril in range(base, base + VIAS_POR_INTERSECCION):
+                llegadas = generadores[carril].contar()
+                if llegadas:
+                    cola[carril] += llegadas
+                    cohortes[carril].append([tick, llegadas])
+
+            # 3. Despacho en los carriles en verde
+            for slot in verdes_por_posicion[pos]:
+                if cola[base + slot]:
+                    self._despachar(base + slot, tick)
+
+        self._registrar_cambios_observada()
+        return self._construir_estado(self.interseccion_observada)
+
+    def _avanzar_np(self, tick: int) -> None:
+        """Avanza fases, llegadas y despacho de todas las intersecciones con NumPy."""
+        self._cohortes_np.reservar()
+        self._avanzar_fases_np()
+        self._encolar_np(tick, self._carriles_llegadas, self._llegadas_del_tick())
+        carriles = self._en_verde_con_cola_np(self._todos_carriles)
+        if carriles.size:
+            cantidades = np.minimum(self._cola_np[carriles], self.config.capacidad_cruce_por_tick)
+            self._despachar_np(carriles, cantidades, tick, self.stats)
+
+    def _registrar_cambios_observada(self) -> None:
+        """Registra los cambios de color de la intersección observada."""
+        self._eventos_tick = []
+        luces = self._luces(self.interseccion_observada)
+        for via, color in luces.items():
+            if self._luces_observadas.get(via) != color:
+                self._eventos_tick.append({
+                    "tipo": "cambio_semaforo", "via": via,
+                    "color_anterior": self._luces_observadas.get(via), "color_nuevo": color,
+                })
+        self._luces_observadas = luces
+
+    def _despachar(
+        self, carril: int, tick: int, maximo: int = None, stats: EstadisticasTrafico = None,
+    ) -> int:
+        """
+        Despacha hasta la capacidad de un carril en verde y registra las esperas.
+        
+        Args:
+            carril: Carril a despachar
+            tick: Tick actual
+            maximo: Límite adicional de vehículos (por ejemplo, espacio aguas abajo)
+            stats: Estadísticas donde registrar las esperas (por defecto, las del engine)
+            
+        Returns:
+            Vehículos despachados
+        """
+        restantes = min(self.config.capacidad_cruce_por_tick, self.cola[carril])
+        if maximo is not None:
+            restantes = min(restantes, maximo)
+        despachados = restantes
+        self.cola[carril] -= restantes
+        self.cruzados[carril] += restantes
+
+        if stats is None:
+            stats = self.stats
+        via = NOMBRES_VIA[carril % VIAS_POR_INTERSECCION]
+        cohortes = self._cohortes[carril]
+        while restantes:
+            cohorte = cohortes[0]
+            cantidad = min(cohorte[1], restantes)
+            espera = tick - cohorte[0]
+            self.espera_total[carril] += espera * cantidad
+            stats.registrar_grupo(espera, cantidad, via)
+            cohorte[1] -= cantidad
+            if not cohorte[1]:
+                cohortes.popleft()
+            restantes -= cantidad
+        return despachados
+
+    def _luces(self, interseccion: int) -> Dict[str, str]:
+        """Retorna el color de cada vía de una intersección."""
+        plan = self._plan_por_posicion[self.posicion[interseccion]]
+        return {via.name: color for via, color in plan.items()}
+
+    def _validar(self, interseccion: int) -> None:
+        """Verifica que la intersección exista."""
+        if not 0 <= interseccion < self.num_intersecciones:
+            raise IndexError(
+                f"Intersección {interseccion} fuera de rango (0..{self.num_intersecciones - 1})"
+            )
+
+    def _construir_estado(self, interseccion: int) -> TrafficState:
+        """Construye el TrafficState de una intersección."""
+        self._validar(interseccion)
+        base = interseccion * VIAS_POR_INTERSECCION
+        pos = self.posicion[interseccion]
+        tick = self.reloj.ahora
+
+        timing = self._timing_por_posicion[pos]
+
+        cruzados = {via.name: self.cruzados[base + slot] for slot, via in enumerate(Via)}
+        total = sum(cruzados.values())
+        espera = sum(self.espera_total[base:base + VIAS_POR_INTERSECCION])
+
+        return TrafficState(
+            tick=tick,
+            ciclo=(tick + self.desfases[interseccion]) // self.controlador.duracion_ciclo,
+            fase=timing["fase_actual"],
+            luces=self._luces(interseccion),
+            colas={via.name: self.cola[base + slot] for slot, via in enumerate(Via)},
+            estadisticas={
+                "interseccion": interseccion,
+                "total_vehiculos": total,
+                "tiempo_espera_promedio": round(espera / total, 3) if total else 0.0,
+                "tiempo_espera_total": espera,
+                "vehiculos_por_via": cruzados,
+                # Agregado de todas las intersecciones
+                "red": self.stats.get_resumen(),
+            },
+            info_sistema={
+                "motor": "Vectorizado (NumPy)" if self.usar_numpy else "Vectorizado (struct-of-arrays)",
+                "python_version": f"{sys.version_info.major}.{sys.version_info.minor}",
+                "intersecciones": self.num_intersecciones,
+                "carriles": len(self.cola),
+            },
+            vehiculos_detalle={via.name: [] for via in Via},
+            vehiculos_en_transito={},
+            eventos_tick={"eventos": self._eventos_tick if interseccion == self.interseccion_observada else []},
+            timing_fase=dict(timing),
+            configuracion={
+                "duracion_verde": self.config.duracion_verde,
+                "duracion_amarillo": self.config.duracion_amarillo,
+                "capacidad_cruce": self.config.capacidad_cruce_por_tick,
+                "probabilidad_llegada": self.config.probabilidad_llegada,
+                "intervalo_tick": self.config.intervalo_tick,
+            },
+        )
+
+    def get_state(self, interseccion: int = None) -> TrafficState:
+        """
+        Obtiene el estado de una intersección sin avanzar.
+
+        Args:
+            interseccion: Intersección a observar. Por defecto, la configurada.
+
+        Returns:
+            TrafficState de esa intersección
+        """
+        if interseccion is None:
+            interseccion = self.interseccion_observada
+        return self._construir_estado(interseccion)
+
+    def stop(self) -> None:
+        """Detiene el engine (no hay hilos ni procesos que liberar)."""
+        self._running = False
+
+    def is_running(self) -> bool:
+        """Verifica si está corriendo."""
+        return self._running
+
+    def __repr__(self) -> str:
+        return f"VectorizedEngine(running={self._running}, intersecciones={self.num_intersecciones})"
+
+
+def _vista(columna: array):
+    """Retorna una vista de NumPy que comparte la memoria de un `array`."""
+    return np.frombuffer(columna, dtype=columna.typecode)
@@ -0,0 +1,90 @@
+"""
+Tests para el almacén columnar de vehículos.
+Verifica asignación de filas, crecimiento, reutilización y cálculo de esperas.
+"""
+import threading
+
+from backend.core.models.almacen import AlmacenVehiculos, SIN_TIEMPO
+
+
+class TestAlmacenVehiculos:
+    """Tests para AlmacenVehiculos."""
+
+    def test_agregar_asigna_filas_consecutivas(self):
+        """Verifica que cada llegada ocupa la siguiente fila."""
+        almacen = AlmacenVehiculos()
+        assert almacen.agregar(10, tick=0) == 0
+        assert almacen.agregar(11, tick=0) == 1
+        assert len(almacen) == 2
+        assert almacen.ids[1] == 11
+
+    def test_crecimiento(self):
+        """Verifica que las columnas crecen al superar la capacidad."""
+        almacen = AlmacenVehiculos(capacidad_inicial=2)
+        for i in range(5):
+            almacen.agregar(i, tick=i)
+        
+        assert len(almacen) == 5
+        assert almacen.capacidad >= 5
+        assert almacen.llegada[4] == 4
+        assert almacen.salida[4] == SIN_TIEMPO
+
+    def test_liberar_reutiliza_filas(self):
+        """Verifica que las filas liberadas se reasignan, limpias, antes de crecer."""
+        almacen = AlmacenVehiculos(capacidad_inicial=2)
+        primera = almacen.agregar(1, tick=0)
+        almacen.agregar(2, tick=0)
+        almacen.marcar_salida(primera, 5)
+        almacen.liberar([primera])
+        assert len(almacen) == 1
+
+        assert almacen.agregar(3, tick=6) == primera
+        assert almacen.capacidad == 2
+        assert almacen.vehiculo(primera).id == 3
+        assert almacen.tiempo_espera(primera) == 0  # La salida anterior no se hereda
+
+    def test_tiempo_espera(self):
+        """Verifica el cálculo de espera en ticks."""
+        almacen = AlmacenVehiculos()
+        indice = almacen.agregar(1, tick=3)
+        
+        assert almacen.tiempo_espera(indice) == 0
+        assert almacen.tiempo_espera_hasta(indice, 5) == 2
+        
+        almacen.marcar_salida(indice, 7)
+        assert almacen.tiempo_espera(indice) == 4
+        assert almacen.tiempo_espera_hasta(indice, 100) == 4
+
+    def test_vista_vehiculo(self):
+        """Verifica la materialización de una fila como Vehiculo."""
+        almacen = AlmacenVehiculos()
+        indice = almacen.agregar(42, tick=1)
+        
+        vehiculo = almacen.vehiculo(indice)
+        assert vehiculo.id == 42
+        assert vehiculo.tiempo_llegada == 1
+        assert vehiculo.tiempo_salida is None
+
+    def test_agregar_desde_varios_hilos(self):
+        """Verifica que los hilos que agregan y marcan salidas mientras las columnas crecen no pierden filas."""
+        almacen = AlmacenVehiculos(capacidad_inicial=1)
+        por_hilo = 2000
+
+        def llegar(base):
+            for i in range(por_hilo):
+                indice = almacen.agregar(base + i, tick=i)
+                if i % 2:
+                    almacen.marcar_salida(indice, i + 3)
+
+        hilos = [threading.Thread(target=llegar, args=(k * por_hilo,)) for k in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        assert len(almacen) == 4 * por_hilo
+        assert sorted(almacen.ids[:len(almacen)]) == list(range(4 * por_hilo))
+        for indice in range(len(almacen)):
+            i = almacen.id_vehiculo(indice) % por_hilo
+            assert almacen.llegada[indice] == i
+            assert almacen.tiempo_espera(indice) == (3 if i % 2 else 0)
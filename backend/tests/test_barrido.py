@@ -0,0 +1,50 @@
+"""
+Tests para los barridos de parámetros.
+Verifica la generación de puntos y que la caché evita recalcular corridas.
+"""
+import pytest
+from backend.app.barrido import (
+    CacheResultados, clave_resultado, ejecutar_barrido, puntos_aleatorios, puntos_grilla,
+)
+from backend.app.config import ConfiguracionSimulacion
+
+
+class TestBarrido:
+    """Tests para el barrido y su caché."""
+
+    def test_puntos(self):
+        """Verifica la grilla, el muestreo aleatorio y los campos inválidos."""
+        grilla = puntos_grilla({"duracion_verde": [3, 5], "capacidad_cruce_por_tick": [1, 2, 3]})
+        assert len(grilla) == 6
+        assert {"duracion_verde": 5, "capacidad_cruce_por_tick": 3} in grilla
+
+        aleatorios = puntos_aleatorios({"duracion_verde": (3, 9), "probabilidad_llegada": (0.1, 0.5)}, 20, semilla=1)
+        assert aleatorios == puntos_aleatorios({"duracion_verde": (3, 9), "probabilidad_llegada": (0.1, 0.5)}, 20, semilla=1)
+        assert all(isinstance(p["duracion_verde"], int) and 3 <= p["duracion_verde"] <= 9 for p in aleatorios)
+        assert all(0.1 <= p["probabilidad_llegada"] <= 0.5 for p in aleatorios)
+
+        with pytest.raises(ValueError):
+            puntos_grilla({"duracion_azul": [1]})
+
+    def test_clave_estable(self):
+        """Verifica que la clave depende de la configuración y la semilla, no de la GUI."""
+        config = ConfiguracionSimulacion()
+        assert clave_resultado("vectorized", config, 1) == clave_resultado(
+            "vectorized", ConfiguracionSimulacion(ancho_ventana=10), 1
+        )
+        assert clave_resultado("vectorized", config, 1) != clave_resultado("vectorized", config, 2)
+        assert clave_resultado("vectorized", config, 1) != clave_resultado(
+            "vectorized", ConfiguracionSimulacion(duracion_verde=6), 1
+        )
+
+    def test_barrido_solapado_usa_cache(self, tmp_path):
+        """Verifica que un segundo barrido solo calcula los puntos nuevos."""
+        base = ConfiguracionSimulacion(ciclos_minimos=10, headless=True)
+        cache = CacheResultados(tmp_path)
+
+        primero = ejecutar_barrido("discrete_event", base, puntos_grilla({"duracion_verde": [3, 5]}), [1, 2], cache=cache, procesos=1)
+        segundo = ejecutar_barrido("discrete_event", base, puntos_grilla({"duracion_verde": [3, 5, 7]}), [1, 2], cache=cache, procesos=1)
+
+        assert [r["calculadas"] for r in primero] == [2, 2]
+        assert [r["calculadas"] for r in segundo] == [0, 0, 2]
+        assert segundo[0]["resumen"] == primero[0]["resumen"]
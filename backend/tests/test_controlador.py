@@ -99,3 +99,44 @@ class TestControladorTrafico:
             if plan[Via.ESTE] == Color.VERDE:
                 assert plan[Via.NORTE] == Color.ROJO
                 assert plan[Via.SUR] == Color.ROJO
+
+    def test_plan_en_tick_coincide_con_avanzar(self):
+        """Verifica que el plan calculado por tick coincide con el secuencial."""
+        controlador = ControladorTrafico(duracion_verde=3, duracion_amarillo=2)
+        referencia = ControladorTrafico(duracion_verde=3, duracion_amarillo=2)
+        
+        for tick in range(1, 40):
+            plan = controlador.avanzar_tick()
+            assert referencia.plan_en_tick(tick) == plan
+            assert referencia.fase_en_tick(tick) == controlador.fase_actual
+        
+        # El cálculo no altera el estado del controlador de referencia
+        assert referencia.tick_actual == 0
+
+    def test_saltar_a_equivale_a_avanzar(self):
+        """Verifica que saltar a un tick deja el mismo estado que avanzar tick a tick."""
+        secuencial = ControladorTrafico(duracion_verde=4, duracion_amarillo=1)
+        for tick in range(1, 30):
+            plan = secuencial.avanzar_tick()
+            directo = ControladorTrafico(duracion_verde=4, duracion_amarillo=1)
+            
+            assert directo.saltar_a(tick) == plan
+            assert directo.get_info() == secuencial.get_info()
+
+    def test_planes_compartidos_e_inmutables(self):
+        """Verifica que los ticks de una misma fase comparten un plan inmutable."""
+        controlador = ControladorTrafico(duracion_verde=3, duracion_amarillo=2)
+        
+        assert controlador.plan_en_tick(0) is controlador.plan_en_tick(2)
+        assert controlador.plan_en_tick(0) is controlador.plan_en_tick(controlador.duracion_ciclo)
+        with pytest.raises(TypeError):
+            controlador.plan_en_tick(0)[Via.NORTE] = Color.ROJO
+
+    def test_proximo_cambio(self):
+        """Verifica el tick del próximo cambio de fase."""
+        controlador = ControladorTrafico(duracion_verde=3, duracion_amarillo=2)
+        
+        assert controlador.proximo_cambio(0) == 3
+        assert controlador.proximo_cambio(3) == 5
+        assert controlador.proximo_cambio(9) == 10
+        assert controlador.proximo_cambio(10 + 4) == 10 + 5
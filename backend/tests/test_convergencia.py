@@ -0,0 +1,60 @@
+"""
+Tests para la terminación adaptativa.
+Verifica el truncamiento MSER, las medias de lotes y el corte temprano de una corrida headless.
+"""
+import random
+
+from backend.app.config import ConfiguracionSimulacion
+from backend.app.sim import ejecutar_headless
+from backend.core.common.convergencia import MonitorConvergencia, truncamiento_mser
+
+
+class TestConvergencia:
+    """Tests para truncamiento_mser y MonitorConvergencia."""
+
+    def test_mser_descarta_transitorio(self):
+        """Verifica que el corte cae al final de un calentamiento evidente."""
+        rng = random.Random(1)
+        serie = [50 - i for i in range(50)] + [rng.gauss(0, 1) for _ in range(450)]
+        corte = truncamiento_mser(serie)
+        assert 40 <= corte <= 60
+        assert truncamiento_mser([rng.gauss(0, 1) for _ in range(500)]) < 50
+
+    def test_monitor_converge_con_serie_estable(self):
+        """Verifica que una serie estable converge y una ruidosa no con tolerancia estricta."""
+        rng = random.Random(2)
+        estable = MonitorConvergencia(0.05)
+        ruidosa = MonitorConvergencia(0.001)
+        espera = vehiculos = 0
+        for _ in range(200):
+            espera += 100 + rng.randint(-5, 5)
+            vehiculos += 20
+            estable.observar(espera, vehiculos, 10 + rng.randint(-1, 1))
+            ruidosa.observar(espera, vehiculos, rng.randint(0, 20))
+
+        assert estable.convergido()
+        assert not ruidosa.convergido()
+        resumen = estable.get_resumen(ticks=2800)
+        assert resumen["ticks_necesarios"] == 2800
+        assert abs(resumen["tiempo_espera_promedio"]["media"] - 5) < 0.1
+
+    def test_corrida_termina_al_converger(self):
+        """Verifica que la corrida headless se detiene antes del horizonte y lo reporta."""
+        config = ConfiguracionSimulacion(
+            semilla=3, probabilidad_llegada=0.5, ciclos_minimos=100000, tolerancia_relativa=0.03
+        )
+        reporte = ejecutar_headless("discrete_event", config)
+        assert reporte["convergencia"]["convergido"]
+        assert reporte["ticks"] == reporte["convergencia"]["ticks_necesarios"]
+        assert reporte["ticks"] < 100000 * config.duracion_ciclo
+        assert reporte["ticks"] == ejecutar_headless("vectorized", config)["ticks"]
+
+    def test_multiprocessing_converge(self):
+        """Verifica que el engine multiprocessing observa los ciclos y converge igual que los demás."""
+        config = ConfiguracionSimulacion(semilla=3, ciclos_minimos=400, tolerancia_relativa=0.05, lookahead=4)
+        reporte = ejecutar_headless("multiprocessing", config)
+        esperado = ejecutar_headless("discrete_event", config)
+        assert reporte["convergencia"]["convergido"]
+        assert reporte["ticks"] == esperado["ticks"] < 400 * config.duracion_ciclo
+        # El pipeline se detiene en el cierre de ciclo: no hay ticks de más en las estadísticas
+        assert reporte["estadisticas"]["total_vehiculos"] == esperado["estadisticas"]["total_vehiculos"]
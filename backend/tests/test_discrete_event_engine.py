@@ -0,0 +1,58 @@
+"""
+Tests para el engine de eventos discretos.
+Verifica que saltar entre eventos da el mismo resultado que avanzar tick a tick
+y que el almacén de vehículos no crece con la duración de la corrida.
+"""
+import pytest
+from backend.app.config import ConfiguracionSimulacion
+from backend.runtime.engines.discrete_event_engine import DiscreteEventEngine
+from backend.runtime.engines.vectorized_engine import VectorizedEngine
+
+
+class TestDiscreteEventEngine:
+    """Tests para DiscreteEventEngine."""
+
+    def test_cada_tick_coincide_con_engine_por_tick(self):
+        """Verifica luces, colas y estadísticas tick a tick contra un engine por tick."""
+        config = ConfiguracionSimulacion(semilla=21, distribucion_llegadas="binomial", max_llegadas_por_tick=2)
+        eventos = DiscreteEventEngine(config)
+        por_tick = VectorizedEngine(config)
+        eventos.start()
+        por_tick.start()
+
+        for _ in range(120):
+            a, b = eventos.step(), por_tick.step()
+            assert (a.tick, a.ciclo, a.fase) == (b.tick, b.ciclo, b.fase)
+            assert a.luces == b.luces
+            assert a.colas == b.colas
+            assert a.estadisticas["tiempo_espera_total"] == b.estadisticas["tiempo_espera_total"]
+
+    def test_salto_equivale_a_pasos(self):
+        """Verifica que observar en un tick lejano equivale a llegar paso a paso."""
+        config = ConfiguracionSimulacion(semilla=4, probabilidad_llegada=0.05, headless=True)
+        pasos = DiscreteEventEngine(config)
+        salto = DiscreteEventEngine(config)
+        pasos.start()
+        salto.start()
+
+        for _ in range(500):
+            esperado = pasos.step()
+        obtenido = salto.avanzar_hasta(500)
+
+        assert obtenido.colas == esperado.colas
+        assert obtenido.timing_fase == esperado.timing_fase
+        assert obtenido.estadisticas == esperado.estadisticas
+        assert salto.eventos_procesados < 500
+        with pytest.raises(ValueError):
+            salto.avanzar_hasta(100)
+
+    def test_almacen_acotado_en_corridas_largas(self):
+        """Verifica que las filas de los vehículos que cruzaron se reutilizan."""
+        engine = DiscreteEventEngine(ConfiguracionSimulacion(semilla=1, headless=True))
+        engine.start()
+        estado = engine.avanzar_hasta(20000)
+        engine.stop()
+
+        assert estado.estadisticas["total_vehiculos"] > 10000
+        assert len(engine.almacen) == sum(estado.colas.values())
+        assert engine.almacen.capacidad == 1024  # La capacidad inicial alcanza
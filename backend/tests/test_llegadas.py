@@ -0,0 +1,83 @@
+"""
+Tests para la generación de llegadas.
+Verifica reproducibilidad de los flujos y que los IDs no se repiten.
+"""
+import pytest
+from backend.core.traffic.llegadas import BloquesIds, GeneradorLlegadas, derivar_semilla
+
+
+class TestGeneradorLlegadas:
+    """Tests para GeneradorLlegadas y BloquesIds."""
+
+    def test_bloques_disjuntos(self):
+        """Verifica que las vías nunca comparten IDs, incluso al cambiar de bloque."""
+        asignadores = [BloquesIds(slot, 4, tamano_bloque=8) for slot in range(4)]
+        ids = [a.siguiente() for _ in range(30) for a in asignadores]
+
+        assert len(ids) == len(set(ids))
+
+    def test_misma_semilla_mismas_llegadas(self):
+        """Verifica que la semilla maestra reproduce el flujo de cada vía."""
+        a = GeneradorLlegadas.para_via("NORTE", 0, 4, 0.5, semilla=7)
+        b = GeneradorLlegadas.para_via("NORTE", 0, 4, 0.5, semilla=7)
+
+        assert [a.generar() for _ in range(100)] == [b.generar() for _ in range(100)]
+
+    def test_flujos_independientes_por_via(self):
+        """Verifica que cada vía usa una semilla distinta."""
+        assert derivar_semilla(7, "llegadas", "NORTE") != derivar_semilla(7, "llegadas", "SUR")
+        assert derivar_semilla(7, "llegadas", "NORTE") == derivar_semilla(7, "llegadas", "NORTE")
+
+    @pytest.mark.parametrize("distribucion", ["bernoulli", "binomial", "poisson"])
+    def test_media_por_tick(self, distribucion):
+        """Verifica que la media observada se acerca a la esperada."""
+        generador = GeneradorLlegadas.para_via(
+            "ESTE", 2, 4, 0.5, semilla=3, distribucion=distribucion, max_por_tick=3,
+        )
+        ticks = 20000
+        total = sum(len(generador.generar()) for _ in range(ticks))
+
+        assert total / ticks == pytest.approx(generador.media_por_tick, rel=0.05)
+
+    def test_varias_llegadas_por_tick(self):
+        """Verifica que la binomial entrega más de un vehículo por tick y respeta el máximo."""
+        generador = GeneradorLlegadas.para_via(
+            "OESTE", 3, 4, 0.9, semilla=1, distribucion="binomial", max_por_tick=3,
+        )
+        conteos = [len(generador.generar()) for _ in range(1000)]
+
+        assert max(conteos) == 3
+        assert min(conteos) >= 0
+
+    def test_distribucion_invalida(self):
+        """Verifica que se rechaza una distribución desconocida."""
+        with pytest.raises(ValueError):
+            GeneradorLlegadas.para_via("NORTE", 0, 4, 0.5, semilla=1, distribucion="uniforme")
+
+    def test_saltar_hasta_llegada_equivale_a_generar(self):
+        """Verifica que saltar los ticks vacíos produce las mismas llegadas que tick a tick."""
+        por_tick = GeneradorLlegadas.para_via("SUR", 1, 4, 0.05, semilla=5, distribucion="poisson")
+        por_salto = GeneradorLlegadas.para_via("SUR", 1, 4, 0.05, semilla=5, distribucion="poisson")
+
+        esperado = [(tick, ids) for tick in range(20000) if (ids := por_tick.generar())]
+        obtenido, tick = [], -1
+        while True:
+            saltados, ids = por_salto.saltar_hasta_llegada()
+            tick += saltados + 1
+            if tick >= 20000:
+                break
+            obtenido.append((tick, ids))
+
+        assert obtenido == esperado
+
+    def test_tomar_bloque_equivale_a_contar(self):
+        """Verifica que consumir bloques completos da los mismos conteos que tick a tick."""
+        por_tick = GeneradorLlegadas.para_via("ESTE", 2, 4, 0.3, semilla=8, distribucion="binomial", max_por_tick=3)
+        por_bloque = GeneradorLlegadas.para_via("ESTE", 2, 4, 0.3, semilla=8, distribucion="binomial", max_por_tick=3)
+        ticks = 2 * por_tick.ticks_por_bloque
+
+        esperado = [por_tick.contar() for _ in range(ticks)]
+        assert list(por_bloque.tomar_bloque()) + list(por_bloque.tomar_bloque()) == esperado
+        assert por_bloque.contar() == por_tick.contar()
+        with pytest.raises(RuntimeError):
+            por_bloque.tomar_bloque()
@@ -0,0 +1,191 @@
+"""
+Tests para el engine multiprocessing con workers locales.
+Verifica que cada tick es un único PASO por worker, que las respuestas se
+correlacionan por secuencia y que un worker lento o muerto se detecta, que el pipeline de PASO no
+adelanta las estadísticas respecto del tick del proceso principal y que en modo
+interactivo los workers solo envían sus estadísticas al cierre de cada ciclo.
+"""
+import multiprocessing as mp
+from dataclasses import replace
+from time import sleep
+
+import pytest
+
+from backend.app.config import ConfiguracionSimulacion
+from backend.core.common.tipos import Color, Via
+from backend.runtime.comms.messages import Comando, PasoMsg, Respuesta, TipoComando, TipoRespuesta
+from backend.runtime.engines import multiprocessing_engine
+from backend.runtime.engines.multiprocessing_engine import (
+    MultiprocessingEngine, esperar_respuestas, worker_semaforo,
+)
+
+
+def _correr(engine, ticks):
+    """Avanza un engine y retorna el estado final con estadísticas combinadas."""
+    engine.start()
+    try:
+        for _ in range(ticks):
+            engine.step()
+        return engine.get_state()
+    finally:
+        engine.stop()
+
+
+def _worker_falso(conexion, respuestas, demora=0.0):
+    """Worker de prueba: tras `demora` segundos envía las respuestas dadas y termina."""
+    sleep(demora)
+    for respuesta in respuestas:
+        conexion.send(respuesta)
+
+
+def _esperar_de_worker_falso(respuestas, secuencia, tipo_esperado=TipoRespuesta.ACK, demora=0.0):
+    """Lanza un worker falso y espera su respuesta a la petición `secuencia`."""
+    padre, hijo = mp.Pipe()
+    proceso = mp.Process(target=_worker_falso, args=(hijo, respuestas, demora), daemon=True)
+    proceso.start()
+    try:
+        return esperar_respuestas({Via.SUR: secuencia}, {Via.SUR: padre}, {Via.SUR: proceso}, tipo_esperado)
+    finally:
+        proceso.terminate()
+        proceso.join()
+
+
+class TestPaso:
+    """Tests del comando PASO: un ida y vuelta por worker y por tick."""
+
+    def test_worker_responde_cada_paso(self):
+        """Verifica que un lote de PASO enviado de una vez vuelve en orden, un resultado por tick."""
+        padre, hijo = mp.Pipe()
+        proceso = mp.Process(target=worker_semaforo, args=(Via.NORTE, hijo, 2), daemon=True)
+        proceso.start()
+        try:
+            pasos = [(Color.VERDE, [1, 2, 3, 4, 5]), (Color.VERDE, []), (Color.ROJO, [6])]
+            for tick, (color, llegadas) in enumerate(pasos, start=1):
+                padre.send(Comando(
+                    TipoComando.PASO, "NORTE", PasoMsg(color=color, llegadas=llegadas), tick=tick, secuencia=10 + tick,
+                ))
+
+            resultados = []
+            for tick in range(1, len(pasos) + 1):
+                (resp,) = esperar_respuestas(
+                    {Via.NORTE: 10 + tick}, {Via.NORTE: padre}, {Via.NORTE: proceso}, TipoRespuesta.RESULTADO_PASO,
+                )
+                assert resp.tick == tick
+                resultados.append(resp.payload)
+        finally:
+            padre.send(Comando(TipoComando.DETENER, "NORTE"))
+            proceso.join(timeout=2)
+
+        assert [[v["id"] for v in r.despachados.vehiculos_detalle] for r in resultados] == [[1, 2], [3, 4], []]
+        assert [r.tamano_cola for r in resultados] == [3, 1, 2]
+        assert [r.vehiculos_cruzados for r in resultados] == [2, 4, 4]
+
+    def test_un_comando_por_worker_y_tick(self):
+        """Verifica que el engine solo envía un PASO por worker en cada tick."""
+        engine = MultiprocessingEngine(ConfiguracionSimulacion(semilla=5, probabilidad_llegada=0.5))
+        enviados = []
+        enviar = engine._enviar
+
+        def registrar(via, tipo, payload=None, tick=None):
+            enviados.append((tipo, tick))
+            return enviar(via, tipo, payload, tick)
+
+        engine._enviar = registrar
+        _correr(engine, 30)
+
+        pasos = [tick for tipo, tick in enviados if tipo == TipoComando.PASO]
+        assert sorted(pasos) == [tick for tick in range(1, 31) for _ in Via]
+        # Aparte de los PASO, a lo sumo el estado final de get_state y el DETENER
+        assert {tipo for tipo, _ in enviados} <= {TipoComando.PASO, TipoComando.OBTENER_ESTADO, TipoComando.DETENER}
+
+
+class TestPipeline:
+    """Tests del envío adelantado de PASO."""
+
+    def test_estadisticas_no_incluyen_ticks_adelantados(self):
+        """Verifica que con los workers adelantados las estadísticas son las del tick actual."""
+        config = ConfiguracionSimulacion(semilla=5, probabilidad_llegada=0.5, headless=True, ciclos_minimos=1000)
+        secuencial = _correr(MultiprocessingEngine(config), 137)
+
+        engine = MultiprocessingEngine(replace(config, lookahead=8))
+        engine.start()
+        try:
+            for _ in range(137):
+                engine.step()
+            assert engine._ultimo_tick_enviado > engine.reloj.ahora
+            adelantado = engine.get_state()
+        finally:
+            engine.stop()
+
+        assert adelantado.estadisticas == secuencial.estadisticas
+        assert adelantado.colas == secuencial.colas
+
+    def test_interactivo_pide_estadisticas_al_cierre_de_ciclo(self):
+        """Verifica que entre cierres de ciclo los totales de cada tick salen de los contadores del PASO."""
+        config = ConfiguracionSimulacion(semilla=5, probabilidad_llegada=0.5, lookahead=3)
+        ciclo = config.duracion_ciclo
+        engine = MultiprocessingEngine(config)
+        engine.start()
+        try:
+            for _ in range(2 * ciclo + 5):
+                paso = engine.step()
+            assert engine._tick_estadisticas == 2 * ciclo
+            completo = engine.get_state()
+        finally:
+            engine.stop()
+
+        assert engine._tick_estadisticas == 2 * ciclo + 5
+        assert completo.estadisticas["total_vehiculos"] > 0
+        for clave in ("total_vehiculos", "tiempo_espera_total", "tiempo_espera_promedio", "vehiculos_por_via"):
+            assert paso.estadisticas[clave] == completo.estadisticas[clave]
+
+
+class TestRespuestas:
+    """Tests de la correlación de respuestas y de los workers que no responden."""
+
+    def test_respuesta_correlacionada(self):
+        """Verifica que la respuesta de un worker devuelve el tick y la secuencia de su comando."""
+        padre, hijo = mp.Pipe()
+        proceso = mp.Process(target=worker_semaforo, args=(Via.ESTE, hijo, 2), daemon=True)
+        proceso.start()
+        try:
+            padre.send(Comando(TipoComando.OBTENER_ESTADO, "ESTE", True, tick=4, secuencia=21))
+            (resp,) = esperar_respuestas(
+                {Via.ESTE: 21}, {Via.ESTE: padre}, {Via.ESTE: proceso}, TipoRespuesta.ESTADO_SEMAFORO,
+            )
+        finally:
+            padre.send(Comando(TipoComando.DETENER, "ESTE"))
+            proceso.join(timeout=2)
+
+        assert (resp.tick, resp.secuencia, resp.via) == (4, 21, "ESTE")
+        assert resp.payload.estadisticas is not None
+
+    def test_rechaza_respuesta_atrasada(self):
+        """Verifica que una respuesta con la secuencia de una petición anterior no se acepta."""
+        atrasada = Respuesta(TipoRespuesta.ACK, "SUR", tick=3, secuencia=20)
+        with pytest.raises(RuntimeError, match="Respuesta inesperada"):
+            _esperar_de_worker_falso([atrasada], secuencia=21)
+        assert _esperar_de_worker_falso([atrasada], secuencia=20) == [atrasada]
+
+    def test_rechaza_respuesta_de_otro_tipo(self):
+        """Verifica que una respuesta con la secuencia correcta pero de otro tipo no se acepta."""
+        ack = Respuesta(TipoRespuesta.ACK, "SUR", tick=3, secuencia=21)
+        with pytest.raises(RuntimeError, match="Respuesta inesperada"):
+            _esperar_de_worker_falso([ack], secuencia=21, tipo_esperado=TipoRespuesta.RESULTADO_PASO)
+
+    def test_error_del_worker(self):
+        """Verifica que una respuesta de error se reporta con su mensaje."""
+        error = Respuesta(TipoRespuesta.ERROR, "SUR", "falló", exito=False, secuencia=21)
+        with pytest.raises(RuntimeError, match="falló"):
+            _esperar_de_worker_falso([error], secuencia=21)
+
+    def test_worker_lento(self, monkeypatch):
+        """Verifica que un worker que no responde a tiempo se reporta con TimeoutError."""
+        monkeypatch.setattr(multiprocessing_engine, "TIMEOUT_RESPUESTA", 0.2)
+        with pytest.raises(TimeoutError, match="SUR"):
+            _esperar_de_worker_falso([], secuencia=21, demora=30)
+
+    def test_worker_muerto(self):
+        """Verifica que un worker que termina sin responder se detecta por su centinela, sin esperar el timeout."""
+        with pytest.raises(RuntimeError, match="terminó sin responder"):
+            _esperar_de_worker_falso([], secuencia=21)
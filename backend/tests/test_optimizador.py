@@ -0,0 +1,49 @@
+"""
+Tests para el optimizador de tiempos semafóricos.
+Verifica la búsqueda con números aleatorios comunes y el descarte temprano.
+"""
+import pytest
+from backend.app.config import ConfiguracionSimulacion
+from backend.app.optimizador import OptimizadorTiempos
+from backend.app.replicas import crear_pool
+
+
+def _optimizador(**kwargs):
+    base = ConfiguracionSimulacion(probabilidad_llegada=0.3, ciclos_minimos=15, headless=True)
+    return OptimizadorTiempos(
+        "discrete_event", base, {"NS_VERDE": (2, 25), "EW_VERDE": (2, 25)},
+        semillas=[1, 2, 3, 4], tamano_generacion=6, **kwargs
+    )
+
+
+class TestOptimizadorTiempos:
+    """Tests para OptimizadorTiempos."""
+
+    def test_busqueda_reproducible_y_acotada(self):
+        """Verifica que la búsqueda respeta los rangos, mejora el inicio y se repite igual."""
+        with crear_pool(1) as pool:
+            primero = _optimizador().optimizar(3, pool=pool)
+            segundo = _optimizador().optimizar(3, pool=pool)
+            inicial = _optimizador()
+            valor_inicial = inicial.evaluar_generacion(pool, [(5, 5)])[0]["valor"]
+
+        assert primero["mejor"] == segundo["mejor"]
+        assert all(2 <= v <= 25 for v in primero["mejor"].values())
+        assert primero["valor"] <= valor_inicial
+        assert [f["duracion"] for f in primero["programa_fases"]][::2] == list(primero["mejor"].values())
+
+    def test_descarta_candidatos_claramente_peores(self):
+        """Verifica que un candidato muy malo no se evalúa con todas las semillas."""
+        optimizador = _optimizador(semillas_por_etapa=2)
+        optimizador.semillas = list(range(8))
+        with crear_pool(1) as pool:
+            resultados = optimizador.evaluar_generacion(pool, [(3, 3), (25, 25)])
+
+        malo = next(r for r in resultados if r["candidato"] == (25, 25))
+        assert malo["descartado"] and malo["semillas"] < 8
+        assert optimizador.evaluaciones_ahorradas > 0
+
+    def test_fase_desconocida(self):
+        """Verifica que solo se aceptan fases del programa."""
+        with pytest.raises(ValueError):
+            OptimizadorTiempos("discrete_event", ConfiguracionSimulacion(), {"NS_ROJO": (1, 2)})
@@ -0,0 +1,99 @@
+"""
+Tests para los programas de fases.
+Verifica la compilación, la validación de conflictos y su uso en el controlador y los engines.
+"""
+import pickle
+
+import pytest
+from backend.app.config import ConfiguracionSimulacion
+from backend.core.common.tipos import Color, Via
+from backend.core.traffic.controlador import ControladorTrafico
+from backend.core.traffic.programa import ProgramaSemaforico
+from backend.runtime.engines.discrete_event_engine import DiscreteEventEngine
+from backend.runtime.engines.vectorized_engine import VectorizedEngine
+
+FASES = [
+    {"nombre": "N_PROTEGIDO", "duracion": 3, "verde": ["NORTE"]},
+    {"nombre": "NS_VERDE", "duracion": 6, "verde": ["NORTE", "SUR"]},
+    {"nombre": "NS_AMARILLO", "duracion": 2, "amarillo": ["NORTE", "SUR"]},
+    {"nombre": "TODO_ROJO_1", "duracion": 1},
+    {"nombre": "E_PROTEGIDO", "duracion": 2, "verde": ["ESTE"]},
+    {"nombre": "EW_VERDE", "duracion": 5, "verde": ["ESTE", "OESTE"]},
+    {"nombre": "EW_AMARILLO", "duracion": 2, "amarillo": ["ESTE", "OESTE"]},
+    {"nombre": "TODO_ROJO_2", "duracion": 1},
+]
+
+
+class TestProgramaSemaforico:
+    """Tests para ProgramaSemaforico."""
+
+    def test_compilacion(self):
+        """Verifica la tabla por posición y la codificación de colores."""
+        programa = ProgramaSemaforico.desde_lista(FASES)
+
+        assert programa.num_fases == 8
+        assert programa.duracion_ciclo == 22
+        assert len(programa.fase_por_posicion) == 22
+        assert programa.fase_por_posicion[3] == 1
+        assert list(programa.inicio_fase[:3]) == [0, 3, 9]
+        assert programa.color(0, Via.NORTE) == Color.VERDE
+        assert programa.color(0, Via.SUR) == Color.ROJO
+        assert set(programa.plan(3).values()) == {Color.ROJO}
+
+    def test_clasico_equivale_al_controlador_por_defecto(self):
+        """Verifica que el programa clásico reproduce el ciclo de cuatro fases."""
+        clasico = ControladorTrafico(duracion_verde=5, duracion_amarillo=2)
+        compilado = ControladorTrafico(programa=ProgramaSemaforico.clasico(5, 2))
+
+        for tick in range(40):
+            assert clasico.plan_en_tick(tick) == compilado.plan_en_tick(tick)
+            assert clasico.fase_en_tick(tick) == compilado.fase_en_tick(tick)
+
+    def test_conflictos_y_errores(self):
+        """Verifica que se rechazan fases que cruzan ejes y descripciones inválidas."""
+        with pytest.raises(ValueError):
+            ProgramaSemaforico.desde_lista([{"nombre": "X", "duracion": 3, "verde": ["NORTE", "ESTE"]}])
+        with pytest.raises(ValueError):
+            ProgramaSemaforico.desde_lista([{"nombre": "X", "duracion": 3, "verde": ["CENTRO"]}])
+        with pytest.raises(ValueError):
+            ProgramaSemaforico.desde_lista([{"nombre": "X"}])
+        with pytest.raises(ValueError):
+            ProgramaSemaforico.desde_lista([{"nombre": "X", "duracion": 0}])
+
+    def test_serializable(self):
+        """Verifica que el programa compilado viaja a un worker sin cambios."""
+        programa = ProgramaSemaforico.desde_lista(FASES)
+        assert pickle.loads(pickle.dumps(programa)) == programa
+
+    def test_controlador_con_programa(self):
+        """Verifica timing y próximo cambio con duraciones distintas por fase."""
+        controlador = ControladorTrafico(programa=ProgramaSemaforico.desde_lista(FASES))
+
+        assert controlador.duracion_ciclo == 22
+        assert controlador.proximo_cambio(4) == 9
+        assert controlador.timing_en_tick(10) == {
+            "fase_actual": "NS_AMARILLO", "ticks_en_fase": 1,
+            "ticks_restantes": 1, "duracion_total": 2,
+        }
+
+    def test_engines_con_programa(self):
+        """Verifica que eventos discretos y vectorizado coinciden con un programa propio."""
+        config = ConfiguracionSimulacion(semilla=5, programa_fases=FASES)
+        assert config.duracion_ciclo == 22
+        eventos = DiscreteEventEngine(config)
+        por_tick = VectorizedEngine(config)
+        eventos.start()
+        por_tick.start()
+
+        for _ in range(66):
+            a, b = eventos.step(), por_tick.step()
+            assert (a.fase, a.luces, a.colas) == (b.fase, b.luces, b.colas)
+            assert a.timing_fase == b.timing_fase
+
+    def test_a_lista_es_inversa_de_desde_lista(self):
+        """Verifica que un programa se puede describir y volver a compilar."""
+        programa = ProgramaSemaforico.desde_lista(FASES)
+        assert ProgramaSemaforico.desde_lista(programa.a_lista()) == programa
+        assert ProgramaSemaforico.clasico(5, 2).a_lista()[0] == {
+            "nombre": "NS_VERDE", "duracion": 5, "verde": ["NORTE", "SUR"],
+        }
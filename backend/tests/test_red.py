@@ -0,0 +1,291 @@
+"""
+Tests para la red vial y los engines de red.
+Verifica la estructura CSR, la validación de enlaces, la partición, la conservación de vehículos,
+el bloqueo por cola y que el engine particionado reproduce al secuencial con ambas sincronizaciones.
+"""
+from collections import Counter
+from dataclasses import replace
+
+import pytest
+
+from backend.app.config import ConfiguracionSimulacion
+from backend.core.traffic.red import RedVial
+from backend.runtime.engines.network_engine import NetworkEngine
+from backend.runtime.comms.messages import VentanaMsg
+from backend.runtime.engines.partitioned_engine import PartitionedNetworkEngine, RegionOptimista
+from backend.runtime.engines.vectorized_engine import VectorizedEngine
+
+
+def _correr(engine, ticks):
+    """Avanza un engine y retorna el último estado."""
+    engine.start()
+    try:
+        for _ in range(ticks):
+            state = engine.step()
+    finally:
+        engine.stop()
+    return state
+
+
+class TestRedVial:
+    """Tests para RedVial."""
+
+    def test_grilla_en_csr(self):
+        """Verifica enlaces, vecinos y carriles de borde de una grilla 2x3."""
+        red = RedVial.grilla(2, 3, capacidad=10, tiempo_viaje=4)
+        # 2 filas x 2 pares horizontales + 3 columnas x 1 par vertical, en ambos sentidos
+        assert red.num_enlaces == 2 * (2 * 2 + 3 * 1)
+        assert list(red.indptr) == [0, 2, 5, 7, 9, 12, 14]
+        assert sorted(red.vecinos(1)) == [0, 2, 4]
+        assert set(red.capacidad) == {10} and set(red.tiempo_viaje) == {4}
+        for e in range(red.num_enlaces):
+            assert red.enlace_de_carril[red.carril_origen[e]] == e
+            assert red.entrada_de_carril[red.carril_destino[e]] == e
+        # 24 carriles, uno por enlace recibe flujo interno
+        assert len(red.carriles_de_borde()) == 24 - red.num_enlaces
+
+    def test_enlaces_invalidos(self):
+        """Verifica que los enlaces inválidos o duplicados se rechazan."""
+        enlace = {"origen": 0, "destino": 1, "via": "OESTE", "capacidad": 5, "tiempo_viaje": 2}
+        with pytest.raises(ValueError):
+            RedVial(2, [dict(enlace, destino=2)])
+        with pytest.raises(ValueError):
+            RedVial(2, [dict(enlace, via="DIAGONAL")])
+        with pytest.raises(ValueError):
+            RedVial(2, [dict(enlace, tiempo_viaje=0)])
+        with pytest.raises(ValueError):
+            RedVial(3, [enlace, dict(enlace, destino=2)])
+        with pytest.raises(ValueError):
+            RedVial(2, [{"origen": 0, "destino": 1}])
+
+    def test_desde_config(self):
+        """Verifica las descripciones de red admitidas por la configuración."""
+        assert RedVial.desde_config(ConfiguracionSimulacion()) is None
+        corredor = RedVial.desde_config(ConfiguracionSimulacion(red={"tipo": "corredor", "intersecciones": 4}))
+        assert (corredor.num_intersecciones, corredor.num_enlaces) == (4, 6)
+        with pytest.raises(ValueError):
+            RedVial.desde_config(ConfiguracionSimulacion(red={"tipo": "anillo"}))
+
+    def test_particion_balanceada_y_compacta(self):
+        """Verifica que la partición reparte parejo y corta pocos enlaces."""
+        red = RedVial.grilla(10, 10)
+        asignacion = red.particionar(4)
+        assert sorted(Counter(asignacion).values()) == [25, 25, 25, 25]
+        # Cuadrantes: dos fronteras de 10 pares de enlaces, en ambos sentidos
+        assert len(red.enlaces_de_corte(asignacion)) == 40
+        assert len(red.enlaces_de_corte(red.particionar(1))) == 0
+        assert max(RedVial.corredor(3).particionar(8)) == 2
+
+
+class TestNetworkEngine:
+    """Tests para NetworkEngine."""
+
+    def test_sin_enlaces_igual_al_vectorizado(self):
+        """Verifica que sin enlaces el engine de red reproduce al vectorizado."""
+        config = ConfiguracionSimulacion(semilla=3, num_intersecciones=4, headless=True)
+        red = _correr(NetworkEngine(config), 300)
+        vectorizado = _correr(VectorizedEngine(config), 300)
+        assert red.colas == vectorizado.colas
+        assert red.estadisticas["red"]["tiempo_espera_total"] == vectorizado.estadisticas["red"]["tiempo_espera_total"]
+
+    def test_conservacion_de_vehiculos(self):
+        """Verifica que todo lo que entra por el borde sigue en la red o salió."""
+        config = ConfiguracionSimulacion(semilla=5, probabilidad_llegada=0.4, headless=True)
+        engine = NetworkEngine(config, RedVial.grilla(3, 3, capacidad=8, tiempo_viaje=3))
+        resumen = _correr(engine, 500).estadisticas["red"]
+        borde = engine.red.carriles_de_borde()
+        entraron = sum(engine.cruzados[c] + engine.cola[c] for c in borde)
+        assert entraron == resumen["salidas_red"] + resumen["en_transito"] + resumen["en_cola"]
+        assert resumen["salidas_red"] > 0 and resumen["en_transito"] >= 0
+
+    def test_bloqueo_por_cola(self):
+        """Verifica que un enlace nunca supera su capacidad y que la cola se propaga aguas arriba."""
+        config = ConfiguracionSimulacion(semilla=1, probabilidad_llegada=0.9, duracion_verde=8, headless=True)
+        engine = NetworkEngine(config, RedVial.corredor(3, capacidad=3, tiempo_viaje=2))
+        red = engine.red
+        engine.start()
+        try:
+            for _ in range(400):
+                engine.step()
+                for e in range(red.num_enlaces):
+                    assert engine.en_transito[e] + engine.cola[red.carril_destino[e]] <= red.capacidad[e]
+        finally:
+            engine.stop()
+
+        holgado = NetworkEngine(config, RedVial.corredor(3, capacidad=1000, tiempo_viaje=2))
+        _correr(holgado, 400)
+        assert sum(engine.cola) > sum(holgado.cola)
+
+    def test_numpy_coincide_con_python(self):
+        """Verifica que el tick con NumPy da el mismo resultado que en Python, también tras restaurar."""
+        pytest.importorskip("numpy")
+        config = ConfiguracionSimulacion(semilla=9, probabilidad_llegada=0.7, desfase_intersecciones=2, headless=True)
+        red = RedVial.grilla(4, 4, capacidad=4, tiempo_viaje=3)
+        region = [0, 1, 4, 5, 6, 9, 10, 15]
+        resultados = []
+        for usar_numpy in (False, True):
+            engine = NetworkEngine(config, red, region, usar_numpy=usar_numpy)
+            engine.start()
+            try:
+                salientes = []
+                for tick in range(400):
+                    engine.avanzar()
+                    salientes.append(engine.tomar_salientes())
+                    if tick == 300:
+                        captura = engine.capturar()
+                engine.restaurar(captura)
+                for _ in range(50):
+                    engine.avanzar()
+                    salientes.append(engine.tomar_salientes())
+                resultados.append((
+                    engine.cola, engine.ocupacion, engine.en_transito, engine.contadores(), salientes,
+                    engine.get_state().estadisticas,
+                ))
+            finally:
+                engine.stop()
+        assert resultados[0] == resultados[1]
+
+    def test_tramos_en_hilos(self):
+        """Verifica que repartir el tick en hilos no cambia el resultado ni lo que sale de la región."""
+        config = ConfiguracionSimulacion(semilla=4, probabilidad_llegada=0.5, desfase_intersecciones=2, headless=True)
+        red = RedVial.grilla(4, 4, capacidad=5, tiempo_viaje=2)
+        region = [0, 1, 2, 4, 5, 6, 8, 9, 10, 12]
+        secuencial = NetworkEngine(config, red, region)
+        en_hilos = NetworkEngine(replace(config, hilos=3), red, region)
+        secuencial.start()
+        en_hilos.start()
+        try:
+            assert len(en_hilos._tramos_intersecciones) == 3
+            for _ in range(200):
+                secuencial.avanzar()
+                en_hilos.avanzar()
+                assert secuencial.tomar_salientes() == en_hilos.tomar_salientes()
+                assert secuencial.contadores() == en_hilos.contadores()
+            assert secuencial.cola == en_hilos.cola and secuencial.ocupacion == en_hilos.ocupacion
+            estado = en_hilos.get_state()
+            assert estado.estadisticas == secuencial.get_state().estadisticas
+            assert estado.info_sistema["hilos"] == 3
+        finally:
+            secuencial.stop()
+            en_hilos.stop()
+        assert en_hilos._pool is None
+
+
+class TestPartitionedNetworkEngine:
+    """Tests para PartitionedNetworkEngine."""
+
+    def test_reproduce_al_engine_secuencial(self):
+        """Verifica que la red particionada da el mismo resultado tick a tick."""
+        config = ConfiguracionSimulacion(
+            semilla=2, probabilidad_llegada=0.5, desfase_intersecciones=3, interseccion_observada=4,
+            red={"tipo": "grilla", "filas": 3, "columnas": 3, "capacidad": 6, "tiempo_viaje": 2},
+            regiones=3,
+        )
+        secuencial, particionado = NetworkEngine(config), PartitionedNetworkEngine(config)
+        assert particionado.ventana == 2 and particionado.num_regiones == 3
+        secuencial.start()
+        particionado.start()
+        try:
+            for _ in range(150):
+                a, b = secuencial.step(), particionado.step()
+                assert (a.luces, a.colas, a.eventos_tick) == (b.luces, b.colas, b.eventos_tick)
+                for clave in ("total_vehiculos", "tiempo_espera_total", "salidas_red", "en_cola", "en_transito"):
+                    assert a.estadisticas["red"][clave] == b.estadisticas["red"][clave]
+            assert secuencial.get_state().estadisticas == particionado.get_state().estadisticas
+        finally:
+            secuencial.stop()
+            particionado.stop()
+        assert not particionado.is_running()
+
+    def test_retroceso_optimista(self):
+        """Verifica que una región adelantada retrocede ante un rezagado y da el resultado secuencial."""
+        config = ConfiguracionSimulacion(semilla=4, probabilidad_llegada=0.6, headless=True)
+        red = RedVial.corredor(2, capacidad=4, tiempo_viaje=2)
+        secuencial = NetworkEngine(config, red)
+        secuencial.start()
+        esperados = []
+        for _ in range(40):
+            secuencial.avanzar()
+            esperados.append(secuencial.contadores())
+
+        regiones = []
+        for interseccion in (0, 1):
+            engine = NetworkEngine(config, red, [interseccion])
+            engine.start()
+            regiones.append(RegionOptimista(engine, intervalo_checkpoint=7))
+        entrantes = [VentanaMsg(hasta=0), VentanaMsg(hasta=0)]
+        contadores = [{}, {}]
+
+        def procesar(indice, hasta):
+            # GVT como lo calcula el proceso principal: tick de cada región y llegada de lo no entregado
+            gvt = min(region.ahora for region in regiones)
+            for pendiente in entrantes:
+                for triples in (pendiente.llegadas, pendiente.creditos):
+                    for k in range(0, len(triples), 3):
+                        gvt = min(gvt, triples[k + 1] + red.tiempo_viaje[triples[k]] - 1)
+            ventana, entrantes[indice] = entrantes[indice], VentanaMsg(hasta=hasta)
+            ventana.hasta = hasta
+            ventana.gvt = gvt
+            resultado = regiones[indice].procesar(ventana)
+            # En un corredor de dos intersecciones, todo enlace va de una región a la otra
+            entrantes[1 - indice].llegadas.extend(resultado.llegadas)
+            entrantes[1 - indice].creditos.extend(resultado.creditos)
+            for k, t in enumerate(range(resultado.desde, resultado.ahora + 1)):
+                contadores[indice][t] = resultado.contadores[k * 5:(k + 1) * 5]
+
+        # La región 1 corre sola hasta el final; lo de la región 0 le llega tarde
+        procesar(1, 40)
+        for hasta in (10, 20, 30, 40, 40, 40):
+            procesar(0, hasta)
+            procesar(1, 40)
+
+        assert regiones[1].retrocesos > 0 and regiones[1].ticks_deshechos > 0
+        for t in range(1, 41):
+            suma = tuple(a + b for a, b in zip(contadores[0][t], contadores[1][t]))
+            assert suma == esperados[t - 1]
+
+    def test_optimista_reproduce_al_engine_secuencial(self):
+        """Verifica que la sincronización optimista da el mismo resultado que el engine secuencial."""
+        config = ConfiguracionSimulacion(
+            semilla=2, probabilidad_llegada=0.5, desfase_intersecciones=3, interseccion_observada=4,
+            red={"tipo": "grilla", "filas": 3, "columnas": 3, "capacidad": 6, "tiempo_viaje": 2},
+            regiones=3, sincronizacion="optimista", intervalo_checkpoint=3, adelanto_maximo=30,
+        )
+        secuencial, particionado = NetworkEngine(config), PartitionedNetworkEngine(config)
+        secuencial.start()
+        particionado.start()
+        try:
+            for tick in range(1, 121):
+                a, b = secuencial.step(), particionado.step()
+                assert (a.luces, a.colas, a.eventos_tick) == (b.luces, b.colas, b.eventos_tick)
+                assert a.estadisticas["red"]["en_cola"] == b.estadisticas["red"]["en_cola"]
+                if tick % 40 == 0:
+                    assert secuencial.get_state().estadisticas == particionado.get_state().estadisticas
+            assert particionado.get_state().info_sistema["sincronizacion"] == "optimista"
+        finally:
+            secuencial.stop()
+            particionado.stop()
+
+        with pytest.raises(ValueError):
+            PartitionedNetworkEngine(replace(config, sincronizacion="especulativa"))
+
+    def test_procesos_por_hilos(self):
+        """Verifica que el esquema híbrido (regiones con varios hilos) reproduce al engine secuencial."""
+        config = ConfiguracionSimulacion(
+            semilla=6, probabilidad_llegada=0.5, interseccion_observada=7, headless=True,
+            red={"tipo": "grilla", "filas": 4, "columnas": 4, "capacidad": 6, "tiempo_viaje": 2},
+            regiones=2, hilos=2,
+        )
+        secuencial = NetworkEngine(replace(config, hilos=None))
+        _correr(secuencial, 120)
+        for sincronizacion in ("conservadora", "optimista"):
+            hibrido = PartitionedNetworkEngine(replace(config, sincronizacion=sincronizacion))
+            hibrido.start()
+            try:
+                for _ in range(120):
+                    estado = hibrido.step()
+                assert estado.colas == secuencial.get_state().colas
+                assert hibrido.get_state().estadisticas == secuencial.get_state().estadisticas
+                assert estado.info_sistema["hilos_por_region"] == 2
+            finally:
+                hibrido.stop()
@@ -0,0 +1,70 @@
+"""
+Tests para las réplicas Monte Carlo.
+Verifica los intervalos de confianza y que el pool reproduce las corridas individuales.
+"""
+import pytest
+from backend.app.config import ConfiguracionSimulacion
+from backend.app.replicas import crear_pool, ejecutar_replica, ejecutar_replicas, resumir_reporte
+from backend.app.sim import ejecutar_headless
+from backend.core.common.intervalos import cuantil_t, intervalo_confianza
+
+
+class TestIntervalos:
+    """Tests para los intervalos de confianza."""
+
+    @pytest.mark.parametrize("gl,esperado", [(1, 12.706), (2, 4.303), (5, 2.571), (9, 2.262), (30, 2.042)])
+    def test_cuantil_t(self, gl, esperado):
+        """Verifica el cuantil 0.975 contra la tabla de la t de Student."""
+        assert cuantil_t(0.975, gl) == pytest.approx(esperado, rel=2e-3)
+
+    @pytest.mark.parametrize("confianza,gl,esperado", [
+        (0.90, 3, 2.353363), (0.95, 4, 2.776445), (0.99, 3, 5.840909), (0.99, 10, 3.169273), (0.99, 11, 3.105807),
+    ])
+    def test_cuantil_t_pocos_grados(self, confianza, gl, esperado):
+        """Verifica los cuantiles bilaterales con pocos grados de libertad, donde falla la aproximación."""
+        assert cuantil_t(0.5 + confianza / 2, gl) == pytest.approx(esperado, rel=1e-4)
+        assert cuantil_t(0.5 - confianza / 2, gl) == pytest.approx(-esperado, rel=1e-4)
+
+    def test_intervalo(self):
+        """Verifica media y semiancho de una muestra conocida."""
+        intervalo = intervalo_confianza([2, 4, 4, 4, 5, 5, 7, 9])
+        assert intervalo["media"] == 5
+        assert intervalo["semiancho"] == pytest.approx(2.365 * 2.138 / 8 ** 0.5, rel=1e-3)
+        assert intervalo_confianza([3.0])["semiancho"] is None
+
+
+class TestReplicas:
+    """Tests para ejecutar_replicas."""
+
+    def test_pool_reproduce_corridas_individuales(self):
+        """Verifica que cada réplica del pool coincide con su corrida aislada."""
+        config = ConfiguracionSimulacion(ciclos_minimos=20)
+        semillas = [1, 2, 3]
+        recibidas = []
+
+        with crear_pool(2) as pool:
+            resumen = ejecutar_replicas("discrete_event", config, semillas, pool=pool, al_terminar=recibidas.append)
+            # El mismo pool sirve para otra tanda
+            otra = ejecutar_replicas("discrete_event", config, semillas, pool=pool)
+
+        assert resumen["replicas"] == 3
+        assert sorted(r["semilla"] for r in recibidas) == semillas
+        assert otra["tiempo_espera_promedio"] == resumen["tiempo_espera_promedio"]
+
+        aisladas = [ejecutar_replica("discrete_event", config, s) for s in semillas]
+        media = sum(r["tiempo_espera_promedio"] for r in aisladas) / 3
+        assert resumen["tiempo_espera_promedio"]["media"] == pytest.approx(media)
+        assert set(resumen["vehiculos_por_via"]) == {"NORTE", "SUR", "ESTE", "OESTE"}
+
+    def test_throughput_de_red_cuenta_salidas(self):
+        """Verifica que en la red el throughput cuenta vehículos que salen y no cruces."""
+        config = ConfiguracionSimulacion(
+            ciclos_minimos=10, semilla=7, headless=True, red={"tipo": "grilla", "filas": 3, "columnas": 3},
+        )
+        reporte = ejecutar_headless("network", config)
+        red = reporte["estadisticas"]["red"]
+        resumen = resumir_reporte(reporte)
+
+        assert red["cruces"] == red["total_vehiculos"] > red["salidas_red"] > 0
+        assert resumen["throughput"] == pytest.approx(red["salidas_red"] / reporte["ticks"])
+        assert resumen["cruces_por_tick"] == pytest.approx(red["cruces"] / reporte["ticks"])
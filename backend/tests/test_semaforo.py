@@ -5,7 +5,7 @@ Verifica el despacho correcto de vehículos según el color.
 import pytest
 from backend.core.traffic.semaforo import Semaforo
 from backend.core.common.tipos import Via, Color
-from backend.core.models.vehiculo import Vehiculo
+from backend.core.common.reloj import RelojSimulacion
 
 
 class TestSemaforo:
@@ -22,17 +22,16 @@ class TestSemaforo:
     def test_agregar_vehiculo(self):
         """Verifica que se pueden agregar vehículos a la cola."""
         semaforo = Semaforo(Via.SUR)
-        vehiculo = Vehiculo(id=1)
         
-        semaforo.agregar_vehiculo(vehiculo)
+        indice = semaforo.agregar_vehiculo(1)
         assert semaforo.tamano_cola == 1
-        assert vehiculo.tiempo_inicio_espera is not None
+        assert semaforo.almacen.vehiculo(indice).tiempo_inicio_espera is not None
 
     def test_no_despacho_en_rojo(self):
         """Verifica que no se despachan vehículos en rojo."""
         semaforo = Semaforo(Via.ESTE)
-        semaforo.agregar_vehiculo(Vehiculo(id=1))
-        semaforo.agregar_vehiculo(Vehiculo(id=2))
+        semaforo.agregar_vehiculo(1)
+        semaforo.agregar_vehiculo(2)
         
         semaforo.set_color(Color.ROJO)
         cruzados = semaforo.tick()
@@ -43,7 +42,7 @@ class TestSemaforo:
     def test_no_despacho_en_amarillo(self):
         """Verifica que no se despachan vehículos en amarillo."""
         semaforo = Semaforo(Via.OESTE)
-        semaforo.agregar_vehiculo(Vehiculo(id=1))
+        semaforo.agregar_vehiculo(1)
         
         semaforo.set_color(Color.AMARILLO)
         cruzados = semaforo.tick()
@@ -54,9 +53,9 @@ class TestSemaforo:
     def test_despacho_en_verde(self):
         """Verifica que se despachan vehículos en verde."""
         semaforo = Semaforo(Via.NORTE, capacidad_por_tick=2)
-        semaforo.agregar_vehiculo(Vehiculo(id=1))
-        semaforo.agregar_vehiculo(Vehiculo(id=2))
-        semaforo.agregar_vehiculo(Vehiculo(id=3))
+        semaforo.agregar_vehiculo(1)
+        semaforo.agregar_vehiculo(2)
+        semaforo.agregar_vehiculo(3)
         
         semaforo.set_color(Color.VERDE)
         cruzados = semaforo.tick()
@@ -70,7 +69,7 @@ class TestSemaforo:
         """Verifica que se respeta la capacidad por tick."""
         semaforo = Semaforo(Via.SUR, capacidad_por_tick=1)
         for i in range(5):
-            semaforo.agregar_vehiculo(Vehiculo(id=i))
+            semaforo.agregar_vehiculo(i)
         
         semaforo.set_color(Color.VERDE)
         cruzados = semaforo.tick()
@@ -82,20 +81,19 @@ class TestSemaforo:
     def test_marca_salida_vehiculos(self):
         """Verifica que los vehículos despachados tienen marca de salida."""
         semaforo = Semaforo(Via.ESTE)
-        vehiculo = Vehiculo(id=1)
-        semaforo.agregar_vehiculo(vehiculo)
+        semaforo.agregar_vehiculo(1)
         
         semaforo.set_color(Color.VERDE)
         cruzados = semaforo.tick()
         
         assert len(cruzados) == 1
-        assert cruzados[0].tiempo_salida is not None
+        assert semaforo.almacen.vehiculo(cruzados[0]).tiempo_salida is not None
 
     def test_multiples_ticks_verde(self):
         """Verifica múltiples ticks consecutivos en verde."""
         semaforo = Semaforo(Via.NORTE, capacidad_por_tick=2)
         for i in range(6):
-            semaforo.agregar_vehiculo(Vehiculo(id=i))
+            semaforo.agregar_vehiculo(i)
         
         semaforo.set_color(Color.VERDE)
         
@@ -112,8 +110,8 @@ class TestSemaforo:
     def test_cambio_color_durante_operacion(self):
         """Verifica cambio de color durante operación."""
         semaforo = Semaforo(Via.OESTE)
-        semaforo.agregar_vehiculo(Vehiculo(id=1))
-        semaforo.agregar_vehiculo(Vehiculo(id=2))
+        semaforo.agregar_vehiculo(1)
+        semaforo.agregar_vehiculo(2)
         
         # Tick en rojo - no despacha
         semaforo.set_color(Color.ROJO)
@@ -123,3 +121,20 @@ class TestSemaforo:
         semaforo.set_color(Color.VERDE)
         cruzados = semaforo.tick()
         assert len(cruzados) == 2
+
+    def test_tiempo_espera_en_ticks(self):
+        """Verifica que la espera se mide con el reloj lógico compartido."""
+        reloj = RelojSimulacion()
+        semaforo = Semaforo(Via.NORTE, capacidad_por_tick=1, reloj=reloj)
+        semaforo.agregar_vehiculo(1)
+        
+        # Tres ticks en rojo, el vehículo sigue esperando
+        for _ in range(3):
+            reloj.avanzar()
+            semaforo.tick()
+        assert semaforo.get_vehiculos_detalle()[0]["esperando_desde"] == 3
+        
+        reloj.avanzar()
+        semaforo.set_color(Color.VERDE)
+        cruzados = semaforo.tick()
+        assert semaforo.almacen.tiempo_espera(cruzados[0]) == 4
@@ -0,0 +1,58 @@
+"""
+Tests para la gestión de semillas.
+Verifica que los subflujos con nombre son reproducibles y que la demanda es común entre configuraciones.
+"""
+from dataclasses import replace
+
+from backend.app.comparacion import comparar_pareado
+from backend.app.config import ConfiguracionSimulacion
+from backend.app.replicas import crear_pool
+from backend.core.common.semillas import FlujosAleatorios, derivar_semilla
+from backend.runtime.engines.discrete_event_engine import DiscreteEventEngine
+from backend.runtime.engines.threading_engine import ThreadingEngine
+
+
+def _llegadas_totales(engine, ticks):
+    """Vehículos que llegaron: los que cruzaron más los que siguen en cola."""
+    engine.start()
+    try:
+        for _ in range(ticks):
+            state = engine.step()
+    finally:
+        engine.stop()
+    return state.estadisticas["total_vehiculos"] + sum(state.colas.values())
+
+
+class TestFlujosAleatorios:
+    """Tests para FlujosAleatorios."""
+
+    def test_subflujos_reproducibles(self):
+        """Verifica que un subflujo depende solo de la semilla y su nombre."""
+        flujos = FlujosAleatorios(42)
+        primero = [flujos.flujo("llegadas", "NORTE").random() for _ in range(3)]
+        flujos.flujo("servicio", "NORTE").random()  # Pedir otro flujo no altera el anterior
+        assert primero == [FlujosAleatorios(42).flujo("llegadas", "NORTE").random() for _ in range(3)]
+        assert flujos.semilla("llegadas", "NORTE") != flujos.semilla("servicio", "NORTE")
+        assert flujos.hijo("3").semilla("ESTE") == derivar_semilla(42, "3", "ESTE")
+        assert FlujosAleatorios().semilla_maestra is not None
+
+    def test_demanda_comun_entre_configuraciones_y_engines(self):
+        """Verifica que cambiar tiempos o engine no cambia las llegadas de una semilla."""
+        config = ConfiguracionSimulacion(semilla=8, headless=True)
+        base = _llegadas_totales(DiscreteEventEngine(config), 200)
+        assert _llegadas_totales(DiscreteEventEngine(replace(config, duracion_verde=9)), 200) == base
+        assert _llegadas_totales(ThreadingEngine(replace(config, capacidad_cruce_por_tick=1)), 200) == base
+
+    def test_comparacion_pareada(self):
+        """Verifica que dos alternativas iguales dan diferencia exactamente nula."""
+        config = ConfiguracionSimulacion(ciclos_minimos=10)
+        with crear_pool(1) as pool:
+            igual = comparar_pareado("discrete_event", config, "vectorized", config, [1, 2, 3], pool=pool)
+            distinta = comparar_pareado(
+                "discrete_event", config, "discrete_event", replace(config, capacidad_cruce_por_tick=1),
+                [1, 2, 3], pool=pool,
+            )
+
+        assert igual["tiempo_espera_promedio"]["diferencia"]["media"] == 0
+        assert not igual["tiempo_espera_promedio"]["significativa"]
+        assert distinta["tiempo_espera_promedio"]["diferencia"]["media"] > 0
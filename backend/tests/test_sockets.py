@@ -0,0 +1,160 @@
+"""
+Tests para el transporte por sockets.
+Verifica el formato binario de los lotes y que los engines multiprocessing dan el mismo
+resultado con los workers repartidos en nodos locales que con Pipes, y que los nodos
+rechazan a quien no conoce la clave y los workers fuera de la lista permitida.
+"""
+import pickle
+import socket
+from array import array
+from dataclasses import replace
+from multiprocessing import AuthenticationError
+
+import pytest
+
+from backend.app.config import ConfiguracionSimulacion
+from backend.core.common.tipos import Color
+from backend.runtime.comms.messages import (
+    Comando, EstadoSemaforoMsg, PasoMsg, Respuesta, ResultadoPasoMsg, ResultadoVentanaMsg,
+    TipoComando, TipoRespuesta, VehiculosDespachadosMsg, VentanaMsg,
+)
+from backend.runtime.comms.nodos import CoordinadorNodos, NodosLocales
+from backend.runtime.comms.sockets import CanalSocket, codificar_lote, decodificar_lote, parsear_direccion
+from backend.runtime.engines.multiprocessing_engine import MultiprocessingEngine
+from backend.runtime.engines.network_engine import NetworkEngine
+from backend.runtime.engines.partitioned_engine import PartitionedNetworkEngine
+
+
+def _ida_y_vuelta(mensajes):
+    """Codifica un lote y lo decodifica sin el largo de la trama."""
+    return decodificar_lote(codificar_lote(mensajes)[4:])
+
+
+def _correr(engine, ticks):
+    """Avanza un engine y retorna el estado final con estadísticas combinadas."""
+    engine.start()
+    try:
+        for _ in range(ticks):
+            engine.step()
+        return engine.get_state()
+    finally:
+        engine.stop()
+
+
+class TestFormatoBinario:
+    """Tests para la codificación de los lotes."""
+
+    def test_ida_y_vuelta(self):
+        """Verifica que cada tipo de payload sobrevive a la codificación."""
+        ventana = VentanaMsg(hasta=12, llegadas=array("q", [3, 10, 2]), creditos=array("q", [5, 11, -1]), gvt=9)
+        resultado = ResultadoVentanaMsg(
+            llegadas=array("q"), creditos=array("q", [1, 2, 3]), contadores=array("q", range(10)),
+            desde=11, ahora=12, retrocesos=4,
+        )
+        paso = ResultadoPasoMsg(
+            despachados=VehiculosDespachadosMsg(via="NORTE", cantidad=2, vehiculos_detalle=[{"id": 7}, {"id": 9}]),
+            tamano_cola=3, llegadas=[11], vehiculos_cruzados=40, espera_total=123,
+        )
+        estado = EstadoSemaforoMsg(via="SUR", color="VERDE", tamano_cola=1, vehiculos_cruzados=4)
+        mensajes = [
+            Comando(TipoComando.VENTANA, "2", ventana, tick=12, secuencia=40),
+            Comando(TipoComando.PASO, "NORTE", PasoMsg(color=Color.VERDE, llegadas=[5], incluir_detalle=False), tick=3),
+            Comando(TipoComando.OBTENER_ESTADO, "SUR", True, secuencia=41),
+            Comando(TipoComando.DETENER, "ESTE"),
+            Respuesta(TipoRespuesta.RESULTADO_VENTANA, "2", resultado, tick=12, secuencia=40),
+            Respuesta(TipoRespuesta.RESULTADO_PASO, "NORTE", paso, tick=3, secuencia=42),
+            Respuesta(TipoRespuesta.ESTADO_SEMAFORO, "SUR", estado, secuencia=41),
+            Respuesta(TipoRespuesta.ERROR, "OESTE", "falló", exito=False),
+        ]
+        assert _ida_y_vuelta(mensajes) == mensajes
+
+    def test_lote_compacto(self):
+        """Verifica que los payloads de cada tick ocupan menos que con pickle."""
+        ventana = Comando(
+            TipoComando.VENTANA, "0", VentanaMsg(hasta=100, llegadas=array("q", range(30))), tick=98, secuencia=7,
+        )
+        assert len(codificar_lote([ventana])) < len(pickle.dumps(ventana))
+        assert decodificar_lote(codificar_lote([])[4:]) == []
+
+    def test_direcciones(self):
+        """Verifica la lectura de direcciones host:puerto."""
+        assert parsear_direccion("10.0.0.2:7001") == ("10.0.0.2", 7001)
+        assert parsear_direccion(":7001") == ("127.0.0.1", 7001)
+        with pytest.raises(ValueError):
+            parsear_direccion("10.0.0.2")
+        with pytest.raises(ValueError):
+            CoordinadorNodos([])
+
+
+class TestAutenticacion:
+    """Tests de la autenticación y de los workers permitidos en un nodo."""
+
+    def test_clave_incorrecta(self):
+        """Verifica que un nodo rechaza otra clave y sigue atendiendo a quien tiene la correcta."""
+        nodos = NodosLocales(1)
+        with nodos as direcciones:
+            coordinador = CoordinadorNodos(direcciones, clave=b"otra clave")
+            with pytest.raises(AuthenticationError):
+                coordinador.iniciar({"0": ("worker_region", ())})
+            coordinador.cerrar()
+
+            canal = CanalSocket.conectar(direcciones[0])
+            canal.autenticar(nodos.clave.encode(), servidor=False)
+            canal.enviar([Comando(TipoComando.INICIAR, "", {}, secuencia=0)])
+            (respuesta,) = canal.recibir()
+            canal.close()
+            assert respuesta.tipo == TipoRespuesta.LISTO
+
+    def test_sin_autenticar_no_se_lee_ninguna_trama(self):
+        """Verifica que el nodo cierra la conexión de quien envía una trama en lugar de la firma."""
+        with NodosLocales(1) as direcciones:
+            host, puerto = parsear_direccion(direcciones[0])
+            with socket.create_connection((host, puerto), timeout=5) as conexion:
+                assert len(conexion.recv(32)) == 32  # Desafío del nodo
+                trama = codificar_lote([Comando(TipoComando.INICIAR, "", {"0": ("worker_region", ())})])
+                conexion.sendall(trama[:32])
+                assert conexion.recv(1) == b"\x00"
+                assert conexion.recv(1) == b""
+
+    def test_solo_workers_permitidos(self):
+        """Verifica que ni el coordinador ni el nodo crean workers fuera de WORKERS_REMOTOS."""
+        with NodosLocales(1) as direcciones:
+            coordinador = CoordinadorNodos(direcciones)
+            with pytest.raises(ValueError):
+                coordinador.iniciar({"0": ("system", ("true",))})
+
+            canal = CanalSocket.conectar(direcciones[0])
+            canal.autenticar(coordinador._clave, servidor=False)
+            canal.enviar([Comando(TipoComando.INICIAR, "", {"0": ("system", ("true",))}, secuencia=0)])
+            (respuesta,) = canal.recibir()
+            canal.close()
+            assert respuesta.tipo == TipoRespuesta.ERROR and not respuesta.exito
+
+
+class TestNodos:
+    """Tests de los engines con workers en nodos locales."""
+
+    def test_multiprocessing_en_nodos(self):
+        """Verifica que los semáforos en dos nodos dan el mismo resultado que con Pipes."""
+        config = ConfiguracionSimulacion(semilla=7, headless=True, lookahead=3)
+        with NodosLocales(2) as direcciones:
+            remoto = _correr(MultiprocessingEngine(replace(config, nodos=direcciones)), 150)
+        local = _correr(MultiprocessingEngine(config), 150)
+        assert remoto.estadisticas == local.estadisticas
+        assert remoto.colas == local.colas
+        assert remoto.info_sistema["nodos"] == 2
+
+    def test_red_particionada_en_nodos(self):
+        """Verifica que las regiones en nodos reproducen al engine secuencial, con ambas sincronizaciones."""
+        config = ConfiguracionSimulacion(
+            semilla=2, probabilidad_llegada=0.5, interseccion_observada=4, headless=True,
+            red={"tipo": "grilla", "filas": 3, "columnas": 3, "capacidad": 6, "tiempo_viaje": 2},
+            regiones=3,
+        )
+        secuencial = _correr(NetworkEngine(config), 120)
+        with NodosLocales(2) as direcciones:
+            for sincronizacion in ("conservadora", "optimista"):
+                engine = PartitionedNetworkEngine(replace(config, nodos=direcciones, sincronizacion=sincronizacion))
+                estado = _correr(engine, 120)
+                assert estado.estadisticas == secuencial.estadisticas
+                assert estado.info_sistema["procesos_activos"] == 3
@@ -0,0 +1,113 @@
+"""
+Tests para las estadísticas de tráfico.
+Verifica los acumuladores en streaming y el resumen por vía.
+"""
+import statistics
+import random
+import pytest
+from backend.core.common.acumulador import AcumuladorEspera, HistogramaLog
+from backend.core.common.stats import EstadisticasTrafico
+
+
+class TestAcumuladorEspera:
+    """Tests para AcumuladorEspera e HistogramaLog."""
+
+    def test_media_y_varianza(self):
+        """Verifica que Welford coincide con el cálculo directo."""
+        valores = [3, 7, 7, 19, 0, 4]
+        acumulador = AcumuladorEspera()
+        acumulador.agregar_varios(valores)
+        
+        assert acumulador.cuenta == 6
+        assert acumulador.suma == sum(valores)
+        assert acumulador.media == pytest.approx(statistics.mean(valores))
+        assert acumulador.varianza == pytest.approx(statistics.variance(valores))
+        assert acumulador.minimo == 0
+        assert acumulador.maximo == 19
+
+    def test_agregar_con_repeticiones(self):
+        """Verifica que registrar un valor con veces=n equivale a n registros."""
+        repetido = AcumuladorEspera()
+        for valor, veces in [(3, 4), (10, 1), (0, 2)]:
+            repetido.agregar(valor, veces)
+        individual = AcumuladorEspera()
+        individual.agregar_varios([3, 3, 3, 3, 10, 0, 0])
+
+        assert repetido.cuenta == individual.cuenta
+        assert repetido.suma == individual.suma
+        assert repetido.media == pytest.approx(individual.media)
+        assert repetido.varianza == pytest.approx(individual.varianza)
+        assert repetido.percentil(50) == individual.percentil(50)
+
+    def test_percentiles_exactos_en_valores_pequenos(self):
+        """Verifica que los valores pequeños caen en cubetas exactas."""
+        acumulador = AcumuladorEspera()
+        acumulador.agregar_varios(range(1, 11))
+        
+        assert acumulador.percentil(50) == 5
+        assert acumulador.percentil(90) == 9
+        assert acumulador.percentil(99) == 10
+
+    def test_error_relativo_acotado(self):
+        """Verifica el error relativo de los percentiles en valores grandes."""
+        rng = random.Random(7)
+        valores = [int(rng.expovariate(1 / 500)) for _ in range(20000)]
+        acumulador = AcumuladorEspera()
+        acumulador.agregar_varios(valores)
+        
+        ordenados = sorted(valores)
+        for p in (50, 90, 99):
+            exacto = ordenados[int(p / 100 * len(ordenados)) - 1]
+            assert acumulador.percentil(p) == pytest.approx(exacto, rel=0.05)
+
+    def test_memoria_acotada(self):
+        """Verifica que el número de cubetas no crece con las muestras."""
+        histograma = HistogramaLog()
+        for i in range(100000):
+            histograma.agregar(i % 1000)
+        assert histograma.num_cubetas < 200
+
+
+class TestEstadisticasTrafico:
+    """Tests para EstadisticasTrafico."""
+
+    def test_resumen_por_via(self):
+        """Verifica totales, conteos y percentiles por vía."""
+        stats = EstadisticasTrafico()
+        stats.registrar_tiempos([1, 2, 3], "NORTE")
+        stats.registrar_tiempos([10], "ESTE")
+        
+        resumen = stats.get_resumen()
+        assert resumen["total_vehiculos"] == 4
+        assert resumen["tiempo_espera_total"] == 16
+        assert resumen["vehiculos_por_via"]["NORTE"] == 3
+        assert resumen["vehiculos_por_via"]["SUR"] == 0
+        assert resumen["espera_por_via"]["NORTE"]["percentiles"]["p50"] == 2
+        assert resumen["espera"]["maximo"] == 10
+
+    def test_reset(self):
+        """Verifica que reset limpia todos los acumuladores."""
+        stats = EstadisticasTrafico()
+        stats.registrar_tiempos([5, 5], "SUR")
+        stats.reset()
+        
+        assert stats.total_vehiculos == 0
+        assert stats.tiempo_espera_promedio == 0.0
+        assert stats.percentil_espera(95) == 0.0
+
+    def test_fusionar_parciales(self):
+        """Verifica que combinar parciales equivale a registrar todo junto."""
+        rng = random.Random(3)
+        tiempos = {via: [rng.randint(0, 300) for _ in range(500)] for via in ("NORTE", "ESTE")}
+        
+        total = EstadisticasTrafico()
+        parciales = []
+        for via, valores in tiempos.items():
+            total.registrar_tiempos(valores, via)
+            parcial = EstadisticasTrafico()
+            parcial.registrar_tiempos(valores, via)
+            parciales.append(parcial)
+        
+        fusion = EstadisticasTrafico.fusionar(parciales)
+        assert fusion.get_resumen() == total.get_resumen()
+        assert fusion._espera.varianza == pytest.approx(total._espera.varianza)
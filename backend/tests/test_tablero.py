@@ -0,0 +1,102 @@
+"""
+Tests para el tablero de estado en memoria compartida.
+Verifica la lectura y escritura entre procesos, la lectura de un slot a medio escribir
+y el ciclo de vida del bloque.
+"""
+import multiprocessing as mp
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from backend.core.common.tipos import Color
+from backend.runtime.comms.tablero import (
+    CAMPOS_POR_SLOT, SECUENCIA, LecturaTablero, TableroEstado, tracker_heredado,
+)
+
+RAIZ = Path(__file__).resolve().parents[2]
+
+
+def _responder(nombre: str, listo) -> None:
+    """Lee el slot 0 y publica en el slot 1 los mismos contadores más uno."""
+    tablero = TableroEstado.conectar(nombre, 2)
+    try:
+        lectura = tablero.leer(0)
+        tablero.escribir(
+            1, lectura.tick + 1, Color.ROJO, lectura.tamano_cola + 1,
+            lectura.vehiculos_cruzados + 1, lectura.espera_total + 1,
+        )
+    finally:
+        tablero.cerrar()
+    listo.send(True)
+
+
+class TestTableroEstado:
+    """Tests para TableroEstado."""
+
+    def test_ida_y_vuelta_entre_procesos(self):
+        """Verifica que los contadores cruzan de un proceso a otro en ambos sentidos."""
+        tablero = TableroEstado.crear(2)
+        try:
+            assert tablero.leer_todos() == [None, None]
+            tablero.escribir(0, 5, Color.VERDE, 3, 10, 42)
+            receptor, emisor = mp.Pipe(duplex=False)
+            proceso = mp.Process(target=_responder, args=(tablero.nombre, emisor))
+            proceso.start()
+            assert receptor.poll(10) and receptor.recv()
+            proceso.join(5)
+            assert proceso.exitcode == 0
+            assert tablero.leer(0) == LecturaTablero(5, Color.VERDE, 3, 10, 42)
+            assert tablero.leer(1) == LecturaTablero(6, Color.ROJO, 4, 11, 43)
+        finally:
+            tablero.cerrar()
+
+    def test_conexion_desde_otro_programa(self):
+        """Verifica que un proceso con su propio resource tracker no elimina el bloque al terminar."""
+        tablero = TableroEstado.crear(1)
+        try:
+            codigo = (
+                "import sys; from backend.core.common.tipos import Color; "
+                "from backend.runtime.comms.tablero import TableroEstado; "
+                "t = TableroEstado.conectar(sys.argv[1], 1); t.escribir(0, 9, Color.AMARILLO, 1, 2, 3); t.cerrar()"
+            )
+            subprocess.run([sys.executable, "-c", codigo, tablero.nombre], cwd=RAIZ, check=True, timeout=30)
+            time.sleep(0.2)  # El tracker del otro programa limpia después de que este termina
+            otro = TableroEstado.conectar(tablero.nombre, 1)
+            assert otro.leer(0) == LecturaTablero(9, Color.AMARILLO, 1, 2, 3)
+            otro.cerrar()
+        finally:
+            tablero.cerrar()
+
+        with pytest.raises(FileNotFoundError):
+            TableroEstado.conectar(tablero.nombre, 1)
+
+    def test_slot_a_medio_escribir(self):
+        """Verifica que leer desiste de un slot cuyo worker murió escribiendo en lugar de colgarse."""
+        tablero = TableroEstado.crear(2)
+        try:
+            tablero.escribir(1, 4, Color.VERDE, 1, 2, 3)
+            tablero._valores[CAMPOS_POR_SLOT + SECUENCIA] += 1  # Secuencia impar, como tras morir a mitad
+            inicio = time.monotonic()
+            assert tablero.leer(1, timeout=0.05) is None
+            assert time.monotonic() - inicio < 1
+            tablero._valores[CAMPOS_POR_SLOT + SECUENCIA] += 1
+            assert tablero.leer(1) == LecturaTablero(4, Color.VERDE, 1, 2, 3)
+        finally:
+            tablero.cerrar()
+
+    @pytest.mark.skipif(sys.version_info >= (3, 13), reason="Desde 3.13 se usa track=False")
+    def test_deteccion_del_tracker(self):
+        """Fija el atributo privado del resource tracker del que depende conectar hasta Python 3.12."""
+        tablero = TableroEstado.crear(1)
+        try:
+            assert tracker_heredado()
+            codigo = "from backend.runtime.comms.tablero import tracker_heredado; print(tracker_heredado())"
+            salida = subprocess.run(
+                [sys.executable, "-c", codigo], cwd=RAIZ, check=True, timeout=30, capture_output=True, text=True,
+            )
+            assert salida.stdout.strip() == "False"
+        finally:
+            tablero.cerrar()
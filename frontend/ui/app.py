@@ -393,7 +393,7 @@ class TrafficGUI:
         self.label_tick.config(text=str(state.tick))
         self.label_ciclo.config(text=str(state.ciclo))
         self.label_total.config(text=str(state.estadisticas.get('total_vehiculos', 0)))
-        self.label_espera.config(text=f"{state.estadisticas.get('tiempo_espera_promedio', 0):.2f}s")
+        self.label_espera.config(text=f"{state.estadisticas.get('tiempo_espera_promedio', 0):.2f} ticks")
         
         timing = state.timing_fase
         self.label_fase_nombre.config(text=timing['fase_actual'])